@@ -0,0 +1,172 @@
+# Benchmarks/api_load_test.py
+"""
+Нагрузочный тест HTTP API (api.py).
+
+--clients потоков в течение --duration секунд по кругу запрашивают
+адреса из --paths, каждый поток держит одно keep-alive соединение,
+как настольный клиент. Клиенты ведут себя как браузер: запоминают ETag
+и шлют If-None-Match, просят gzip (отключается --no-etag и --no-gzip).
+
+По умолчанию сервер запускается в этом же процессе на свободном порту;
+--url - проверить уже запущенный сервер (например, на другой машине):
+    python -m Benchmarks.api_load_test --clients 8 --duration 20
+    python -m Benchmarks.api_load_test --url http://127.0.0.1:8080 --clients 32
+    python -m Benchmarks.api_load_test --no-etag --no-gzip
+"""
+import argparse
+import http.client
+import statistics
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = [
+    "/cars",
+    "/drivers",
+    "/routes",
+    "/tariffs/active",
+    "/cargo-types",
+    "/dashboard",
+    "/revenue?by=route&period=month",
+    "/shipments?status=in_transit",
+]
+
+
+class PathStats:
+    """Замеры по одному адресу"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.not_modified = 0
+        self.errors = 0
+        self.bytes = 0
+
+
+def _client(host: str, port: int, paths: List[str], deadline: float, use_etag: bool, use_gzip: bool,
+            stats: Dict[str, PathStats], lock: threading.Lock):
+    connection = http.client.HTTPConnection(host, port, timeout=120)
+    etags: Dict[str, str] = {}
+    local = {path: PathStats() for path in paths}
+
+    number = 0
+    while time.perf_counter() < deadline:
+        path = paths[number % len(paths)]
+        number += 1
+
+        headers = {}
+        if use_gzip:
+            headers["Accept-Encoding"] = "gzip"
+        if use_etag and path in etags:
+            headers["If-None-Match"] = etags[path]
+
+        started = time.perf_counter()
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            local[path].errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=120)
+            continue
+        elapsed = time.perf_counter() - started
+
+        result = local[path]
+        result.latencies.append(elapsed)
+        result.bytes += len(body)
+        if response.status == 304:
+            result.not_modified += 1
+        elif response.status != 200:
+            result.errors += 1
+        elif response.getheader("ETag"):
+            etags[path] = response.getheader("ETag")
+
+    connection.close()
+    with lock:
+        for path, result in local.items():
+            total = stats[path]
+            total.latencies += result.latencies
+            total.not_modified += result.not_modified
+            total.errors += result.errors
+            total.bytes += result.bytes
+
+
+def run_load(url: str, clients: int, duration: float, paths: List[str],
+             use_etag: bool = True, use_gzip: bool = True) -> Dict[str, PathStats]:
+    address = urlsplit(url)
+    stats = {path: PathStats() for path in paths}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    threads = [
+        threading.Thread(target=_client, args=(
+            address.hostname, address.port or 80,
+            # Клиенты начинают с разных адресов, чтобы не ходить строем
+            paths[i % len(paths):] + paths[:i % len(paths)],
+            deadline, use_etag, use_gzip, stats, lock,
+        ))
+        for i in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats
+
+
+def _percentile(values: List[float], share: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[int(share * 100) - 1]
+
+
+def print_results(stats: Dict[str, PathStats], duration: float):
+    print(f"{'Адрес':<36}{'Запросов':>10}{'304':>7}{'Ошибок':>8}{'p50, мс':>10}{'p95, мс':>10}"
+          f"{'Ср. ответ, КБ':>15}")
+    total = 0
+    for path, result in stats.items():
+        count = len(result.latencies)
+        total += count
+        print(f"{path[:35]:<36}{count:>10}{result.not_modified:>7}{result.errors:>8}"
+              f"{_percentile(result.latencies, 0.50) * 1000:>10.1f}"
+              f"{_percentile(result.latencies, 0.95) * 1000:>10.1f}"
+              f"{result.bytes / max(count, 1) / 1024:>15.1f}")
+    print(f"Всего: {total} запросов за {duration:.0f} с ({total / duration:.1f} в секунду)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест HTTP API")
+    parser.add_argument("--url", help="Адрес запущенного сервера (по умолчанию - запустить здесь)")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20, help="Секунд")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    parser.add_argument("--pool-size", type=int, default=10, help="Пул соединений встроенного сервера")
+    parser.add_argument("--no-etag", action="store_true", help="Не присылать If-None-Match")
+    parser.add_argument("--no-gzip", action="store_true", help="Не просить сжатие")
+    args = parser.parse_args(argv)
+
+    server = None
+    url = args.url
+    if url is None:
+        from api import create_server
+
+        server = create_server("127.0.0.1", 0, pool_size=args.pool_size, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        stats = run_load(url, args.clients, args.duration, args.paths,
+                         use_etag=not args.no_etag, use_gzip=not args.no_gzip)
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+
+    print_results(stats, args.duration)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+# Benchmarks/datagen.py
+"""
+Генератор синтетических данных: машины, водители, маршруты, тарифы,
+связи маршрут-тариф и перевозки в заданном масштабе.
+
+Данные детерминированы (seed + фиксированная опорная дата) и проходят
+триггеры БД: вес груза не больше грузоподъемности машины, дата окончания
+тарифа позже даты начала, стаж не больше 40 лет и согласован с датой приема.
+Стоимость перевозок считает триггер shipment_cost_after_insert (один UPDATE на пачку COPY).
+Перевозки попадают в период действия своего тарифа, водитель - тот, что
+закреплен за машиной.
+
+Загрузка идет через COPY FROM STDIN пачками (триггеры строк и операторов срабатывают и на COPY).
+Месячные партиции shipment на период перевозок создаются перед загрузкой.
+
+Запуск (ВНИМАНИЕ: --reset очищает таблицы текущей базы):
+    python -m Benchmarks.datagen --scale 10 --seed 42 --reset
+"""
+import argparse
+import csv
+import datetime
+import io
+import random
+import sys
+import time
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from Shared.DataBaseSession import SyncDatabase
+from Shared.uuid7 import uuid7_from
+
+
+# Объемы при масштабе 1 (100x - 10 тыс. машин и 5 млн перевозок)
+BASE_VOLUMES: Dict[str, int] = {
+    "cars": 100,
+    "routes": 50,
+    "tariffs": 20,
+    "shipments": 50_000,
+}
+
+# Доля водителей без машины (сверх числа машин)
+SPARE_DRIVERS_RATIO = 0.1
+# Тарифов на маршрут
+TARIFFS_PER_ROUTE = 3
+
+DEFAULT_SEED = 42
+DEFAULT_ANCHOR = datetime.datetime(2025, 1, 1)
+
+# Таблицы в порядке загрузки (очистка - в обратном)
+TABLES = ["car", "driver", "route", "tariff", "route_tariff", "shipment"]
+# Таблицы, которые заполняет само приложение (архив, сводки выручки) - очищаются вместе с TABLES
+DERIVED_TABLES = ["shipment_archive", "revenue_daily_route", "revenue_daily_car", "revenue_daily_driver"]
+
+_BRANDS = [
+    "Volvo FH", "Volvo FM", "Volvo FE", "MAN TGS", "MAN TGX", "MAN TGL", "Scania R500",
+    "Mercedes Actros", "Mercedes Atego", "DAF XF", "DAF CF", "Iveco Stralis", "Renault Magnum", "КАМАЗ 5490",
+]
+_BODY_TYPES = ["Тентованный", "Рефрижератор", "Изотермический", "Самосвал", "Цистерна"]
+_CITIES = [
+    "Москва", "Санкт-Петербург", "Нижний Новгород", "Казань", "Ростов-на-Дону", "Екатеринбург",
+    "Новосибирск", "Самара", "Воронеж", "Ярославль", "Тверь", "Иваново", "Краснодар", "Уфа", "Пермь",
+]
+_ROAD_TYPES = ["Магистраль", "Региональная", "Городская"]
+_CARGO_TYPES = [
+    "Товары народного потребления", "Рефрижераторные грузы", "Продовольствие", "Строительные материалы",
+    "Металлопрокат", "Сельхозпродукция", "Химикаты", "Электроника", "Нефтепродукты", "Опасные грузы",
+]
+_LAST_NAMES = ["Иванов", "Петров", "Сидоров", "Кузнецов", "Смирнов", "Попов", "Волков", "Морозов", "Лебедев"]
+_FIRST_NAMES = ["Иван", "Петр", "Алексей", "Дмитрий", "Сергей", "Андрей", "Михаил", "Николай"]
+_PATRONYMICS = ["Иванович", "Петрович", "Викторович", "Сергеевич", "Андреевич", "Михайлович"]
+_LICENSE_CATEGORIES = ["CE", "C1E", "C"]
+_PLATE_LETTERS = "АВЕКМНОРСТУХ"
+
+
+def scale_volumes(scale: float) -> Dict[str, int]:
+    """Объемы данных для масштаба (1, 10, 100 ...)"""
+    return {name: max(1, int(count * scale)) for name, count in BASE_VOLUMES.items()}
+
+
+class FleetGenerator:
+    """
+    Детерминированный генератор строк для всех таблиц.
+
+    Строки - кортежи в порядке столбцов COLUMNS[table].
+    Генерировать нужно в порядке TABLES: следующие таблицы ссылаются на предыдущие.
+    """
+
+    COLUMNS: Dict[str, List[str]] = {
+        "car": ["id", "brand", "license_plate", "load_capacity", "body_type", "fuel_consumption"],
+        "driver": ["id", "full_name", "license_number", "license_category",
+                   "experience_years", "hire_date", "car_id"],
+        "route": ["id", "origin", "destination", "distance_km", "avg_time_hours", "road_type"],
+        "tariff": ["id", "price_per_km", "cargo_type", "min_price", "date_start", "date_end", "description"],
+        "route_tariff": ["id", "route_id", "tariff_id"],
+        "shipment": ["id", "shipment_date", "cargo_weight", "status",
+                     "car_id", "driver_id", "route_id", "tariff_id"],
+    }
+
+    def __init__(self, scale: float = 1, seed: int = DEFAULT_SEED,
+                 anchor: datetime.datetime = DEFAULT_ANCHOR):
+        self.volumes = scale_volumes(scale)
+        self.anchor = anchor
+        self.rng = random.Random(seed)
+        self._id_seq = 0
+
+        self.cars: List[Tuple[uuid.UUID, float]] = []           # (id, грузоподъемность, т)
+        self.car_drivers: List[Tuple[uuid.UUID, uuid.UUID, float]] = []  # (car_id, driver_id, т)
+        self.routes: List[uuid.UUID] = []
+        self.tariffs: List[Tuple[uuid.UUID, datetime.datetime, datetime.datetime]] = []
+        self.route_tariffs: List[Tuple[uuid.UUID, int]] = []     # (route_id, индекс тарифа)
+
+    def _uuid(self) -> uuid.UUID:
+        # UUIDv7, как у приложения: время - от опорной даты, порядок - порядок генерации
+        seq, self._id_seq = self._id_seq, self._id_seq + 1
+        timestamp_ms = int(self.anchor.timestamp() * 1000) + (seq >> 12)
+        return uuid7_from(timestamp_ms, seq & 0xFFF, self.rng.getrandbits(62))
+
+    def _date_before(self, max_days: int) -> datetime.datetime:
+        """Случайный момент в пределах max_days дней до опорной даты"""
+        return self.anchor - datetime.timedelta(days=self.rng.randint(0, max_days),
+                                                minutes=self.rng.randint(0, 24 * 60 - 1))
+
+    # ========== ТАБЛИЦЫ ==========
+
+    def generate_cars(self) -> Iterator[Tuple]:
+        for i in range(self.volumes["cars"]):
+            car_id = self._uuid()
+            capacity = round(self.rng.choice([1.5, 3.5, 5, 10, 12, 18.5, 20, 22, 25]), 1)
+            plate = f"{_PLATE_LETTERS[i % 12]}{i // 12:06d}{_PLATE_LETTERS[(i // 7) % 12]}{77 + i % 100}"
+            self.cars.append((car_id, capacity))
+            yield (
+                car_id, self.rng.choice(_BRANDS), plate, capacity,
+                self.rng.choice(_BODY_TYPES), round(self.rng.uniform(12, 38), 1),
+            )
+
+    def generate_drivers(self) -> Iterator[Tuple]:
+        total = len(self.cars) + int(len(self.cars) * SPARE_DRIVERS_RATIO)
+        for i in range(total):
+            driver_id = self._uuid()
+            experience = self.rng.randint(1, 35)
+            # Дата приема согласована со стажем (проверка check_driver_experience)
+            hire_date = self.anchor - datetime.timedelta(days=experience * 365 + self.rng.randint(0, 300))
+
+            car_id = None
+            if i < len(self.cars):
+                car_id, capacity = self.cars[i]
+                self.car_drivers.append((car_id, driver_id, capacity))
+
+            full_name = (f"{self.rng.choice(_LAST_NAMES)} {self.rng.choice(_FIRST_NAMES)} "
+                         f"{self.rng.choice(_PATRONYMICS)}")
+            yield (
+                driver_id, full_name, f"77ВУ{i:08d}", self.rng.choice(_LICENSE_CATEGORIES),
+                experience, hire_date, car_id,
+            )
+
+    def generate_routes(self) -> Iterator[Tuple]:
+        for _ in range(self.volumes["routes"]):
+            route_id = self._uuid()
+            origin, destination = self.rng.sample(_CITIES, 2)
+            distance = self.rng.randint(30, 3000)
+            self.routes.append(route_id)
+            yield (
+                route_id, origin, destination, distance,
+                round(distance / self.rng.uniform(45, 75), 1), self.rng.choice(_ROAD_TYPES),
+            )
+
+    def generate_tariffs(self) -> Iterator[Tuple]:
+        for _ in range(self.volumes["tariffs"]):
+            tariff_id = self._uuid()
+            date_start = self._date_before(3 * 365)
+            # Треть тарифов закрыта, остальные бессрочные
+            date_end = None
+            if self.rng.random() < 0.33:
+                date_end = date_start + datetime.timedelta(days=self.rng.randint(30, 365))
+
+            self.tariffs.append((tariff_id, date_start, min(date_end or self.anchor, self.anchor)))
+            yield (
+                tariff_id, round(self.rng.uniform(20, 80), 2), self.rng.choice(_CARGO_TYPES),
+                self.rng.choice([1500, 2500, 3500, 4200, 5500, 7000]), date_start, date_end, None,
+            )
+
+    def generate_route_tariffs(self) -> Iterator[Tuple]:
+        per_route = min(TARIFFS_PER_ROUTE, len(self.tariffs))
+        for route_id in self.routes:
+            for tariff_index in self.rng.sample(range(len(self.tariffs)), per_route):
+                self.route_tariffs.append((route_id, tariff_index))
+                yield self._uuid(), route_id, self.tariffs[tariff_index][0]
+
+    def generate_shipments(self) -> Iterator[Tuple]:
+        for _ in range(self.volumes["shipments"]):
+            car_id, driver_id, capacity = self.rng.choice(self.car_drivers)
+            route_id, tariff_index = self.rng.choice(self.route_tariffs)
+            tariff_id, date_start, date_end = self.tariffs[tariff_index]
+
+            # Дата в периоде действия тарифа
+            span = int((date_end - date_start).total_seconds())
+            shipment_date = date_start + datetime.timedelta(seconds=self.rng.randint(0, max(span, 0)))
+            age_days = (self.anchor - shipment_date).days
+
+            if age_days > 14:
+                status = "cancelled" if self.rng.random() < 0.1 else "delivered"
+            else:
+                status = self.rng.choice(["pending", "in_transit"])
+
+            # Вес в пределах грузоподъемности (проверка check_shipment_capacity)
+            cargo_weight = round(self.rng.uniform(0.05, 1.0) * capacity * 1000, 1)
+            yield (
+                self._uuid(), shipment_date, cargo_weight, status,
+                car_id, driver_id, route_id, tariff_id,
+            )
+
+    def tables(self) -> Iterator[Tuple[str, Iterable[Tuple]]]:
+        """Пары (таблица, строки) в порядке загрузки"""
+        yield "car", self.generate_cars()
+        yield "driver", self.generate_drivers()
+        yield "route", self.generate_routes()
+        yield "tariff", self.generate_tariffs()
+        yield "route_tariff", self.generate_route_tariffs()
+        yield "shipment", self.generate_shipments()
+
+
+# ========== ЗАГРУЗКА ==========
+
+def _copy_rows(session: Session, table: str, columns: Sequence[str], rows: Iterable[Tuple],
+               created_at: datetime.datetime, batch_size: int = 50_000) -> int:
+    """Загрузить строки через COPY FROM STDIN пачками по batch_size"""
+    all_columns = list(columns) + ["created_at", "updated_at", "active"]
+    sql = f"COPY {table} ({', '.join(all_columns)}) FROM STDIN WITH (FORMAT csv)"
+    cursor = session.connection().connection.cursor()
+
+    count = 0
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        buffer.seek(0)
+        cursor.copy_expert(sql, buffer)
+        buffer.seek(0)
+        buffer.truncate()
+
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row] + [created_at, created_at, True])
+        count += 1
+        if count % batch_size == 0:
+            flush()
+
+    if buffer.tell():
+        flush()
+    return count
+
+
+def _csv_value(value: Any) -> Any:
+    """NULL в CSV-формате COPY - пустое значение без кавычек"""
+    return "" if value is None else value
+
+
+def reset_database(session: Session):
+    """Очистить таблицы перевозок (все данные текущей базы будут удалены)"""
+    session.execute(text(f"TRUNCATE {', '.join(DERIVED_TABLES + list(reversed(TABLES)))}"))
+    session.commit()
+
+
+def load_fleet(session: Session, scale: float = 1, seed: int = DEFAULT_SEED,
+               anchor: datetime.datetime = DEFAULT_ANCHOR) -> Dict[str, int]:
+    """
+    Сгенерировать и загрузить данные одной транзакцией.
+
+    Returns:
+        {таблица: количество строк}
+    """
+    generator = FleetGenerator(scale, seed, anchor)
+    counts = {}
+
+    # Предупреждения триггеров (например, тариф с датой начала в прошлом) не нужны
+    session.execute(text("SET LOCAL client_min_messages = error"))
+    for table, rows in generator.tables():
+        if table == "shipment":
+            # Тарифы уже сгенерированы: перевозки лежат в периоде их действия
+            first_date = min(date_start for _, date_start, _ in generator.tariffs)
+            session.execute(
+                text("SELECT ensure_shipment_partitions(CAST(:date_from AS DATE), CAST(:date_to AS DATE))"),
+                {"date_from": first_date, "date_to": anchor}
+            )
+        counts[table] = _copy_rows(session, table, FleetGenerator.COLUMNS[table], rows, anchor)
+
+    session.commit()
+    session.execute(text(f"ANALYZE {', '.join(TABLES)}"))
+    session.commit()
+    return counts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Загрузка синтетических данных в текущую базу")
+    parser.add_argument("--scale", type=float, default=1, help="Масштаб (1 = 100 машин и 50 тыс. перевозок)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--reset", action="store_true", help="Очистить таблицы перед загрузкой")
+    args = parser.parse_args(argv)
+
+    session = SyncDatabase.get_session()
+    try:
+        if args.reset:
+            reset_database(session)
+
+        started = time.perf_counter()
+        counts = load_fleet(session, args.scale, args.seed)
+        elapsed = time.perf_counter() - started
+    finally:
+        session.close()
+
+    for table, count in counts.items():
+        print(f"{table:<14}{count:>10}")
+    print(f"Загружено за {elapsed:.1f} с")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
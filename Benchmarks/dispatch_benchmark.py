@@ -0,0 +1,132 @@
+# Benchmarks/dispatch_benchmark.py
+"""
+Несколько диспетчеров разбирают очередь ожидающих перевозок (Services/Dispatch).
+
+Создается --shipments перевозок в статусе pending (копии машин, водителей,
+маршрутов и тарифов существующих перевозок), затем --workers потоков,
+каждый со своей сессией, по кругу берут по --batch перевозок, "работают"
+--work-ms миллисекунд и переводят их в in_transit, пока очередь не опустеет.
+Проверяется, что каждая перевозка завершена ровно одним диспетчером.
+Созданные перевозки в конце удаляются.
+
+--no-skip-locked - то же без SKIP LOCKED: диспетчеры ждут друг друга
+на одних и тех же строках.
+    python -m Benchmarks.dispatch_benchmark --workers 8 --shipments 2000
+    python -m Benchmarks.dispatch_benchmark --workers 8 --no-skip-locked
+"""
+import argparse
+import collections
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import bindparam, text
+
+from Services.Dispatch import services as dispatch
+from Shared.DataBaseSession import SyncDatabase
+
+CREATE_SQL = """
+    INSERT INTO shipment (id, shipment_date, cargo_weight, status, car_id, driver_id,
+                          route_id, tariff_id, created_at, updated_at, active)
+    SELECT gen_random_uuid(), shipment_date, cargo_weight, 'pending', car_id, driver_id,
+           route_id, tariff_id, now(), now(), true
+    FROM shipment
+    WHERE active
+    ORDER BY shipment_date DESC
+    LIMIT :count
+    RETURNING id
+"""
+
+
+def _dispatcher(number: int, batch: int, work_s: float, completed: Dict[str, List],
+                claim_times: List[float], lock: threading.Lock):
+    worker = f"bench-{number}"
+    session = SyncDatabase.get_session()
+    done = []
+    try:
+        while True:
+            started = time.perf_counter()
+            claimed = dispatch.claim_shipments(session, worker, batch)
+            with lock:
+                claim_times.append(time.perf_counter() - started)
+            if not claimed:
+                break
+            time.sleep(work_s)
+            done += dispatch.complete_claims(session, worker, [row["id"] for row in claimed])
+    finally:
+        session.close()
+
+    with lock:
+        completed[worker] = done
+
+
+def run_benchmark(workers: int, shipments: int, batch: int, work_ms: float, skip_locked: bool) -> Dict:
+    session = SyncDatabase.get_session()
+    ids = session.execute(text(CREATE_SQL), {"count": shipments}).scalars().all()
+    session.commit()
+
+    claim_sql = dispatch.CLAIM_SQL
+    if not skip_locked:
+        dispatch.CLAIM_SQL = claim_sql.replace("SKIP LOCKED", "")
+
+    completed: Dict[str, List] = {}
+    claim_times: List[float] = []
+    lock = threading.Lock()
+    try:
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(target=_dispatcher, args=(i, batch, work_ms / 1000, completed, claim_times, lock))
+            for i in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        dispatch.CLAIM_SQL = claim_sql
+        session.execute(
+            text("DELETE FROM shipment WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"ids": list(ids)}
+        )
+        session.commit()
+        session.close()
+
+    counts = collections.Counter(shipment_id for done in completed.values() for shipment_id in done)
+    claim_times.sort()
+    return {
+        "created": len(ids),
+        "completed": len(counts),
+        "duplicates": sum(1 for count in counts.values() if count > 1),
+        "elapsed_s": elapsed,
+        "per_worker": {worker: len(done) for worker, done in sorted(completed.items())},
+        "claim_p50_ms": claim_times[len(claim_times) // 2] * 1000 if claim_times else 0,
+        "claim_max_ms": claim_times[-1] * 1000 if claim_times else 0,
+    }
+
+
+def print_results(result: Dict):
+    print(f"Создано: {result['created']}, завершено: {result['completed']}, "
+          f"завершено дважды: {result['duplicates']}")
+    print(f"Время: {result['elapsed_s']:.2f} с ({result['completed'] / result['elapsed_s']:.0f} перевозок/с)")
+    print(f"Выборка из очереди: медиана {result['claim_p50_ms']:.1f} мс, максимум {result['claim_max_ms']:.1f} мс")
+    print("По диспетчерам: " + ", ".join(f"{worker}={count}" for worker, count in result["per_worker"].items()))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Параллельная работа диспетчеров с очередью перевозок")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--shipments", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=dispatch.DEFAULT_CLAIM_LIMIT)
+    parser.add_argument("--work-ms", type=float, default=20, help="Сколько диспетчер работает с пачкой")
+    parser.add_argument("--no-skip-locked", action="store_true", help="Брать перевозки без SKIP LOCKED")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args.workers, args.shipments, args.batch, args.work_ms, not args.no_skip_locked)
+    print_results(result)
+    return 0 if result["duplicates"] == 0 and result["completed"] == result["created"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+# Benchmarks/export_benchmark.py
+"""
+Сравнение скорости выгрузки перевозок: старый xlsx, xlsx, csv (COPY), csv (Python), parquet.
+
+"xlsx (старый)" - базовая линия: путь удаленного ShipmentDialog.export_shipments_to_excel
+(get_all_shipments/get_shipments_with_filters и обычный Workbook) без Qt-диалогов.
+xlsx - тот же путь, что у ShipmentDialog.export_shipments.
+Запуск против текущей базы:
+    python -m Benchmarks.export_benchmark --filter all --repeat 3
+"""
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+from Services.Transportation.service import get_all_shipments, get_shipments_with_filters
+from Shared.DataBaseSession import SyncDatabase
+from Shared.Export.entities import SHIPMENT_EXPORT
+from Shared.Export.pipeline import run_copy_export, run_export
+from Shared.Export.sinks import CsvSink, ParquetSink, XlsxSink
+
+
+BASELINE = "xlsx (старый)"
+
+# Фильтры старого экспорта: тип -> статусы (None - все перевозки)
+LEGACY_FILTERS = {
+    "all": None,
+    "current": ["pending", "in_transit"],
+    "completed": ["delivered"],
+    "cancelled": ["cancelled"],
+    "by_status": ["pending"],
+}
+
+LEGACY_STATUS_MAPPING = {
+    "pending": "⏳ Ожидает",
+    "in_transit": "🚛 В пути",
+    "delivered": "✅ Доставлено",
+    "cancelled": "❌ Отменено"
+}
+
+LEGACY_HEADERS = [
+    ("ID", 8), ("Дата", 18), ("Тип груза", 15), ("Вес (кг)", 12), ("Статус", 12),
+    ("Автомобиль", 20), ("Водитель", 20), ("Маршрут", 25), ("Расстояние (км)", 15),
+    ("Тариф (руб/км)", 15), ("Мин. цена", 12), ("Стоимость (руб)", 15)
+]
+
+
+def _legacy_xlsx(session, file_name: str, filter_type: str) -> int:
+    """
+    Выгрузка как в удаленном export_shipments_to_excel: все перевозки словарями
+    из сервиса, затем построчное заполнение обычного Workbook со стилями.
+    Отладочный вывод и QMessageBox опущены, итоговая статистика сохранена.
+    """
+    statuses = LEGACY_FILTERS[filter_type]
+    if statuses is None:
+        shipments_data = get_all_shipments(session)
+    else:
+        shipments_data = get_shipments_with_filters(session, status=statuses)
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Перевозки"
+
+    ws.merge_cells('A1:L1')
+    ws['A1'].value = "ОТЧЕТ ПО ПЕРЕВОЗКАМ"
+    ws['A1'].font = Font(bold=True, size=16, color="2C3E50")
+    ws['A1'].alignment = Alignment(horizontal="center", vertical="center")
+
+    header_font = Font(bold=True, size=12, color="FFFFFF")
+    header_fill = PatternFill(start_color="2E86C1", end_color="2E86C1", fill_type="solid")
+    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    for col_idx, (header, width) in enumerate(LEGACY_HEADERS, 1):
+        cell = ws.cell(row=3, column=col_idx, value=header)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_alignment
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+
+    current_row = 4
+    total_cost = 0
+    total_weight = 0
+    total_distance = 0
+    status_counts = {}
+
+    for shipment in shipments_data:
+        date_str = datetime.datetime.fromisoformat(shipment["shipment_date"]).strftime("%d.%m.%Y %H:%M")
+        car_info = shipment.get("car_info", {})
+        driver_info = shipment.get("driver_info", {})
+        route_info = shipment.get("route_info", {})
+        tariff_info = shipment.get("tariff_info", {})
+
+        car_text = f"{car_info.get('brand', '')} ({car_info.get('license_plate', '')})"
+        driver_text = f"{driver_info.get('full_name', '')}"
+        if driver_info.get('license_number'):
+            driver_text += f" ({driver_info.get('license_number')})"
+        route_text = ""
+        if route_info.get('origin') and route_info.get('destination'):
+            route_text = f"{route_info['origin']} → {route_info['destination']}"
+
+        status = shipment.get("status", "pending")
+        cost = shipment.get("total_cost", 0)
+
+        ws.cell(row=current_row, column=1, value=str(shipment.get("id", "")))
+        ws.cell(row=current_row, column=2, value=date_str)
+        ws.cell(row=current_row, column=4, value=shipment.get("cargo_weight", 0))
+        ws.cell(row=current_row, column=5, value=LEGACY_STATUS_MAPPING.get(status, "⏳ Ожидает"))
+        ws.cell(row=current_row, column=6, value=car_text)
+        ws.cell(row=current_row, column=7, value=driver_text)
+        ws.cell(row=current_row, column=8, value=route_text)
+        ws.cell(row=current_row, column=9, value=route_info.get('distance_km', 0))
+        ws.cell(row=current_row, column=10, value=tariff_info.get('price_per_km', 0))
+        ws.cell(row=current_row, column=11, value=tariff_info.get('min_price', 0))
+        ws.cell(row=current_row, column=12, value=cost)
+
+        ws.cell(row=current_row, column=4).number_format = '#,##0.0" кг"'
+        ws.cell(row=current_row, column=9).number_format = '#,##0" км"'
+        ws.cell(row=current_row, column=10).number_format = '#,##0.00" руб"'
+        ws.cell(row=current_row, column=11).number_format = '#,##0" руб"'
+        ws.cell(row=current_row, column=12).number_format = '#,##0.00" руб"'
+
+        total_cost += cost
+        total_weight += shipment.get("cargo_weight", 0)
+        total_distance += route_info.get('distance_km', 0)
+        status_counts[status] = status_counts.get(status, 0) + 1
+
+        if status in ("delivered", "cancelled"):
+            color = "D5F5E3" if status == "delivered" else "FADBD8"
+            for col in range(1, 13):
+                ws.cell(row=current_row, column=col).fill = PatternFill(
+                    start_color=color, end_color=color, fill_type="solid"
+                )
+
+        current_row += 1
+
+    thin_border = Border(left=Side(style='thin'), right=Side(style='thin'),
+                         top=Side(style='thin'), bottom=Side(style='thin'))
+    for row in ws.iter_rows(min_row=3, max_row=current_row - 1, max_col=12):
+        for cell in row:
+            cell.border = thin_border
+
+    stats_row = current_row + 2
+    ws.merge_cells(f'A{stats_row}:L{stats_row}')
+    ws.cell(row=stats_row, column=1, value="СТАТИСТИКА").font = Font(bold=True, size=14)
+    ws.cell(row=stats_row + 1, column=2, value=f"Количество перевозок: {len(shipments_data)}")
+    ws.cell(row=stats_row + 2, column=1, value=f"Ожидает: {status_counts.get('pending', 0)}")
+    ws.cell(row=stats_row + 2, column=2, value=f"В пути: {status_counts.get('in_transit', 0)}")
+    ws.cell(row=stats_row + 2, column=3, value=f"Доставлено: {status_counts.get('delivered', 0)}")
+    ws.cell(row=stats_row + 2, column=4, value=f"Отменено: {status_counts.get('cancelled', 0)}")
+    ws.cell(row=stats_row + 3, column=1, value=f"Общий вес: {total_weight:.1f} кг")
+    ws.cell(row=stats_row + 3, column=2, value=f"Общая дистанция: {total_distance:.0f} км")
+    ws.cell(row=stats_row + 3, column=3, value=f"Общая стоимость: {total_cost:.2f} руб")
+
+    wb.save(file_name)
+    return len(shipments_data)
+
+
+def _exporters(filter_type: str) -> Dict[str, Callable]:
+    """
+    Варианты выгрузки: имя -> функция (session, file_path) -> количество строк.
+    У каждого варианта свой файл, чтобы размер не перезаписывался соседним.
+    У старого экспорта не было фильтра по периоду - для него базовой линии нет.
+    """
+    exporters = {}
+    if filter_type in LEGACY_FILTERS:
+        exporters[BASELINE] = lambda session, path: _legacy_xlsx(session, path + ".xlsx", filter_type)
+    exporters.update({
+        "xlsx": lambda session, path: run_export(session, SHIPMENT_EXPORT, XlsxSink(path + ".xlsx"), filter_type),
+        "csv (COPY)": lambda session, path: run_copy_export(session, SHIPMENT_EXPORT, path + ".csv", filter_type),
+        "csv (Python)": lambda session, path: run_export(session, SHIPMENT_EXPORT, CsvSink(path + ".csv"), filter_type),
+        "parquet": lambda session, path: run_export(session, SHIPMENT_EXPORT, ParquetSink(path + ".parquet"), filter_type),
+    })
+    return exporters
+
+
+def run_benchmark(filter_type: str = "all", repeat: int = 3) -> List[Dict]:
+    """
+    Прогнать каждый вариант repeat раз.
+
+    Returns:
+        Список {name, rows, median_s, rows_per_s, size_bytes}
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for index, (name, exporter) in enumerate(_exporters(filter_type).items()):
+            path = os.path.join(tmp_dir, f"export_{index}")
+            timings = []
+            rows = 0
+
+            for _ in range(repeat):
+                session = SyncDatabase.get_session()
+                try:
+                    started = time.perf_counter()
+                    rows = exporter(session, path)
+                    timings.append(time.perf_counter() - started)
+                finally:
+                    session.close()
+
+            median = statistics.median(timings)
+            size = sum(
+                os.path.getsize(os.path.join(tmp_dir, f))
+                for f in os.listdir(tmp_dir) if f.startswith(os.path.basename(path) + ".")
+            )
+            results.append({
+                "name": name,
+                "rows": rows,
+                "median_s": median,
+                "rows_per_s": rows / median if median > 0 else 0,
+                "size_bytes": size,
+            })
+
+    return results
+
+
+def print_results(results: List[Dict]):
+    baseline = next((r for r in results if r["name"] == BASELINE), None)
+
+    print(f"{'Формат':<16}{'Строк':>10}{'Медиана, с':>12}{'Строк/с':>12}{'Размер, КБ':>12}{'vs старый':>11}")
+    for r in results:
+        speedup = ""
+        if baseline and baseline["rows_per_s"] > 0:
+            speedup = f"x{r['rows_per_s'] / baseline['rows_per_s']:.1f}"
+        print(f"{r['name']:<16}{r['rows']:>10}{r['median_s']:>12.3f}"
+              f"{r['rows_per_s']:>12.0f}{r['size_bytes'] / 1024:>12.1f}{speedup:>11}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Скорость выгрузки перевозок по форматам")
+    parser.add_argument("--filter", default="all", choices=list(SHIPMENT_EXPORT.filters))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print_results(run_benchmark(args.filter, args.repeat))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
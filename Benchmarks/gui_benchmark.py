@@ -0,0 +1,178 @@
+# Benchmarks/gui_benchmark.py
+"""
+Замеры главного окна без экрана (QT_QPA_PLATFORM=offscreen).
+
+Что меряется:
+- запуск: создание MainWindow (все вкладки загружаются в конструкторе) и первая отрисовка;
+- загрузка каждой вкладки (load_routes, load_cars, ...);
+- сортировка таблицы вкладки по каждому столбцу;
+- прокрутка: проход по таблице с синхронной перерисовкой видимой области;
+- пиковый RSS процесса.
+
+Запуск против текущей базы или с перезаполнением синтетическими данными:
+    python -m Benchmarks.gui_benchmark --repeat 3
+    python -m Benchmarks.gui_benchmark --scale 1 --reset --json gui.json
+"""
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from PySide6.QtWidgets import QApplication, QTableWidget
+
+from Benchmarks.datagen import DEFAULT_SEED, load_fleet, reset_database
+from Shared.DataBaseSession import SyncDatabase
+
+# Вкладки: (имя, метод загрузки, таблица, виджет вкладки)
+TABS = [
+    ("routes", "load_routes", "route_table", "route_tab"),
+    ("cars", "load_cars", "car_table", "car_tab"),
+    ("drivers", "load_drivers", "driver_table", "driver_tab"),
+    ("shipments", "load_shipments", "shipment_table", "shipment_tab"),
+    ("tariffs", "load_tariffs", "tariff_table", "tariff_tab"),
+]
+
+# Сколько экранов прокручивать при замере перерисовки
+SCROLL_PAGES = 50
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Пиковый RSS процесса в МБ (None, если платформа не дает его узнать)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдает КБ, macOS - байты
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _timed(func: Callable, repeat: int) -> float:
+    """Медиана времени вызова, с"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def _sort_all_columns(table: QTableWidget):
+    for column in range(table.columnCount()):
+        table.sortItems(column)
+    table.sortItems(0)
+
+
+def _scroll_repaint(app: QApplication, table: QTableWidget) -> int:
+    """Прокрутить таблицу постранично, перерисовывая видимую область. Возвращает число кадров"""
+    scroll_bar = table.verticalScrollBar()
+    step = max(scroll_bar.pageStep(), 1)
+    frames = 0
+
+    scroll_bar.setValue(0)
+    for page in range(SCROLL_PAGES):
+        value = page * step
+        if value > scroll_bar.maximum():
+            break
+        scroll_bar.setValue(value)
+        table.viewport().repaint()
+        app.processEvents()
+        frames += 1
+    return frames
+
+
+def run_benchmark(repeat: int = 3) -> Dict[str, float]:
+    """
+    Замерить окно на данных текущей базы.
+
+    Returns:
+        {метрика: значение}; времена в секундах, *_rows - число строк таблицы
+    """
+    from Gui.route_main_window import MainWindow
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results: Dict[str, float] = {}
+
+    started = time.perf_counter()
+    window = MainWindow()
+    window.show()
+    app.processEvents()
+    results["startup_s"] = time.perf_counter() - started
+
+    for name, load_method, table_name, tab_name in TABS:
+        table: QTableWidget = getattr(window, table_name)
+        window.tabs.setCurrentWidget(getattr(window, tab_name))
+        app.processEvents()
+
+        results[f"{name}_load_s"] = _timed(getattr(window, load_method), repeat)
+        results[f"{name}_rows"] = table.rowCount()
+        results[f"{name}_sort_s"] = _timed(lambda: _sort_all_columns(table), repeat)
+
+        frames = 0
+
+        def scroll():
+            nonlocal frames
+            frames = _scroll_repaint(app, table)
+
+        elapsed = _timed(scroll, repeat)
+        results[f"{name}_scroll_frame_s"] = elapsed / frames if frames else 0.0
+
+    window.close()
+    window.session.close()
+
+    rss = peak_rss_mb()
+    if rss is not None:
+        results["peak_rss_mb"] = rss
+    return results
+
+
+def print_results(results: Dict[str, float]):
+    print(f"{'Запуск окна':<28}{results['startup_s'] * 1000:>12.1f} мс")
+    print(f"\n{'Вкладка':<12}{'Строк':>10}{'Загрузка, мс':>16}{'Сортировка, мс':>18}{'Кадр прокрутки, мс':>22}")
+    for name, _, _, _ in TABS:
+        print(f"{name:<12}{results[f'{name}_rows']:>10.0f}"
+              f"{results[f'{name}_load_s'] * 1000:>16.1f}"
+              f"{results[f'{name}_sort_s'] * 1000:>18.1f}"
+              f"{results[f'{name}_scroll_frame_s'] * 1000:>22.2f}")
+    if "peak_rss_mb" in results:
+        print(f"\n{'Пиковый RSS':<28}{results['peak_rss_mb']:>12.1f} МБ")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Замеры главного окна без экрана")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=float, help="Перезаполнить базу синтетическими данными этого масштаба")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--reset", action="store_true", help="Подтверждение очистки базы (нужно вместе с --scale)")
+    parser.add_argument("--json", help="Сохранить результаты в JSON")
+    args = parser.parse_args(argv)
+
+    if args.scale is not None:
+        if not args.reset:
+            print("--scale перезаполняет базу: все данные будут удалены. Добавьте --reset", file=sys.stderr)
+            return 2
+        session = SyncDatabase.get_session()
+        try:
+            reset_database(session)
+            load_fleet(session, args.scale, args.seed)
+        finally:
+            session.close()
+
+    results = run_benchmark(args.repeat)
+    print_results(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+# Benchmarks/regression_gate.py
+"""
+Проверка на регрессии производительности с историей замеров.
+
+Прогоняет ключевые функции (get_all_shipments, get_shipments_with_filters,
+выгрузки xlsx / csv / parquet), дописывает результат в JSON-историю и
+сравнивает его с базовым прогоном. Код возврата 1, если что-то замедлилось.
+
+Для каждой функции сохраняется: все замеры времени, медиана, p95,
+число SQL-запросов и пик памяти Python (tracemalloc) за один вызов.
+Запросы и память меряются отдельным прогоном, чтобы tracemalloc
+не искажал время.
+
+Регрессия по времени засчитывается, только если медиана выросла больше
+чем на --time-tolerance И самый быстрый новый замер медленнее медианы
+базового прогона (разброс замеров не перекрывается). Рост числа
+запросов - регрессия всегда, памяти - сверх --memory-tolerance.
+
+    python -m Benchmarks.regression_gate --repeat 5 --set-baseline   # зафиксировать базу
+    python -m Benchmarks.regression_gate --repeat 5                  # проверить
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from Benchmarks.datagen import DEFAULT_SEED, load_fleet, reset_database
+from Benchmarks.services_benchmark import count_queries
+from Services.Transportation.service import get_all_shipments, get_shipments_with_filters
+from Shared.DataBaseSession import SyncDatabase
+from Shared.Export.entities import SHIPMENT_EXPORT
+from Shared.Export.pipeline import run_copy_export, run_export
+from Shared.Export.sinks import CsvSink, ParquetSink, XlsxSink
+
+
+DEFAULT_HISTORY = Path.home() / ".transport_app" / "bench_history.json"
+
+# Функция гейта: (session, временная папка) -> что угодно
+GateCase = Callable[[Session, str], object]
+
+GATE_CASES: Dict[str, GateCase] = {
+    "get_all_shipments": lambda s, tmp: get_all_shipments(s),
+    "get_shipments_with_filters": lambda s, tmp: get_shipments_with_filters(s, status=["in_transit"]),
+    "export_xlsx": lambda s, tmp: run_export(s, SHIPMENT_EXPORT, XlsxSink(os.path.join(tmp, "s.xlsx"))),
+    # COPY выполняется курсором psycopg2 напрямую, в счетчик запросов не попадает
+    "export_csv_copy": lambda s, tmp: run_copy_export(s, SHIPMENT_EXPORT, os.path.join(tmp, "s.csv")),
+    "export_csv": lambda s, tmp: run_export(s, SHIPMENT_EXPORT, CsvSink(os.path.join(tmp, "s.csv"))),
+    "export_parquet": lambda s, tmp: run_export(s, SHIPMENT_EXPORT, ParquetSink(os.path.join(tmp, "s.parquet"))),
+}
+
+
+def percentile(samples: List[float], percent: float) -> float:
+    """Перцентиль по ближайшему рангу"""
+    ordered = sorted(samples)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def measure_case(case: GateCase, repeat: int) -> Dict:
+    """Замерить функцию: repeat прогонов на время и один на запросы и память"""
+    samples = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for _ in range(repeat):
+            session = SyncDatabase.get_session()
+            try:
+                started = time.perf_counter()
+                case(session, tmp_dir)
+                samples.append(time.perf_counter() - started)
+            finally:
+                session.close()
+
+        session = SyncDatabase.get_session()
+        try:
+            tracemalloc.start()
+            with count_queries(SyncDatabase.engine) as counter:
+                case(session, tmp_dir)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            session.close()
+
+    return {
+        "samples": samples,
+        "median_s": statistics.median(samples),
+        "p95_s": percentile(samples, 95),
+        "queries": counter.count,
+        "peak_mem_mb": peak / (1024 * 1024),
+    }
+
+
+# ========== ИСТОРИЯ ==========
+
+def load_history(path: Path) -> List[Dict]:
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_history(path: Path, history: List[Dict]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def find_baseline(history: List[Dict]) -> Optional[Dict]:
+    """Последний прогон, отмеченный как базовый, иначе просто последний"""
+    for entry in reversed(history):
+        if entry.get("baseline"):
+            return entry
+    return history[-1] if history else None
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).resolve().parent, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ========== СРАВНЕНИЕ ==========
+
+def compare(current: Dict, baseline: Dict, time_tolerance: float, memory_tolerance: float) -> List[str]:
+    """
+    Сравнить замер функции с базовым.
+
+    Returns:
+        Список причин регрессии (пустой - регрессии нет)
+    """
+    problems = []
+
+    ratio = current["median_s"] / baseline["median_s"] if baseline["median_s"] > 0 else 1.0
+    if ratio > 1 + time_tolerance and min(current["samples"]) > baseline["median_s"]:
+        problems.append(f"время x{ratio:.2f} ({baseline['median_s'] * 1000:.1f} -> "
+                        f"{current['median_s'] * 1000:.1f} мс)")
+
+    if current["queries"] > baseline["queries"]:
+        problems.append(f"запросов {baseline['queries']} -> {current['queries']}")
+
+    if baseline["peak_mem_mb"] > 0 and current["peak_mem_mb"] > baseline["peak_mem_mb"] * (1 + memory_tolerance):
+        problems.append(f"память {baseline['peak_mem_mb']:.1f} -> {current['peak_mem_mb']:.1f} МБ")
+
+    return problems
+
+
+def print_report(entry: Dict, baseline: Optional[Dict], regressions: Dict[str, List[str]]):
+    print(f"{'Функция':<28}{'Медиана, мс':>13}{'p95, мс':>11}{'Запросов':>10}{'Память, МБ':>12}{'vs база':>10}  ")
+    for name, result in entry["results"].items():
+        delta = ""
+        base = baseline["results"].get(name) if baseline else None
+        if base and base["median_s"] > 0:
+            delta = f"{(result['median_s'] / base['median_s'] - 1) * 100:+.0f}%"
+        status = "РЕГРЕССИЯ" if name in regressions else ""
+        print(f"{name:<28}{result['median_s'] * 1000:>13.1f}{result['p95_s'] * 1000:>11.1f}"
+              f"{result['queries']:>10}{result['peak_mem_mb']:>12.1f}{delta:>10}  {status}")
+
+    for name, problems in regressions.items():
+        print(f"  {name}: {'; '.join(problems)}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Проверка производительности против базового прогона")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cases", nargs="+", choices=list(GATE_CASES), default=list(GATE_CASES))
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY, help="Файл истории замеров")
+    parser.add_argument("--label", default="", help="Подпись прогона в истории")
+    parser.add_argument("--set-baseline", action="store_true", help="Отметить этот прогон как базовый")
+    parser.add_argument("--time-tolerance", type=float, default=0.10, help="Допустимый рост медианы (доля)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.20, help="Допустимый рост памяти (доля)")
+    parser.add_argument("--scale", type=float, help="Перед замером перезаполнить базу синтетическими данными")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--reset", action="store_true", help="Подтверждение очистки базы (нужно вместе с --scale)")
+    args = parser.parse_args(argv)
+
+    if args.scale is not None:
+        if not args.reset:
+            print("--scale перезаполняет базу: все данные будут удалены. Добавьте --reset", file=sys.stderr)
+            return 2
+        session = SyncDatabase.get_session()
+        try:
+            reset_database(session)
+            load_fleet(session, args.scale, args.seed)
+        finally:
+            session.close()
+
+    entry = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "label": args.label,
+        "scale": args.scale,
+        "baseline": args.set_baseline,
+        "results": {name: measure_case(GATE_CASES[name], args.repeat) for name in args.cases},
+    }
+
+    history = load_history(args.history)
+    baseline = None if args.set_baseline else find_baseline(history)
+
+    regressions = {}
+    if baseline:
+        for name, result in entry["results"].items():
+            base = baseline["results"].get(name)
+            if base:
+                problems = compare(result, base, args.time_tolerance, args.memory_tolerance)
+                if problems:
+                    regressions[name] = problems
+
+    history.append(entry)
+    save_history(args.history, history)
+
+    if baseline:
+        print(f"База: {baseline['timestamp']} ({baseline.get('commit') or 'без коммита'})")
+    else:
+        print("Базовый прогон сохранен" if args.set_baseline else "Истории нет, прогон станет базой для сравнения")
+    print_report(entry, baseline, regressions)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
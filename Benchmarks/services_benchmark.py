@@ -0,0 +1,401 @@
+# Benchmarks/services_benchmark.py
+"""
+Замеры всех функций Services/* на синтетических данных в масштабах 1x, 10x, 100x.
+
+Для каждого масштаба база очищается и заново заполняется генератором
+(Benchmarks.datagen), затем каждая функция вызывается repeat раз
+в отдельной сессии. Кроме времени считается число SQL-запросов на вызов -
+по нему сразу видны N+1 запросы.
+
+ВНИМАНИЕ: данные текущей базы удаляются, поэтому нужен флаг --reset.
+    python -m Benchmarks.services_benchmark --reset --scales 1 10 100 --repeat 5
+
+Функции, которые на предыдущем масштабе работали дольше --skip-over секунд,
+на следующих масштабах пропускаются (например, get_all_shipments на 5 млн строк).
+Упавшие функции попадают в результаты с текстом ошибки, код возврата - 1.
+"""
+import argparse
+import datetime
+import itertools
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from Benchmarks.datagen import DEFAULT_SEED, load_fleet, reset_database
+from Shared.DataBaseSession import SyncDatabase
+
+from Services.Car import services as car_services
+from Services.Driver import services as driver_services
+from Services.Rate import resolver as rate_resolver
+from Services.Rate import services as rate_services
+from Services.Dashboard import services as dashboard_services
+from Services.Dispatch import services as dispatch_services
+from Services.Revenue import services as revenue_services
+from Services.Route import planner as route_planner
+from Services.Route import services as route_services
+from Services.Transportation import service as shipment_services
+from Services.Utilization import services as utilization_services
+from Shared.soft_delete import purge_inactive
+
+
+DEFAULT_SCALES = [1, 10, 100]
+
+
+class QueryCounter:
+    """Счетчик SQL-запросов движка"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[QueryCounter]:
+    """Считать запросы, выполненные движком внутри блока"""
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+
+class BenchCase:
+    """
+    Замеряемый вызов.
+
+    setup(session, ctx) готовит аргументы (не замеряется),
+    run(session, ctx, prepared) - сам вызов функции сервиса,
+    teardown(session, ctx, result) - уборка после вызова (не замеряется).
+    """
+
+    def __init__(self, name: str, run: Callable[[Session, Dict, Any], Any],
+                 setup: Optional[Callable[[Session, Dict], Any]] = None,
+                 teardown: Optional[Callable[[Session, Dict, Any], Any]] = None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.teardown = teardown
+
+
+_counter = itertools.count()
+
+
+def _unique(prefix: str) -> str:
+    return f"{prefix}{next(_counter):08d}"
+
+
+def _new_car(session: Session, ctx: Dict):
+    return car_services.create_car(
+        session, brand="Bench", license_plate=_unique("BN"), load_capacity=20,
+        body_type="Тентованный", fuel_consumption=30
+    ).id
+
+
+def _new_driver(session: Session, ctx: Dict):
+    return driver_services.create_driver(
+        session, full_name="Бенчмарков Б.Б.", license_number=_unique("BN"), license_category="CE",
+        experience_years=5, hire_date=(datetime.date.today() - datetime.timedelta(days=5 * 365)).isoformat()
+    ).id
+
+
+def _new_tariff(session: Session, ctx: Dict):
+    return rate_services.create_tariff(
+        session, price_per_km=40, cargo_type="Бенчмарк", min_price=3000,
+        date_start=datetime.datetime.now(), date_end=None
+    ).id
+
+
+def _new_route(session: Session, ctx: Dict):
+    origin = _unique("Бенч")
+    route_services.create_route(session, origin, "Москва", 500, 8, "Магистраль")
+    return route_services.get_routes_with_filters(session, origin=origin)[0]["id"]
+
+
+def _new_shipment(session: Session, ctx: Dict):
+    return shipment_services.create_shipment(session, **_shipment_kwargs(ctx)).id
+
+
+def _shipment_kwargs(ctx: Dict) -> Dict:
+    return {
+        "shipment_date": ctx["shipment_date"], "cargo_weight": 1000, "status": "pending",
+        "car_id": ctx["car_id"], "driver_id": ctx["driver_id"],
+        "route_id": ctx["route_id"], "tariff_id": ctx["tariff_id"],
+    }
+
+
+def _shipment_batch(session: Session, ctx: Dict, size: int = 100) -> List[Dict]:
+    """Пачка перевозок для create_shipments: тариф маршрута на дату, если он привязан"""
+    tariffs = rate_resolver.get_route_tariffs(session, ctx["route_id"], ctx["shipment_date"])
+    row = dict(_shipment_kwargs(ctx), tariff_id=tariffs[0]["id"] if tariffs else ctx["tariff_id"])
+    del row["status"]
+    return [row] * size
+
+
+def _release_claims(session: Session, ctx: Dict, claimed: List[Dict]):
+    dispatch_services.release_claims(session, "bench", [row["id"] for row in claimed])
+
+
+def build_cases() -> List[BenchCase]:
+    """Все функции сервисов: сначала чтение, потом изменения"""
+    return [
+        # ---- Car ----
+        BenchCase("Car.get_all_cars", lambda s, c, p: car_services.get_all_cars(s)),
+        BenchCase("Car.get_all_cars_for_assignment", lambda s, c, p: car_services.get_all_cars_for_assignment(s)),
+        BenchCase("Car.get_car_by_id", lambda s, c, p: car_services.get_car_by_id(s, c["car_id"])),
+        BenchCase("Car.get_all_cars_with_drivers", lambda s, c, p: car_services.get_all_cars_with_drivers(s)),
+        BenchCase("Car.get_free_cars", lambda s, c, p: car_services.get_free_cars(s)),
+        BenchCase("Car.get_cars_by_load_capacity", lambda s, c, p: car_services.get_cars_by_load_capacity(s, 10)),
+        BenchCase("Car.get_cars_by_fuel_consumption",
+                  lambda s, c, p: car_services.get_cars_by_fuel_consumption(s, 25)),
+        BenchCase("Car.search_cars", lambda s, c, p: car_services.search_cars(s, "Scania")),
+        # ---- Driver ----
+        BenchCase("Driver.get_all_drivers_with_cars", lambda s, c, p: driver_services.get_all_drivers_with_cars(s)),
+        BenchCase("Driver.get_drivers_with_heavy_cars",
+                  lambda s, c, p: driver_services.get_drivers_with_heavy_cars(s, 10)),
+        BenchCase("Driver.get_all_available_cars", lambda s, c, p: driver_services.get_all_available_cars(s)),
+        BenchCase("Driver.get_all_cars_for_assignment",
+                  lambda s, c, p: driver_services.get_all_cars_for_assignment(s)),
+        BenchCase("Driver.get_driver_by_id", lambda s, c, p: driver_services.get_driver_by_id(s, c["driver_id"])),
+        BenchCase("Driver.search_drivers", lambda s, c, p: driver_services.search_drivers(s, "Кузнец")),
+        # ---- Rate ----
+        BenchCase("Rate.get_all_tariffs", lambda s, c, p: rate_services.get_all_tariffs(s)),
+        BenchCase("Rate.get_active_tariffs", lambda s, c, p: rate_services.get_active_tariffs(s)),
+        BenchCase("Rate.get_tariff_by_id", lambda s, c, p: rate_services.get_tariff_by_id(s, c["tariff_id"])),
+        BenchCase("Rate.get_tariffs_by_cargo_type",
+                  lambda s, c, p: rate_services.get_tariffs_by_cargo_type(s, c["cargo_type"])),
+        BenchCase("Rate.get_cargo_types", lambda s, c, p: rate_services.get_cargo_types(s)),
+        BenchCase("Rate.get_route_tariffs", lambda s, c, p: rate_resolver.get_route_tariffs(s, c["route_id"])),
+        # ---- Route ----
+        BenchCase("Route.get_all_routes", lambda s, c, p: route_services.get_all_routes(s)),
+        BenchCase("Route.get_routes_with_filters",
+                  lambda s, c, p: route_services.get_routes_with_filters(s, min_distance=500, road_type="магистраль")),
+        BenchCase("Route.get_route_by_id", lambda s, c, p: route_services.get_route_by_id(s, c["route_id"])),
+        BenchCase("Route.plan_route", lambda s, c, p: route_planner.plan_route(s, "Москва", "Уфа", "time")),
+        BenchCase("Route.search_routes", lambda s, c, p: route_services.search_routes(s, "Новосиб")),
+        BenchCase("Route.get_route_statistics", lambda s, c, p: route_services.get_route_statistics(s)),
+        # ---- Dashboard ----
+        BenchCase("Dashboard.compute_kpis", lambda s, c, p: dashboard_services.compute_kpis(s)),
+        # ---- Utilization ----
+        BenchCase("Utilization.get_utilization",
+                  lambda s, c, p: utilization_services.get_utilization(
+                      s, c["shipment_date"] - datetime.timedelta(days=90), c["shipment_date"], "car")),
+        # ---- Revenue ----
+        BenchCase("Revenue.get_revenue", lambda s, c, p: revenue_services.get_revenue(s, "route", "quarter")),
+        BenchCase("Revenue.get_revenue_totals", lambda s, c, p: revenue_services.get_revenue_totals(s, "month")),
+        # ---- Transportation ----
+        BenchCase("Transportation.get_all_shipments", lambda s, c, p: shipment_services.get_all_shipments(s)),
+        BenchCase("Transportation.get_active_tariffs", lambda s, c, p: shipment_services.get_active_tariffs(s)),
+        BenchCase("Transportation.get_available_cars_with_drivers",
+                  lambda s, c, p: shipment_services.get_available_cars_with_drivers(s, 5000)),
+        BenchCase("Transportation.get_all_drivers", lambda s, c, p: shipment_services.get_all_drivers(s)),
+        BenchCase("Transportation.get_all_routes", lambda s, c, p: shipment_services.get_all_routes(s)),
+        BenchCase("Transportation.calculate_shipment_cost",
+                  lambda s, c, p: shipment_services.calculate_shipment_cost(s, c["shipment_id"])),
+        BenchCase("Transportation.get_shipments_with_filters",
+                  lambda s, c, p: shipment_services.get_shipments_with_filters(s, status=["in_transit"])),
+        BenchCase("Transportation.iter_shipments_for_export",
+                  lambda s, c, p: sum(1 for _ in shipment_services.iter_shipments_for_export(s, status=["delivered"]))),
+
+        # ---- Изменения ----
+        BenchCase("Car.create_car", lambda s, c, p: _new_car(s, c)),
+        BenchCase("Car.update_car", lambda s, c, p: car_services.update_car(s, c["car_id"], fuel_consumption=31.5)),
+        BenchCase("Car.delete_car", lambda s, c, p: car_services.delete_car(s, p), setup=_new_car),
+        BenchCase("Driver.create_driver", lambda s, c, p: _new_driver(s, c)),
+        BenchCase("Driver.update_driver",
+                  lambda s, c, p: driver_services.update_driver(s, c["spare_driver_id"], experience_years=6)),
+        BenchCase("Driver.assign_driver_to_car",
+                  lambda s, c, p: driver_services.assign_driver_to_car(s, c["spare_driver_id"], p), setup=_new_car),
+        BenchCase("Driver.swap_driver_car",
+                  lambda s, c, p: driver_services.swap_driver_car(s, c["driver_id"], c["spare_driver_id"])),
+        # Назначения, как в sample_context: повторные вызовы ничего не меняют
+        BenchCase("Driver.reassign_fleet",
+                  lambda s, c, p: driver_services.reassign_fleet(
+                      s, {c["driver_id"]: c["car_id"], c["spare_driver_id"]: None})),
+        BenchCase("Driver.delete_driver", lambda s, c, p: driver_services.delete_driver(s, p), setup=_new_driver),
+        BenchCase("Rate.create_tariff", lambda s, c, p: _new_tariff(s, c)),
+        BenchCase("Rate.update_tariff",
+                  lambda s, c, p: rate_services.update_tariff(s, c["tariff_id"], description="bench")),
+        BenchCase("Rate.delete_tariff", lambda s, c, p: rate_services.delete_tariff(s, p), setup=_new_tariff),
+        BenchCase("Route.create_route",
+                  lambda s, c, p: route_services.create_route(s, "Бенч", "Москва", 500, 8, "Магистраль")),
+        BenchCase("Route.link_route_tariff",
+                  lambda s, c, p: route_services.link_route_tariff(s, p, c["tariff_id"]), setup=_new_route),
+        BenchCase("Route.update_route",
+                  lambda s, c, p: route_services.update_route(s, p, "Бенч", "Тверь", 180, 3, "Региональная"),
+                  setup=_new_route),
+        BenchCase("Route.delete_route", lambda s, c, p: route_services.delete_route(s, p), setup=_new_route),
+        BenchCase("Transportation.create_shipment", lambda s, c, p: _new_shipment(s, c)),
+        BenchCase("Transportation.update_shipment",
+                  lambda s, c, p: shipment_services.update_shipment(s, p, status="in_transit"), setup=_new_shipment),
+        BenchCase("Transportation.delete_shipment",
+                  lambda s, c, p: shipment_services.delete_shipment(s, p), setup=_new_shipment),
+        BenchCase("Transportation.create_shipments",
+                  lambda s, c, p: shipment_services.create_shipments(s, p), setup=_shipment_batch),
+        BenchCase("Transportation.transition_shipments",
+                  lambda s, c, p: shipment_services.transition_shipments(s, "in_transit", [p]),
+                  setup=_new_shipment),
+        BenchCase("Transportation.recalculate_shipment_costs",
+                  lambda s, c, p: shipment_services.recalculate_shipment_costs(s)),
+        BenchCase("Dispatch.claim_shipments",
+                  lambda s, c, p: dispatch_services.claim_shipments(s, "bench"), teardown=_release_claims),
+        BenchCase("soft_delete.purge_inactive", lambda s, c, p: purge_inactive(s, older_than_days=0)),
+        # Последним: переносит старые перевозки из shipment, повторные вызовы переносят только новые
+        BenchCase("Transportation.archive_shipments", lambda s, c, p: shipment_services.archive_shipments(s)),
+    ]
+
+
+def sample_context(session: Session) -> Dict:
+    """Идентификаторы существующих записей, на которых вызываются функции"""
+    driver = session.execute(text(
+        "SELECT id, car_id FROM driver WHERE car_id IS NOT NULL ORDER BY license_number LIMIT 1"
+    )).one()
+    spare = session.execute(text(
+        "SELECT id FROM driver WHERE car_id IS NULL ORDER BY license_number LIMIT 1"
+    )).scalar()
+    tariff = session.execute(text(
+        "SELECT id, cargo_type FROM tariff WHERE date_end IS NULL ORDER BY date_start LIMIT 1"
+    )).one()
+    route_id = session.execute(text("SELECT id FROM route ORDER BY origin, destination LIMIT 1")).scalar()
+    shipment_id = session.execute(text("SELECT id FROM shipment ORDER BY shipment_date LIMIT 1")).scalar()
+
+    return {
+        "driver_id": driver.id,
+        "car_id": driver.car_id,
+        "spare_driver_id": spare,
+        "tariff_id": tariff.id,
+        "cargo_type": tariff.cargo_type,
+        "route_id": route_id,
+        "shipment_id": shipment_id,
+        "shipment_date": datetime.datetime.now(),
+    }
+
+
+def measure(case: BenchCase, ctx: Dict, repeat: int) -> Dict:
+    """
+    Вызвать функцию repeat раз, каждый раз в новой сессии.
+
+    Returns:
+        {name, median_s, min_s, queries} или {name, error}, если вызов упал
+    """
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        session = SyncDatabase.get_session()
+        try:
+            prepared = case.setup(session, ctx) if case.setup else None
+            with count_queries(SyncDatabase.engine) as counter:
+                started = time.perf_counter()
+                result = case.run(session, ctx, prepared)
+                timings.append(time.perf_counter() - started)
+            queries = counter.count
+            if case.teardown:
+                case.teardown(session, ctx, result)
+        except Exception as e:
+            session.rollback()
+            return {"name": case.name, "error": str(e).splitlines()[0]}
+        finally:
+            session.close()
+
+    return {
+        "name": case.name,
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "queries": queries,
+    }
+
+
+def run_scale(scale: float, repeat: int, seed: int, skip: Optional[set] = None) -> Dict[str, Dict]:
+    """Перезаполнить базу в масштабе scale и замерить все функции"""
+    skip = skip or set()
+    session = SyncDatabase.get_session()
+    try:
+        reset_database(session)
+        started = time.perf_counter()
+        volumes = load_fleet(session, scale, seed)
+        print(f"\n=== Масштаб {scale:g}x: {volumes['car']} машин, {volumes['shipment']} перевозок "
+              f"(загрузка {time.perf_counter() - started:.1f} с) ===")
+        ctx = sample_context(session)
+    finally:
+        session.close()
+
+    results = {}
+    for case in build_cases():
+        if case.name in skip:
+            print(f"{case.name:<50}{'пропущено':>12}")
+            continue
+        result = measure(case, ctx, repeat)
+        results[case.name] = result
+        if "error" in result:
+            print(f"{case.name:<50}  ошибка: {result['error']}")
+            continue
+        print(f"{case.name:<50}{result['median_s'] * 1000:>10.1f} мс{result['queries']:>8} запр.")
+    return results
+
+
+def print_summary(scales: List[float], by_scale: Dict[float, Dict[str, Dict]]):
+    """Медианы по масштабам и рост времени от первого масштаба к последнему"""
+    print("\nМедиана, мс")
+    header = "".join(f"{f'{scale:g}x':>12}" for scale in scales)
+    print(f"{'Функция':<50}{header}{'рост':>10}")
+
+    for case in build_cases():
+        cells = []
+        values = []
+        for scale in scales:
+            result = by_scale[scale].get(case.name)
+            if result is None:
+                cells.append(f"{'-':>12}")
+                continue
+            if "error" in result:
+                cells.append(f"{'ошибка':>12}")
+                continue
+            values.append(result["median_s"])
+            cells.append(f"{result['median_s'] * 1000:>12.1f}")
+
+        growth = ""
+        if len(values) > 1 and values[0] > 0:
+            growth = f"x{values[-1] / values[0]:.1f}"
+        print(f"{case.name:<50}{''.join(cells)}{growth:>10}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Замеры функций Services/* на синтетических данных")
+    parser.add_argument("--scales", type=float, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--skip-over", type=float, default=60,
+                        help="Не запускать на следующих масштабах функции медленнее N секунд")
+    parser.add_argument("--reset", action="store_true", help="Подтверждение очистки текущей базы")
+    args = parser.parse_args(argv)
+
+    if not args.reset:
+        print("Замеры перезаполняют базу: все данные будут удалены. Запустите с --reset", file=sys.stderr)
+        return 2
+
+    by_scale = {}
+    skip = set()
+    for scale in args.scales:
+        by_scale[scale] = run_scale(scale, args.repeat, args.seed, skip)
+        skip |= {name for name, result in by_scale[scale].items()
+                 if result.get("median_s", 0) > args.skip_over}
+
+    print_summary(args.scales, by_scale)
+
+    failed = sorted({name for results in by_scale.values() for name, result in results.items() if "error" in result})
+    if failed:
+        print(f"\nС ошибками: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
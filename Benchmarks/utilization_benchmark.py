@@ -0,0 +1,104 @@
+# Benchmarks/utilization_benchmark.py
+"""
+Скорость расчета загрузки парка (Services/Utilization).
+
+Без --db интервалы генерируются в памяти: --trucks машин, у каждой
+--per-truck перевозок за год, длительность 2-48 часов, часть перевозок
+пересекается. Замеряется только compute_utilization - за год, за квартал
+и за месяц. С --db к этому добавляется загрузка интервалов из текущей
+базы (бинарный COPY) и расчет за весь период данных.
+    python -m Benchmarks.utilization_benchmark
+    python -m Benchmarks.utilization_benchmark --trucks 5000 --per-truck 200
+    python -m Benchmarks.utilization_benchmark --db
+"""
+import argparse
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import text
+
+from Services.Utilization.services import compute_utilization, load_intervals, to_epoch
+from Shared.DataBaseSession import SyncDatabase
+
+YEAR_SECONDS = 365 * 24 * 3600
+
+WINDOWS = [
+    ("год", 0, YEAR_SECONDS),
+    ("квартал", 90 * 24 * 3600, 181 * 24 * 3600),
+    ("месяц", 181 * 24 * 3600, 212 * 24 * 3600),
+]
+
+
+def _timed(func, *args, repeat: int = 3) -> float:
+    """Лучшее время из repeat запусков, секунды"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run_synthetic(trucks: int, per_truck: int, seed: int) -> List[Dict]:
+    rng = np.random.default_rng(seed)
+    count = trucks * per_truck
+    codes = rng.integers(0, trucks, count).astype(np.int32)
+    start = rng.uniform(0, YEAR_SECONDS, count)
+    end = start + rng.uniform(2, 48, count) * 3600
+
+    results = []
+    for name, window_start, window_end in WINDOWS:
+        elapsed = _timed(compute_utilization, codes, start, end, trucks, window_start, window_end)
+        results.append({"name": f"{name}, {trucks} машин", "rows": count, "elapsed_s": elapsed})
+    return results
+
+
+def run_database() -> List[Dict]:
+    session = SyncDatabase.get_session()
+    try:
+        date_from, date_to = session.execute(text(
+            "SELECT MIN(shipment_date), MAX(shipment_date) + interval '1 day' FROM shipment"
+        )).one()
+        if date_from is None:
+            return []
+
+        started = time.perf_counter()
+        intervals = load_intervals(session, date_from, date_to)
+        load_s = time.perf_counter() - started
+    finally:
+        session.close()
+
+    window = (to_epoch(date_from), to_epoch(date_to))
+    results = [{"name": "загрузка из БД", "rows": len(intervals), "elapsed_s": load_s}]
+    for name, codes, ids in (("машины", intervals.car, intervals.car_ids),
+                             ("водители", intervals.driver, intervals.driver_ids)):
+        elapsed = _timed(compute_utilization, codes, intervals.start, intervals.end, len(ids), *window)
+        results.append({"name": f"{name}, {len(ids)} шт.", "rows": len(intervals), "elapsed_s": elapsed})
+    return results
+
+
+def print_results(results: List[Dict]):
+    print(f"{'Расчет':<28}{'Интервалов':>12}{'Время, мс':>12}")
+    for r in results:
+        print(f"{r['name']:<28}{r['rows']:>12}{r['elapsed_s'] * 1000:>12.1f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Расчет загрузки машин и водителей")
+    parser.add_argument("--trucks", type=int, default=5000)
+    parser.add_argument("--per-truck", type=int, default=100, help="Перевозок на машину за год")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", action="store_true", help="Также замерить на данных текущей базы")
+    args = parser.parse_args(argv)
+
+    results = run_synthetic(args.trucks, args.per_truck, args.seed)
+    if args.db:
+        results += run_database()
+    print_results(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
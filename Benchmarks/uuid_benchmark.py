@@ -0,0 +1,157 @@
+# Benchmarks/uuid_benchmark.py
+"""
+Скорость вставки с первичным ключом uuid4 и UUIDv7 (Shared/uuid7.py).
+
+Для каждого генератора создается временная таблица bench_uuid_* с первичным
+ключом uuid, строки вставляются пачками по --batch штук, каждая пачка - своя
+транзакция, как при работе приложения. Каждая вставка выполняется через
+EXPLAIN (ANALYZE, BUFFERS, WAL), поэтому видно, сколько страниц она затронула
+и сколько WAL записала (FPI - полные образы страниц после контрольной точки).
+
+pgstattuple не установлен, поэтому заполнение листьев оценивается по размеру
+индекса: каждая страница сверх первой появляется при расщеплении.
+Разница в попаданиях в буферный кэш видна, когда индекс больше shared_buffers:
+    python -m Benchmarks.uuid_benchmark --rows 500000 --batch 1000
+    python -m Benchmarks.uuid_benchmark --rows 5000000 --batch 5000
+"""
+import argparse
+import datetime
+import json
+import sys
+import time
+import uuid
+from typing import Callable, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from Shared.DataBaseSession import SyncDatabase
+from Shared.uuid7 import uuid7
+
+
+GENERATORS: Dict[str, Callable[[], uuid.UUID]] = {
+    "uuid4": uuid.uuid4,
+    "uuid7": uuid7,
+}
+
+PAGE_SIZE = 8192
+# Запись листа B-дерева с uuid: заголовок 8 + ключ 16 + указатель 4 байта
+INDEX_TUPLE_BYTES = 28
+# Полезное место страницы: без заголовка (24) и special-области btree (16)
+PAGE_PAYLOAD_BYTES = PAGE_SIZE - 24 - 16
+
+INSERT_SQL = """
+    EXPLAIN (ANALYZE, TIMING OFF, BUFFERS, WAL, FORMAT JSON)
+    INSERT INTO {table} (id, created_at, payload)
+    SELECT id, :created_at, 'payload'
+    FROM unnest(CAST(:ids AS uuid[])) AS id
+"""
+
+PLAN_COUNTERS = {
+    "hit": "Shared Hit Blocks",
+    "read": "Shared Read Blocks",
+    "dirtied": "Shared Dirtied Blocks",
+    "written": "Shared Written Blocks",
+    "wal_fpi": "WAL FPI",
+    "wal_bytes": "WAL Bytes",
+}
+
+
+def _insert_batches(session: Session, table: str, generator: Callable[[], uuid.UUID],
+                    rows: int, batch: int) -> Dict:
+    totals = {key: 0 for key in PLAN_COUNTERS}
+    started = time.perf_counter()
+
+    for offset in range(0, rows, batch):
+        ids = [str(generator()) for _ in range(min(batch, rows - offset))]
+        plan = session.execute(
+            text(INSERT_SQL.format(table=table)),
+            {"ids": ids, "created_at": datetime.datetime.now()}
+        ).scalar()
+        session.commit()
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        node = plan[0]["Plan"]
+        for key, field in PLAN_COUNTERS.items():
+            totals[key] += node.get(field, 0)
+
+    totals["elapsed_s"] = time.perf_counter() - started
+    return totals
+
+
+def run_benchmark(rows: int = 500_000, batch: int = 1000) -> List[Dict]:
+    """
+    Вставить rows строк каждым генератором в отдельную таблицу.
+
+    Returns:
+        Список {name, rows, elapsed_s, rows_per_s, index_pages, splits, leaf_fill,
+                hit, read, dirtied, written, hit_ratio, wal_fpi, wal_bytes}
+    """
+    results = []
+    session = SyncDatabase.get_session()
+    try:
+        for name, generator in GENERATORS.items():
+            table = f"bench_uuid_{name}"
+            session.execute(text(f"DROP TABLE IF EXISTS {table}"))
+            session.execute(text(f"""
+                CREATE TABLE {table} (
+                    id uuid PRIMARY KEY,
+                    created_at timestamp NOT NULL,
+                    payload varchar(50)
+                )
+            """))
+            session.commit()
+
+            try:
+                totals = _insert_batches(session, table, generator, rows, batch)
+                index_bytes = session.execute(
+                    text("SELECT pg_relation_size(CAST(:index AS regclass))"),
+                    {"index": f"{table}_pkey"}
+                ).scalar()
+            finally:
+                session.rollback()
+                session.execute(text(f"DROP TABLE IF EXISTS {table}"))
+                session.commit()
+
+            index_pages = index_bytes // PAGE_SIZE
+            accessed = totals["hit"] + totals["read"]
+            results.append({
+                "name": name,
+                "rows": rows,
+                **totals,
+                "rows_per_s": rows / totals["elapsed_s"] if totals["elapsed_s"] > 0 else 0,
+                "index_pages": index_pages,
+                # Страница метаданных и первый лист появляются без расщепления
+                "splits": max(index_pages - 2, 0),
+                "leaf_fill": rows * INDEX_TUPLE_BYTES / (max(index_pages - 1, 1) * PAGE_PAYLOAD_BYTES),
+                "hit_ratio": totals["hit"] / accessed if accessed else 0,
+            })
+    finally:
+        session.close()
+
+    return results
+
+
+def print_results(results: List[Dict]):
+    print(f"{'Ключ':<8}{'Строк':>10}{'Время, с':>10}{'Строк/с':>10}{'Стр. PK':>9}{'Расщепл.':>10}"
+          f"{'Заполн.':>9}{'Hit':>11}{'Read':>9}{'Hit, %':>8}{'Dirtied':>9}{'FPI':>8}{'WAL, МБ':>9}")
+    for r in results:
+        print(f"{r['name']:<8}{r['rows']:>10}{r['elapsed_s']:>10.2f}{r['rows_per_s']:>10.0f}"
+              f"{r['index_pages']:>9}{r['splits']:>10}{r['leaf_fill']:>9.0%}"
+              f"{r['hit']:>11}{r['read']:>9}{r['hit_ratio']:>8.1%}{r['dirtied']:>9}"
+              f"{r['wal_fpi']:>8}{r['wal_bytes'] / 1024 / 1024:>9.1f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Вставка с первичным ключом uuid4 и UUIDv7")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--batch", type=int, default=1000, help="Строк в одной транзакции")
+    args = parser.parse_args(argv)
+
+    print_results(run_benchmark(args.rows, args.batch))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
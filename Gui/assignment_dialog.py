@@ -2,14 +2,22 @@
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel,
     QPushButton, QMessageBox, QListWidget, QListWidgetItem,
-    QSplitter, QGroupBox
+    QSplitter, QGroupBox, QAbstractItemView
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
 
 
 class AssignmentDialog(QDialog):
-    """Диалог для управления назначениями водителей и автомобилей"""
+    """
+    Диалог для управления назначениями водителей и автомобилей.
+
+    Назначения, открепления и обмены не применяются сразу, а копятся
+    в очереди (self.pending: {id водителя: id машины или None}); списки
+    показывают состояние с учетом очереди. "Применить все" отправляет
+    очередь родителю одним reassign_fleet - все перестановки проходят
+    или не проходят вместе.
+    """
 
     def __init__(self, parent=None, drivers=None, cars=None):
         super().__init__(parent)
@@ -18,9 +26,11 @@ class AssignmentDialog(QDialog):
 
         self.drivers = drivers or []
         self.cars = cars or []
+        self.pending = {}
 
-        # Списки
+        # Списки (для обмена выбираются два водителя)
         self.drivers_list = QListWidget()
+        self.drivers_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.cars_list = QListWidget()
 
         # Кнопки
@@ -30,6 +40,11 @@ class AssignmentDialog(QDialog):
         self.refresh_btn = QPushButton("🔄 Обновить")
         self.close_btn = QPushButton("✖ Закрыть")
 
+        # Очередь изменений
+        self.queue_list = QListWidget()
+        self.apply_btn = QPushButton("✅ Применить все")
+        self.clear_btn = QPushButton("↩ Очистить очередь")
+
         # Информационная панель
         self.info_label = QLabel("Выберите водителя и автомобиль для назначения")
         self.info_label.setStyleSheet("""
@@ -72,6 +87,20 @@ class AssignmentDialog(QDialog):
         splitter.setSizes([400, 400])
 
         main_layout.addWidget(splitter)
+
+        # Группа очереди изменений
+        queue_group = QGroupBox("Очередь изменений")
+        queue_layout = QHBoxLayout()
+        self.queue_list.setMaximumHeight(120)
+        queue_layout.addWidget(self.queue_list)
+        queue_btn_layout = QVBoxLayout()
+        queue_btn_layout.addWidget(self.apply_btn)
+        queue_btn_layout.addWidget(self.clear_btn)
+        queue_btn_layout.addStretch()
+        queue_layout.addLayout(queue_btn_layout)
+        queue_group.setLayout(queue_layout)
+
+        main_layout.addWidget(queue_group)
         main_layout.addWidget(self.info_label)
 
         # Кнопки
@@ -93,14 +122,71 @@ class AssignmentDialog(QDialog):
         self.assign_btn.clicked.connect(self.assign_driver_to_car)
         self.unassign_btn.clicked.connect(self.unassign_driver)
         self.swap_btn.clicked.connect(self.swap_assignment)
-        self.refresh_btn.clicked.connect(self.load_data)
-        self.close_btn.clicked.connect(self.accept)
+        self.apply_btn.clicked.connect(self.apply_pending)
+        self.clear_btn.clicked.connect(self.clear_pending)
+        self.refresh_btn.clicked.connect(self.refresh_data)
+        self.close_btn.clicked.connect(self.close_dialog)
+
+    def planned_cars(self):
+        """Машины водителей с учетом очереди: {id водителя: id машины или None}"""
+        planned = {driver['id']: driver.get('car_id') for driver in self.drivers}
+        planned.update(self.pending)
+        return planned
+
+    def planned_drivers(self):
+        """Водители машин с учетом очереди: {id машины: водитель}"""
+        by_id = {driver['id']: driver for driver in self.drivers}
+        return {
+            car_id: by_id[driver_id]
+            for driver_id, car_id in self.planned_cars().items()
+            if car_id is not None
+        }
+
+    def car_label(self, car_id):
+        """Короткое описание машины для очереди и подсказок"""
+        car = next((car for car in self.cars if car['id'] == car_id), None)
+        if car is None:
+            return "без автомобиля"
+        return f"{car['brand']} ({car['license_plate']})"
+
+    def queue_move(self, driver_id, car_id):
+        """
+        Поставить в очередь назначение водителя на машину (None - открепить).
+        Если машина по плану занята другим водителем, он открепляется.
+        """
+        if car_id is not None:
+            holder = self.planned_drivers().get(car_id)
+            if holder and holder['id'] != driver_id:
+                self.pending[holder['id']] = None
+        self.pending[driver_id] = car_id
+
+        # Ходы, возвращающие водителя к исходной машине, из очереди убираем
+        current = {driver['id']: driver.get('car_id') for driver in self.drivers}
+        self.pending = {
+            queued_driver: queued_car for queued_driver, queued_car in self.pending.items()
+            if current.get(queued_driver) != queued_car
+        }
+
+    def update_queue(self):
+        """Показать очередь изменений"""
+        self.queue_list.clear()
+        current = {driver['id']: driver for driver in self.drivers}
+        for driver_id, car_id in self.pending.items():
+            driver = current[driver_id]
+            self.queue_list.addItem(
+                f"{driver['full_name']}: {self.car_label(driver.get('car_id'))} → {self.car_label(car_id)}"
+            )
+        self.apply_btn.setEnabled(bool(self.pending))
+        self.clear_btn.setEnabled(bool(self.pending))
 
     def load_data(self):
         """Загрузить данные в списки"""
         self.drivers_list.clear()
         self.cars_list.clear()
 
+        planned_cars = self.planned_cars()
+        planned_drivers = self.planned_drivers()
+
         # Загружаем водителей
         for driver in self.drivers:
             item_text = f"👤 {driver['full_name']}\n"
@@ -113,6 +199,9 @@ class AssignmentDialog(QDialog):
             else:
                 item_text = f"⏳ {item_text}"
 
+            if driver['id'] in self.pending:
+                item_text += f"\n   ✏ Будет: {self.car_label(self.pending[driver['id']])}"
+
             item = QListWidgetItem(item_text)
             item.setData(Qt.UserRole, driver)
 
@@ -121,8 +210,10 @@ class AssignmentDialog(QDialog):
             font.setPointSize(10)
             item.setFont(font)
 
-            # Устанавливаем цвет в зависимости от статуса
-            if driver.get('car_id'):
+            # Устанавливаем цвет в зависимости от статуса (с учетом очереди)
+            if driver['id'] in self.pending:
+                item.setForeground(Qt.darkYellow)
+            elif planned_cars[driver['id']]:
                 item.setForeground(Qt.darkGreen)
             else:
                 item.setForeground(Qt.darkGray)
@@ -146,6 +237,10 @@ class AssignmentDialog(QDialog):
             else:
                 item_text = f"🆓 {item_text}"
 
+            planned_driver = planned_drivers.get(car['id'])
+            if (planned_driver['full_name'] if planned_driver else None) != car['driver_info']:
+                item_text += f"\n   ✏ Будет: {planned_driver['full_name'] if planned_driver else 'свободен'}"
+
             item = QListWidgetItem(item_text)
             item.setData(Qt.UserRole, car)
 
@@ -154,18 +249,22 @@ class AssignmentDialog(QDialog):
             font.setPointSize(10)
             item.setFont(font)
 
-            # Устанавливаем цвет в зависимости от статуса
-            if car['has_driver']:
+            # Устанавливаем цвет в зависимости от статуса (с учетом очереди)
+            if planned_driver:
                 item.setForeground(Qt.darkGreen)
             else:
                 item.setForeground(Qt.blue)
 
             self.cars_list.addItem(item)
 
+        self.update_queue()
+
     def update_info(self):
         """Обновить информацию о выбранных элементах"""
         selected_drivers = self.drivers_list.selectedItems()
         selected_cars = self.cars_list.selectedItems()
+        planned_cars = self.planned_cars()
+        planned_drivers = self.planned_drivers()
 
         if selected_drivers and selected_cars:
             driver = selected_drivers[0].data(Qt.UserRole)
@@ -174,8 +273,8 @@ class AssignmentDialog(QDialog):
             driver_name = driver['full_name']
             car_info = f"{car['brand']} ({car['license_plate']})"
 
-            if car['has_driver']:
-                current_driver = car['driver_info']
+            if car['id'] in planned_drivers:
+                current_driver = planned_drivers[car['id']]['full_name']
                 self.info_label.setText(
                     f"⚠ Автомобиль {car_info} уже назначен водителю {current_driver}.\n"
                     f"Назначить {driver_name} на этот автомобиль?"
@@ -193,8 +292,8 @@ class AssignmentDialog(QDialog):
             driver = selected_drivers[0].data(Qt.UserRole)
             driver_name = driver['full_name']
 
-            if driver.get('car_id'):
-                current_car = driver['car_info']['full_info']
+            if planned_cars[driver['id']]:
+                current_car = self.car_label(planned_cars[driver['id']])
                 self.info_label.setText(
                     f"Водитель {driver_name} уже назначен на автомобиль {current_car}.\n"
                     f"Вы можете открепить его от автомобиля."
@@ -212,8 +311,8 @@ class AssignmentDialog(QDialog):
             car = selected_cars[0].data(Qt.UserRole)
             car_info = f"{car['brand']} ({car['license_plate']})"
 
-            if car['has_driver']:
-                current_driver = car['driver_info']
+            if car['id'] in planned_drivers:
+                current_driver = planned_drivers[car['id']]['full_name']
                 self.info_label.setText(
                     f"Автомобиль {car_info} назначен водителю {current_driver}.\n"
                     f"Вы можете открепить водителя или выбрать другого."
@@ -243,8 +342,7 @@ class AssignmentDialog(QDialog):
         driver = selected_drivers[0].data(Qt.UserRole)
         car = selected_cars[0].data(Qt.UserRole)
 
-        # Отправляем сигнал родителю для выполнения назначения
-        self.parent().assign_driver_to_car_requested(driver['id'], car['id'])
+        self.queue_move(driver['id'], car['id'])
         self.load_data()
 
     def unassign_driver(self):
@@ -254,18 +352,15 @@ class AssignmentDialog(QDialog):
 
         if selected_drivers:
             driver = selected_drivers[0].data(Qt.UserRole)
-            if driver.get('car_id'):
-                # Отправляем сигнал родителю
-                self.parent().assign_driver_to_car_requested(driver['id'], None)
+            if self.planned_cars()[driver['id']]:
+                self.queue_move(driver['id'], None)
 
         elif selected_cars:
             car = selected_cars[0].data(Qt.UserRole)
-            if car['has_driver']:
-                # Находим водителя этого автомобиля
-                for driver in self.drivers:
-                    if driver.get('car_id') == car['id']:
-                        self.parent().assign_driver_to_car_requested(driver['id'], None)
-                        break
+            # Находим водителя этого автомобиля (с учетом очереди)
+            driver = self.planned_drivers().get(car['id'])
+            if driver:
+                self.queue_move(driver['id'], None)
 
         self.load_data()
 
@@ -279,13 +374,54 @@ class AssignmentDialog(QDialog):
 
         driver1 = selected_drivers[0].data(Qt.UserRole)
         driver2 = selected_drivers[1].data(Qt.UserRole)
+        planned = self.planned_cars()
+        car1_id = planned[driver1['id']]
+        car2_id = planned[driver2['id']]
 
         # Проверяем, что у водителей есть автомобили для обмена
-        if not driver1.get('car_id') and not driver2.get('car_id'):
+        if not car1_id and not car2_id:
             QMessageBox.warning(self, "Ошибка",
                                 "У обоих водителей нет автомобилей для обмена")
             return
 
-        # Отправляем сигнал родителю
-        self.parent().swap_drivers_requested(driver1['id'], driver2['id'])
-        self.load_data()
\ No newline at end of file
+        # Сначала оба открепляются, иначе второй ход отнял бы машину у первого
+        self.queue_move(driver1['id'], None)
+        self.queue_move(driver2['id'], None)
+        self.queue_move(driver1['id'], car2_id)
+        self.queue_move(driver2['id'], car1_id)
+        self.load_data()
+
+    def apply_pending(self):
+        """Применить всю очередь одной транзакцией"""
+        if not self.pending:
+            return
+
+        versions = {driver['id']: driver['version'] for driver in self.drivers if driver['id'] in self.pending}
+        if self.parent().reassign_fleet_requested(self.pending, versions):
+            self.pending = {}
+            self.refresh_data()
+
+    def clear_pending(self):
+        """Отменить все изменения в очереди"""
+        self.pending = {}
+        self.load_data()
+
+    def refresh_data(self):
+        """Перечитать водителей и машины (очередь сохраняется)"""
+        self.drivers, self.cars = self.parent().assignment_data()
+        current = {driver['id'] for driver in self.drivers}
+        self.pending = {driver_id: car_id for driver_id, car_id in self.pending.items() if driver_id in current}
+        self.load_data()
+
+    def close_dialog(self):
+        """Закрыть диалог; непримененную очередь - только после подтверждения"""
+        if self.pending:
+            reply = QMessageBox.question(
+                self, "Подтверждение",
+                f"В очереди {len(self.pending)} непримененных изменений.\n"
+                "Закрыть без сохранения?",
+                QMessageBox.Yes | QMessageBox.No
+            )
+            if reply == QMessageBox.No:
+                return
+        self.accept()
\ No newline at end of file
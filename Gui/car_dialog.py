@@ -3,7 +3,7 @@ from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QLabel,
     QLineEdit, QPushButton, QDoubleSpinBox,
     QMessageBox, QHBoxLayout, QRadioButton,
-    QButtonGroup, QGroupBox, QFileDialog
+    QButtonGroup, QGroupBox, QFileDialog, QComboBox
 )
 from PySide6.QtCore import Qt
 from datetime import datetime
@@ -48,7 +48,7 @@ class CarDialog(QDialog):
         self.save_btn.clicked.connect(self.validate_and_accept)
 
         # Кнопка экспорта (НОВАЯ КНОПКА)
-        self.export_btn = QPushButton("Экспорт машин в Excel")
+        self.export_btn = QPushButton("Экспорт машин")
         self.export_btn.clicked.connect(self.show_export_dialog)
 
         # Кнопка отмены
@@ -138,7 +138,7 @@ class CarDialog(QDialog):
     def show_export_dialog(self):
         """Показать диалог выбора фильтра для экспорта"""
         dialog = QDialog(self)
-        dialog.setWindowTitle("Экспорт машин в Excel")
+        dialog.setWindowTitle("Экспорт машин")
         dialog.setMinimumWidth(350)
 
         layout = QVBoxLayout(dialog)
@@ -170,6 +170,15 @@ class CarDialog(QDialog):
         group_box.setLayout(group_layout)
         layout.addWidget(group_box)
 
+        # Формат файла
+        from Shared.Export.pipeline import EXPORT_FORMATS
+
+        layout.addWidget(QLabel("Формат файла:"))
+        self.export_format_combo = QComboBox()
+        for title, export_format in EXPORT_FORMATS:
+            self.export_format_combo.addItem(title, export_format)
+        layout.addWidget(self.export_format_combo)
+
         # Кнопки
         buttons_layout = QHBoxLayout()
         export_btn = QPushButton("Экспорт")
@@ -203,11 +212,12 @@ class CarDialog(QDialog):
 
         # Создаем диалог для выбора файла
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        export_format = self.export_format_combo.currentData()
         file_name, _ = QFileDialog.getSaveFileName(
             self,
-            "Сохранить файл Excel",
-            f"машины_{option_id}_{timestamp}.xlsx",
-            "Excel files (*.xlsx)"
+            "Сохранить файл",
+            f"машины_{option_id}_{timestamp}.{export_format}",
+            self.export_format_combo.currentText()
         )
 
         if not file_name:
@@ -215,7 +225,7 @@ class CarDialog(QDialog):
 
         try:
             # Экспортируем данные с фильтром
-            if self.export_cars_to_excel(session, file_name, option_id):
+            if self.export_cars(session, file_name, option_id, export_format):
                 QMessageBox.information(
                     self,
                     "Экспорт завершен",
@@ -243,117 +253,19 @@ class CarDialog(QDialog):
 
         return None
 
-    def export_cars_to_excel(self, session, file_name, filter_type="all"):
-        """Экспорт машин в Excel с фильтрацией"""
+    def export_cars(self, session, file_name, filter_type="all", export_format="xlsx"):
+        """Экспорт машин в файл (xlsx, csv, parquet) с фильтрацией"""
         try:
-            # Получаем данные в зависимости от фильтра
-            from Services.Car.services import (
-                get_all_cars_with_drivers, get_free_cars,
-                get_cars_by_load_capacity, get_cars_by_fuel_consumption
-            )
-
-            if filter_type == "all":
-                cars_data = get_all_cars_with_drivers(session)
-            elif filter_type == "free":
-                cars_data = get_free_cars(session)
-            elif filter_type == "heavy":
-                cars_data = get_cars_by_load_capacity(session, 10.0)
-            elif filter_type == "efficient":
-                cars_data = get_cars_by_fuel_consumption(session, 15.0)
-            elif filter_type == "with_driver":
-                cars_data = get_all_cars_with_drivers(session)
-                cars_data = [car for car in cars_data if car.get("has_driver", False)]
-            else:
-                cars_data = get_all_cars_with_drivers(session)
+            from Shared.Export.entities import CAR_EXPORT
+            from Shared.Export.pipeline import export_to_file
 
-            if not cars_data:
+            if not export_to_file(session, CAR_EXPORT, export_format, file_name, filter_type):
                 QMessageBox.warning(self, "Нет данных",
                                     f"Нет машин по выбранному фильтру: {filter_type}")
                 return False
 
-            # Создаем Excel файл
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, Alignment, PatternFill
-
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Машины"
-
-            # Стили для заголовков
-            header_font = Font(bold=True, size=12)
-            header_fill = PatternFill(start_color="CCE5FF", end_color="CCE5FF", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-
-            # Заголовки столбцов
-            headers = [
-                "ID", "Марка", "Госномер",
-                "Грузоподъемность (т)", "Тип кузова",
-                "Расход топлива (л/100км)", "Статус", "Водитель"
-            ]
-
-            for col_idx, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col_idx, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-
-            # Заполняем данными
-            for row_idx, car in enumerate(cars_data, 2):
-                # Конвертируем ID в строку, если это UUID
-                car_id = car.get("id", "")
-                if hasattr(car_id, '__str__'):
-                    car_id = str(car_id)
-
-                ws.cell(row=row_idx, column=1, value=car_id)
-                ws.cell(row=row_idx, column=2, value=car.get("brand", ""))
-                ws.cell(row=row_idx, column=3, value=car.get("license_plate", ""))
-                ws.cell(row=row_idx, column=4, value=car.get("load_capacity", 0))
-                ws.cell(row=row_idx, column=5, value=car.get("body_type", ""))
-                ws.cell(row=row_idx, column=6, value=car.get("fuel_consumption", 0))
-                ws.cell(row=row_idx, column=7, value=car.get("status", "Свободна"))
-                ws.cell(row=row_idx, column=8, value=car.get("driver_name", ""))
-
-            # Автоподбор ширины столбцов
-            for column in ws.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        cell_value = str(cell.value) if cell.value is not None else ""
-                        if len(cell_value) > max_length:
-                            max_length = len(cell_value)
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
-
-            # Добавляем информацию о фильтре
-            last_row = ws.max_row + 2
-            filter_names = {
-                "all": "Все машины",
-                "free": "Свободные машины",
-                "heavy": "Машины с грузоподъемностью > 10т",
-                "efficient": "Экономичные машины (< 15 л/100км)",
-                "with_driver": "Машины с водителями"
-            }
-
-            ws.cell(row=last_row, column=1, value=f"Фильтр: {filter_names.get(filter_type, 'Все машины')}")
-            ws.cell(row=last_row, column=2, value=f"Всего машин: {len(cars_data)}")
-
-            if filter_type == "all":
-                free_count = sum(1 for c in cars_data if c.get("status") == "Свободна")
-                busy_count = sum(1 for c in cars_data if c.get("status") == "Занята")
-                ws.cell(row=last_row, column=3, value=f"Свободных: {free_count}")
-                ws.cell(row=last_row, column=4, value=f"Занятых: {busy_count}")
-
-            # Добавляем дату экспорта
-            ws.cell(row=last_row + 1, column=1,
-                    value=f"Экспортировано: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-
-            # Сохраняем файл
-            wb.save(file_name)
             return True
 
         except Exception as e:
             print(f"Ошибка при экспорте: {str(e)}")
-            return False
\ No newline at end of file
+            return False
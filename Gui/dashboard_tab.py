@@ -0,0 +1,186 @@
+# Gui/dashboard_tab.py
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel,
+    QPushButton, QGroupBox, QTableWidget, QTableWidgetItem, QHeaderView
+)
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+from PySide6.QtGui import QFont
+
+from Services.Dashboard.services import get_dashboard_kpis
+from Shared.DataBaseSession import SyncDatabase
+
+# Как часто обновлять показатели, пока вкладка открыта (мс)
+DASHBOARD_REFRESH_MS = 60_000
+
+STATUS_NAMES = {
+    "pending": "⏳ Ожидает",
+    "in_transit": "🚛 В пути",
+    "delivered": "✅ Доставлено",
+    "cancelled": "❌ Отменено",
+}
+
+
+class _KpiSignals(QObject):
+    loaded = Signal(object)
+    failed = Signal(str)
+
+
+class _KpiTask(QRunnable):
+    """Подсчет показателей в пуле потоков, со своей сессией"""
+
+    def __init__(self, force: bool):
+        super().__init__()
+        self.force = force
+        self.signals = _KpiSignals()
+
+    def run(self):
+        session = SyncDatabase.get_session()
+        try:
+            self.signals.loaded.emit(get_dashboard_kpis(session, force=self.force))
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        finally:
+            session.close()
+
+
+class DashboardTab(QWidget):
+    """Вкладка "Обзор": загрузка парка, перевозки по статусам, выручка, простаивающие машины"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._loading = False
+        self._task = None
+
+        self.utilization_label = self._kpi_label()
+        self.in_transit_label = self._kpi_label()
+        self.month_revenue_label = self._kpi_label()
+        self.month_shipments_label = self._kpi_label()
+        self.updated_label = QLabel("Загрузка...")
+
+        self.status_table = self._table(["Статус", "Перевозок за 30 дней"])
+        self.top_routes_table = self._table(["Маршрут", "Перевозок", "Выручка (руб)"])
+        self.idle_cars_table = self._table(["Автомобиль", "Госномер", "Грузоподъемность (т)", "Водитель"])
+
+        self.refresh_btn = QPushButton("🔄 Обновить")
+        self.refresh_btn.clicked.connect(lambda: self.refresh(force=True))
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(DASHBOARD_REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+
+        self.setup_ui()
+
+    @staticmethod
+    def _kpi_label() -> QLabel:
+        label = QLabel("—")
+        label.setFont(QFont("Arial", 16, QFont.Bold))
+        return label
+
+    @staticmethod
+    def _table(headers) -> QTableWidget:
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setAlternatingRowColors(True)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        return table
+
+    def setup_ui(self):
+        """Настройка интерфейса"""
+        layout = QVBoxLayout(self)
+
+        kpi_group = QGroupBox("Показатели")
+        kpi_layout = QGridLayout()
+        for column, (title, label) in enumerate([
+            ("Загрузка парка", self.utilization_label),
+            ("Машин в пути", self.in_transit_label),
+            ("Выручка за месяц", self.month_revenue_label),
+            ("Перевозок за месяц", self.month_shipments_label),
+        ]):
+            kpi_layout.addWidget(QLabel(title), 0, column)
+            kpi_layout.addWidget(label, 1, column)
+        kpi_group.setLayout(kpi_layout)
+        layout.addWidget(kpi_group)
+
+        tables_layout = QHBoxLayout()
+        for title, table in [
+            ("Перевозки по статусам", self.status_table),
+            ("Лучшие маршруты месяца", self.top_routes_table),
+        ]:
+            group = QGroupBox(title)
+            group_layout = QVBoxLayout()
+            group_layout.addWidget(table)
+            group.setLayout(group_layout)
+            tables_layout.addWidget(group)
+        layout.addLayout(tables_layout)
+
+        idle_group = QGroupBox("Простаивающие автомобили")
+        idle_layout = QVBoxLayout()
+        idle_layout.addWidget(self.idle_cars_table)
+        idle_group.setLayout(idle_layout)
+        layout.addWidget(idle_group)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addWidget(self.updated_label)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.refresh_btn)
+        layout.addLayout(btn_layout)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer.stop()
+
+    def refresh(self, force: bool = False):
+        """Запустить подсчет в фоне (повторный запуск, пока идет текущий, игнорируется)"""
+        if self._loading:
+            return
+        self._loading = True
+        self.refresh_btn.setEnabled(False)
+
+        # Ссылку на задачу держим, пока не придет результат: иначе сигналы могут быть удалены
+        self._task = _KpiTask(force)
+        self._task.signals.loaded.connect(self.on_loaded)
+        self._task.signals.failed.connect(self.on_failed)
+        QThreadPool.globalInstance().start(self._task)
+
+    def on_loaded(self, kpis: dict):
+        self._loading = False
+        self.refresh_btn.setEnabled(True)
+
+        utilization = kpis["utilization"]
+        self.utilization_label.setText(f"{utilization['utilization']:.0%}")
+        self.in_transit_label.setText(f"{utilization['cars_in_transit']} из {utilization['cars_total']}")
+        self.month_revenue_label.setText(f"{kpis['month_revenue']:,.0f} руб".replace(",", " "))
+        self.month_shipments_label.setText(str(kpis["month_shipments"]))
+
+        self._fill(self.status_table, [
+            (STATUS_NAMES.get(status, status), count)
+            for status, count in kpis["shipments_by_status"].items()
+        ])
+        self._fill(self.top_routes_table, [
+            (route["name"], route["shipments_count"], f"{route['total_cost']:.2f}")
+            for route in kpis["top_routes"]
+        ])
+        self._fill(self.idle_cars_table, [
+            (car["brand"], car["license_plate"], car["load_capacity"], car["driver_name"] or "—")
+            for car in kpis["idle_cars"]
+        ])
+
+        self.updated_label.setText(f"Обновлено: {kpis['computed_at']:%d.%m.%Y %H:%M:%S}")
+
+    def on_failed(self, message: str):
+        self._loading = False
+        self.refresh_btn.setEnabled(True)
+        self.updated_label.setText(f"Ошибка загрузки показателей: {message}")
+
+    @staticmethod
+    def _fill(table: QTableWidget, rows):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                table.setItem(row, column, QTableWidgetItem(str(value)))
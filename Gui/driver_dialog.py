@@ -7,8 +7,8 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import QDate, Qt
 import datetime
 from Shared.excel_export import ExcelExporter
+from Shared.Export.pipeline import EXPORT_FORMATS
 from typing import List, Dict, Any
-from sqlalchemy import text
 
 
 class DriverDialog(QDialog):
@@ -64,10 +64,16 @@ class DriverDialog(QDialog):
         car_layout.addWidget(self.current_car_label)
         self.car_selection_group.setLayout(car_layout)
 
-        # Кнопки экспорта в Excel
-        self.export_group = QGroupBox("Экспорт в Excel")
+        # Кнопки экспорта
+        self.export_group = QGroupBox("Экспорт")
         export_layout = QVBoxLayout()
 
+        # Формат файла
+        self.export_format_combo = QComboBox()
+        for title, export_format in EXPORT_FORMATS:
+            self.export_format_combo.addItem(title, export_format)
+        export_layout.addWidget(self.export_format_combo)
+
         # Кнопка 1: Все водители
         self.export_all_btn = QPushButton("👥 Экспорт всех водителей")
         self.export_all_btn.clicked.connect(self.export_all_drivers)
@@ -138,260 +144,60 @@ class DriverDialog(QDialog):
             return self.main_window.session
         return None
 
-    from sqlalchemy import text
-
-    # Замените этот метод:
     def get_drivers_with_heavy_cars(self) -> List[Dict[str, Any]]:
         """
         Получает всех водителей с машинами грузоподъемностью более 10 тонн
         """
-        query = text("""
-        SELECT 
-            d.full_name,
-            d.license_number,
-            d.license_category,
-            d.experience_years,
-            d.hire_date,
-            c.brand,
-            c.license_plate,
-            c.load_capacity,
-            c.body_type,
-            c.fuel_consumption
-        FROM driver d
-        INNER JOIN car c ON d.car_id = c.id
-        WHERE c.load_capacity > 10
-        ORDER BY c.load_capacity DESC
-        """)
+        from Services.Driver.services import get_drivers_with_heavy_cars
 
         try:
-            # Выполняем запрос
-            session = self.get_session()
-            result = session.execute(query)
-
-            # Преобразуем результат в список словарей
-            drivers_data = []
-            for row in result:
-                drivers_data.append({
-                    "full_name": row.full_name,
-                    "license_number": row.license_number,
-                    "license_category": row.license_category,
-                    "experience_years": row.experience_years,
-                    "hire_date": row.hire_date.strftime("%Y-%m-%d") if row.hire_date else "",
-                    "car_brand": row.brand,
-                    "license_plate": row.license_plate,
-                    "load_capacity": row.load_capacity,
-                    "body_type": row.body_type,
-                    "fuel_consumption": row.fuel_consumption
-                })
-
-            return drivers_data
-
+            return get_drivers_with_heavy_cars(self.get_session(), 10)
         except Exception as e:
             print(f"Ошибка при выполнении запроса: {e}")
             return []
 
-    # На этот:
-    def export_drivers_with_heavy_cars(self):
-        """Экспорт водителей с машинами грузоподъемностью более 10 тонн в Excel"""
-        try:
-            session = self.get_session()
-            if not session:
-                QMessageBox.warning(self, "Ошибка", "Не удалось получить доступ к базе данных")
-                return
+    def run_driver_export(self, spec, empty_message: str, **params):
+        """Выгрузить водителей по спецификации в папку загрузок в выбранном формате"""
+        from Shared.Export.pipeline import export_to_file, default_export_path
 
-            # SQL запрос
-            query = text("""
-            SELECT 
-                d.full_name,
-                d.license_number,
-                d.license_category,
-                d.experience_years,
-                d.hire_date,
-                c.brand,
-                c.license_plate,
-                c.load_capacity,
-                c.body_type,
-                c.fuel_consumption
-            FROM driver d
-            INNER JOIN car c ON d.car_id = c.id
-            WHERE c.load_capacity > 10
-            ORDER BY c.load_capacity DESC
-            """)
-
-            # Выполняем запрос
-            result = session.execute(query)
-
-            # Подготавливаем данные для экспорта
-            export_data = []
-            for row in result:
-                # Форматируем дату
-                hire_date = ""
-                if row.hire_date:
-                    if hasattr(row.hire_date, 'strftime'):
-                        hire_date = row.hire_date.strftime("%d.%m.%Y")
-                    else:
-                        hire_date = str(row.hire_date)
-
-                export_data.append({
-                    "ФИО": row.full_name,
-                    "Номер прав": row.license_number,
-                    "Категория прав": row.license_category,
-                    "Стаж (лет)": row.experience_years,
-                    "Дата приема": hire_date,
-                    "Марка автомобиля": row.brand,
-                    "Госномер": row.license_plate,
-                    "Грузоподъемность (т)": f"{float(row.load_capacity):.1f}",
-                    "Тип кузова": row.body_type,
-                    "Расход топлива (л/100км)": f"{float(row.fuel_consumption):.1f}"
-                })
-
-            if not export_data:
-                QMessageBox.information(self, "Информация",
-                                        "Не найдено водителей с машинами грузоподъемностью более 10 тонн")
-                return
-
-            # Экспорт в Excel
-            filepath = ExcelExporter.export_to_excel(
-                export_data,
-                "Водители_с_тяжелыми_машинами",
-                "Водители с машинами >10т"
-            )
-
-            if filepath:
-                ExcelExporter.show_success_message(filepath, self)
-            else:
-                QMessageBox.warning(self, "Ошибка", "Не удалось создать Excel файл")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Ошибка при экспорте: {str(e)}")
-            print(f"Детали ошибки: {e}")
+        session = self.get_session()
+        if not session:
+            QMessageBox.warning(self, "Ошибка", "Не удалось получить доступ к базе данных")
+            return
 
-    def export_all_drivers(self):
-        """Экспорт всех водителей в Excel"""
         try:
-            from Services.Driver.services import get_all_drivers_with_cars
-
-            session = self.get_session()
-            if not session:
-                QMessageBox.warning(self, "Ошибка", "Не удалось получить доступ к базе данных")
+            export_format = self.export_format_combo.currentData()
+            filepath = default_export_path(spec.name, export_format)
+            if not export_to_file(session, spec, export_format, filepath, **params):
+                QMessageBox.information(self, "Информация", empty_message)
                 return
 
-            drivers = get_all_drivers_with_cars(session)
-
-            # Подготавливаем данные для экспорта
-            export_data = []
-            for driver in drivers:
-                export_data.append({
-                    "ID": driver.get("id", ""),
-                    "ФИО": driver.get("full_name", ""),
-                    "Номер прав": driver.get("license_number", ""),
-                    "Категория": driver.get("license_category", ""),
-                    "Стаж (лет)": driver.get("experience_years", 0),
-                    "Дата приема": driver.get("hire_date", ""),
-                    "ID автомобиля": driver.get("car_id", ""),
-                    "Автомобиль": driver.get("car_info", {}).get("full_info", "Не назначен"),
-                    "Марка автомобиля": driver.get("car_info", {}).get("brand", ""),
-                    "Госномер": driver.get("car_info", {}).get("license_plate", "")
-                })
-
-            # Экспорт в Excel
-            filepath = ExcelExporter.export_to_excel(
-                export_data,
-                "Все_водители",
-                "Водители"
-            )
-
             ExcelExporter.show_success_message(filepath, self)
 
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Не удалось экспортировать данные: {str(e)}")
 
-    def export_experienced_drivers(self):
-        """Экспорт водителей со стажем более 10 лет"""
-        #try:
-        from Services.Driver.services import get_all_drivers_with_cars
-
-        session = self.get_session()
-        if not session:
-            QMessageBox.warning(self, "Ошибка", "Не удалось получить доступ к базе данных")
-            return
-
-        drivers = get_all_drivers_with_cars(session)
-
-            # Фильтруем водителей со стажем > 10 лет
-        experienced_drivers = [
-            driver for driver in drivers
-            if driver.get("experience_years", 0) > 10
-        ]
-
-        export_data = []
-        for driver in experienced_drivers:
-
-            export_data.append({
-                "ID": driver.get("id", ""),
-                "ФИО": driver.get("full_name", ""),
-                "Номер прав": driver.get("license_number", ""),
-                "Категория": driver.get("license_category", ""),
-                "Общий стаж (лет)": driver.get("experience_years", 0),
-                "Дата приема": driver.get("hire_date", ""),
-                "ID автомобиля": driver.get("car_id", ""),
-                "Автомобиль": driver.get("car_info", {}).get("full_info", "Не назначен"),
-                "Статус": "Опытный водитель"
-            })
-
-        filepath = ExcelExporter.export_to_excel(
-            export_data,
-            "Водители_со_стажем_более_10_лет",
-            "Опытные водители"
-        )
+    def export_drivers_with_heavy_cars(self):
+        """Экспорт водителей с машинами грузоподъемностью более 10 тонн"""
+        from Shared.Export.entities import HEAVY_CAR_DRIVER_EXPORT
+        self.run_driver_export(HEAVY_CAR_DRIVER_EXPORT,
+                               "Не найдено водителей с машинами грузоподъемностью более 10 тонн",
+                               min_capacity=10)
 
-        ExcelExporter.show_success_message(filepath, self)
+    def export_all_drivers(self):
+        """Экспорт всех водителей"""
+        from Shared.Export.entities import DRIVER_EXPORT
+        self.run_driver_export(DRIVER_EXPORT, "Нет водителей для экспорта")
 
-        #except Exception as e:
-        #    QMessageBox.critical(self, "Ошибка", f"Не удалось экспортировать данные: {str(e)}")
+    def export_experienced_drivers(self):
+        """Экспорт водителей со стажем более 10 лет"""
+        from Shared.Export.entities import EXPERIENCED_DRIVER_EXPORT
+        self.run_driver_export(EXPERIENCED_DRIVER_EXPORT, "Нет водителей со стажем более 10 лет")
 
     def export_drivers_without_car(self):
         """Экспорт водителей без назначенного автомобиля"""
-        try:
-            from Services.Driver.services import get_all_drivers_with_cars
-
-            session = self.get_session()
-            if not session:
-                QMessageBox.warning(self, "Ошибка", "Не удалось получить доступ к базе данных")
-                return
-
-            drivers = get_all_drivers_with_cars(session)
-
-            # Фильтруем водителей без машины
-            drivers_without_car = [
-                driver for driver in drivers
-                if not driver.get("car_id")
-            ]
-
-            export_data = []
-            for driver in drivers_without_car:
-                export_data.append({
-                    "ID": driver.get("id", ""),
-                    "ФИО": driver.get("full_name", ""),
-                    "Номер прав": driver.get("license_number", ""),
-                    "Категория": driver.get("license_category", ""),
-                    "Стаж (лет)": driver.get("experience_years", 0),
-                    "Дата приема": driver.get("hire_date", ""),
-                    "Статус": "Требуется автомобиль",
-                    "Приоритет": "Высокий" if driver.get("experience_years", 0) > 5 else "Средний",
-                    "Рекомендация": "Назначить автомобиль"
-                })
-
-            filepath = ExcelExporter.export_to_excel(
-                export_data,
-                "Водители_без_автомобиля",
-                "Водители без авто"
-            )
-
-            ExcelExporter.show_success_message(filepath, self)
-
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Не удалось экспортировать данные: {str(e)}")
+        from Shared.Export.entities import DRIVER_WITHOUT_CAR_EXPORT
+        self.run_driver_export(DRIVER_WITHOUT_CAR_EXPORT, "Нет водителей без автомобиля")
 
     # ========== СУЩЕСТВУЮЩИЕ МЕТОДЫ ==========
 
@@ -3,7 +3,7 @@ from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QLabel,
     QLineEdit, QPushButton, QDoubleSpinBox,
     QHBoxLayout, QRadioButton, QButtonGroup,
-    QGroupBox, QMessageBox, QFileDialog
+    QGroupBox, QMessageBox, QFileDialog, QComboBox
 )
 from datetime import datetime
 import os
@@ -45,7 +45,7 @@ class CreateRouteDialog(QDialog):
         self.save_btn.clicked.connect(self.validate_and_accept)
 
         # Кнопка экспорта (НОВАЯ)
-        self.export_btn = QPushButton("Экспорт маршрутов в Excel")
+        self.export_btn = QPushButton("Экспорт маршрутов")
         self.export_btn.clicked.connect(self.show_export_dialog)
 
         # Кнопка отмены
@@ -129,7 +129,7 @@ class CreateRouteDialog(QDialog):
     def show_export_dialog(self):
         """Показать диалог выбора фильтра для экспорта маршрутов"""
         dialog = QDialog(self)
-        dialog.setWindowTitle("Экспорт маршрутов в Excel")
+        dialog.setWindowTitle("Экспорт маршрутов")
         dialog.setMinimumWidth(350)
 
         layout = QVBoxLayout(dialog)
@@ -161,6 +161,15 @@ class CreateRouteDialog(QDialog):
         group_box.setLayout(group_layout)
         layout.addWidget(group_box)
 
+        # Формат файла
+        from Shared.Export.pipeline import EXPORT_FORMATS
+
+        layout.addWidget(QLabel("Формат файла:"))
+        self.export_format_combo = QComboBox()
+        for title, export_format in EXPORT_FORMATS:
+            self.export_format_combo.addItem(title, export_format)
+        layout.addWidget(self.export_format_combo)
+
         # Кнопки
         buttons_layout = QHBoxLayout()
         export_btn = QPushButton("Экспорт")
@@ -194,11 +203,12 @@ class CreateRouteDialog(QDialog):
 
         # Создаем диалог для выбора файла
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        export_format = self.export_format_combo.currentData()
         file_name, _ = QFileDialog.getSaveFileName(
             self,
-            "Сохранить файл Excel",
-            f"маршруты_{option_id}_{timestamp}.xlsx",
-            "Excel files (*.xlsx)"
+            "Сохранить файл",
+            f"маршруты_{option_id}_{timestamp}.{export_format}",
+            self.export_format_combo.currentText()
         )
 
         if not file_name:
@@ -206,7 +216,7 @@ class CreateRouteDialog(QDialog):
 
         try:
             # Экспортируем данные с фильтром
-            if self.export_routes_to_excel(session, file_name, option_id):
+            if self.export_routes(session, file_name, option_id, export_format):
                 QMessageBox.information(
                     self,
                     "Экспорт завершен",
@@ -234,123 +244,17 @@ class CreateRouteDialog(QDialog):
 
         return None
 
-    def export_routes_to_excel(self, session, file_name, filter_type="all"):
-        """Экспорт маршрутов в Excel с фильтрацией"""
+    def export_routes(self, session, file_name, filter_type="all", export_format="xlsx"):
+        """Экспорт маршрутов в файл (xlsx, csv, parquet) с фильтрацией"""
         try:
-            # Импортируем сервис маршрутов
-            from Services.Route.services import get_all_routes, get_routes_with_filters
-
-            # Получаем данные в зависимости от фильтра
-            if filter_type == "all":
-                routes_data = get_all_routes(session)
-            elif filter_type == "long":
-                routes_data = get_routes_with_filters(session, min_distance=500)
-            elif filter_type == "short":
-                routes_data = get_routes_with_filters(session, max_distance=200)
-            elif filter_type == "highway":
-                routes_data = get_routes_with_filters(session, road_type="магистраль")
-            elif filter_type == "city":
-                routes_data = get_routes_with_filters(session, road_type="город")
-            else:
-                routes_data = get_all_routes(session)
+            from Shared.Export.entities import ROUTE_EXPORT
+            from Shared.Export.pipeline import export_to_file
 
-            if not routes_data:
+            if not export_to_file(session, ROUTE_EXPORT, export_format, file_name, filter_type):
                 QMessageBox.warning(self, "Нет данных",
                                     f"Нет маршрутов по выбранному фильтру: {filter_type}")
                 return False
 
-            # Создаем Excel файл
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, Alignment, PatternFill
-
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Маршруты"
-
-            # Стили для заголовков
-            header_font = Font(bold=True, size=12)
-            header_fill = PatternFill(start_color="D4E6F1", end_color="D4E6F1", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-
-            # Заголовки столбцов
-            headers = [
-                "ID", "Откуда", "Куда",
-                "Расстояние (км)", "Среднее время (ч)",
-                "Тип дороги", "Скорость (км/ч)"
-            ]
-
-            for col_idx, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col_idx, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-
-            # Заполняем данными
-            total_distance = 0
-            for row_idx, route in enumerate(routes_data, 2):
-                # Конвертируем ID в строку
-                route_id = route.get("id", "")
-                if hasattr(route_id, '__str__'):
-                    route_id = str(route_id)
-
-                # Рассчитываем среднюю скорость
-                distance = route.get("distance_km", 0)
-                time = route.get("avg_time_hours", 1)
-                avg_speed = distance / time if time > 0 else 0
-
-                total_distance += distance
-
-                ws.cell(row=row_idx, column=1, value=route_id)
-                ws.cell(row=row_idx, column=2, value=route.get("origin", ""))
-                ws.cell(row=row_idx, column=3, value=route.get("destination", ""))
-                ws.cell(row=row_idx, column=4, value=distance)
-                ws.cell(row=row_idx, column=5, value=time)
-                ws.cell(row=row_idx, column=6, value=route.get("road_type", ""))
-                ws.cell(row=row_idx, column=7, value=round(avg_speed, 1))
-
-            # Автоподбор ширины столбцов
-            for column in ws.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        cell_value = str(cell.value) if cell.value is not None else ""
-                        if len(cell_value) > max_length:
-                            max_length = len(cell_value)
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
-
-            # Добавляем статистику
-            last_row = ws.max_row + 2
-            filter_names = {
-                "all": "Все маршруты",
-                "long": "Длинные маршруты (> 500 км)",
-                "short": "Короткие маршруты (< 200 км)",
-                "highway": "Магистральные маршруты",
-                "city": "Городские маршруты"
-            }
-
-            ws.cell(row=last_row, column=1, value=f"Фильтр: {filter_names.get(filter_type, 'Все маршруты')}")
-            ws.cell(row=last_row, column=2, value=f"Количество маршрутов: {len(routes_data)}")
-            ws.cell(row=last_row, column=3, value=f"Общее расстояние: {total_distance} км")
-
-            # Рассчитываем среднюю скорость по всем маршрутам
-            avg_speed_all = 0
-            if routes_data:
-                total_time = sum(r.get("avg_time_hours", 0) for r in routes_data)
-                if total_time > 0:
-                    avg_speed_all = total_distance / total_time
-
-            ws.cell(row=last_row, column=4, value=f"Средняя скорость: {round(avg_speed_all, 1)} км/ч")
-
-            # Добавляем дату экспорта
-            ws.cell(row=last_row + 1, column=1,
-                    value=f"Экспортировано: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-
-            # Сохраняем файл
-            wb.save(file_name)
             return True
 
         except ImportError as e:
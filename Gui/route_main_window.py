@@ -1,13 +1,12 @@
 # Gui/main_window.py
 import datetime
-from typing import Optional
 
 from Gui.shipment_dialog import ShipmentDialog
 from Services.Transportation.service import (
     get_all_shipments, create_shipment, update_shipment, delete_shipment,
     get_available_cars_with_drivers, get_all_drivers,
     get_all_routes, get_active_tariffs,
-    calculate_shipment_cost
+    calculate_shipment_cost, transition_shipments
 )
 
 from PySide6.QtWidgets import QStyle
@@ -18,14 +17,14 @@ from PySide6.QtWidgets import (
     QTabWidget, QMenuBar, QMenu, QStatusBar, QApplication,
     QToolBar, QHeaderView
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, Signal
 from PySide6.QtGui import QAction
 
 from Gui.assignment_dialog import AssignmentDialog
 from Gui.driver_dialog import DriverDialog
 from Services.Driver.services import (
     create_driver, update_driver, delete_driver, get_all_cars_for_assignment,
-    get_all_drivers_with_cars, assign_driver_to_car, swap_driver_car
+    get_all_drivers_with_cars, reassign_fleet
 )
 from Gui.car_dialog import CarDialog
 from Services.Car.services import (
@@ -38,9 +37,37 @@ from Services.Route.services import get_all_routes, create_route
 from Gui.route_dialog import CreateRouteDialog
 
 from Gui.tariff_dialog import TariffDialog
+from Gui.dashboard_tab import DashboardTab
 from Services.Rate.services import (
     get_all_tariffs, create_tariff, update_tariff, delete_tariff
 )
+from Services.Rate.resolver import get_route_tariffs
+from Shared.Export.pipeline import default_export_path
+from Shared.Export.workbook import build_workbook
+from Shared.versioning import StaleVersionError
+
+# Версия строки (Shared/versioning.py) хранится в ячейке id рядом с самим id
+VERSION_ROLE = Qt.UserRole + 1
+
+
+class _WorkbookSignals(QObject):
+    finished = Signal(object)
+    failed = Signal(str)
+
+
+class _WorkbookTask(QRunnable):
+    """Сводная книга в пуле потоков: build_workbook сам держит пул процессов и склейку листов"""
+
+    def __init__(self, file_path: str):
+        super().__init__()
+        self.file_path = file_path
+        self.signals = _WorkbookSignals()
+
+    def run(self):
+        try:
+            self.signals.finished.emit(build_workbook(self.file_path))
+        except Exception as e:
+            self.signals.failed.emit(str(e))
 
 
 class MainWindow(QMainWindow):
@@ -218,15 +245,26 @@ class MainWindow(QMainWindow):
         self.setup_tariff_tab()
         self.load_tariffs()
 
+        # Обзор - первой вкладкой; показатели считаются в фоне при ее открытии
+        self.setup_dashboard_tab()
+
         # Создаем статус бар
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Готово к работе")
 
+        # Фоновая сборка сводного отчета (export_month_workbook)
+        self._workbook_task = None
+
         # Загружаем начальные данные
         self.load_all_data()
 
 
+    def setup_dashboard_tab(self):
+        """Настройка вкладки обзора"""
+        self.dashboard_tab = DashboardTab()
+        self.tabs.insertTab(0, self.dashboard_tab, "📊 Обзор")
+
     def setup_tariff_tab(self):
         """Настройка вкладки тарифов"""
         self.tariff_tab = QWidget()
@@ -443,13 +481,16 @@ class MainWindow(QMainWindow):
                         )
                         return
 
-                success = update_tariff(self.session, tariff_id, **data)
+                success = update_tariff(self.session, tariff_id, expected_version=tariff["version"], **data)
                 if success:
                     self.load_tariffs()
                     self.status_bar.showMessage("Тариф обновлен", 3000)
                 else:
                     QMessageBox.warning(self, "Ошибка", "Не удалось обновить тариф")
 
+        except StaleVersionError as e:
+            QMessageBox.warning(self, "Тариф изменен", str(e))
+            self.load_tariffs()
         except ValueError as e:
             QMessageBox.warning(self, "Ошибка в датах", str(e))
         except Exception as e:
@@ -536,6 +577,16 @@ class MainWindow(QMainWindow):
         self.shipment_delete_btn = QPushButton("🗑 Удалить")
         self.shipment_calc_btn = QPushButton("📊 Пересчитать стоимость")
 
+        # Смена статуса всех выделенных перевозок (выделение - Ctrl/Shift)
+        self.shipment_status_btns = {
+            "in_transit": QPushButton("🚛 В путь"),
+            "delivered": QPushButton("✅ Доставлено"),
+            "cancelled": QPushButton("❌ Отменить"),
+        }
+        for status, button in self.shipment_status_btns.items():
+            button.clicked.connect(lambda checked=False, status=status: self.transition_selected_shipments(status))
+            button.setEnabled(False)
+
         self.shipment_add_btn.clicked.connect(self.add_shipment)
         self.shipment_edit_btn.clicked.connect(self.edit_shipment)
         self.shipment_delete_btn.clicked.connect(self.delete_shipment)
@@ -548,6 +599,8 @@ class MainWindow(QMainWindow):
         btn_layout.addWidget(self.shipment_edit_btn)
         btn_layout.addWidget(self.shipment_delete_btn)
         btn_layout.addWidget(self.shipment_calc_btn)
+        for button in self.shipment_status_btns.values():
+            btn_layout.addWidget(button)
         btn_layout.addStretch()
 
         layout.addWidget(self.shipment_table)
@@ -636,6 +689,7 @@ class MainWindow(QMainWindow):
             available_drivers=available_drivers,
             available_routes=available_routes,
             available_tariffs=available_tariffs,
+            route_tariffs=lambda route_id, date: get_route_tariffs(self.session, route_id, date),
         )
 
         if dialog.exec():
@@ -679,17 +733,21 @@ class MainWindow(QMainWindow):
                 available_cars=available_cars,
                 available_drivers=available_drivers,
                 available_routes=available_routes,
-                available_tariffs=available_tariffs
+                available_tariffs=available_tariffs,
+                route_tariffs=lambda route_id, date: get_route_tariffs(self.session, route_id, date)
             )
 
             if dialog.exec():
                 data = dialog.get_data()
 
                 # Обновляем перевозку
-                update_shipment(self.session, shipment_id, **data)
+                update_shipment(self.session, shipment_id, expected_version=shipment["version"], **data)
                 self.load_shipments()
                 self.status_bar.showMessage("Перевозка обновлена", 3000)
 
+        except StaleVersionError as e:
+            QMessageBox.warning(self, "Перевозка изменена", str(e))
+            self.load_shipments()
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Не удалось обновить перевозку: {str(e)}")
 
@@ -736,6 +794,29 @@ class MainWindow(QMainWindow):
 
         self.shipment_edit_btn.setEnabled(has_selection)
         self.shipment_delete_btn.setEnabled(has_selection)
+        for button in self.shipment_status_btns.values():
+            button.setEnabled(has_selection)
+
+    def transition_selected_shipments(self, new_status: str):
+        """Перевести все выделенные перевозки в новый статус (один UPDATE)"""
+        rows = self.shipment_table.selectionModel().selectedRows()
+        ids = [self.shipment_table.item(index.row(), 0).data(Qt.UserRole) for index in rows]
+        if not ids:
+            return
+
+        try:
+            updated = transition_shipments(self.session, new_status, ids)
+        except Exception as e:
+            self.session.rollback()
+            QMessageBox.critical(self, "Ошибка", f"Не удалось сменить статус: {str(e)}")
+            return
+
+        self.load_shipments()
+        skipped = len(ids) - len(updated)
+        message = f"Статус изменен: {len(updated)}"
+        if skipped:
+            message += f", пропущено (переход из их статуса не разрешен): {skipped}"
+        self.status_bar.showMessage(message, 5000)
 
     def create_menu(self):
         """Создание меню приложения"""
@@ -754,6 +835,10 @@ class MainWindow(QMainWindow):
         refresh_action.triggered.connect(self.load_all_data)
         data_menu.addAction(refresh_action)
 
+        self.workbook_action = QAction("Сводный отчет в Excel", self)
+        self.workbook_action.triggered.connect(self.export_month_workbook)
+        data_menu.addAction(self.workbook_action)
+
         # Меню Справка
         help_menu = menu_bar.addMenu("Справка")
         about_action = QAction("О программе", self)
@@ -1060,12 +1145,15 @@ class MainWindow(QMainWindow):
                 return
 
             try:
-                success = update_driver(self.session, driver_id, **data)
+                success = update_driver(self.session, driver_id, expected_version=driver["version"], **data)
                 if success:
                     self.load_drivers()
                     self.status_bar.showMessage("Данные водителя обновлены успешно", 3000)
                 else:
                     QMessageBox.warning(self, "Ошибка", "Не удалось обновить данные водителя")
+            except StaleVersionError as e:
+                QMessageBox.warning(self, "Водитель изменен", str(e))
+                self.load_drivers()
             except ValueError as e:
                 if "40 лет" in str(e):
                     QMessageBox.warning(self, "Ошибка в стаже", str(e))
@@ -1075,39 +1163,32 @@ class MainWindow(QMainWindow):
                 QMessageBox.critical(self, "Ошибка", f"Ошибка при обновлении: {str(e)}")
 
 
+    def assignment_data(self):
+        """Водители и машины для диалога назначений"""
+        return get_all_drivers_with_cars(self.session), get_all_cars_for_assignment(self.session)
+
     def open_assignment_dialog(self):
         """Открыть диалог управления назначениями"""
-        drivers = get_all_drivers_with_cars(self.session)
-        cars = get_all_cars_for_assignment(self.session)
+        drivers, cars = self.assignment_data()
 
         dialog = AssignmentDialog(self, drivers, cars)
         dialog.exec()
 
-    def assign_driver_to_car_requested(self, driver_id: int, car_id: Optional[int]):
-        """Обработка запроса на назначение водителя на автомобиль"""
-        success = assign_driver_to_car(self.session, driver_id, car_id)
-
-        if success:
-            self.load_drivers()
-            self.load_cars()
-
-            if car_id:
-                self.status_bar.showMessage("Водитель успешно назначен на автомобиль", 3000)
-            else:
-                self.status_bar.showMessage("Водитель откреплен от автомобиля", 3000)
-        else:
-            QMessageBox.warning(self, "Ошибка", "Не удалось выполнить назначение")
-
-    def swap_drivers_requested(self, driver1_id: int, driver2_id: int):
-        """Обработка запроса на обмен автомобилями"""
-        success = swap_driver_car(self.session, driver1_id, driver2_id)
+    def reassign_fleet_requested(self, mapping: dict, expected_versions: dict) -> bool:
+        """Применить очередь назначений из диалога одной транзакцией"""
+        try:
+            reassigned = reassign_fleet(self.session, mapping, expected_versions)
+        except StaleVersionError as e:
+            QMessageBox.warning(self, "Водитель изменен", str(e))
+            return False
+        except ValueError as e:
+            QMessageBox.warning(self, "Ошибка", f"Не удалось выполнить назначения: {str(e)}")
+            return False
 
-        if success:
-            self.load_drivers()
-            self.load_cars()
-            self.status_bar.showMessage("Автомобили успешно обменены", 3000)
-        else:
-            QMessageBox.warning(self, "Ошибка", "Не удалось выполнить обмен")
+        self.load_drivers()
+        self.load_cars()
+        self.status_bar.showMessage(f"Назначения применены: {len(reassigned)} водителей", 3000)
+        return True
 
     def load_cars(self):
         """Загрузка машин в таблицу"""
@@ -1182,6 +1263,7 @@ class MainWindow(QMainWindow):
             active_shipments = self.session.query(Shipment).filter(
                 and_(
                     Shipment.driver_id == driver_id,
+                    Shipment.active,
                     Shipment.status.in_(["pending", "in_transit"])
                 )
             ).all()
@@ -1251,6 +1333,7 @@ class MainWindow(QMainWindow):
 
             id_item = QTableWidgetItem(str(route["id"]))
             id_item.setData(Qt.UserRole, route["id"])
+            id_item.setData(VERSION_ROLE, route["version"])
             self.route_table.setItem(row, 0, id_item)
 
             self.route_table.setItem(row, 1, QTableWidgetItem(route["origin"]))
@@ -1345,9 +1428,13 @@ class MainWindow(QMainWindow):
                 QMessageBox.warning(self, "Ошибка", "Заполните поля 'Откуда' и 'Куда'")
                 return
 
-            update_route(self.session, route_id, **data)
+            try:
+                update_route(self.session, route_id, expected_version=id_item.data(VERSION_ROLE), **data)
+            except StaleVersionError as e:
+                QMessageBox.warning(self, "Маршрут изменен", str(e))
+            else:
+                self.status_bar.showMessage("Маршрут обновлен успешно", 3000)
             self.load_routes()
-            self.status_bar.showMessage("Маршрут обновлен успешно", 3000)
 
     # ========== Методы для машин ==========
 
@@ -1361,6 +1448,7 @@ class MainWindow(QMainWindow):
 
             id_item = QTableWidgetItem(str(car["id"]))
             id_item.setData(Qt.UserRole, car["id"])
+            id_item.setData(VERSION_ROLE, car["version"])
             self.car_table.setItem(row, 0, id_item)
 
             self.car_table.setItem(row, 1, QTableWidgetItem(car["brand"]))
@@ -1463,13 +1551,46 @@ class MainWindow(QMainWindow):
                     QMessageBox.warning(self, "Ошибка", f"Заполните поле: {field}")
                     return
 
-            success = update_car(self.session, car_id, **data)
+            try:
+                success = update_car(self.session, car_id, expected_version=id_item.data(VERSION_ROLE), **data)
+            except StaleVersionError as e:
+                QMessageBox.warning(self, "Машина изменена", str(e))
+                self.load_cars()
+                return
+
             if success:
                 self.load_cars()
                 self.status_bar.showMessage("Данные машины обновлены успешно", 3000)
             else:
                 QMessageBox.warning(self, "Ошибка", "Не удалось обновить данные машины")
 
+    def export_month_workbook(self):
+        """Сводная книга: машины, водители, маршруты, активные тарифы, перевозки (в фоне)"""
+        file_path = default_export_path("отчет", "xlsx")
+        self.workbook_action.setEnabled(False)
+        self.status_bar.showMessage("Формирование сводного отчета...")
+
+        # Ссылку на задачу держим, пока не придет результат: иначе сигналы могут быть удалены
+        self._workbook_task = _WorkbookTask(file_path)
+        self._workbook_task.signals.finished.connect(self.on_workbook_finished)
+        self._workbook_task.signals.failed.connect(self.on_workbook_failed)
+        QThreadPool.globalInstance().start(self._workbook_task)
+
+    def on_workbook_finished(self, counts: dict):
+        file_path = self._workbook_task.file_path
+        self._workbook_task = None
+        self.workbook_action.setEnabled(True)
+        self.status_bar.clearMessage()
+
+        lines = "\n".join(f"• {title}: {count}" for title, count in counts.items())
+        QMessageBox.information(self, "Отчет сформирован", f"Файл: {file_path}\n\n{lines}")
+
+    def on_workbook_failed(self, message: str):
+        self._workbook_task = None
+        self.workbook_action.setEnabled(True)
+        self.status_bar.clearMessage()
+        QMessageBox.critical(self, "Ошибка", f"Не удалось сформировать отчет: {message}")
+
     def show_about(self):
         """Показать информацию о программе"""
         QMessageBox.information(
@@ -16,7 +16,7 @@ class ShipmentDialog(QDialog):
 
     def __init__(self, parent=None, shipment=None,
                  available_cars=None, available_drivers=None,
-                 available_routes=None, available_tariffs=None):
+                 available_routes=None, available_tariffs=None, route_tariffs=None):
         super().__init__(parent)
         self.setWindowTitle("Редактирование перевозки" if shipment else "Создание перевозки")
         self.setMinimumWidth(800)
@@ -26,6 +26,10 @@ class ShipmentDialog(QDialog):
         self.available_drivers = available_drivers or []
         self.available_routes = available_routes or []
         self.available_tariffs = available_tariffs or []
+        # Все действующие тарифы - на случай маршрута без привязанных тарифов
+        self.all_tariffs = list(self.available_tariffs)
+        # (route_id, datetime) -> тарифы маршрута на дату, самый дешевый первым
+        self.route_tariffs = route_tariffs
 
         # Виджеты
         self.shipment_date = QDateTimeEdit()
@@ -99,7 +103,8 @@ class ShipmentDialog(QDialog):
         # Подключаем сигналы
         self.cargo_weight.valueChanged.connect(self.check_car_capacity)
         self.car_combo.currentIndexChanged.connect(self.check_car_capacity)
-        self.route_combo.currentIndexChanged.connect(self.calculate_cost)
+        self.route_combo.currentIndexChanged.connect(self.on_route_or_date_changed)
+        self.shipment_date.dateTimeChanged.connect(self.on_route_or_date_changed)
         self.tariff_combo.currentIndexChanged.connect(self.calculate_cost)
 
     def setup_ui(self):
@@ -198,34 +203,78 @@ class ShipmentDialog(QDialog):
         # Автомобиль
         car_id = shipment.get("car_id")
         if car_id:
-            idx = self.car_combo.findData(car_id)
+            idx = self._find_data(self.car_combo, car_id)
             if idx >= 0:
                 self.car_combo.setCurrentIndex(idx)
 
         # Водитель
         driver_id = shipment.get("driver_id")
         if driver_id:
-            idx = self.driver_combo.findData(driver_id)
+            idx = self._find_data(self.driver_combo, driver_id)
             if idx >= 0:
                 self.driver_combo.setCurrentIndex(idx)
 
         # Маршрут
         route_id = shipment.get("route_id")
         if route_id:
-            idx = self.route_combo.findData(route_id)
+            idx = self._find_data(self.route_combo, route_id)
             if idx >= 0:
                 self.route_combo.setCurrentIndex(idx)
 
         # Тариф
         tariff_id = shipment.get("tariff_id")
+        self.refresh_tariffs(keep_id=tariff_id)
         if tariff_id:
-            idx = self.tariff_combo.findData(tariff_id)
+            idx = self._find_data(self.tariff_combo, tariff_id)
             if idx >= 0:
                 self.tariff_combo.setCurrentIndex(idx)
 
         # Расчетные поля
         self.calculate_cost()
 
+    @staticmethod
+    def _find_data(combo: QComboBox, value) -> int:
+        """findData для uuid: QComboBox не сравнивает произвольные Python-объекты"""
+        for index in range(combo.count()):
+            if combo.itemData(index) == value:
+                return index
+        return -1
+
+    def on_route_or_date_changed(self):
+        """Подобрать тарифы под выбранный маршрут и дату"""
+        self.refresh_tariffs()
+        self.calculate_cost()
+
+    def refresh_tariffs(self, keep_id=None):
+        """Заполнить список тарифов: привязанные к маршруту на дату, самый выгодный - первым"""
+        route_id = self.route_combo.currentData()
+        if keep_id is None:
+            keep_id = self.tariff_combo.currentData()
+
+        tariffs = []
+        if self.route_tariffs and route_id:
+            tariffs = list(self.route_tariffs(route_id, self.get_shipment_datetime()))
+        resolved = bool(tariffs)
+
+        if not resolved:
+            tariffs = list(self.all_tariffs)
+        elif keep_id and all(t["id"] != keep_id for t in tariffs):
+            # Уже выбранный тариф не пропадает из списка при редактировании
+            tariffs += [t for t in self.all_tariffs if t["id"] == keep_id]
+
+        self.available_tariffs = tariffs
+        self.tariff_combo.blockSignals(True)
+        self.tariff_combo.clear()
+        self.tariff_combo.addItem("Выберите тариф", None)
+        for tariff in tariffs:
+            self.tariff_combo.addItem(tariff["full_info"], tariff["id"])
+
+        idx = self._find_data(self.tariff_combo, keep_id) if keep_id else -1
+        if idx < 0 and resolved:
+            idx = 1
+        self.tariff_combo.setCurrentIndex(max(idx, 0))
+        self.tariff_combo.blockSignals(False)
+
     def check_car_capacity(self):
         """Проверить грузоподъемность автомобиля"""
         car_id = self.car_combo.currentData()
@@ -283,7 +332,7 @@ class ShipmentDialog(QDialog):
     def show_export_dialog(self):
         """Показать диалог выбора фильтра для экспорта перевозок"""
         dialog = QDialog(self)
-        dialog.setWindowTitle("Экспорт перевозок в Excel")
+        dialog.setWindowTitle("Экспорт перевозок")
         dialog.setMinimumWidth(400)
 
         layout = QVBoxLayout(dialog)
@@ -330,6 +379,15 @@ class ShipmentDialog(QDialog):
         self.export_options_group.buttonClicked.connect(on_option_changed)
         layout.addWidget(self.status_combo)
 
+        # Формат файла
+        from Shared.Export.pipeline import EXPORT_FORMATS
+
+        layout.addWidget(QLabel("Формат файла:"))
+        self.export_format_combo = QComboBox()
+        for title, export_format in EXPORT_FORMATS:
+            self.export_format_combo.addItem(title, export_format)
+        layout.addWidget(self.export_format_combo)
+
         # Кнопки
         buttons_layout = QHBoxLayout()
         export_btn = QPushButton("Экспорт")
@@ -374,13 +432,32 @@ class ShipmentDialog(QDialog):
                                 "Не удалось получить доступ к базе данных")
             return
 
+        # Большие выгрузки не помещаются на лист Excel - предлагаем CSV через COPY
+        export_format = self.export_format_combo.currentData()
+        if export_format == "xlsx":
+            from Shared.Export.entities import SHIPMENT_EXPORT
+            from Shared.Export.pipeline import count_rows
+            from Shared.excel_stream import EXCEL_MAX_ROWS
+
+            rows_count = count_rows(session, SHIPMENT_EXPORT, option_id, **extra_params)
+            if rows_count and rows_count >= EXCEL_MAX_ROWS - 3:
+                answer = QMessageBox.question(
+                    dialog, "Большая выгрузка",
+                    f"Перевозок: {rows_count}. Это больше, чем помещается на лист Excel.\n"
+                    f"Выгрузить в CSV напрямую из базы данных?"
+                )
+                if answer != QMessageBox.Yes:
+                    return
+                self.export_format_combo.setCurrentIndex(self.export_format_combo.findData("csv"))
+                export_format = "csv"
+
         # Создаем диалог для выбора файла
         timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
         file_name, _ = QFileDialog.getSaveFileName(
             self,
-            "Сохранить файл Excel",
-            f"перевозки_{option_id}_{timestamp}.xlsx",
-            "Excel files (*.xlsx)"
+            "Сохранить файл",
+            f"перевозки_{option_id}_{timestamp}.{export_format}",
+            self.export_format_combo.currentText()
         )
 
         if not file_name:
@@ -388,7 +465,7 @@ class ShipmentDialog(QDialog):
 
         try:
             # Экспортируем данные с фильтром
-            if self.export_shipments_to_excel(session, file_name, option_id, **extra_params):
+            if self.export_shipments(session, file_name, option_id, export_format, **extra_params):
                 QMessageBox.information(
                     self,
                     "Экспорт завершен",
@@ -446,10 +523,10 @@ class ShipmentDialog(QDialog):
 
         self.accept()
 
-    def get_data(self):
-        """Получить данные из формы"""
+    def get_shipment_datetime(self) -> datetime.datetime:
+        """Дата и время перевозки из формы"""
         qdt = self.shipment_date.dateTime()
-        shipment_date = datetime.datetime(
+        return datetime.datetime(
             qdt.date().year(),
             qdt.date().month(),
             qdt.date().day(),
@@ -457,6 +534,10 @@ class ShipmentDialog(QDialog):
             qdt.time().minute()
         )
 
+    def get_data(self):
+        """Получить данные из формы"""
+        shipment_date = self.get_shipment_datetime()
+
         # Преобразуем статус обратно в код
         status_mapping = {
             "⏳ Ожидает": "pending",
@@ -476,303 +557,20 @@ class ShipmentDialog(QDialog):
             "tariff_id": self.tariff_combo.currentData()
         }
 
-    def export_shipments_to_excel(self, session, file_name, filter_type="all", **kwargs):
-        """Экспорт перевозок в Excel с фильтрацией"""
+    def export_shipments(self, session, file_name, filter_type="all", export_format="xlsx", **kwargs):
+        """Экспорт перевозок в файл (xlsx, csv, parquet) с фильтрацией"""
         try:
-            print(f"=== ДЕБАГ: Начало экспорта перевозок ===")
-            print(f"1. Фильтр: {filter_type}")
-            print(f"2. Доп. параметры: {kwargs}")
-            print(f"3. Файл для сохранения: {file_name}")
-
-            # Импортируем сервис перевозок
-            try:
-                from Services.Transportation.service import get_all_shipments, get_shipments_with_filters
-                print("✅ 4. Импорт функций успешен")
-            except ImportError as e:
-                print(f"❌ 4. Ошибка импорта: {e}")
-                QMessageBox.critical(self, "Ошибка", f"Не удалось импортировать модуль: {e}")
-                return False
-
-            import datetime
-
-            print("5. Получаем данные из базы...")
-            try:
-                # Получаем данные в зависимости от фильтра
-                if filter_type == "all":
-                    shipments_data = get_all_shipments(session)
-                    print(f"   Использован get_all_shipments")
-                elif filter_type == "current":
-                    shipments_data = get_shipments_with_filters(session, status=["pending", "in_transit"])
-                    print(f"   Использован get_shipments_with_filters: status=['pending', 'in_transit']")
-                elif filter_type == "completed":
-                    shipments_data = get_shipments_with_filters(session, status=["delivered"])
-                    print(f"   Использован get_shipments_with_filters: status=['delivered']")
-                elif filter_type == "cancelled":
-                    shipments_data = get_shipments_with_filters(session, status=["cancelled"])
-                    print(f"   Использован get_shipments_with_filters: status=['cancelled']")
-                elif filter_type == "by_status":
-                    status = kwargs.get("status", "pending")
-                    shipments_data = get_shipments_with_filters(session, status=[status])
-                    print(f"   Использован get_shipments_with_filters: status=[{status}]")
-                else:
-                    shipments_data = get_all_shipments(session)
-                    print(f"   Использован get_all_shipments (по умолчанию)")
-
-                print(f"6. Получено перевозок: {len(shipments_data) if shipments_data else 0}")
-
-            except Exception as e:
-                print(f"❌ Ошибка при получении данных: {type(e).__name__}: {e}")
-                import traceback
-                traceback.print_exc()
-                QMessageBox.critical(self, "Ошибка", f"Ошибка при получении данных:\n{str(e)}")
-                return False
+            from Shared.Export.entities import SHIPMENT_EXPORT
+            from Shared.Export.pipeline import export_to_file
 
-            if not shipments_data:
-                print("7. ⚠ Нет данных после фильтрации")
+            if not export_to_file(session, SHIPMENT_EXPORT, export_format, file_name, filter_type, **kwargs):
                 QMessageBox.warning(self, "Нет данных",
                                     f"Нет перевозок по выбранному фильтру: {filter_type}")
                 return False
 
-            # Проверяем структуру данных
-            if shipments_data:
-                print(f"8. Пример структуры данных первой перевозки:")
-                print(f"   Ключи: {list(shipments_data[0].keys())}")
-                print(f"   ID: {shipments_data[0].get('id')}")
-                print(f"   Статус: {shipments_data[0].get('status')}")
-                print(f"   Дата: {shipments_data[0].get('shipment_date')}")
-
-            print("9. Создаем Excel файл...")
-            try:
-                from openpyxl import Workbook
-                from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-                from openpyxl.utils import get_column_letter
-                print("   ✅ Импорт openpyxl успешен")
-            except ImportError as e:
-                print(f"   ❌ Ошибка импорта openpyxl: {e}")
-                QMessageBox.critical(self, "Ошибка", f"Не установлен openpyxl: {e}")
-                return False
-
-            try:
-                wb = Workbook()
-                ws = wb.active
-                ws.title = "Перевозки"
-
-                print("10. Настраиваем стили...")
-
-                # Стили
-                header_font = Font(bold=True, size=12, color="FFFFFF")
-                header_fill = PatternFill(start_color="2E86C1", end_color="2E86C1", fill_type="solid")
-                header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-                title_font = Font(bold=True, size=16, color="2C3E50")
-                title_alignment = Alignment(horizontal="center", vertical="center")
-
-                # Заголовок
-                ws.merge_cells('A1:L1')
-                title_cell = ws['A1']
-                title_cell.value = "ОТЧЕТ ПО ПЕРЕВОЗКАМ"
-                title_cell.font = title_font
-                title_cell.alignment = title_alignment
-
-                # Заголовки столбцов
-                headers = [
-                    ("ID", 8),
-                    ("Дата", 18),
-                    ("Тип груза", 15),
-                    ("Вес (кг)", 12),
-                    ("Статус", 12),
-                    ("Автомобиль", 20),
-                    ("Водитель", 20),
-                    ("Маршрут", 25),
-                    ("Расстояние (км)", 15),
-                    ("Тариф (руб/км)", 15),
-                    ("Мин. цена", 12),
-                    ("Стоимость (руб)", 15)
-                ]
-
-                for col_idx, (header, width) in enumerate(headers, 1):
-                    cell = ws.cell(row=3, column=col_idx, value=header)
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-                    ws.column_dimensions[get_column_letter(col_idx)].width = width
-
-                print("11. Заполняем данные...")
-
-                # Заполняем данными
-                current_row = 4
-                total_cost = 0
-                total_weight = 0
-                total_distance = 0
-
-                # Маппинг статусов
-                status_mapping = {
-                    "pending": "⏳ Ожидает",
-                    "in_transit": "🚛 В пути",
-                    "delivered": "✅ Доставлено",
-                    "cancelled": "❌ Отменено"
-                }
-
-                for i, shipment in enumerate(shipments_data):
-                    # Отладочный вывод для первых 2 записей
-                    if i < 2:
-                        print(f"   Обработка записи {i + 1}: ID={shipment.get('id')}")
-
-                    # Форматируем дату
-                    shipment_date = shipment.get("shipment_date", "")
-                    if shipment_date:
-                        try:
-                            dt = datetime.datetime.fromisoformat(shipment_date)
-                            date_str = dt.strftime("%d.%m.%Y %H:%M")
-                        except Exception as e:
-                            print(f"   ❌ Ошибка форматирования даты: {e}")
-                            date_str = str(shipment_date)
-                    else:
-                        date_str = ""
-
-                    # Получаем информацию
-                    car_info = shipment.get("car_info", {})
-                    driver_info = shipment.get("driver_info", {})
-                    route_info = shipment.get("route_info", {})
-                    tariff_info = shipment.get("tariff_info", {})
-
-                    # Проверяем наличие данных
-                    car_text = f"{car_info.get('brand', '')} ({car_info.get('license_plate', '')})"
-                    driver_text = f"{driver_info.get('full_name', '')}"
-                    if driver_info.get('license_number'):
-                        driver_text += f" ({driver_info.get('license_number')})"
-
-                    route_text = ""
-                    if route_info.get('origin') and route_info.get('destination'):
-                        route_text = f"{route_info['origin']} → {route_info['destination']}"
-
-                    # Статус с иконкой
-                    status = shipment.get("status", "pending")
-                    status_text = status_mapping.get(status, "⏳ Ожидает")
-
-                    # Стоимость
-                    cost = shipment.get("total_cost", 0)
-
-                    # Записываем данные
-                    ws.cell(row=current_row, column=1, value=str(shipment.get("id", "")))
-                    ws.cell(row=current_row, column=2, value=date_str)
-                    ws.cell(row=current_row, column=4, value=shipment.get("cargo_weight", 0))
-                    ws.cell(row=current_row, column=5, value=status_text)
-                    ws.cell(row=current_row, column=6, value=car_text)
-                    ws.cell(row=current_row, column=7, value=driver_text)
-                    ws.cell(row=current_row, column=8, value=route_text)
-                    ws.cell(row=current_row, column=9, value=route_info.get('distance_km', 0))
-                    ws.cell(row=current_row, column=10, value=tariff_info.get('price_per_km', 0))
-                    ws.cell(row=current_row, column=11, value=tariff_info.get('min_price', 0))
-                    ws.cell(row=current_row, column=12, value=cost)
-
-                    # Форматирование числовых полей
-                    ws.cell(row=current_row, column=4).number_format = '#,##0.0" кг"'
-                    ws.cell(row=current_row, column=9).number_format = '#,##0" км"'
-                    ws.cell(row=current_row, column=10).number_format = '#,##0.00" руб"'
-                    ws.cell(row=current_row, column=11).number_format = '#,##0" руб"'
-                    ws.cell(row=current_row, column=12).number_format = '#,##0.00" руб"'
-
-                    # Собираем статистику
-                    total_cost += cost
-                    total_weight += shipment.get("cargo_weight", 0)
-                    total_distance += route_info.get('distance_km', 0)
-
-                    # Подсветка строк по статусу
-                    if status == "delivered":
-                        for col in range(1, 13):
-                            ws.cell(row=current_row, column=col).fill = PatternFill(
-                                start_color="D5F5E3", end_color="D5F5E3", fill_type="solid"
-                            )
-                    elif status == "cancelled":
-                        for col in range(1, 13):
-                            ws.cell(row=current_row, column=col).fill = PatternFill(
-                                start_color="FADBD8", end_color="FADBD8", fill_type="solid"
-                            )
-
-                    current_row += 1
-
-                print(f"12. Заполнено строк: {current_row - 4}")
-
-                # Добавляем границы для данных
-                thin_border = Border(left=Side(style='thin'),
-                                     right=Side(style='thin'),
-                                     top=Side(style='thin'),
-                                     bottom=Side(style='thin'))
-
-                for row in ws.iter_rows(min_row=3, max_row=current_row - 1, max_col=12):
-                    for cell in row:
-                        cell.border = thin_border
-
-                print("13. Добавляем статистику...")
-
-                # Добавляем статистику
-                stats_row = current_row + 2
-
-                ws.merge_cells(f'A{stats_row}:L{stats_row}')
-                ws.cell(row=stats_row, column=1, value="СТАТИСТИКА").font = Font(bold=True, size=14)
-                ws.cell(row=stats_row, column=1).alignment = Alignment(horizontal="center")
-
-                # Информация о фильтре
-                filter_names = {
-                    "all": "Все перевозки",
-                    "current": "Текущие перевозки (ожидает/в пути)",
-                    "completed": "Завершенные перевозки",
-                    "cancelled": "Отмененные перевозки",
-                    "by_status": f"Перевозки по статусу: {status_mapping.get(kwargs.get('status', 'pending'), 'Ожидает')}"
-                }
-
-                ws.cell(row=stats_row + 1, column=1, value=f"Фильтр: {filter_names.get(filter_type, 'Все перевозки')}")
-                ws.cell(row=stats_row + 1, column=2, value=f"Количество перевозок: {len(shipments_data)}")
-
-                if shipments_data:
-                    # Подсчет по статусам
-                    status_counts = {}
-                    for shipment in shipments_data:
-                        status = shipment.get("status", "pending")
-                        status_counts[status] = status_counts.get(status, 0) + 1
-
-                    ws.cell(row=stats_row + 2, column=1, value=f"Ожидает: {status_counts.get('pending', 0)}")
-                    ws.cell(row=stats_row + 2, column=2, value=f"В пути: {status_counts.get('in_transit', 0)}")
-                    ws.cell(row=stats_row + 2, column=3, value=f"Доставлено: {status_counts.get('delivered', 0)}")
-                    ws.cell(row=stats_row + 2, column=4, value=f"Отменено: {status_counts.get('cancelled', 0)}")
-
-                    ws.cell(row=stats_row + 3, column=1, value=f"Общий вес: {total_weight:.1f} кг")
-                    ws.cell(row=stats_row + 3, column=2, value=f"Общая дистанция: {total_distance:.0f} км")
-                    ws.cell(row=stats_row + 3, column=3, value=f"Общая стоимость: {total_cost:.2f} руб")
-
-                    if total_weight > 0:
-                        avg_cost_per_kg = total_cost / total_weight
-                        ws.cell(row=stats_row + 4, column=1,
-                                value=f"Средняя стоимость за кг: {avg_cost_per_kg:.2f} руб/кг")
-
-                    if total_distance > 0:
-                        avg_cost_per_km = total_cost / total_distance
-                        ws.cell(row=stats_row + 4, column=2,
-                                value=f"Средняя стоимость за км: {avg_cost_per_km:.2f} руб/км")
-
-                # Добавляем дату экспорта
-                ws.cell(row=stats_row + 6, column=1,
-                        value=f"Экспортировано: {datetime.datetime.now().strftime('%d.%m.%Y %H:%M:%S')}")
-
-                # Автоподбор ширины для некоторых столбцов
-                for col in [6, 7, 8]:  # Автомобиль, Водитель, Маршрут
-                    ws.column_dimensions[get_column_letter(col)].auto_size = True
-
-                print(f"14. Сохраняем файл: {file_name}")
-                wb.save(file_name)
-                print("✅ 15. Файл успешно сохранен!")
-
-                return True
-
-            except Exception as e:
-                print(f"❌ Ошибка при создании Excel: {type(e).__name__}: {e}")
-                import traceback
-                traceback.print_exc()
-                raise  # Пробрасываем дальше
+            return True
 
         except Exception as e:
-            print(f"❌ Критическая ошибка в export_shipments_to_excel: {type(e).__name__}: {e}")
             import traceback
             traceback.print_exc()  # Выводим полный стек вызовов
 
@@ -787,4 +585,4 @@ class ShipmentDialog(QDialog):
 
             QMessageBox.critical(self, "Ошибка экспорта",
                                  f"Произошла ошибка:\n{error_msg}")
-            return False
\ No newline at end of file
+            return False
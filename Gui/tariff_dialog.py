@@ -196,7 +196,7 @@ class TariffDialog(QDialog):
     def show_export_dialog(self):
         """Показать диалог выбора фильтра для экспорта тарифов"""
         dialog = QDialog(self)
-        dialog.setWindowTitle("Экспорт тарифов в Excel")
+        dialog.setWindowTitle("Экспорт тарифов")
         dialog.setMinimumWidth(400)
 
         layout = QVBoxLayout(dialog)
@@ -244,6 +244,15 @@ class TariffDialog(QDialog):
         self.export_options_group.buttonClicked.connect(on_option_changed)
         layout.addWidget(self.cargo_combo)
 
+        # Формат файла
+        from Shared.Export.pipeline import EXPORT_FORMATS
+
+        layout.addWidget(QLabel("Формат файла:"))
+        self.export_format_combo = QComboBox()
+        for title, export_format in EXPORT_FORMATS:
+            self.export_format_combo.addItem(title, export_format)
+        layout.addWidget(self.export_format_combo)
+
         # Кнопки
         buttons_layout = QHBoxLayout()
         export_btn = QPushButton("Экспорт")
@@ -286,11 +295,12 @@ class TariffDialog(QDialog):
 
         # Создаем диалог для выбора файла
         timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        export_format = self.export_format_combo.currentData()
         file_name, _ = QFileDialog.getSaveFileName(
             self,
-            "Сохранить файл Excel",
-            f"тарифы_{option_id}_{timestamp}.xlsx",
-            "Excel files (*.xlsx)"
+            "Сохранить файл",
+            f"тарифы_{option_id}_{timestamp}.{export_format}",
+            self.export_format_combo.currentText()
         )
 
         if not file_name:
@@ -298,7 +308,7 @@ class TariffDialog(QDialog):
 
         try:
             # Экспортируем данные с фильтром
-            if self.export_tariffs_to_excel(session, file_name, option_id, **extra_params):
+            if self.export_tariffs(session, file_name, option_id, export_format, **extra_params):
                 QMessageBox.information(
                     self,
                     "Экспорт завершен",
@@ -385,187 +395,17 @@ class TariffDialog(QDialog):
             "description": self.description_input.toPlainText().strip()
         }
 
-    def export_tariffs_to_excel(self, session, file_name, filter_type="all", **kwargs):
-        """Экспорт тарифов в Excel с фильтрацией"""
+    def export_tariffs(self, session, file_name, filter_type="all", export_format="xlsx", **kwargs):
+        """Экспорт тарифов в файл (xlsx, csv, parquet) с фильтрацией"""
         try:
-            # Импортируем сервис тарифов
-            from Services.Rate.services import (
-                get_all_tariffs, get_active_tariffs,
-                get_tariffs_by_cargo_type
-            )
-            import datetime
-
-            # Получаем данные в зависимости от фильтра
-            if filter_type == "all":
-                tariffs_data = get_all_tariffs(session)
-            elif filter_type == "active":
-                tariffs_data = get_active_tariffs(session)
-            elif filter_type == "archived":
-                all_tariffs = get_all_tariffs(session)
-                now = datetime.datetime.now()
-                tariffs_data = [t for t in all_tariffs
-                                if t.get("date_end") and
-                                datetime.datetime.fromisoformat(t["date_end"]) < now]
-            elif filter_type == "by_cargo":
-                cargo_type = kwargs.get("cargo_type", "")
-                tariffs_data = get_tariffs_by_cargo_type(session, cargo_type)
-            elif filter_type == "unlimited":
-                all_tariffs = get_all_tariffs(session)
-                tariffs_data = [t for t in all_tariffs if t.get("date_end") is None]
-            else:
-                tariffs_data = get_all_tariffs(session)
+            from Shared.Export.entities import TARIFF_EXPORT
+            from Shared.Export.pipeline import export_to_file
 
-            if not tariffs_data:
+            if not export_to_file(session, TARIFF_EXPORT, export_format, file_name, filter_type, **kwargs):
                 QMessageBox.warning(self, "Нет данных",
                                     f"Нет тарифов по выбранному фильтру: {filter_type}")
                 return False
 
-            # Создаем Excel файл
-            from openpyxl import Workbook
-            from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-            from openpyxl.utils import get_column_letter
-
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Тарифы"
-
-            # Стили
-            header_font = Font(bold=True, size=12, color="FFFFFF")
-            header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-            title_font = Font(bold=True, size=14)
-            title_alignment = Alignment(horizontal="center", vertical="center")
-
-            # Заголовок
-            ws.merge_cells('A1:H1')
-            title_cell = ws['A1']
-            title_cell.value = "ТАРИФЫ НА ПЕРЕВОЗКИ"
-            title_cell.font = title_font
-            title_cell.alignment = title_alignment
-
-            # Заголовки столбцов
-            headers = [
-                ("ID", 10),
-                ("Тип груза", 20),
-                ("Цена за км (руб)", 15),
-                ("Мин. цена (руб)", 15),
-                ("Дата начала", 15),
-                ("Дата окончания", 15),
-                ("Статус", 12),
-                ("Описание", 30)
-            ]
-
-            for col_idx, (header, width) in enumerate(headers, 1):
-                cell = ws.cell(row=3, column=col_idx, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-                ws.column_dimensions[get_column_letter(col_idx)].width = width
-
-            # Заполняем данными
-            current_row = 4
-            total_price_per_km = 0
-            total_min_price = 0
-
-            for tariff in tariffs_data:
-                # Конвертируем даты в читаемый формат
-                date_start = tariff.get("date_start", "")
-                date_end = tariff.get("date_end", "")
-
-                if date_start:
-                    try:
-                        dt = datetime.datetime.fromisoformat(date_start)
-                        date_start_str = dt.strftime("%d.%m.%Y %H:%M")
-                    except:
-                        date_start_str = str(date_start)
-                else:
-                    date_start_str = ""
-
-                if date_end:
-                    try:
-                        dt = datetime.datetime.fromisoformat(date_end)
-                        date_end_str = dt.strftime("%d.%m.%Y %H:%M")
-                    except:
-                        date_end_str = str(date_end)
-                else:
-                    date_end_str = "Бессрочно"
-
-                # Определяем статус
-                is_active = tariff.get("is_active", False)
-                status = "✅ Активен" if is_active else "⏸️ Архив"
-
-                ws.cell(row=current_row, column=1, value=tariff.get("id", ""))
-                ws.cell(row=current_row, column=2, value=tariff.get("cargo_type", ""))
-                ws.cell(row=current_row, column=3, value=tariff.get("price_per_km", 0))
-                ws.cell(row=current_row, column=4, value=tariff.get("min_price", 0))
-                ws.cell(row=current_row, column=5, value=date_start_str)
-                ws.cell(row=current_row, column=6, value=date_end_str)
-                ws.cell(row=current_row, column=7, value=status)
-                ws.cell(row=current_row, column=8, value=tariff.get("description", ""))
-
-                # Форматирование для числовых полей
-                price_cell = ws.cell(row=current_row, column=3)
-                price_cell.number_format = '#,##0.00" руб"'
-
-                min_price_cell = ws.cell(row=current_row, column=4)
-                min_price_cell.number_format = '#,##0" руб"'
-
-                # Собираем статистику
-                total_price_per_km += tariff.get("price_per_km", 0)
-                total_min_price += tariff.get("min_price", 0)
-
-                current_row += 1
-
-            # Добавляем границы для данных
-            thin_border = Border(left=Side(style='thin'),
-                                 right=Side(style='thin'),
-                                 top=Side(style='thin'),
-                                 bottom=Side(style='thin'))
-
-            for row in ws.iter_rows(min_row=3, max_row=current_row - 1, max_col=8):
-                for cell in row:
-                    cell.border = thin_border
-
-            # Добавляем статистику
-            stats_row = current_row + 2
-
-            ws.cell(row=stats_row, column=1, value="СТАТИСТИКА").font = Font(bold=True)
-
-            # Информация о фильтре
-            filter_names = {
-                "all": "Все тарифы",
-                "active": "Активные тарифы",
-                "archived": "Архивные тарифы",
-                "by_cargo": f"Тарифы по типу груза: {kwargs.get('cargo_type', '')}",
-                "unlimited": "Бессрочные тарифы"
-            }
-
-            ws.cell(row=stats_row + 1, column=1, value=f"Фильтр: {filter_names.get(filter_type, 'Все тарифы')}")
-            ws.cell(row=stats_row + 1, column=2, value=f"Количество тарифов: {len(tariffs_data)}")
-
-            if tariffs_data:
-                avg_price_per_km = total_price_per_km / len(tariffs_data)
-                avg_min_price = total_min_price / len(tariffs_data)
-
-                ws.cell(row=stats_row + 2, column=1, value=f"Средняя цена за км: {avg_price_per_km:.2f} руб")
-                ws.cell(row=stats_row + 2, column=2, value=f"Средняя минимальная цена: {avg_min_price:.2f} руб")
-
-                # Подсчет активных и архивных
-                active_count = sum(1 for t in tariffs_data if t.get("is_active", False))
-                ws.cell(row=stats_row + 3, column=1, value=f"Активных тарифов: {active_count}")
-                ws.cell(row=stats_row + 3, column=2, value=f"Архивных тарифов: {len(tariffs_data) - active_count}")
-
-            # Добавляем дату экспорта
-            ws.cell(row=stats_row + 5, column=1,
-                    value=f"Экспортировано: {datetime.datetime.now().strftime('%d.%m.%Y %H:%M:%S')}")
-
-            # Автоподбор ширины для последних столбцов
-            for col in range(5, 9):
-                ws.column_dimensions[get_column_letter(col)].auto_size = True
-
-            # Сохраняем файл
-            wb.save(file_name)
             return True
 
         except ImportError as e:
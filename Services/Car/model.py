@@ -1,6 +1,6 @@
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy import (
-    String, Integer, Float, Date, ForeignKey
+    String, Integer, Float, Date, ForeignKey, Index, text
 )
 from typing import Optional, List
 
@@ -8,9 +8,13 @@ from Shared.Base import Base
 
 class Car(Base):
     __tablename__ = "car"
+    # Госномер уникален среди неудаленных машин (миграция d4b7f2a9e016)
+    __table_args__ = (
+        Index("ux_car_license_plate_active", "license_plate", unique=True, postgresql_where=text("active")),
+    )
 
     brand: Mapped[str] = mapped_column(String(100))
-    license_plate: Mapped[str] = mapped_column(String(20), unique=True)
+    license_plate: Mapped[str] = mapped_column(String(20))
 
     load_capacity: Mapped[float] = mapped_column(Float)  # т
     body_type: Mapped[str] = mapped_column(String(50))
@@ -1,11 +1,14 @@
 # Services/Car/services.py
 from sqlalchemy.orm import Session, joinedload
 from Services.Car.model import Car
-from typing import Dict, List
+from Shared.search import DEFAULT_LIMIT, trigram_search
+from Shared.soft_delete import soft_delete
+from Shared.versioning import versioned_update
+from typing import Dict, List, Optional
 
 
 def get_all_cars(session: Session) -> List[Dict]:
-    cars = session.query(Car).all()
+    cars = session.query(Car).filter(Car.active).all()
     return [
         {
             "id": car.id,
@@ -13,7 +16,8 @@ def get_all_cars(session: Session) -> List[Dict]:
             "license_plate": car.license_plate,
             "load_capacity": car.load_capacity,
             "body_type": car.body_type,
-            "fuel_consumption": car.fuel_consumption
+            "fuel_consumption": car.fuel_consumption,
+            "version": car.version
         }
         for car in cars
     ]
@@ -23,7 +27,7 @@ def get_all_cars(session: Session) -> List[Dict]:
 
 def get_all_cars_for_assignment(session: Session) -> List[Dict]:
     """Получить все автомобили с информацией о назначении"""
-    cars = session.query(Car).options(joinedload(Car.driver)).all()
+    cars = session.query(Car).options(joinedload(Car.driver)).filter(Car.active).all()
     return [
         {
             "id": car.id,
@@ -41,9 +45,18 @@ def get_all_cars_for_assignment(session: Session) -> List[Dict]:
     ]
 
 
+def search_cars(session: Session, query: str, limit: int = DEFAULT_LIMIT) -> List[Dict]:
+    """Найти машины по госномеру или марке (с учетом опечаток)"""
+    return trigram_search(
+        session, "car", ["license_plate", "brand"],
+        "id, brand, license_plate, load_capacity, body_type, fuel_consumption",
+        query, limit
+    )
+
+
 def get_car_by_id(session: Session, car_id: int) -> Car:
     """Получить машину по ID"""
-    return session.query(Car).filter(Car.id == car_id).first()
+    return session.query(Car).filter(Car.id == car_id, Car.active).first()
 
 
 def create_car(session: Session, **kwargs) -> Car:
@@ -54,26 +67,29 @@ def create_car(session: Session, **kwargs) -> Car:
     return car
 
 
-def update_car(session: Session, car_id: int, **kwargs) -> bool:
-    """Обновить данные машины"""
-    car = session.query(Car).filter(Car.id == car_id).first()
-    if not car:
-        return False
+def update_car(session: Session, car_id: int, expected_version: Optional[int] = None, **kwargs) -> bool:
+    """
+    Обновить данные машины.
 
-    for key, value in kwargs.items():
-        setattr(car, key, value)
+    expected_version - версия, которую видел пользователь: если машину
+    с тех пор изменили, StaleVersionError (Shared/versioning.py).
+    """
+    if versioned_update(session, Car, car_id, kwargs, expected_version) is None:
+        return False
 
     session.commit()
     return True
 
 
 def delete_car(session: Session, car_id: int) -> bool:
-    """Удалить машину"""
-    car = session.query(Car).filter(Car.id == car_id).first()
+    """Удалить машину (мягко: active = false, водитель открепляется)"""
+    car = session.query(Car).filter(Car.id == car_id, Car.active).first()
     if not car:
         return False
 
-    session.delete(car)
+    if car.driver:
+        car.driver.car_id = None
+    soft_delete(car)
     session.commit()
     return True
 
@@ -86,7 +102,7 @@ from typing import Dict, List, Optional
 
 def get_all_cars_with_drivers(session: Session) -> List[Dict]:
     """Получить все машины с информацией о водителях"""
-    cars = session.query(Car).options(joinedload(Car.driver)).all()
+    cars = session.query(Car).options(joinedload(Car.driver)).filter(Car.active).all()
     return [
         {
             "id": car.id,
@@ -106,7 +122,7 @@ def get_all_cars_with_drivers(session: Session) -> List[Dict]:
 
 def get_free_cars(session: Session) -> List[Dict]:
     """Получить свободные машины (без водителя)"""
-    cars = session.query(Car).filter(Car.driver == None).all()
+    cars = session.query(Car).filter(Car.driver == None, Car.active).all()
     return [
         {
             "id": car.id,
@@ -124,7 +140,7 @@ def get_free_cars(session: Session) -> List[Dict]:
 
 def get_cars_by_load_capacity(session: Session, min_load: float) -> List[Dict]:
     """Получить машины с грузоподъемностью больше указанной"""
-    cars = session.query(Car).filter(Car.load_capacity >= min_load).all()
+    cars = session.query(Car).filter(Car.load_capacity >= min_load, Car.active).all()
     return [
         {
             "id": car.id,
@@ -142,7 +158,7 @@ def get_cars_by_load_capacity(session: Session, min_load: float) -> List[Dict]:
 
 def get_cars_by_fuel_consumption(session: Session, max_fuel: float) -> List[Dict]:
     """Получить машины с расходом топлива меньше указанного"""
-    cars = session.query(Car).filter(Car.fuel_consumption <= max_fuel).all()
+    cars = session.query(Car).filter(Car.fuel_consumption <= max_fuel, Car.active).all()
     return [
         {
             "id": car.id,
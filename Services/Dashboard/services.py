@@ -0,0 +1,147 @@
+# Services/Dashboard/services.py
+"""
+Показатели для вкладки "Обзор".
+
+Все показатели - агрегирующие запросы по текущим данным: перевозки
+только за последние STATUS_WINDOW_DAYS дней (по shipment_date, с отсечением
+партиций) или по частичному индексу статуса, выручка - из дневных
+сводок (Services/Revenue). Полного прохода по истории перевозок нет.
+
+Результат кешируется на KPI_TTL секунд и с отметкой версии данных:
+если в таблицах перевозок, машин и водителей что-то изменилось
+(счетчики pg_stat_user_tables, видят изменения всех клиентов),
+показатели пересчитываются раньше.
+"""
+import datetime
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from Services.Revenue.services import get_revenue, get_revenue_totals
+
+# Сколько секунд показатели считаются свежими
+KPI_TTL = 300
+# За сколько дней считать перевозки по статусам
+STATUS_WINDOW_DAYS = 30
+# Машина простаивает, если у нее не было перевозок столько дней
+IDLE_DAYS = 14
+TOP_ROUTES = 5
+
+DATA_VERSION_SQL = """
+    SELECT COALESCE(SUM(n_tup_ins + n_tup_upd + n_tup_del), 0)
+    FROM pg_stat_user_tables
+    WHERE relname IN ('car', 'driver', 'shipment_archive')
+       OR relname LIKE 'shipment\\_%'
+"""
+
+UTILIZATION_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM car WHERE active) AS cars_total,
+        (SELECT COUNT(*) FROM car c JOIN driver d ON d.car_id = c.id AND d.active WHERE c.active) AS cars_with_driver,
+        (SELECT COUNT(DISTINCT car_id) FROM shipment WHERE active AND status = 'in_transit') AS cars_in_transit
+"""
+
+STATUS_SQL = """
+    SELECT status, COUNT(*) AS shipments_count
+    FROM shipment
+    WHERE active AND shipment_date >= :since
+    GROUP BY status
+"""
+
+IDLE_CARS_SQL = """
+    SELECT c.id, c.brand, c.license_plate, c.load_capacity, d.full_name AS driver_name
+    FROM car c
+    LEFT JOIN driver d ON d.car_id = c.id AND d.active
+    WHERE c.active
+      AND NOT EXISTS (
+          SELECT 1 FROM shipment s
+          WHERE s.car_id = c.id AND s.active AND s.shipment_date >= :since
+      )
+    ORDER BY c.load_capacity DESC, c.license_plate
+"""
+
+
+def data_version(session: Session) -> int:
+    """Отметка версии данных: меняется при любой записи в перевозки, машины или водителей"""
+    return session.execute(text(DATA_VERSION_SQL)).scalar()
+
+
+def compute_kpis(session: Session) -> Dict:
+    """Посчитать показатели заново (без кеша)"""
+    now = datetime.datetime.now()
+    month_start = now.date().replace(day=1)
+
+    utilization = dict(session.execute(text(UTILIZATION_SQL)).mappings().one())
+    cars_total = utilization["cars_total"]
+    utilization["utilization"] = utilization["cars_in_transit"] / cars_total if cars_total else 0.0
+
+    by_status = {
+        row["status"]: row["shipments_count"]
+        for row in session.execute(
+            text(STATUS_SQL), {"since": now - datetime.timedelta(days=STATUS_WINDOW_DAYS)}
+        ).mappings()
+    }
+
+    month = get_revenue_totals(session, "month", date_from=month_start)
+    top_routes = get_revenue(session, "route", "month", date_from=month_start)[:TOP_ROUTES]
+
+    idle_cars = [
+        dict(row) for row in session.execute(
+            text(IDLE_CARS_SQL), {"since": now - datetime.timedelta(days=IDLE_DAYS)}
+        ).mappings()
+    ]
+
+    return {
+        "computed_at": now,
+        "utilization": utilization,
+        "shipments_by_status": by_status,
+        "month_revenue": month[0]["total_cost"] if month else 0.0,
+        "month_shipments": month[0]["shipments_count"] if month else 0,
+        "top_routes": top_routes,
+        "idle_cars": idle_cars,
+    }
+
+
+class KpiCache:
+    """Кеш показателей с временем жизни и отметкой версии данных"""
+
+    def __init__(self, ttl: float = KPI_TTL):
+        self.ttl = ttl
+        self.kpis: Optional[Dict] = None
+        self.version: Optional[int] = None
+        self.loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, session: Session, force: bool = False) -> Dict:
+        version = data_version(session)
+        with self._lock:
+            fresh = (
+                self.kpis is not None
+                and self.version == version
+                and time.monotonic() - self.loaded_at < self.ttl
+            )
+            if fresh and not force:
+                return self.kpis
+
+        kpis = compute_kpis(session)
+        with self._lock:
+            self.kpis, self.version, self.loaded_at = kpis, version, time.monotonic()
+        return kpis
+
+
+kpi_cache = KpiCache()
+
+
+def get_dashboard_kpis(session: Session, force: bool = False) -> Dict:
+    """
+    Показатели для вкладки "Обзор" (из кеша, если данные не менялись).
+
+    Returns:
+        {computed_at, utilization: {cars_total, cars_with_driver, cars_in_transit, utilization},
+         shipments_by_status: {статус: количество}, month_revenue, month_shipments,
+         top_routes: [...], idle_cars: [...]}
+    """
+    return kpi_cache.get(session, force)
@@ -0,0 +1,162 @@
+# Services/Dispatch/services.py
+"""
+Очередь ожидающих перевозок для нескольких диспетчеров.
+
+Диспетчер берет следующие N перевозок в статусе pending одним запросом
+SELECT ... FOR UPDATE SKIP LOCKED: строки, которые в этот момент берет
+другой диспетчер, пропускаются, а не ждутся. Взятые перевозки получают
+аренду (claimed_by, claimed_until, миграция c1f5a8e2d947) и сразу
+коммитятся: блокировка строк держится только на время выборки, а не
+на все время, пока диспетчер назначает машины.
+
+Дальше диспетчер либо завершает перевозки (complete_claims - смена статуса
+и снятие аренды), либо отпускает (release_claims). Если клиент упал,
+аренда истекает сама, и перевозки снова попадают в очередь. Завершить
+можно только перевозки, аренда которых еще за этим диспетчером.
+
+    with claimed_shipments(session, worker) as batch:
+        ... назначить машины ...
+        complete_claims(session, worker, [s["id"] for s in batch])
+    # не завершенные в блоке перевозки отпускаются
+"""
+import os
+import socket
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from Services.Transportation.service import SHIPMENT_TRANSITIONS
+
+# Сколько перевозок брать за раз и на сколько секунд
+DEFAULT_CLAIM_LIMIT = 10
+DEFAULT_LEASE_SECONDS = 300
+
+# Перевозка свободна: ожидает и никем не арендована (или аренда истекла)
+AVAILABLE_CONDITION = "active AND status = 'pending' AND (claimed_until IS NULL OR claimed_until < now())"
+# Аренда еще за этим диспетчером
+HELD_CONDITION = "active AND status = 'pending' AND claimed_by = :worker AND claimed_until >= now()"
+
+# Ключ секционирования в условии соединения: UPDATE находит строку
+# по первичному ключу в нужной партиции
+CLAIM_SQL = f"""
+    WITH next AS (
+        SELECT shipment_date, id
+        FROM shipment
+        WHERE {AVAILABLE_CONDITION}
+        ORDER BY shipment_date
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE shipment s
+    SET claimed_by = :worker,
+        claimed_until = now() + make_interval(secs => :lease_seconds)
+    FROM next
+    WHERE s.shipment_date = next.shipment_date AND s.id = next.id
+    RETURNING s.id, s.shipment_date, s.cargo_weight, s.car_id, s.driver_id,
+              s.route_id, s.tariff_id, s.total_cost, s.version, s.claimed_until
+"""
+
+
+def default_worker_id() -> str:
+    """Имя диспетчера по умолчанию: машина и процесс"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_shipments(session: Session, worker: str, limit: int = DEFAULT_CLAIM_LIMIT,
+                    lease_seconds: int = DEFAULT_LEASE_SECONDS) -> List[Dict]:
+    """
+    Взять следующие limit свободных перевозок (самые ранние по дате).
+
+    Returns:
+        Взятые перевозки: [{id, shipment_date, cargo_weight, car_id, driver_id,
+        route_id, tariff_id, total_cost, version, claimed_until}];
+        пустой список - очередь пуста или все разобрано
+    """
+    rows = session.execute(text(CLAIM_SQL), {
+        "worker": worker,
+        "limit": limit,
+        "lease_seconds": lease_seconds,
+    }).mappings().all()
+    session.commit()
+    return sorted((dict(row) for row in rows), key=lambda row: row["shipment_date"])
+
+
+def _held_ids(session: Session, sql: str, worker: str, ids: List, params: Dict = None) -> List:
+    if not ids:
+        return []
+    statement = text(sql).bindparams(bindparam("ids", expanding=True))
+    updated = session.execute(statement, {"worker": worker, "ids": list(ids), **(params or {})}).scalars().all()
+    session.commit()
+    return updated
+
+
+def renew_claims(session: Session, worker: str, ids: List,
+                 lease_seconds: int = DEFAULT_LEASE_SECONDS) -> List:
+    """
+    Продлить аренду (диспетчер еще работает с перевозками).
+
+    Returns:
+        id перевозок, аренда которых продлена; остальные уже потеряны
+    """
+    return _held_ids(session, f"""
+        UPDATE shipment
+        SET claimed_until = now() + make_interval(secs => :lease_seconds)
+        WHERE id IN :ids AND {HELD_CONDITION}
+        RETURNING id
+    """, worker, ids, {"lease_seconds": lease_seconds})
+
+
+def complete_claims(session: Session, worker: str, ids: List, new_status: str = "in_transit") -> List:
+    """
+    Завершить работу с арендованными перевозками: сменить статус и снять аренду.
+
+    Перевозки, аренда которых истекла (и, возможно, уже у другого
+    диспетчера), не меняются.
+
+    Returns:
+        id завершенных перевозок
+    """
+    if "pending" not in SHIPMENT_TRANSITIONS.get(new_status, ()):
+        raise ValueError(f"Из очереди нельзя перевести в статус {new_status}")
+
+    return _held_ids(session, f"""
+        UPDATE shipment
+        SET status = :new_status,
+            claimed_by = NULL,
+            claimed_until = NULL,
+            version = version + 1,
+            updated_at = now()
+        WHERE id IN :ids AND {HELD_CONDITION}
+        RETURNING id
+    """, worker, ids, {"new_status": new_status})
+
+
+def release_claims(session: Session, worker: str, ids: List) -> List:
+    """
+    Отпустить арендованные перевозки обратно в очередь.
+
+    Returns:
+        id отпущенных перевозок
+    """
+    return _held_ids(session, f"""
+        UPDATE shipment
+        SET claimed_by = NULL, claimed_until = NULL
+        WHERE id IN :ids AND {HELD_CONDITION}
+        RETURNING id
+    """, worker, ids)
+
+
+@contextmanager
+def claimed_shipments(session: Session, worker: str, limit: int = DEFAULT_CLAIM_LIMIT,
+                      lease_seconds: int = DEFAULT_LEASE_SECONDS) -> Iterator[List[Dict]]:
+    """Взять перевозки на время блока; не завершенные в блоке отпускаются при выходе"""
+    claimed = claim_shipments(session, worker, limit, lease_seconds)
+    try:
+        yield claimed
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        release_claims(session, worker, [row["id"] for row in claimed])
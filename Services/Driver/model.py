@@ -2,7 +2,7 @@ import datetime
 
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy import (
-    String, Integer, Float, Date, ForeignKey
+    String, Integer, Float, Date, ForeignKey, Index, UniqueConstraint, text
 )
 from typing import Optional, List
 from Shared.Base import Base
@@ -10,17 +10,21 @@ from Shared.Base import Base
 
 class Driver(Base):
     __tablename__ = "driver"
+    # Номер прав уникален среди неудаленных водителей (миграция d4b7f2a9e016)
+    __table_args__ = (
+        Index("ux_driver_license_number_active", "license_number", unique=True, postgresql_where=text("active")),
+        # Проверяется при COMMIT: перестановки машин между водителями (миграция d8a2f5c3e619)
+        UniqueConstraint("car_id", name="driver_car_id_key", deferrable=True, initially="DEFERRED"),
+    )
 
     full_name: Mapped[str] = mapped_column(String(150))
-    license_number: Mapped[str] = mapped_column(String(50), unique=True)
+    license_number: Mapped[str] = mapped_column(String(50))
 
     license_category: Mapped[str] = mapped_column(String(10))
     experience_years: Mapped[int]
     hire_date: Mapped[datetime.datetime]
 
-    car_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("car.id"), unique=True
-    )
+    car_id: Mapped[Optional[int]] = mapped_column(ForeignKey("car.id"))
 
     car: Mapped[Optional['Car']] = relationship(back_populates="driver")
     shipments: Mapped[List["Shipment"]] = relationship(back_populates="driver")
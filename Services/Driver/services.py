@@ -1,16 +1,22 @@
 # Services/driver/services.py
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 from Services.Driver.model import Driver
 from Services.Car.model import Car
+from Shared.search import DEFAULT_LIMIT, trigram_search
+from Shared.soft_delete import soft_delete
+from Shared.versioning import check_stale, versioned_update
 from typing import Dict, List, Optional
 import datetime
+import uuid
 
 
 def get_all_drivers_with_cars(session: Session) -> List[Dict]:
     """Получить всех водителей с информацией об автомобилях"""
     drivers = session.query(Driver).options(
         joinedload(Driver.car)  # Жадная загрузка автомобиля
-    ).all()
+    ).filter(Driver.active).all()
 
     return [
         {
@@ -21,6 +27,7 @@ def get_all_drivers_with_cars(session: Session) -> List[Dict]:
             "experience_years": driver.experience_years,
             "hire_date": driver.hire_date.isoformat(),
             "car_id": driver.car_id,
+            "version": driver.version,
             "car_info": {
                 "id": driver.car.id if driver.car else None,
                 "brand": driver.car.brand if driver.car else None,
@@ -38,9 +45,36 @@ def get_all_drivers_with_cars(session: Session) -> List[Dict]:
     ]
 
 
+# Водители с машинами грузоподъемностью больше :min_capacity тонн
+HEAVY_CARS_DRIVERS_SQL = """
+    SELECT
+        d.full_name,
+        d.license_number,
+        d.license_category,
+        d.experience_years,
+        d.hire_date,
+        c.brand,
+        c.license_plate,
+        c.load_capacity,
+        c.body_type,
+        c.fuel_consumption
+    FROM driver d
+    INNER JOIN car c ON d.car_id = c.id
+    WHERE d.active AND c.active
+      AND c.load_capacity > :min_capacity
+    ORDER BY c.load_capacity DESC
+"""
+
+
+def get_drivers_with_heavy_cars(session: Session, min_capacity: float = 10) -> List[Dict]:
+    """Получить водителей с машинами грузоподъемностью более min_capacity тонн"""
+    result = session.execute(text(HEAVY_CARS_DRIVERS_SQL), {"min_capacity": min_capacity})
+    return [dict(row) for row in result.mappings()]
+
+
 def get_all_available_cars(session: Session) -> List[Dict]:
     """Получить все автомобили без водителей"""
-    cars = session.query(Car).filter(Car.driver == None).all()
+    cars = session.query(Car).filter(Car.driver == None, Car.active).all()
     return [
         {
             "id": car.id,
@@ -52,7 +86,7 @@ def get_all_available_cars(session: Session) -> List[Dict]:
 
 def get_all_cars_for_assignment(session: Session) -> List[Dict]:
     """Получить все автомобили с информацией о назначении"""
-    cars = session.query(Car).options(joinedload(Car.driver)).all()
+    cars = session.query(Car).options(joinedload(Car.driver)).filter(Car.active).all()
     return [
         {
             "id": car.id,
@@ -68,55 +102,150 @@ def get_all_cars_for_assignment(session: Session) -> List[Dict]:
     ]
 
 
-def assign_driver_to_car(session: Session, driver_id: int, car_id: Optional[int]) -> bool:
-    """Назначить или открепить водителя от автомобиля"""
-    driver = session.query(Driver).filter(Driver.id == driver_id).first()
-    if not driver:
-        return False
-
-    # Если указан car_id, проверяем автомобиль
-    if car_id:
-        car = session.query(Car).filter(Car.id == car_id).first()
-        if not car:
-            return False
+# Перестановка назначений одним UPDATE. Уникальность driver.car_id
+# отложенная (миграция d8a2f5c3e619): обмены и циклы A -> B -> C -> A
+# проверяются при COMMIT, когда все строки уже на своих местах.
+REASSIGN_FLEET_SQL = """
+    UPDATE driver d
+    SET car_id = v.car_id,
+        version = d.version + 1,
+        updated_at = now()
+    FROM (VALUES {rows}) AS v(driver_id, car_id, expected_version)
+    WHERE d.id = v.driver_id
+      AND d.active
+      AND (v.expected_version IS NULL OR d.version = v.expected_version)
+    RETURNING d.id
+"""
+
+# Какие из водителей и машин переназначения существуют и не удалены
+REASSIGN_TARGETS_SQL = """
+    SELECT 'driver' AS kind, id FROM driver WHERE active AND id IN :driver_ids
+    UNION ALL
+    SELECT 'car', id FROM car WHERE active AND id IN :car_ids
+"""
+
+
+def reassign_fleet(session: Session, mapping: Dict, expected_versions: Optional[Dict] = None) -> List:
+    """
+    Применить набор назначений водитель -> машина (None - открепить) атомарно.
+
+    Годится любая перестановка: обмены, циклы, передача машины от
+    открепляемого водителя другому. Машина, закрепленная за водителем вне
+    mapping, остается за ним - назначить ее другому нельзя.
+
+    Args:
+        mapping: {driver_id: car_id или None}
+        expected_versions: {driver_id: version} - см. Shared/versioning.py
+
+    Returns:
+        id переназначенных водителей
+
+    Raises:
+        ValueError: водитель или машина не найдены, машина назначена дважды
+            или уже закреплена за водителем вне mapping
+        StaleVersionError: водителя изменили после чтения expected_versions
+    """
+    if not mapping:
+        return []
+    # id могут прийти строками (GUI, API): сравниваем с uuid.UUID из базы
+    mapping = {
+        uuid.UUID(str(driver_id)): None if car_id is None else uuid.UUID(str(car_id))
+        for driver_id, car_id in mapping.items()
+    }
+    expected_versions = {
+        uuid.UUID(str(driver_id)): version for driver_id, version in (expected_versions or {}).items()
+    }
+
+    car_ids = [car_id for car_id in mapping.values() if car_id is not None]
+    if len(car_ids) != len(set(car_ids)):
+        raise ValueError("Одна машина назначена нескольким водителям")
+
+    statement = text(REASSIGN_TARGETS_SQL).bindparams(
+        bindparam("driver_ids", expanding=True), bindparam("car_ids", expanding=True)
+    )
+    found = session.execute(statement, {
+        "driver_ids": list(mapping), "car_ids": car_ids or [None]
+    }).all()
+    missing_drivers = set(mapping) - {row.id for row in found if row.kind == "driver"}
+    missing_cars = set(car_ids) - {row.id for row in found if row.kind == "car"}
+    if missing_drivers:
+        raise ValueError(f"Водители не найдены: {sorted(missing_drivers)}")
+    if missing_cars:
+        raise ValueError(f"Автомобили не найдены: {sorted(missing_cars)}")
+
+    rows = []
+    params = {}
+    for number, (driver_id, car_id) in enumerate(mapping.items()):
+        rows.append(f"(CAST(:d{number} AS uuid), CAST(:c{number} AS uuid), CAST(:v{number} AS integer))")
+        params[f"d{number}"] = driver_id
+        params[f"c{number}"] = car_id
+        params[f"v{number}"] = expected_versions.get(driver_id)
+
+    # Точка сохранения: при несовпадении версии отменяется только этот UPDATE,
+    # а не вся транзакция вызывающего
+    savepoint = session.begin_nested()
+    updated = session.execute(
+        text(REASSIGN_FLEET_SQL.format(rows=", ".join(rows))), params
+    ).scalars().all()
+
+    if len(updated) != len(mapping):
+        # Водители проверены выше: не совпала версия (или водителя удалили между запросами)
+        savepoint.rollback()
+        for driver_id in set(mapping) - set(updated):
+            check_stale(session, "driver", driver_id, expected_versions.get(driver_id))
+        raise ValueError(f"Водители не найдены: {sorted(set(mapping) - set(updated))}")
+    savepoint.commit()
 
-        # Проверяем, не занят ли автомобиль другим водителем
-        existing_driver = session.query(Driver).filter(Driver.car_id == car_id).first()
-        if existing_driver and existing_driver.id != driver_id:
-            return False
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise ValueError("Автомобиль уже закреплен за водителем, которого нет в переназначении")
+    return updated
 
-        driver.car_id = car_id
-    else:
-        # Открепляем водителя от автомобиля
-        driver.car_id = None
 
-    session.commit()
+def assign_driver_to_car(session: Session, driver_id: int, car_id: Optional[int]) -> bool:
+    """Назначить или открепить водителя от автомобиля"""
+    try:
+        reassign_fleet(session, {driver_id: car_id})
+    except ValueError:
+        return False
     return True
 
 
 def swap_driver_car(session: Session, driver1_id: int, driver2_id: int) -> bool:
     """Поменять местами автомобили между водителями"""
-    driver1 = session.query(Driver).filter(Driver.id == driver1_id).first()
-    driver2 = session.query(Driver).filter(Driver.id == driver2_id).first()
-
-    if not driver1 or not driver2:
+    try:
+        driver1_id, driver2_id = uuid.UUID(str(driver1_id)), uuid.UUID(str(driver2_id))
+    except ValueError:
         return False
 
-    # Сохраняем текущие автомобили
-    car1_id = driver1.car_id
-    car2_id = driver2.car_id
-
-    # Меняем местами
-    driver1.car_id = car2_id
-    driver2.car_id = car1_id
+    cars = dict(session.execute(
+        text("SELECT id, car_id FROM driver WHERE active AND id IN (:driver1_id, :driver2_id)"),
+        {"driver1_id": driver1_id, "driver2_id": driver2_id}
+    ).all())
+    if driver1_id not in cars or driver2_id not in cars:
+        return False
 
-    session.commit()
+    try:
+        reassign_fleet(session, {driver1_id: cars[driver2_id], driver2_id: cars[driver1_id]})
+    except ValueError:
+        return False
     return True
 
 
 # Остальные функции остаются без изменений
+def search_drivers(session: Session, query: str, limit: int = DEFAULT_LIMIT) -> List[Dict]:
+    """Найти водителей по ФИО (с учетом опечаток)"""
+    return trigram_search(
+        session, "driver", ["full_name"],
+        "id, full_name, license_number, license_category, experience_years, car_id",
+        query, limit
+    )
+
+
 def get_driver_by_id(session: Session, driver_id: int) -> Optional[Driver]:
-    return session.query(Driver).filter(Driver.id == driver_id).first()
+    return session.query(Driver).filter(Driver.id == driver_id, Driver.active).first()
 
 
 def create_driver(session: Session, **kwargs) -> Driver:
@@ -160,12 +289,8 @@ def create_driver(session: Session, **kwargs) -> Driver:
     return driver
 
 
-def update_driver(session: Session, driver_id: int, **kwargs) -> bool:
-    """Обновить данные водителя"""
-    driver = session.query(Driver).filter(Driver.id == driver_id).first()
-    if not driver:
-        return False
-
+def update_driver(session: Session, driver_id: int, expected_version: Optional[int] = None, **kwargs) -> bool:
+    """Обновить данные водителя (expected_version - см. Shared/versioning.py)"""
     # Проверка стажа перед обновлением
     if 'experience_years' in kwargs and kwargs['experience_years'] > 40:
         raise ValueError(f"Стаж водителя не может превышать 40 лет. Указано: {kwargs['experience_years']} лет.")
@@ -188,10 +313,11 @@ def update_driver(session: Session, driver_id: int, **kwargs) -> bool:
             raise ValueError(f"По дате приема стаж водителя превышает 40 лет. "
                              f"Стаж: {years_experience_from_hire} лет (дата приема: {hire_date_value}).")
 
-    for key, value in kwargs.items():
-        if key == 'hire_date' and isinstance(value, str):
-            value = datetime.date.fromisoformat(value)
-        setattr(driver, key, value)
+    if isinstance(kwargs.get('hire_date'), str):
+        kwargs['hire_date'] = datetime.date.fromisoformat(kwargs['hire_date'])
+
+    if versioned_update(session, Driver, driver_id, kwargs, expected_version) is None:
+        return False
 
     session.commit()
     return True
@@ -199,9 +325,9 @@ def update_driver(session: Session, driver_id: int, **kwargs) -> bool:
 
 
 def delete_driver(session: Session, driver_id: int) -> bool:
-    """Удалить водителя"""
+    """Удалить водителя (мягко: active = false, машина освобождается)"""
     try:
-        driver = session.query(Driver).filter(Driver.id == driver_id).first()
+        driver = session.query(Driver).filter(Driver.id == driver_id, Driver.active).first()
         if not driver:
             return False
 
@@ -212,6 +338,7 @@ def delete_driver(session: Session, driver_id: int) -> bool:
         active_shipments = session.query(Shipment).filter(
             and_(
                 Shipment.driver_id == driver_id,
+                Shipment.active,
                 Shipment.status.in_(["pending", "in_transit"])
             )
         ).count()
@@ -219,7 +346,8 @@ def delete_driver(session: Session, driver_id: int) -> bool:
         if active_shipments > 0:
             raise ValueError(f"У водителя есть активные перевозки ({active_shipments} шт.)")
 
-        session.delete(driver)
+        driver.car_id = None
+        soft_delete(driver)
         session.commit()
         return True
 
@@ -11,7 +11,6 @@ from Shared.Base import Base
 class Tariff(Base):
     __tablename__ = "tariff"
 
-    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     price_per_km: Mapped[float] = mapped_column(Float)
     cargo_type: Mapped[str] = mapped_column(String(50))
     min_price: Mapped[float] = mapped_column(Float)
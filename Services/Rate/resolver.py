@@ -0,0 +1,139 @@
+# Services/Rate/resolver.py
+"""
+Подбор тарифа для маршрута на дату по связям route_tariff.
+
+Для каждого маршрута заранее строится шкала: отсортированные моменты,
+когда меняется набор действующих тарифов (начало действия тарифа и момент
+сразу после его окончания), и для каждого отрезка - действующие тарифы,
+от самого дешевого для этого маршрута к самому дорогому. Запрос
+"тарифы маршрута R на дату D" - один bisect по шкале, O(log n).
+
+Шкалы пересобираются целиком: после изменения тарифов, маршрутов
+или связей в этом процессе (mark_stale) и не реже чем раз в REFRESH_INTERVAL
+секунд - чтобы увидеть изменения из других процессов.
+"""
+import bisect
+import datetime
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Как часто (с) пересобирать шкалы, если этот процесс тарифы не менял
+REFRESH_INTERVAL = 30
+
+ROUTE_TARIFFS_SQL = """
+    SELECT DISTINCT
+        rt.route_id, r.distance_km,
+        t.id, t.cargo_type, t.price_per_km, t.min_price, t.date_start, t.date_end
+    FROM route_tariff rt
+    JOIN route r ON r.id = rt.route_id AND r.active
+    JOIN tariff t ON t.id = rt.tariff_id AND t.active
+    WHERE rt.active
+"""
+
+
+class TariffTimeline:
+    """Шкала действующих тарифов одного маршрута"""
+
+    def __init__(self, distance_km: float, tariffs: List[Dict]):
+        for tariff in tariffs:
+            tariff["cost"] = max(distance_km * tariff["price_per_km"], tariff["min_price"])
+        tariffs.sort(key=lambda t: (t["cost"], t["price_per_km"]))
+
+        # date_end включительно (как в get_active_tariffs): тариф перестает
+        # действовать через микросекунду после окончания
+        points = set()
+        for tariff in tariffs:
+            points.add(tariff["date_start"])
+            if tariff["date_end"] is not None:
+                points.add(tariff["date_end"] + datetime.timedelta(microseconds=1))
+
+        self.points: List[datetime.datetime] = sorted(points)
+        self.segments: List[List[Dict]] = [
+            [
+                _public(t) for t in tariffs
+                if t["date_start"] <= point and (t["date_end"] is None or t["date_end"] >= point)
+            ]
+            for point in self.points
+        ]
+
+    def applicable(self, date: datetime.datetime) -> List[Dict]:
+        index = bisect.bisect_right(self.points, date) - 1
+        return self.segments[index] if index >= 0 else []
+
+
+def _public(tariff: Dict) -> Dict:
+    """Тариф в том же виде, что у get_active_tariffs, плюс стоимость на маршруте"""
+    return {
+        "id": tariff["id"],
+        "cargo_type": tariff["cargo_type"],
+        "price_per_km": tariff["price_per_km"],
+        "min_price": tariff["min_price"],
+        "date_start": tariff["date_start"].isoformat(),
+        "date_end": tariff["date_end"].isoformat() if tariff["date_end"] else None,
+        "cost": tariff["cost"],
+        "full_info": (f"{tariff['cargo_type']}: {tariff['price_per_km']} руб/км "
+                      f"(мин. {tariff['min_price']} руб) = {tariff['cost']:.2f} руб"),
+    }
+
+
+class TariffResolver:
+    """Шкалы тарифов всех маршрутов"""
+
+    def __init__(self):
+        self.timelines: Dict = {}     # route_id -> TariffTimeline
+        self._checked_at = 0.0
+        self._stale = True
+        self._lock = threading.Lock()
+
+    def mark_stale(self):
+        """Пересобрать шкалы при следующем запросе (после изменения тарифов или связей)"""
+        self._stale = True
+
+    def refresh(self, session: Session, force: bool = False) -> bool:
+        with self._lock:
+            if not (force or self._stale or time.monotonic() - self._checked_at > REFRESH_INTERVAL):
+                return False
+
+            by_route: Dict = {}
+            for row in session.execute(text(ROUTE_TARIFFS_SQL)).mappings():
+                distance, tariffs = by_route.setdefault(row["route_id"], (row["distance_km"], []))
+                tariffs.append(dict(row))
+
+            self.timelines = {
+                route_id: TariffTimeline(distance, tariffs)
+                for route_id, (distance, tariffs) in by_route.items()
+            }
+            self._checked_at = time.monotonic()
+            self._stale = False
+            return True
+
+    def applicable_tariffs(self, route_id, date: datetime.datetime) -> List[Dict]:
+        timeline = self.timelines.get(route_id)
+        return timeline.applicable(date) if timeline else []
+
+
+tariff_resolver = TariffResolver()
+
+
+def get_route_tariffs(session: Session, route_id, date: datetime.datetime = None) -> List[Dict]:
+    """
+    Тарифы, привязанные к маршруту и действующие на дату.
+
+    Returns:
+        Список тарифов, от самого дешевого на этом маршруте (поле cost) к самому дорогому.
+        Результат общий для всех вызовов (кеш) - не изменяйте его.
+    """
+    if date is None:
+        date = datetime.datetime.now()
+    tariff_resolver.refresh(session)
+    return tariff_resolver.applicable_tariffs(route_id, date)
+
+
+def resolve_best_tariff(session: Session, route_id, date: datetime.datetime = None) -> Optional[Dict]:
+    """Самый дешевый для маршрута тариф на дату (None - к маршруту не привязан ни один действующий)"""
+    tariffs = get_route_tariffs(session, route_id, date)
+    return tariffs[0] if tariffs else None
@@ -1,15 +1,19 @@
 # Services/tariff/services.py
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, or_
+from sqlalchemy import desc, or_, text
 from typing import Dict, List, Optional
 import datetime
 
 from Services.Rate.model import Tariff
+from Services.Rate.resolver import tariff_resolver
+from Services.Transportation.model import Shipment
+from Shared.soft_delete import soft_delete
+from Shared.versioning import versioned_update
 
 
 def get_all_tariffs(session: Session) -> List[Dict]:
     """Получить все тарифы"""
-    tariffs = session.query(Tariff).order_by(desc(Tariff.date_start)).all()
+    tariffs = session.query(Tariff).filter(Tariff.active).order_by(desc(Tariff.date_start)).all()
 
     return [
         {
@@ -21,7 +25,8 @@ def get_all_tariffs(session: Session) -> List[Dict]:
             "date_end": tariff.date_end.isoformat() if tariff.date_end else None,
             "description": tariff.description,
             "is_active": tariff.is_active(),
-            "active_period": tariff.get_active_period()
+            "active_period": tariff.get_active_period(),
+            "version": tariff.version
         }
         for tariff in tariffs
     ]
@@ -33,6 +38,7 @@ def get_active_tariffs(session: Session, date: datetime.datetime = None) -> List
         date = datetime.datetime.now()
 
     tariffs = session.query(Tariff).filter(
+        Tariff.active,
         Tariff.date_start <= date,
         or_(Tariff.date_end == None, Tariff.date_end >= date)
     ).order_by(desc(Tariff.date_start)).all()
@@ -54,12 +60,13 @@ def get_active_tariffs(session: Session, date: datetime.datetime = None) -> List
 
 def get_tariff_by_id(session: Session, tariff_id: int) -> Optional[Tariff]:
     """Получить тариф по ID"""
-    return session.query(Tariff).filter(Tariff.id == tariff_id).first()
+    return session.query(Tariff).filter(Tariff.id == tariff_id, Tariff.active).first()
 
 
 def get_tariffs_by_cargo_type(session: Session, cargo_type: str) -> List[Dict]:
     """Получить тарифы по типу груза"""
     tariffs = session.query(Tariff).filter(
+        Tariff.active,
         Tariff.cargo_type == cargo_type
     ).order_by(desc(Tariff.date_start)).all()
 
@@ -102,12 +109,13 @@ def create_tariff(session: Session, **kwargs) -> Tariff:
     tariff = Tariff(**kwargs)
     session.add(tariff)
     session.commit()
+    tariff_resolver.mark_stale()
     return tariff
 
 
-def update_tariff(session: Session, tariff_id: int, **kwargs) -> bool:
-    """Обновить тариф"""
-    tariff = session.query(Tariff).filter(Tariff.id == tariff_id).first()
+def update_tariff(session: Session, tariff_id: int, expected_version: Optional[int] = None, **kwargs) -> bool:
+    """Обновить тариф (expected_version - см. Shared/versioning.py)"""
+    tariff = session.query(Tariff).filter(Tariff.id == tariff_id, Tariff.active).first()
     if not tariff:
         return False
 
@@ -128,31 +136,40 @@ def update_tariff(session: Session, tariff_id: int, **kwargs) -> bool:
     if date_end is not None and date_end <= date_start:
         raise ValueError(f"Дата окончания ({date_end}) должна быть позже даты начала ({date_start})")
 
-    for key, value in kwargs.items():
-        setattr(tariff, key, value)
+    if versioned_update(session, Tariff, tariff_id, kwargs, expected_version) is None:
+        return False
 
     session.commit()
+    tariff_resolver.mark_stale()
     return True
 
 
 def delete_tariff(session: Session, tariff_id: int) -> bool:
-    """Удалить тариф"""
-    tariff = session.query(Tariff).filter(Tariff.id == tariff_id).first()
+    """Удалить тариф (мягко: active = false вместе со связями с маршрутами)"""
+    tariff = session.query(Tariff).filter(Tariff.id == tariff_id, Tariff.active).first()
     if not tariff:
         return False
 
-    # Проверяем, нет ли связанных перевозок
-    if tariff.shipments:
+    # Проверяем, нет ли связанных перевозок (EXISTS, без загрузки всех перевозок тарифа)
+    has_shipments = session.query(
+        session.query(Shipment).filter(Shipment.tariff_id == tariff_id, Shipment.active).exists()
+    ).scalar()
+    if has_shipments:
         return False  # Не удаляем, если есть связанные перевозки
 
-    session.delete(tariff)
+    session.execute(
+        text("UPDATE route_tariff SET active = false, updated_at = now() WHERE tariff_id = :id AND active"),
+        {"id": tariff_id}
+    )
+    soft_delete(tariff)
     session.commit()
+    tariff_resolver.mark_stale()
     return True
 
 
 def get_cargo_types(session: Session) -> List[str]:
     """Получить все типы грузов из тарифов"""
-    cargo_types = session.query(Tariff.cargo_type).distinct().all()
+    cargo_types = session.query(Tariff.cargo_type).filter(Tariff.active).distinct().all()
     return [cargo_type[0] for cargo_type in cargo_types]
 
 
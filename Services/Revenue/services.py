@@ -0,0 +1,145 @@
+# Services/Revenue/services.py
+"""
+Отчеты по выручке из дневных сводок (миграция f7c3d85a2e19).
+
+Сводки revenue_daily_route/car/driver ведут триггеры shipment
+и shipment_archive: в них живые неотмененные перевозки, рабочие
+и архивные. Отчет за месяц или квартал - агрегация нескольких
+тысяч строк сводки, а не полный проход по перевозкам.
+"""
+import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+PERIODS = ("day", "week", "month", "quarter", "year")
+
+# Разрез -> (таблица сводки, столбец ключа, справочник, подпись)
+REVENUE_ROLLUPS = {
+    "route": ("revenue_daily_route", "route_id", "route", "e.origin || ' → ' || e.destination"),
+    "car": ("revenue_daily_car", "car_id", "car", "e.brand || ' ' || e.license_plate"),
+    "driver": ("revenue_daily_driver", "driver_id", "driver", "e.full_name"),
+}
+
+
+def _period_conditions(date_from: Optional[datetime.date], date_to: Optional[datetime.date],
+                       params: Dict) -> str:
+    conditions = []
+    if date_from:
+        conditions.append("r.day >= :date_from")
+        params["date_from"] = date_from
+    if date_to:
+        conditions.append("r.day <= :date_to")
+        params["date_to"] = date_to
+    return " AND ".join(conditions) or "true"
+
+
+def _check_period(period: str):
+    if period not in PERIODS:
+        raise ValueError(f"Неизвестный период: {period}. Допустимо: {', '.join(PERIODS)}")
+
+
+def get_revenue(session: Session, by: str = "route", period: str = "month",
+                date_from: datetime.date = None, date_to: datetime.date = None,
+                entity_id=None) -> List[Dict]:
+    """
+    Выручка по периодам в разрезе маршрута, машины или водителя.
+
+    Args:
+        by: "route", "car" или "driver"
+        period: "day", "week", "month", "quarter" или "year"
+        date_from, date_to: границы по дате перевозки (включительно)
+        entity_id: только один маршрут/машина/водитель
+
+    Returns:
+        [{period, id, name, shipments_count, total_weight, total_cost}],
+        по периодам, внутри периода - по убыванию выручки
+    """
+    if by not in REVENUE_ROLLUPS:
+        raise ValueError(f"Неизвестный разрез: {by}. Допустимо: {', '.join(REVENUE_ROLLUPS)}")
+    _check_period(period)
+    table, key, entity, label = REVENUE_ROLLUPS[by]
+
+    params = {"period": period}
+    where = _period_conditions(date_from, date_to, params)
+    if entity_id is not None:
+        where += f" AND r.{key} = :entity_id"
+        params["entity_id"] = entity_id
+
+    result = session.execute(text(f"""
+        SELECT
+            date_trunc(:period, r.day)::date AS period,
+            r.{key} AS id,
+            {label} AS name,
+            SUM(r.shipments_count) AS shipments_count,
+            SUM(r.total_weight) AS total_weight,
+            SUM(r.total_cost) AS total_cost
+        FROM {table} r
+        LEFT JOIN {entity} e ON e.id = r.{key}
+        WHERE {where}
+        GROUP BY 1, 2, 3
+        HAVING SUM(r.shipments_count) <> 0
+        ORDER BY period, total_cost DESC
+    """), params)
+
+    return [
+        {
+            "period": row["period"],
+            "id": row["id"],
+            "name": row["name"],
+            "shipments_count": int(row["shipments_count"]),
+            "total_weight": float(row["total_weight"]),
+            "total_cost": float(row["total_cost"]),
+        }
+        for row in result.mappings()
+    ]
+
+
+def get_revenue_totals(session: Session, period: str = "month",
+                       date_from: datetime.date = None, date_to: datetime.date = None) -> List[Dict]:
+    """
+    Общая выручка по периодам.
+
+    Returns:
+        [{period, shipments_count, total_weight, total_cost}] по возрастанию периода
+    """
+    _check_period(period)
+    params = {"period": period}
+    where = _period_conditions(date_from, date_to, params)
+
+    # Каждая перевозка ровно на одном маршруте - сводки по маршрутам хватает
+    result = session.execute(text(f"""
+        SELECT
+            date_trunc(:period, r.day)::date AS period,
+            SUM(r.shipments_count) AS shipments_count,
+            SUM(r.total_weight) AS total_weight,
+            SUM(r.total_cost) AS total_cost
+        FROM revenue_daily_route r
+        WHERE {where}
+        GROUP BY 1
+        HAVING SUM(r.shipments_count) <> 0
+        ORDER BY 1
+    """), params)
+
+    return [
+        {
+            "period": row["period"],
+            "shipments_count": int(row["shipments_count"]),
+            "total_weight": float(row["total_weight"]),
+            "total_cost": float(row["total_cost"]),
+        }
+        for row in result.mappings()
+    ]
+
+
+def rebuild_revenue_rollups(session: Session):
+    """
+    Пересчитать сводки с нуля по shipment и shipment_archive.
+
+    Нужно после изменений в обход триггеров (TRUNCATE). Перевозки
+    отключенных партиций (detach_shipment_partitions) в пересчет не попадут,
+    хотя сводки, которые вели триггеры, их еще учитывают.
+    """
+    session.execute(text("SELECT rebuild_revenue_rollups()"))
+    session.commit()
@@ -0,0 +1,204 @@
+# Services/Route/planner.py
+"""
+Планирование перевозок из нескольких плеч по графу маршрутов.
+
+Таблица route - взвешенный граф: города - вершины, маршруты - ребра
+с весами distance_km и avg_time_hours. Дорога едет в обе стороны, поэтому
+маршрут А -> Б годится и как плечо Б -> А. Граф держится в памяти процесса
+и обновляется по updated_at: читаются только маршруты, измененные
+с прошлого обновления (удаленные - это active = false, они тоже
+попадают в выборку и убираются из графа).
+
+Кратчайший путь - Дейкстра по выбранной метрике. Координат городов в базе
+нет, поэтому допустимой эвристики для A* тоже нет (с нулевой эвристикой
+A* и есть Дейкстра). Найденные пути кешируются по
+(откуда, куда, метрика) до первого изменения графа.
+"""
+import datetime
+import heapq
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Метрика -> столбец веса ребра
+METRICS = {
+    "distance": "distance_km",
+    "time": "avg_time_hours",
+}
+
+# Как часто (с) сверять граф с базой, если этот процесс сам маршруты не менял
+REFRESH_INTERVAL = 30
+# Запас по updated_at: время ставят и клиенты, и сервер, часы могут расходиться
+REFRESH_OVERLAP = datetime.timedelta(minutes=5)
+
+ROUTES_SQL = """
+    SELECT id, origin, destination, distance_km, avg_time_hours, active, updated_at
+    FROM route
+"""
+
+
+class RouteGraph:
+    """Граф маршрутов в памяти с инкрементальным обновлением и кешем путей"""
+
+    def __init__(self):
+        self.edges: Dict[uuid.UUID, Dict] = {}                    # route_id -> маршрут
+        self.adjacency: Dict[str, Dict[uuid.UUID, str]] = {}      # город -> {route_id: соседний город}
+        self.watermark: Optional[datetime.datetime] = None
+        self._checked_at = 0.0
+        self._stale = True
+        self._cache: Dict[Tuple[str, str, str], Optional[Dict]] = {}
+        self._lock = threading.Lock()
+
+    def mark_stale(self):
+        """Сверить граф с базой при следующем запросе (после изменения маршрутов)"""
+        self._stale = True
+
+    def refresh(self, session: Session, force: bool = False) -> int:
+        """
+        Подтянуть маршруты, измененные с прошлого обновления.
+
+        Returns:
+            Сколько ребер добавлено, изменено или удалено
+        """
+        with self._lock:
+            if not (force or self._stale or time.monotonic() - self._checked_at > REFRESH_INTERVAL):
+                return 0
+
+            if self.watermark is None:
+                rows = session.execute(text(ROUTES_SQL + " WHERE active")).mappings().all()
+            else:
+                rows = session.execute(
+                    text(ROUTES_SQL + " WHERE updated_at >= :since"),
+                    {"since": self.watermark - REFRESH_OVERLAP}
+                ).mappings().all()
+
+            changed = 0
+            for row in rows:
+                changed += self._apply(row)
+                if self.watermark is None or row["updated_at"] > self.watermark:
+                    self.watermark = row["updated_at"]
+
+            if self.watermark is None:
+                self.watermark = datetime.datetime.now()
+            if changed:
+                self._cache.clear()
+            self._checked_at = time.monotonic()
+            self._stale = False
+            return changed
+
+    def _apply(self, row) -> int:
+        route_id = row["id"]
+        edge = {
+            "route_id": route_id,
+            "origin": row["origin"],
+            "destination": row["destination"],
+            "distance_km": row["distance_km"],
+            "avg_time_hours": row["avg_time_hours"],
+        }
+        current = self.edges.get(route_id)
+
+        if row["active"] and current == edge:
+            return 0
+        if current is None and not row["active"]:
+            return 0
+
+        if current is not None:
+            del self.edges[route_id]
+            self.adjacency.get(current["origin"], {}).pop(route_id, None)
+            self.adjacency.get(current["destination"], {}).pop(route_id, None)
+
+        if row["active"]:
+            self.edges[route_id] = edge
+            self.adjacency.setdefault(edge["origin"], {})[route_id] = edge["destination"]
+            self.adjacency.setdefault(edge["destination"], {})[route_id] = edge["origin"]
+        return 1
+
+    def shortest_path(self, origin: str, destination: str, metric: str = "distance") -> Optional[Dict]:
+        """Кратчайший путь по метрике (из кеша, если граф не менялся); None - пути нет"""
+        if metric not in METRICS:
+            raise ValueError(f"Неизвестная метрика: {metric}. Допустимо: {', '.join(METRICS)}")
+
+        key = (origin, destination, metric)
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = self._dijkstra(origin, destination, METRICS[metric])
+            return self._cache[key]
+
+    def _dijkstra(self, origin: str, destination: str, weight: str) -> Optional[Dict]:
+        if origin not in self.adjacency or destination not in self.adjacency:
+            return None
+
+        best = {origin: 0.0}
+        came_by: Dict[str, Tuple[str, uuid.UUID]] = {}   # город -> (откуда, route_id)
+        queue = [(0.0, origin)]
+
+        while queue:
+            cost, city = heapq.heappop(queue)
+            if city == destination:
+                break
+            if cost > best[city]:
+                continue
+            for route_id, neighbour in self.adjacency[city].items():
+                new_cost = cost + self.edges[route_id][weight]
+                if new_cost < best.get(neighbour, float("inf")):
+                    best[neighbour] = new_cost
+                    came_by[neighbour] = (city, route_id)
+                    heapq.heappush(queue, (new_cost, neighbour))
+
+        if destination not in best:
+            return None
+
+        legs: List[Dict] = []
+        city = destination
+        while city != origin:
+            previous, route_id = came_by[city]
+            edge = self.edges[route_id]
+            legs.append({**edge, "origin": previous, "destination": city})
+            city = previous
+        legs.reverse()
+
+        return {
+            "origin": origin,
+            "destination": destination,
+            "legs": legs,
+            "total_distance_km": sum(leg["distance_km"] for leg in legs),
+            "total_time_hours": sum(leg["avg_time_hours"] for leg in legs),
+        }
+
+
+route_graph = RouteGraph()
+
+
+def plan_route(session: Session, origin: str, destination: str, metric: str = "distance") -> Optional[Dict]:
+    """
+    Найти путь из нескольких плеч между городами.
+
+    Args:
+        metric: "distance" - кратчайший по километрам, "time" - по времени в пути
+
+    Returns:
+        {origin, destination, legs: [{route_id, origin, destination, distance_km, avg_time_hours}],
+         total_distance_km, total_time_hours} или None, если пути нет.
+        Результат общий для всех вызовов (кеш) - не изменяйте его.
+    """
+    route_graph.refresh(session)
+    return route_graph.shortest_path(origin.strip(), destination.strip(), metric)
+
+
+def calculate_plan_cost(session: Session, plan: Dict, tariff_id) -> float:
+    """Стоимость пути по тарифу: каждое плечо считается как отдельная перевозка"""
+    tariff = session.execute(
+        text("SELECT price_per_km, min_price FROM tariff WHERE id = :id AND active"),
+        {"id": tariff_id}
+    ).mappings().first()
+    if not tariff:
+        raise ValueError("Тариф не найден")
+
+    return sum(
+        max(leg["distance_km"] * tariff["price_per_km"], tariff["min_price"])
+        for leg in plan["legs"]
+    )
@@ -1,10 +1,14 @@
 import datetime
-import uuid
 
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from Services.Rate.resolver import tariff_resolver
+from Services.Route.planner import route_graph
 from Services.Transportation.model import Shipment
+from Shared.search import DEFAULT_LIMIT, trigram_search
+from Shared.uuid7 import uuid7
+from Shared.versioning import check_stale
 
 
 # services/route_service.py
@@ -19,6 +23,8 @@ def create_route(
     avg_time_hours: float,
     road_type: str,
 ):
+    """Создать маршрут, возвращает его id"""
+    route_id = uuid7()
     session.execute(
         text("""
         INSERT INTO route (
@@ -33,7 +39,7 @@ def create_route(
         )
         """),
         {
-            "id": uuid.uuid4(),
+            "id": route_id,
             "origin": origin,
             "destination": destination,
             "distance_km": distance_km,
@@ -45,6 +51,8 @@ def create_route(
         }
     )
     session.commit()
+    route_graph.mark_stale()
+    return route_id
 
 
 def link_route_tariff(
@@ -58,7 +66,7 @@ def link_route_tariff(
         VALUES (:id, :route_id, :tariff_id, :created_at, :updated_at, :active)
         """),
         {
-            "id": uuid.uuid4(),
+            "id": uuid7(),
             "route_id": route_id,
             "tariff_id": tariff_id,
             "created_at": datetime.datetime.now(),
@@ -67,40 +75,46 @@ def link_route_tariff(
         }
     )
     session.commit()
+    tariff_resolver.mark_stale()
 
 
 def get_all_routes(session: Session):
     return session.execute(
         text("""
-        SELECT id, origin, destination, distance_km, avg_time_hours, road_type
+        SELECT id, origin, destination, distance_km, avg_time_hours, road_type, version
         FROM route
+        WHERE active
         ORDER BY created_at
         """)
     ).mappings().all()
 
 
 def delete_route(session: Session, route_id):
-    """Удалить маршрут с проверкой связанных записей"""
+    """Удалить маршрут с проверкой связанных записей (мягко: active = false)"""
     try:
         # Сначала проверяем, есть ли связанные перевозки
-        shipment_count = session.query(Shipment).filter(Shipment.route_id == route_id).count()
+        shipment_count = session.query(Shipment).filter(
+            Shipment.route_id == route_id, Shipment.active
+        ).count()
 
         if shipment_count > 0:
             return False, f"Нельзя удалить маршрут, так как он связан с {shipment_count} перевозками"
 
-        # Удаляем связи с тарифами
+        # Помечаем удаленными связи с тарифами
         session.execute(
-            text("DELETE FROM route_tariff WHERE route_id = :route_id"),
+            text("UPDATE route_tariff SET active = false, updated_at = now() WHERE route_id = :route_id AND active"),
             {"route_id": route_id}
         )
 
-        # Теперь удаляем маршрут
+        # Теперь сам маршрут
         session.execute(
-            text("DELETE FROM route WHERE id = :id"),
+            text("UPDATE route SET active = false, updated_at = now() WHERE id = :id AND active"),
             {"id": route_id}
         )
 
         session.commit()
+        route_graph.mark_stale()
+        tariff_resolver.mark_stale()
         return True, "Маршрут успешно удален"
 
     except Exception as e:
@@ -114,17 +128,23 @@ def update_route(
     destination: str,
     distance_km: float,
     avg_time_hours: float,
-    road_type: str
-):
-    session.execute(
+    road_type: str,
+    expected_version: int = None
+) -> bool:
+    """Обновить маршрут (expected_version - см. Shared/versioning.py)"""
+    updated = session.execute(
         text("""
         UPDATE route
         SET origin = :origin,
             destination = :destination,
             distance_km = :distance_km,
             avg_time_hours = :avg_time_hours,
-            road_type = :road_type
-        WHERE id = :id
+            road_type = :road_type,
+            updated_at = now(),
+            version = version + 1
+        WHERE id = :id AND active
+          AND (CAST(:expected_version AS integer) IS NULL OR version = :expected_version)
+        RETURNING version
         """),
         {
             "id": route_id,
@@ -132,16 +152,24 @@ def update_route(
             "destination": destination,
             "distance_km": distance_km,
             "avg_time_hours": avg_time_hours,
-            "road_type": road_type
+            "road_type": road_type,
+            "expected_version": expected_version
         }
-    )
+    ).scalar()
+    if updated is None:
+        check_stale(session, "route", route_id, expected_version)
+        return False
+
     session.commit()
+    route_graph.mark_stale()
+    tariff_resolver.mark_stale()
+    return True
 
 
 def get_routes_with_filters(session: Session, **filters):
     """Получить маршруты с фильтрами"""
     query = """
-        SELECT id, origin, destination, distance_km, avg_time_hours, road_type
+        SELECT id, origin, destination, distance_km, avg_time_hours, road_type, version
         FROM route
         WHERE active = true
     """
@@ -161,13 +189,14 @@ def get_routes_with_filters(session: Session, **filters):
         conditions.append("LOWER(road_type) LIKE :road_type")
         params["road_type"] = f"%{filters['road_type'].lower()}%"
 
+    # ILIKE, а не LOWER(...) LIKE: его обслуживают триграммные индексы (e2a6c91f3b84)
     if "origin" in filters:
-        conditions.append("LOWER(origin) LIKE :origin")
-        params["origin"] = f"%{filters['origin'].lower()}%"
+        conditions.append("origin ILIKE :origin")
+        params["origin"] = f"%{filters['origin']}%"
 
     if "destination" in filters:
-        conditions.append("LOWER(destination) LIKE :destination")
-        params["destination"] = f"%{filters['destination'].lower()}%"
+        conditions.append("destination ILIKE :destination")
+        params["destination"] = f"%{filters['destination']}%"
 
     if conditions:
         query += " AND " + " AND ".join(conditions)
@@ -177,11 +206,20 @@ def get_routes_with_filters(session: Session, **filters):
     return session.execute(text(query), params).mappings().all()
 
 
+def search_routes(session: Session, query: str, limit: int = DEFAULT_LIMIT):
+    """Найти маршруты по пункту отправления или назначения (с учетом опечаток)"""
+    return trigram_search(
+        session, "route", ["origin", "destination"],
+        "id, origin, destination, distance_km, avg_time_hours, road_type",
+        query, limit
+    )
+
+
 def get_route_by_id(session: Session, route_id):
     """Получить маршрут по ID"""
     result = session.execute(
         text("""
-        SELECT id, origin, destination, distance_km, avg_time_hours, road_type
+        SELECT id, origin, destination, distance_km, avg_time_hours, road_type, version
         FROM route
         WHERE id = :id AND active = true
         """),
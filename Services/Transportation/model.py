@@ -2,7 +2,7 @@
 from __future__ import annotations
 import datetime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Float, ForeignKey, DateTime
+from sqlalchemy import String, Float, ForeignKey, DateTime, func
 from typing import Optional
 
 from Shared.Base import Base
@@ -10,20 +10,27 @@ from Shared.Base import Base
 
 class Shipment(Base):
     __tablename__ = "shipment"
+    # Месячные партиции по shipment_date (миграция 9a41c7e2d5b0)
+    __table_args__ = {"postgresql_partition_by": "RANGE (shipment_date)"}
 
-    shipment_date: Mapped[datetime.datetime] = mapped_column(DateTime)
+    # Ключ секционирования входит в первичный ключ вместе с id
+    shipment_date: Mapped[datetime.datetime] = mapped_column(DateTime, primary_key=True)
     cargo_weight: Mapped[float] = mapped_column(Float)  # вес груза в
     status: Mapped[str] = mapped_column(String(50), default="pending")  # pending, in_transit, delivered, cancelled
 
     # Внешние ключи
     car_id: Mapped[int] = mapped_column(ForeignKey("car.id"))
     driver_id: Mapped[int] = mapped_column(ForeignKey("driver.id"))
-    route_id: Mapped[int] = mapped_column(ForeignKey("route.id"))
-    tariff_id: Mapped[int] = mapped_column(ForeignKey("tariff.id"))
+    route_id: Mapped[int] = mapped_column(ForeignKey("route.id"), index=True)
+    tariff_id: Mapped[int] = mapped_column(ForeignKey("tariff.id"), index=True)
 
     # Расчетные поля (будут вычисляться автоматически)
     total_cost: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
+    # Аренда диспетчером из очереди (Services/Dispatch, миграция c1f5a8e2d947)
+    claimed_by: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    claimed_until: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime, nullable=True)
+
     # Отношения (без Car и Route отношений, т.к. они не нужны напрямую)
     route: Mapped["Route"] = relationship("Route")
     car: Mapped["Car"] = relationship("Car")
@@ -31,4 +38,30 @@ class Shipment(Base):
     tariff: Mapped["Tariff"] = relationship(back_populates="shipments")
 
     def __repr__(self) -> str:
-        return f"Shipment(id={self.id}, status='{self.status}', type='{self.cargo_type}')"
\ No newline at end of file
+        return f"Shipment(id={self.id}, status='{self.status}', type='{self.cargo_type}')"
+
+
+class ShipmentArchive(Base):
+    """Завершенные перевозки, перенесенные из shipment (миграция c58e0b93f7a1)"""
+    __tablename__ = "shipment_archive"
+
+    shipment_date: Mapped[datetime.datetime] = mapped_column(DateTime, index=True)
+    cargo_weight: Mapped[float] = mapped_column(Float)
+    status: Mapped[str] = mapped_column(String(50))  # delivered, cancelled
+
+    car_id: Mapped[int] = mapped_column(ForeignKey("car.id"))
+    driver_id: Mapped[int] = mapped_column(ForeignKey("driver.id"))
+    route_id: Mapped[int] = mapped_column(ForeignKey("route.id"))
+    tariff_id: Mapped[int] = mapped_column(ForeignKey("tariff.id"))
+
+    total_cost: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    archived_at: Mapped[datetime.datetime] = mapped_column(DateTime, server_default=func.now())
+
+    # Только для чтения: обратных списков у водителя и тарифа нет
+    route: Mapped["Route"] = relationship("Route", viewonly=True)
+    car: Mapped["Car"] = relationship("Car", viewonly=True)
+    driver: Mapped["Driver"] = relationship("Driver", viewonly=True)
+    tariff: Mapped["Tariff"] = relationship("Tariff", viewonly=True)
+
+    def __repr__(self) -> str:
+        return f"ShipmentArchive(id={self.id}, status='{self.status}')"
@@ -1,14 +1,17 @@
 # Services/shipment/services.py
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc, and_, or_
-from typing import Dict, List, Optional
+from sqlalchemy import desc, and_, or_, select, text, func, bindparam, insert, update, literal, union_all
+from typing import Dict, Iterator, List, Optional
 import datetime
 
-from Services.Transportation.model import Shipment
+from Services.Transportation.model import Shipment, ShipmentArchive
 from Services.Car.model import Car
 from Services.Driver.model import Driver
 from Services.Route.model import Route
 from Services.Rate.model import Tariff
+from Services.Rate.resolver import get_route_tariffs
+from Shared.soft_delete import soft_delete
+from Shared.versioning import versioned_update
 
 
 def get_all_shipments(session: Session, auto_recalculate: bool = True) -> List[Dict]:
@@ -16,7 +19,7 @@ def get_all_shipments(session: Session, auto_recalculate: bool = True) -> List[D
     shipments = session.query(Shipment).options(
         joinedload(Shipment.driver),
         joinedload(Shipment.tariff)
-    ).order_by(desc(Shipment.shipment_date)).all()
+    ).filter(Shipment.active).order_by(desc(Shipment.shipment_date)).all()
 
     result = []
     updated_shipments = []  # Для хранения перевозок, которые нужно обновить
@@ -43,6 +46,7 @@ def get_all_shipments(session: Session, auto_recalculate: bool = True) -> List[D
             "cargo_weight": shipment.cargo_weight,
             "status": shipment.status,
             "total_cost": total_cost,
+            "version": shipment.version,
             "car_id": shipment.car_id,
             "car_info": {
                 "brand": car.brand if car else None,
@@ -84,6 +88,7 @@ def get_active_tariffs(session: Session, date: datetime.datetime = None) -> List
         date = datetime.datetime.now()
 
     query = session.query(Tariff).filter(
+        Tariff.active,
         Tariff.date_start <= date,
         or_(Tariff.date_end == None, Tariff.date_end >= date)
     )
@@ -105,7 +110,7 @@ def get_active_tariffs(session: Session, date: datetime.datetime = None) -> List
 
 def get_available_cars_with_drivers(session: Session, cargo_weight: float = 0) -> List[Dict]:
     """Получить автомобили с назначенными водителями"""
-    cars = session.query(Car).options(joinedload(Car.driver)).all()
+    cars = session.query(Car).options(joinedload(Car.driver)).filter(Car.active).all()
 
     result = []
     for car in cars:
@@ -131,7 +136,7 @@ def get_available_cars_with_drivers(session: Session, cargo_weight: float = 0) -
 
 def get_all_drivers(session: Session) -> List[Dict]:
     """Получить всех водителей"""
-    drivers = session.query(Driver).all()
+    drivers = session.query(Driver).filter(Driver.active).all()
     return [
         {
             "id": driver.id,
@@ -146,7 +151,7 @@ def get_all_drivers(session: Session) -> List[Dict]:
 
 def get_all_routes(session: Session) -> List[Dict]:
     """Получить все маршруты"""
-    routes = session.query(Route).all()
+    routes = session.query(Route).filter(Route.active).all()
     return [
         {
             "id": route.id,
@@ -165,7 +170,7 @@ def create_shipment(session: Session, **kwargs) -> Shipment:
     """Создать новую перевозку"""
     # Проверяем, что выбранный тариф активен
     if 'tariff_id' in kwargs and 'shipment_date' in kwargs:
-        tariff = session.query(Tariff).filter(Tariff.id == kwargs['tariff_id']).first()
+        tariff = session.query(Tariff).filter(Tariff.id == kwargs['tariff_id'], Tariff.active).first()
         shipment_date = kwargs['shipment_date']
 
         if isinstance(shipment_date, str):
@@ -180,7 +185,7 @@ def create_shipment(session: Session, **kwargs) -> Shipment:
 
     # Проверяем, что автомобиль существует и может перевезти груз
     if 'car_id' in kwargs and 'cargo_weight' in kwargs:
-        car = session.query(Car).filter(Car.id == kwargs['car_id']).first()
+        car = session.query(Car).filter(Car.id == kwargs['car_id'], Car.active).first()
         if car and car.load_capacity * 1000 < kwargs['cargo_weight']:
             raise ValueError(f"Груз слишком тяжелый для автомобиля {car.brand} (макс: {car.load_capacity * 1000} кг)")
 
@@ -190,33 +195,80 @@ def create_shipment(session: Session, **kwargs) -> Shipment:
     return shipment
 
 
-def update_shipment(session: Session, shipment_id: int, **kwargs) -> bool:
-    """Обновить данные перевозки"""
-    shipment = session.query(Shipment).filter(Shipment.id == shipment_id).first()
-    if not shipment:
-        return False
+def create_shipments(session: Session, shipments: List[Dict]) -> int:
+    """
+    Создать перевозки пачкой (один INSERT на всю пачку).
+
+    Если tariff_id не задан, берется самый дешевый тариф, привязанный
+    к маршруту на дату перевозки (Services/Rate/resolver.py); заданный
+    тариф должен быть привязан к маршруту и действовать на эту дату.
+    Если к маршруту на эту дату не привязан ни один тариф, подходит любой
+    тариф, действующий на дату (как в списке тарифов ShipmentDialog).
+    Стоимость считает триггер shipment_cost_after_insert, грузоподъемность
+    проверяет validate_shipment_capacity.
+
+    Returns:
+        Количество созданных перевозок
+    """
+    rows = []
+    unlinked_tariffs: Dict[str, Optional[Tariff]] = {}
+    for number, data in enumerate(shipments, start=1):
+        row = dict(data)
+        if isinstance(row.get("shipment_date"), str):
+            row["shipment_date"] = datetime.datetime.fromisoformat(row["shipment_date"])
+
+        tariffs = get_route_tariffs(session, row["route_id"], row["shipment_date"])
+        if not row.get("tariff_id"):
+            if not tariffs:
+                raise ValueError(f"Перевозка {number}: у маршрута нет тарифа на {row['shipment_date']}")
+            row["tariff_id"] = tariffs[0]["id"]
+        elif not tariffs:
+            # Маршрут без привязанных тарифов: годится любой тариф, действующий на дату
+            key = str(row["tariff_id"])
+            if key not in unlinked_tariffs:
+                unlinked_tariffs[key] = session.query(Tariff).filter(
+                    Tariff.id == row["tariff_id"], Tariff.active
+                ).first()
+            tariff = unlinked_tariffs[key]
+            if tariff is None or not tariff.is_active(row["shipment_date"]):
+                raise ValueError(f"Перевозка {number}: тариф не действует на {row['shipment_date']}")
+        elif all(str(tariff["id"]) != str(row["tariff_id"]) for tariff in tariffs):
+            raise ValueError(f"Перевозка {number}: тариф не действует на маршруте на {row['shipment_date']}")
+
+        rows.append(row)
+
+    if rows:
+        session.execute(insert(Shipment), rows)
+    session.commit()
+    return len(rows)
 
-    for key, value in kwargs.items():
-        setattr(shipment, key, value)
+
+def update_shipment(session: Session, shipment_id: int, expected_version: Optional[int] = None, **kwargs) -> bool:
+    """Обновить данные перевозки (expected_version - см. Shared/versioning.py)"""
+    if isinstance(kwargs.get('shipment_date'), str):
+        kwargs['shipment_date'] = datetime.datetime.fromisoformat(kwargs['shipment_date'])
+
+    if versioned_update(session, Shipment, shipment_id, kwargs, expected_version) is None:
+        return False
 
     session.commit()
     return True
 
 
 def delete_shipment(session: Session, shipment_id: int) -> bool:
-    """Удалить перевозку"""
-    shipment = session.query(Shipment).filter(Shipment.id == shipment_id).first()
+    """Удалить перевозку (мягко: active = false)"""
+    shipment = session.query(Shipment).filter(Shipment.id == shipment_id, Shipment.active).first()
     if not shipment:
         return False
 
-    session.delete(shipment)
+    soft_delete(shipment)
     session.commit()
     return True
 
 
 def calculate_shipment_cost(session: Session, shipment_id: int) -> float:
     """Рассчитать стоимость перевозки"""
-    shipment = session.query(Shipment).filter(Shipment.id == shipment_id).first()
+    shipment = session.query(Shipment).filter(Shipment.id == shipment_id, Shipment.active).first()
     if not shipment:
         return 0
 
@@ -230,113 +282,367 @@ def calculate_shipment_cost(session: Session, shipment_id: int) -> float:
     return max(cost, tariff.min_price)
 
 
-def get_shipments_with_filters(session: Session, **filters) -> List[Dict]:
-    """Получить перевозки с фильтрами"""
-    from sqlalchemy import and_, or_
+def recalculate_shipment_costs(session: Session) -> int:
+    """
+    Пересчитать стоимость всех перевозок одним UPDATE.
+
+    Обычно стоимость ведут триггеры (миграция 3f9c2a7d41e8); пересчет нужен
+    после загрузки в обход триггеров или ручных правок. Обновляются только
+    перевозки, у которых стоимость разошлась с маршрутом и тарифом, поэтому
+    повторный запуск ничего не пишет.
+
+    Returns:
+        Количество перевозок с исправленной стоимостью
+    """
+    result = session.execute(text("""
+        UPDATE shipment s
+        SET total_cost = GREATEST(r.distance_km * t.price_per_km, t.min_price)
+        FROM route r, tariff t
+        WHERE r.id = s.route_id
+          AND t.id = s.tariff_id
+          AND s.active
+          AND s.total_cost IS DISTINCT FROM GREATEST(r.distance_km * t.price_per_km, t.min_price)
+    """))
+    session.commit()
+    return result.rowcount
+
+
+# ========== СТАТУСЫ ==========
+
+# Разрешенные переходы: новый статус -> из каких статусов в него можно перейти
+SHIPMENT_TRANSITIONS = {
+    "in_transit": ("pending",),
+    "delivered": ("in_transit",),
+    "cancelled": ("pending", "in_transit"),
+}
+
+
+def transition_shipments(session: Session, new_status: str, ids: List = None, **filters) -> List:
+    """
+    Перевести перевозки в новый статус одним UPDATE ... RETURNING.
+
+    Перевозки выбираются по списку ids и/или по фильтрам
+    build_shipment_conditions (например, date_from/date_before - все за день).
+    Переводятся только те, для которых переход разрешен
+    (SHIPMENT_TRANSITIONS), остальные остаются как были. Версия строк
+    растет (Shared/versioning.py), сводки выручки ведут триггеры.
+
+    Returns:
+        id переведенных перевозок
+    """
+    if new_status not in SHIPMENT_TRANSITIONS:
+        raise ValueError(f"Нельзя перевести в статус {new_status}. Допустимо: {', '.join(SHIPMENT_TRANSITIONS)}")
+    if ids is None and not filters:
+        raise ValueError("Укажите перевозки: список id или фильтр")
+    if ids is not None and not ids:
+        return []
+
+    # Фильтр status сужает выборку, но переход все равно проверяется
+    conditions = build_shipment_conditions(filters)
+    conditions.append(Shipment.status.in_(SHIPMENT_TRANSITIONS[new_status]))
+    if ids is not None:
+        conditions.append(Shipment.id.in_(ids))
+
+    updated = session.execute(
+        update(Shipment)
+        .where(*conditions)
+        .values(status=new_status, version=Shipment.version + 1, updated_at=datetime.datetime.now())
+        .returning(Shipment.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    session.commit()
+    return updated
 
-    query = session.query(Shipment).options(
-        joinedload(Shipment.driver),
-        joinedload(Shipment.tariff)
+
+# ========== ПАРТИЦИИ ==========
+
+# На сколько месяцев вперед держать готовые партиции shipment
+SHIPMENT_PARTITION_MONTHS_AHEAD = 3
+
+
+def ensure_shipment_partitions(session: Session, date_from: datetime.date = None,
+                               date_to: datetime.date = None) -> int:
+    """
+    Создать месячные партиции shipment за период.
+
+    По умолчанию - с текущего месяца на SHIPMENT_PARTITION_MONTHS_AHEAD вперед.
+    Перевозки вне созданных месяцев попадают в shipment_default и переносятся
+    в партицию при ее создании.
+
+    Нужны права на DDL по shipment, поэтому запускается по расписанию
+    (cli.py partitions), а не при старте клиентов. Одновременные запуски
+    безопасны: создание партиций сериализовано (миграция e4b9c2d7a318).
+
+    Returns:
+        Количество созданных партиций
+    """
+    today = datetime.date.today()
+    if date_from is None:
+        date_from = today
+    if date_to is None:
+        date_to = today + datetime.timedelta(days=31 * SHIPMENT_PARTITION_MONTHS_AHEAD)
+
+    created = session.execute(
+        text("SELECT ensure_shipment_partitions(CAST(:date_from AS DATE), CAST(:date_to AS DATE))"),
+        {"date_from": date_from, "date_to": date_to}
+    ).scalar()
+    session.commit()
+    return created
+
+
+def detach_shipment_partitions(session: Session, before: datetime.date) -> List[str]:
+    """
+    Отключить партиции месяцев, целиком лежащих раньше before.
+
+    Данные не удаляются: партиция становится отдельной таблицей
+    shipment_detached_ГГГГ_ММ.
+
+    Returns:
+        Имена отключенных таблиц
+    """
+    names = session.execute(
+        text("SELECT detach_shipment_partitions(CAST(:before AS DATE))"), {"before": before}
+    ).scalars().all()
+    session.commit()
+    return names
+
+
+# ========== АРХИВ ==========
+
+# Завершенные перевозки старше стольких месяцев уходят в shipment_archive
+ARCHIVE_AFTER_MONTHS = 12
+ARCHIVE_STATUSES = ("delivered", "cancelled")
+
+
+def _month_start(date: datetime.date) -> datetime.datetime:
+    return datetime.datetime(date.year, date.month, 1)
+
+
+def _next_month(month: datetime.datetime) -> datetime.datetime:
+    return datetime.datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def archive_shipments(session: Session, older_than_months: int = ARCHIVE_AFTER_MONTHS) -> int:
+    """
+    Перенести доставленные и отмененные перевозки старше older_than_months
+    месяцев из shipment в shipment_archive.
+
+    Перенос идет помесячно (один DELETE ... RETURNING + INSERT на партицию,
+    коммит после каждого месяца), затем VACUUM ANALYZE освобождает место,
+    чтобы рабочая таблица оставалась компактной и помещалась в кэш.
+
+    Returns:
+        Количество перенесенных перевозок
+    """
+    today = datetime.date.today()
+    months = today.year * 12 + today.month - 1 - older_than_months
+    cutoff = datetime.datetime(months // 12, months % 12 + 1, 1)
+
+    first_date = session.query(func.min(Shipment.shipment_date)).filter(
+        Shipment.active,
+        Shipment.status.in_(ARCHIVE_STATUSES),
+        Shipment.shipment_date < cutoff
+    ).scalar()
+    if first_date is None:
+        return 0
+
+    # Общие столбцы: служебные столбцы очереди (claimed_*) в архив не переносятся
+    columns = ", ".join(
+        column.name for column in Shipment.__table__.columns
+        if column.name in ShipmentArchive.__table__.columns
     )
+    move = text(f"""
+        WITH moved AS (
+            DELETE FROM shipment
+            WHERE active AND status IN :statuses
+              AND shipment_date >= :month_start AND shipment_date < :month_end
+            RETURNING {columns}
+        )
+        INSERT INTO shipment_archive ({columns})
+        SELECT {columns} FROM moved
+    """).bindparams(bindparam("statuses", expanding=True))
+
+    moved = 0
+    month = _month_start(first_date)
+    while month < cutoff:
+        result = session.execute(move, {
+            "statuses": list(ARCHIVE_STATUSES),
+            "month_start": month,
+            "month_end": _next_month(month),
+        })
+        moved += result.rowcount
+        session.commit()
+        month = _next_month(month)
+
+    # VACUUM не выполняется внутри транзакции
+    with session.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("VACUUM (ANALYZE) shipment"))
 
-    conditions = []
+    return moved
+
+
+def build_shipment_conditions(filters: Dict, model=Shipment) -> List:
+    """Построить условия WHERE для перевозок (или архива - model=ShipmentArchive) по словарю фильтров"""
+    # Удаленные (active = false) не показываем никогда
+    conditions = [model.active]
 
     # Фильтр по статусу
     if "status" in filters:
         status_list = filters["status"]
         if isinstance(status_list, str):
             status_list = [status_list]
-        conditions.append(Shipment.status.in_(status_list))
+        conditions.append(model.status.in_(status_list))
 
-    # Фильтр по дате (от)
+    # Фильтр по дате (от). Условия по shipment_date отсекают лишние партиции
     if "date_from" in filters:
         date_from = filters["date_from"]
         if isinstance(date_from, str):
             date_from = datetime.datetime.fromisoformat(date_from)
-        conditions.append(Shipment.shipment_date >= date_from)
+        conditions.append(model.shipment_date >= date_from)
 
     # Фильтр по дате (до)
     if "date_to" in filters:
         date_to = filters["date_to"]
         if isinstance(date_to, str):
             date_to = datetime.datetime.fromisoformat(date_to)
-        conditions.append(Shipment.shipment_date <= date_to)
+        conditions.append(model.shipment_date <= date_to)
+
+    # Фильтр по дате (строго до): для периодов по дням - date_before = следующий день
+    if "date_before" in filters:
+        date_before = filters["date_before"]
+        if isinstance(date_before, str):
+            date_before = datetime.datetime.fromisoformat(date_before)
+        conditions.append(model.shipment_date < date_before)
 
     # Фильтр по автомобилю
     if "car_id" in filters:
-        conditions.append(Shipment.car_id == filters["car_id"])
+        conditions.append(model.car_id == filters["car_id"])
 
     # Фильтр по водителю
     if "driver_id" in filters:
-        conditions.append(Shipment.driver_id == filters["driver_id"])
+        conditions.append(model.driver_id == filters["driver_id"])
 
     # Фильтр по маршруту
     if "route_id" in filters:
-        conditions.append(Shipment.route_id == filters["route_id"])
+        conditions.append(model.route_id == filters["route_id"])
 
     # Фильтр по тарифу
     if "tariff_id" in filters:
-        conditions.append(Shipment.tariff_id == filters["tariff_id"])
+        conditions.append(model.tariff_id == filters["tariff_id"])
 
     # Фильтр по весу (от)
     if "weight_from" in filters:
-        conditions.append(Shipment.cargo_weight >= filters["weight_from"])
+        conditions.append(model.cargo_weight >= filters["weight_from"])
 
     # Фильтр по весу (до)
     if "weight_to" in filters:
-        conditions.append(Shipment.cargo_weight <= filters["weight_to"])
-
-    # Применяем условия
-    if conditions:
-        query = query.filter(and_(*conditions))
-
-    shipments = query.order_by(Shipment.shipment_date.desc()).all()
-
-    # Преобразуем в словари с полной информацией
-    result = []
-    for shipment in shipments:
-        # Получаем связанные данные через отдельные запросы
-        car = session.query(Car).filter(Car.id == shipment.car_id).first()
-        route = session.query(Route).filter(Route.id == shipment.route_id).first()
-
-        # Рассчитываем стоимость
-        total_cost = 0
-        if route and shipment.tariff:
-            cost = route.distance_km * shipment.tariff.price_per_km
-            total_cost = max(cost, shipment.tariff.min_price)
+        conditions.append(model.cargo_weight <= filters["weight_to"])
+
+    return conditions
+
+
+def _joined_shipments(model, filters: Dict):
+    """SELECT перевозок (или записей архива) с машиной, водителем, маршрутом и тарифом"""
+    return (
+        select(
+            model.id, model.shipment_date, model.cargo_weight, model.status, model.version,
+            literal(model is ShipmentArchive).label("archived"),
+            model.car_id, model.driver_id, model.route_id, model.tariff_id,
+            Car.brand, Car.license_plate, Car.load_capacity,
+            Driver.full_name, Driver.license_number, Driver.car_id.label("driver_car_id"),
+            Route.origin, Route.destination, Route.distance_km, Route.avg_time_hours,
+            Tariff.price_per_km, Tariff.min_price, Tariff.date_start, Tariff.date_end,
+        )
+        .select_from(model)
+        .outerjoin(Car, Car.id == model.car_id)
+        .outerjoin(Driver, Driver.id == model.driver_id)
+        .outerjoin(Route, Route.id == model.route_id)
+        .outerjoin(Tariff, Tariff.id == model.tariff_id)
+        .where(*build_shipment_conditions(filters, model))
+    )
 
-        result.append({
-            "id": shipment.id,
-            "shipment_date": shipment.shipment_date.isoformat(),
-            "cargo_weight": shipment.cargo_weight,
-            "status": shipment.status,
-            "total_cost": total_cost,
-            "car_id": shipment.car_id,
-            "car_info": {
-                "brand": car.brand if car else None,
-                "license_plate": car.license_plate if car else None,
-                "load_capacity": car.load_capacity if car else None
-            } if car else None,
-            "driver_id": shipment.driver_id,
-            "driver_info": {
-                "full_name": shipment.driver.full_name if shipment.driver else None,
-                "license_number": shipment.driver.license_number if shipment.driver else None,
-                "car_id": shipment.driver.car_id if shipment.driver else None
-            } if shipment.driver else None,
-            "route_id": shipment.route_id,
-            "route_info": {
-                "origin": route.origin if route else None,
-                "destination": route.destination if route else None,
-                "distance_km": route.distance_km if route else None,
-                "avg_time_hours": route.avg_time_hours if route else None
-            } if route else None,
-            "tariff_id": shipment.tariff_id,
-            "tariff_info": {
-                "price_per_km": shipment.tariff.price_per_km if shipment.tariff else None,
-                "min_price": shipment.tariff.min_price if shipment.tariff else None,
-                "date_start": shipment.tariff.date_start.isoformat() if shipment.tariff else None,
-                "date_end": shipment.tariff.date_end.isoformat() if shipment.tariff and shipment.tariff.date_end else None
-            } if shipment.tariff else None
-        })
 
-    return result
\ No newline at end of file
+def build_shipment_rows_query(filters: Dict, include_archived: bool = False):
+    """
+    Один запрос перевозок по фильтрам со связанными данными, новые сначала.
+
+    С include_archived=True - UNION ALL с shipment_archive (столбец archived),
+    порядок общий и задается в SQL. Фильтры применяются в каждой ветке,
+    поэтому условия по shipment_date по-прежнему отсекают партиции.
+    """
+    query = _joined_shipments(Shipment, filters)
+    if include_archived:
+        query = union_all(query, _joined_shipments(ShipmentArchive, filters))
+    columns = query.selected_columns
+    return query.order_by(columns.shipment_date.desc(), columns.id.desc())
+
+
+def _shipment_dict(row) -> Dict:
+    """Строка build_shipment_rows_query -> словарь перевозки для GUI, API и выгрузок"""
+    # Стоимость по маршруту и тарифу, 0 - если одного из них нет
+    total_cost = 0
+    if row.distance_km is not None and row.price_per_km is not None:
+        total_cost = max(row.distance_km * row.price_per_km, row.min_price or 0)
+
+    return {
+        "id": row.id,
+        "shipment_date": row.shipment_date.isoformat(),
+        "cargo_weight": row.cargo_weight,
+        "status": row.status,
+        "total_cost": total_cost,
+        "version": row.version,
+        "archived": row.archived,
+        "car_id": row.car_id,
+        "car_info": {
+            "brand": row.brand,
+            "license_plate": row.license_plate,
+            "load_capacity": row.load_capacity
+        } if row.brand is not None else None,
+        "driver_id": row.driver_id,
+        "driver_info": {
+            "full_name": row.full_name,
+            "license_number": row.license_number,
+            "car_id": row.driver_car_id
+        } if row.full_name is not None else None,
+        "route_id": row.route_id,
+        "route_info": {
+            "origin": row.origin,
+            "destination": row.destination,
+            "distance_km": row.distance_km,
+            "avg_time_hours": row.avg_time_hours
+        } if row.origin is not None else None,
+        "tariff_id": row.tariff_id,
+        "tariff_info": {
+            "price_per_km": row.price_per_km,
+            "min_price": row.min_price,
+            "date_start": row.date_start.isoformat(),
+            "date_end": row.date_end.isoformat() if row.date_end else None
+        } if row.price_per_km is not None else None
+    }
+
+
+def get_shipments_with_filters(session: Session, include_archived: bool = False, limit: Optional[int] = None,
+                               offset: int = 0, **filters) -> List[Dict]:
+    """
+    Получить перевозки с фильтрами (один запрос с JOIN).
+
+    С include_archived=True в выборку попадают и перевозки из архива
+    (поле "archived" в результате), порядок по дате общий.
+    limit/offset - страница в этом порядке (None - все перевозки).
+    """
+    query = build_shipment_rows_query(filters, include_archived).limit(limit).offset(offset or None)
+    return [_shipment_dict(row) for row in session.execute(query)]
+
+
+def iter_shipments_for_export(session: Session, batch_size: int = 1000, include_archived: bool = False,
+                              **filters) -> Iterator[Dict]:
+    """
+    Потоково получить перевозки для экспорта.
+
+    Тот же запрос, что у get_shipments_with_filters, но строки читаются
+    серверным курсором пачками по batch_size, поэтому в памяти
+    одновременно находится только одна пачка.
+    """
+    query = build_shipment_rows_query(filters, include_archived)
+    for row in session.execute(query, execution_options={"yield_per": batch_size}):
+        yield _shipment_dict(row)
@@ -0,0 +1,229 @@
+# Services/Utilization/services.py
+"""
+Загрузка машин и водителей: часы в работе, простои, процент занятости.
+
+Перевозка занимает машину и водителя с shipment_date на avg_time_hours
+маршрута. Интервалы перевозок (рабочих и архивных, кроме отмененных)
+загружаются один раз в массивы NumPy через бинарный COPY, дальше любое
+окно считается векторно, без циклов по перевозкам:
+
+1. интервалы обрезаются по окну и сортируются по (машина, начало);
+2. пересекающиеся интервалы одной машины склеиваются в блоки
+   (накопленный максимум окончаний со сдвигом на номер машины, чтобы
+   максимум не перетекал из одной машины в другую);
+3. занятость - сумма длин блоков, простои - промежутки между блоками
+   и краями окна.
+"""
+import datetime
+import io
+import uuid
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from Shared.Export.copy import compile_query
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+# Строка бинарного COPY: число полей, затем (длина, значение) на каждое поле
+_COPY_ROW = np.dtype([
+    ("fields", ">i2"),
+    ("car_len", ">i4"), ("car_id", "V16"),
+    ("driver_len", ">i4"), ("driver_id", "V16"),
+    ("start_len", ">i4"), ("start", ">f8"),
+    ("duration_len", ">i4"), ("duration", ">f8"),
+])
+_COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+
+INTERVALS_SQL = """
+    SELECT s.car_id, s.driver_id,
+           extract(epoch FROM s.shipment_date)::float8,
+           (COALESCE(r.avg_time_hours, 0) * 3600)::float8
+    FROM (
+        SELECT shipment_date, car_id, driver_id, route_id FROM shipment
+        WHERE active AND status <> 'cancelled'
+          AND shipment_date >= %(since)s AND shipment_date < %(until)s
+        UNION ALL
+        SELECT shipment_date, car_id, driver_id, route_id FROM shipment_archive
+        WHERE active AND status <> 'cancelled'
+          AND shipment_date >= %(since)s AND shipment_date < %(until)s
+    ) s
+    JOIN route r ON r.id = s.route_id
+    WHERE s.car_id IS NOT NULL AND s.driver_id IS NOT NULL
+"""
+
+
+def to_epoch(value: datetime.datetime) -> float:
+    """Наивное время в секунды (как extract(epoch) у timestamp without time zone)"""
+    return (value - EPOCH).total_seconds()
+
+
+class ShipmentIntervals:
+    """Интервалы перевозок: номера машин и водителей, начало и конец (секунды epoch)"""
+
+    def __init__(self, car_ids: List[uuid.UUID], driver_ids: List[uuid.UUID],
+                 car: np.ndarray, driver: np.ndarray, start: np.ndarray, end: np.ndarray):
+        self.car_ids = car_ids          # номер -> id машины
+        self.driver_ids = driver_ids    # номер -> id водителя
+        self.car = car
+        self.driver = driver
+        self.start = start
+        self.end = end
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+
+def _entity_codes(raw: np.ndarray, fleet: List[uuid.UUID]):
+    """Номера сущностей для 16-байтовых uuid: сначала весь парк, затем остальные"""
+    ids = list(fleet)
+    index = {value.bytes: number for number, value in enumerate(ids)}
+
+    unique, inverse = np.unique(raw, return_inverse=True)
+    mapping = np.empty(len(unique), dtype=np.int32)
+    for position, value in enumerate(unique.tolist()):
+        number = index.get(value)
+        if number is None:
+            number = index[value] = len(ids)
+            ids.append(uuid.UUID(bytes=value))
+        mapping[position] = number
+    return ids, mapping[inverse.reshape(-1)]
+
+
+def load_intervals(session: Session, date_from: datetime.datetime,
+                   date_to: datetime.datetime) -> ShipmentIntervals:
+    """
+    Загрузить перевозки, занимавшие машины в [date_from, date_to).
+
+    В результат попадают все живые машины и водители, даже без перевозок
+    (их загрузка - 0%), и те, кто уже удален, но ездил в этом окне.
+    """
+    longest = session.execute(text("SELECT COALESCE(MAX(avg_time_hours), 0) FROM route")).scalar()
+    sql, params = compile_query(session, INTERVALS_SQL, {
+        "since": date_from - datetime.timedelta(hours=float(longest)),
+        "until": date_to,
+    })
+
+    dbapi_connection = session.connection().connection
+    cursor = dbapi_connection.cursor()
+    buffer = io.BytesIO()
+    try:
+        select_sql = cursor.mogrify(sql, params).decode(dbapi_connection.encoding)
+        cursor.copy_expert(f"COPY ({select_sql}) TO STDOUT WITH (FORMAT binary)", buffer)
+    finally:
+        cursor.close()
+
+    # Заголовок: сигнатура, флаги, длина расширения; в конце - признак конца (-1)
+    data = buffer.getbuffer()
+    if bytes(data[:len(_COPY_SIGNATURE)]) != _COPY_SIGNATURE:
+        raise ValueError("Неожиданный формат бинарного COPY")
+    offset = len(_COPY_SIGNATURE) + 4
+    offset += 4 + int.from_bytes(data[offset:offset + 4], "big")
+    rows = np.frombuffer(data[offset:len(data) - 2], dtype=_COPY_ROW)
+
+    cars = [row[0] for row in session.execute(text("SELECT id FROM car WHERE active ORDER BY id"))]
+    drivers = [row[0] for row in session.execute(text("SELECT id FROM driver WHERE active ORDER BY id"))]
+    car_ids, car = _entity_codes(rows["car_id"], cars)
+    driver_ids, driver = _entity_codes(rows["driver_id"], drivers)
+
+    start = rows["start"].astype(np.float64)
+    return ShipmentIntervals(car_ids, driver_ids, car, driver, start,
+                             start + rows["duration"].astype(np.float64))
+
+
+def compute_utilization(codes: np.ndarray, start: np.ndarray, end: np.ndarray, entities: int,
+                        window_start: float, window_end: float) -> Dict[str, np.ndarray]:
+    """
+    Занятость сущностей (машин или водителей) в окне [window_start, window_end).
+
+    Args:
+        codes: номер сущности для каждого интервала (0..entities-1)
+        start, end: начало и конец интервалов, секунды
+
+    Returns:
+        Массивы длины entities: busy_hours, utilization (0..1),
+        idle_gaps (число простоев внутри окна), longest_idle_hours
+    """
+    span = window_end - window_start
+
+    # 1. Обрезка по окну, время - от начала окна
+    s = np.clip(start, window_start, window_end) - window_start
+    e = np.clip(end, window_start, window_end) - window_start
+    keep = e > s
+    codes, s, e = codes[keep], s[keep], e[keep]
+
+    order = np.lexsort((s, codes))
+    codes, s, e = codes[order], s[order], e[order]
+
+    # 2. Склейка пересечений: накопленный максимум окончаний внутри машины.
+    # Сдвиг на номер * (span + 1) не дает максимуму перейти к следующей машине.
+    shift = codes.astype(np.float64) * (span + 1)
+    running_end = np.maximum.accumulate(e + shift) - shift
+    first = np.ones(len(codes), dtype=bool)
+    first[1:] = codes[1:] != codes[:-1]
+    previous_end = np.empty_like(running_end)
+    previous_end[:1] = 0
+    previous_end[1:] = running_end[:-1]
+    block_starts = np.flatnonzero(first | (s > previous_end))
+
+    block_code = codes[block_starts]
+    block_start = s[block_starts]
+    block_end = np.maximum.reduceat(e, block_starts) if len(block_starts) else e[:0]
+
+    busy = np.bincount(block_code, weights=block_end - block_start, minlength=entities)
+
+    # 3. Простои: перед первым блоком, между блоками, после последнего
+    block_first = np.ones(len(block_code), dtype=bool)
+    block_first[1:] = block_code[1:] != block_code[:-1]
+    block_last = np.ones(len(block_code), dtype=bool)
+    block_last[:-1] = block_first[1:]
+
+    gap_before = np.where(block_first, block_start, block_start - np.roll(block_end, 1))
+    idle_gaps = np.bincount(block_code[~block_first], minlength=entities)
+
+    longest = np.full(entities, span)      # без перевозок - простой на все окно
+    has_blocks = np.zeros(entities, dtype=bool)
+    has_blocks[block_code] = True
+    longest[has_blocks] = 0
+    np.maximum.at(longest, block_code, gap_before)
+    np.maximum.at(longest, block_code[block_last], span - block_end[block_last])
+
+    return {
+        "busy_hours": busy / 3600,
+        "utilization": busy / span if span > 0 else np.zeros(entities),
+        "idle_gaps": idle_gaps,
+        "longest_idle_hours": longest / 3600,
+    }
+
+
+def get_utilization(session: Session, date_from: datetime.datetime, date_to: datetime.datetime,
+                    by: str = "car") -> List[Dict]:
+    """
+    Загрузка машин (by="car") или водителей (by="driver") за период.
+
+    Returns:
+        [{id, busy_hours, utilization, idle_gaps, longest_idle_hours}]
+        по убыванию загрузки
+    """
+    if by not in ("car", "driver"):
+        raise ValueError(f"Неизвестный разрез: {by}. Допустимо: car, driver")
+
+    intervals = load_intervals(session, date_from, date_to)
+    ids = intervals.car_ids if by == "car" else intervals.driver_ids
+    codes = intervals.car if by == "car" else intervals.driver
+    result = compute_utilization(codes, intervals.start, intervals.end, len(ids),
+                                 to_epoch(date_from), to_epoch(date_to))
+
+    order = np.argsort(-result["utilization"], kind="stable")
+    return [
+        {
+            "id": ids[i],
+            "busy_hours": float(result["busy_hours"][i]),
+            "utilization": float(result["utilization"][i]),
+            "idle_gaps": int(result["idle_gaps"][i]),
+            "longest_idle_hours": float(result["longest_idle_hours"][i]),
+        }
+        for i in order.tolist()
+    ]
@@ -2,10 +2,14 @@ import uuid
 from datetime import datetime
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
+from Shared.uuid7 import uuid7
+
 class Base(DeclarativeBase):
     id: Mapped[uuid.UUID] = mapped_column(
-        default=uuid.uuid4, primary_key=True, nullable=False
+        default=uuid7, primary_key=True, nullable=False
     )
     created_at: Mapped[datetime] = mapped_column(default=datetime.now, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(default=datetime.now, nullable=False)
     active: Mapped[bool] = mapped_column(default=True, nullable=False)
+    # Номер правки строки для оптимистичных блокировок (Shared/versioning.py)
+    version: Mapped[int] = mapped_column(default=1, server_default="1", nullable=False)
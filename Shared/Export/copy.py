@@ -0,0 +1,56 @@
+# Shared/Export/copy.py
+from typing import Any, Dict, Optional, Tuple, Union
+
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+
+def compile_query(session: Session, query: Union[Select, str],
+                  params: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Привести запрос к SQL строке в стиле psycopg2 (%(name)s) и словарю параметров.
+
+    query - SQLAlchemy select или готовая SQL строка с %(name)s параметрами.
+    """
+    if isinstance(query, str):
+        return query, params or {}
+
+    compiled = query.compile(
+        dialect=session.get_bind().dialect,
+        compile_kwargs={"render_postcompile": True}
+    )
+    return str(compiled), dict(compiled.params)
+
+
+def copy_query_to_file(session: Session, query: Union[Select, str], file_path: str,
+                       params: Optional[Dict[str, Any]] = None,
+                       delimiter: str = ";", header: bool = True,
+                       encoding: str = "utf-8-sig") -> int:
+    """
+    Выгрузить результат запроса в CSV через COPY (...) TO STDOUT.
+
+    Строки форматирует сам Postgres и отдает потоком, psycopg2 (copy_expert)
+    пишет их прямо в файл - без объектов Python на каждую строку.
+    Разделитель и кодировка по умолчанию те же, что у CsvSink.
+
+    Returns:
+        Количество выгруженных строк
+    """
+    sql, query_params = compile_query(session, query, params)
+
+    # Сырое соединение psycopg2 той же транзакции, что и у сессии
+    dbapi_connection = session.connection().connection
+    cursor = dbapi_connection.cursor()
+    try:
+        select_sql = cursor.mogrify(sql, query_params).decode(dbapi_connection.encoding)
+        copy_sql = (
+            f"COPY ({select_sql}) TO STDOUT "
+            f"WITH (FORMAT csv, HEADER {'true' if header else 'false'}, DELIMITER '{delimiter}')"
+        )
+
+        with open(file_path, "w", newline="", encoding=encoding) as file:
+            cursor.copy_expert(copy_sql, file)
+
+        return cursor.rowcount
+    finally:
+        cursor.close()
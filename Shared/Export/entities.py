@@ -0,0 +1,617 @@
+# Shared/Export/entities.py
+# Описания выгрузок по сущностям: столбцы, варианты (фильтры) и статистика подвала
+import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Numeric, String, and_, case, cast, column, func, or_, select, text
+
+from Services.Car.model import Car
+from Services.Driver.model import Driver
+from Services.Rate.model import Tariff
+from Services.Route.model import Route
+from Services.Car.services import (
+    get_all_cars_with_drivers, get_free_cars,
+    get_cars_by_load_capacity, get_cars_by_fuel_consumption
+)
+from Services.Driver.services import get_all_drivers_with_cars, HEAVY_CARS_DRIVERS_SQL
+from Services.Rate.services import get_all_tariffs
+from Services.Route.services import get_all_routes, get_routes_with_filters
+from Services.Transportation.service import iter_shipments_for_export, build_shipment_rows_query
+from Shared.Export.sources import ServiceSource, SqlSource
+from Shared.Export.spec import Column, ExportFilter, ExportSpec, ExportSummary
+from Shared.excel_stream import FILL_CANCELLED, FILL_DELIVERED
+
+
+# Формат даты в COPY запросах (как у _format_datetime)
+_SQL_DATETIME = "DD.MM.YYYY HH24:MI"
+
+
+def _format_datetime(value: Optional[str], empty: str = "") -> str:
+    """ISO дата -> ДД.ММ.ГГГГ ЧЧ:ММ"""
+    if not value:
+        return empty
+    try:
+        return datetime.datetime.fromisoformat(value).strftime("%d.%m.%Y %H:%M")
+    except ValueError:
+        return str(value)
+
+
+# ========== МАШИНЫ ==========
+
+class CarSummary(ExportSummary):
+    count_label = "Всего машин"
+
+    def __init__(self, filter_label: str):
+        super().__init__(filter_label)
+        self.free_count = 0
+
+    def add(self, record: Dict):
+        super().add(record)
+        if record.get("status") == "Свободна":
+            self.free_count += 1
+
+    def extra_lines(self) -> List[List[Any]]:
+        return [[f"Свободных: {self.free_count}", f"Занятых: {self.count - self.free_count}"]]
+
+
+def _cars_copy_query(*conditions):
+    """Машины для COPY: столбцы в порядке CAR_EXPORT"""
+    query = (
+        select(
+            cast(Car.id, String),
+            Car.brand,
+            Car.license_plate,
+            Car.load_capacity,
+            Car.body_type,
+            Car.fuel_consumption,
+            case((Driver.id.is_(None), "Свободна"), else_="Занята"),
+            func.coalesce(Driver.full_name, ""),
+        )
+        .select_from(Car)
+        .outerjoin(Driver, Driver.car_id == Car.id)
+        .where(Car.active)
+    )
+    if conditions:
+        query = query.where(*conditions)
+    return query
+
+
+CAR_EXPORT = ExportSpec(
+    name="машины",
+    sheet_title="Машины",
+    columns=[
+        Column("ID", "id"),
+        Column("Марка", "brand"),
+        Column("Госномер", "license_plate"),
+        Column("Грузоподъемность (т)", "load_capacity", value_type=float),
+        Column("Тип кузова", "body_type"),
+        Column("Расход топлива (л/100км)", "fuel_consumption", value_type=float),
+        Column("Статус", lambda car: car.get("status", "Свободна")),
+        Column("Водитель", lambda car: car.get("driver_name") or ""),
+    ],
+    filters={
+        "all": ExportFilter("Все машины", lambda: ServiceSource(get_all_cars_with_drivers),
+                            lambda: _cars_copy_query()),
+        "free": ExportFilter("Свободные машины", lambda: ServiceSource(get_free_cars),
+                             lambda: _cars_copy_query(Driver.id.is_(None))),
+        "heavy": ExportFilter("Машины с грузоподъемностью > 10т",
+                              lambda: ServiceSource(get_cars_by_load_capacity, 10.0),
+                              lambda: _cars_copy_query(Car.load_capacity >= 10.0)),
+        "efficient": ExportFilter("Экономичные машины (< 15 л/100км)",
+                                  lambda: ServiceSource(get_cars_by_fuel_consumption, 15.0),
+                                  lambda: _cars_copy_query(Car.fuel_consumption <= 15.0)),
+        "with_driver": ExportFilter("Машины с водителями", lambda: ServiceSource(
+            get_all_cars_with_drivers, predicate=lambda car: car.get("has_driver", False)
+        ), lambda: _cars_copy_query(Driver.id.isnot(None))),
+    },
+    summary=CarSummary
+)
+
+
+# ========== МАРШРУТЫ ==========
+
+def _route_speed(route: Dict) -> float:
+    distance = route.get("distance_km") or 0
+    time = route.get("avg_time_hours") or 0
+    return round(distance / time, 1) if time > 0 else 0
+
+
+class RouteSummary(ExportSummary):
+    count_label = "Количество маршрутов"
+
+    def __init__(self, filter_label: str):
+        super().__init__(filter_label)
+        self.total_distance = 0
+        self.total_time = 0
+
+    def add(self, record: Dict):
+        super().add(record)
+        self.total_distance += record.get("distance_km") or 0
+        self.total_time += record.get("avg_time_hours") or 0
+
+    def extra_lines(self) -> List[List[Any]]:
+        avg_speed = self.total_distance / self.total_time if self.total_time > 0 else 0
+        return [[f"Общее расстояние: {self.total_distance} км",
+                 f"Средняя скорость: {round(avg_speed, 1)} км/ч"]]
+
+
+def _routes_copy_query(*conditions):
+    """
+    Маршруты для COPY: столбцы в порядке ROUTE_EXPORT.
+
+    Только неудаленные маршруты. Без условий - в порядке создания (как get_all_routes),
+    с условиями - новые сначала (как get_routes_with_filters).
+    """
+    query = select(
+        cast(Route.id, String),
+        Route.origin,
+        Route.destination,
+        Route.distance_km,
+        Route.avg_time_hours,
+        Route.road_type,
+        case(
+            (Route.avg_time_hours > 0,
+             func.round(cast(Route.distance_km / Route.avg_time_hours, Numeric), 1)),
+            else_=0
+        ),
+    )
+    query = query.where(Route.active)
+    if not conditions:
+        return query.order_by(Route.created_at)
+    return query.where(*conditions).order_by(Route.created_at.desc())
+
+
+ROUTE_EXPORT = ExportSpec(
+    name="маршруты",
+    sheet_title="Маршруты",
+    columns=[
+        Column("ID", "id"),
+        Column("Откуда", "origin"),
+        Column("Куда", "destination"),
+        Column("Расстояние (км)", "distance_km", value_type=float),
+        Column("Среднее время (ч)", "avg_time_hours", value_type=float),
+        Column("Тип дороги", "road_type"),
+        Column("Скорость (км/ч)", _route_speed, value_type=float),
+    ],
+    filters={
+        "all": ExportFilter("Все маршруты", lambda: ServiceSource(get_all_routes),
+                            lambda: _routes_copy_query()),
+        "long": ExportFilter("Длинные маршруты (> 500 км)",
+                             lambda: ServiceSource(get_routes_with_filters, min_distance=500),
+                             lambda: _routes_copy_query(Route.distance_km >= 500)),
+        "short": ExportFilter("Короткие маршруты (< 200 км)",
+                              lambda: ServiceSource(get_routes_with_filters, max_distance=200),
+                              lambda: _routes_copy_query(Route.distance_km <= 200)),
+        "highway": ExportFilter("Магистральные маршруты",
+                                lambda: ServiceSource(get_routes_with_filters, road_type="магистраль"),
+                                lambda: _routes_copy_query(Route.road_type.ilike("%магистраль%"))),
+        "city": ExportFilter("Городские маршруты",
+                             lambda: ServiceSource(get_routes_with_filters, road_type="город"),
+                             lambda: _routes_copy_query(Route.road_type.ilike("%город%"))),
+    },
+    summary=RouteSummary
+)
+
+
+# ========== ТАРИФЫ ==========
+
+def _tariff_archived(tariff: Dict) -> bool:
+    date_end = tariff.get("date_end")
+    return bool(date_end) and datetime.datetime.fromisoformat(date_end) < datetime.datetime.now()
+
+
+def _tariff_active_condition():
+    now = func.localtimestamp()
+    return and_(Tariff.date_start <= now, or_(Tariff.date_end.is_(None), Tariff.date_end >= now))
+
+
+def _tariffs_copy_query(*conditions):
+    """Тарифы для COPY: столбцы в порядке TARIFF_EXPORT"""
+    query = select(
+        cast(Tariff.id, String),
+        Tariff.cargo_type,
+        Tariff.price_per_km,
+        Tariff.min_price,
+        func.to_char(Tariff.date_start, _SQL_DATETIME),
+        func.coalesce(func.to_char(Tariff.date_end, _SQL_DATETIME), "Бессрочно"),
+        case((_tariff_active_condition(), "✅ Активен"), else_="⏸️ Архив"),
+        func.coalesce(Tariff.description, ""),
+    ).where(Tariff.active)
+    if conditions:
+        query = query.where(*conditions)
+    return query.order_by(Tariff.date_start.desc())
+
+
+class TariffSummary(ExportSummary):
+    count_label = "Количество тарифов"
+
+    def __init__(self, filter_label: str):
+        super().__init__(filter_label)
+        self.total_price_per_km = 0
+        self.total_min_price = 0
+        self.active_count = 0
+
+    def add(self, record: Dict):
+        super().add(record)
+        self.total_price_per_km += record.get("price_per_km") or 0
+        self.total_min_price += record.get("min_price") or 0
+        if record.get("is_active"):
+            self.active_count += 1
+
+    def extra_lines(self) -> List[List[Any]]:
+        if not self.count:
+            return []
+        return [
+            [f"Средняя цена за км: {self.total_price_per_km / self.count:.2f} руб",
+             f"Средняя минимальная цена: {self.total_min_price / self.count:.2f} руб"],
+            [f"Активных тарифов: {self.active_count}",
+             f"Архивных тарифов: {self.count - self.active_count}"],
+        ]
+
+
+TARIFF_EXPORT = ExportSpec(
+    name="тарифы",
+    sheet_title="Тарифы",
+    title_text="ТАРИФЫ НА ПЕРЕВОЗКИ",
+    columns=[
+        Column("ID", "id"),
+        Column("Тип груза", "cargo_type"),
+        Column("Цена за км (руб)", "price_per_km", '#,##0.00" руб"'),
+        Column("Мин. цена (руб)", "min_price", '#,##0" руб"'),
+        Column("Дата начала", lambda t: _format_datetime(t.get("date_start"))),
+        Column("Дата окончания", lambda t: _format_datetime(t.get("date_end"), "Бессрочно")),
+        Column("Статус", lambda t: "✅ Активен" if t.get("is_active") else "⏸️ Архив"),
+        Column("Описание", lambda t: t.get("description") or ""),
+    ],
+    filters={
+        "all": ExportFilter("Все тарифы", lambda: ServiceSource(get_all_tariffs),
+                            lambda: _tariffs_copy_query()),
+        "active": ExportFilter("Активные тарифы", lambda: ServiceSource(
+            get_all_tariffs, predicate=lambda t: t.get("is_active", False)
+        ), lambda: _tariffs_copy_query(_tariff_active_condition())),
+        "archived": ExportFilter("Архивные тарифы", lambda: ServiceSource(
+            get_all_tariffs, predicate=_tariff_archived
+        ), lambda: _tariffs_copy_query(Tariff.date_end < func.localtimestamp())),
+        "by_cargo": ExportFilter(
+            lambda cargo_type="": f"Тарифы по типу груза: {cargo_type}",
+            lambda cargo_type="": ServiceSource(
+                get_all_tariffs, predicate=lambda t: t.get("cargo_type") == cargo_type
+            ),
+            lambda cargo_type="": _tariffs_copy_query(Tariff.cargo_type == cargo_type)
+        ),
+        "unlimited": ExportFilter("Бессрочные тарифы", lambda: ServiceSource(
+            get_all_tariffs, predicate=lambda t: t.get("date_end") is None
+        ), lambda: _tariffs_copy_query(Tariff.date_end.is_(None))),
+    },
+    summary=TariffSummary
+)
+
+
+# ========== ПЕРЕВОЗКИ ==========
+
+SHIPMENT_STATUS_NAMES = {
+    "pending": "⏳ Ожидает",
+    "in_transit": "🚛 В пути",
+    "delivered": "✅ Доставлено",
+    "cancelled": "❌ Отменено"
+}
+
+
+def _shipment_car(shipment: Dict) -> str:
+    car_info = shipment.get("car_info") or {}
+    return f"{car_info.get('brand', '')} ({car_info.get('license_plate', '')})"
+
+
+def _shipment_driver(shipment: Dict) -> str:
+    driver_info = shipment.get("driver_info") or {}
+    driver_text = f"{driver_info.get('full_name', '')}"
+    if driver_info.get("license_number"):
+        driver_text += f" ({driver_info['license_number']})"
+    return driver_text
+
+
+def _shipment_route(shipment: Dict) -> str:
+    route_info = shipment.get("route_info") or {}
+    if route_info.get("origin") and route_info.get("destination"):
+        return f"{route_info['origin']} → {route_info['destination']}"
+    return ""
+
+
+def _shipment_fill(shipment: Dict) -> Optional[str]:
+    """Подсветка строк по статусу"""
+    status = shipment.get("status")
+    if status == "delivered":
+        return FILL_DELIVERED
+    if status == "cancelled":
+        return FILL_CANCELLED
+    return None
+
+
+def _as_date(value) -> datetime.date:
+    """Дата из ГГГГ-ММ-ДД (параметры фильтров из командной строки - строки)"""
+    return datetime.date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _day_after(value) -> datetime.date:
+    """Следующий день: граница "строго до" для периода, включающего день value"""
+    return _as_date(value) + datetime.timedelta(days=1)
+
+
+def _shipments_copy_query(include_archived: bool = True, **filters):
+    """
+    Перевозки для COPY: столбцы в порядке SHIPMENT_EXPORT.
+
+    Строки - тот же запрос, что у iter_shipments_for_export
+    (build_shipment_rows_query, с архивом - UNION ALL), снаружи текст и
+    стоимость собираются в SQL так же, как в столбцах спецификации.
+    """
+    rows = build_shipment_rows_query(filters, include_archived).subquery("shipments")
+    return (
+        select(
+            cast(rows.c.id, String),
+            func.to_char(rows.c.shipment_date, _SQL_DATETIME),
+            rows.c.cargo_weight,
+            case(
+                *[(rows.c.status == status, name) for status, name in SHIPMENT_STATUS_NAMES.items()],
+                else_=SHIPMENT_STATUS_NAMES["pending"]
+            ),
+            func.concat(rows.c.brand, " (", rows.c.license_plate, ")"),
+            func.concat(rows.c.full_name, case(
+                (rows.c.license_number.isnot(None), func.concat(" (", rows.c.license_number, ")")),
+                else_=""
+            )),
+            case(
+                (and_(rows.c.origin.isnot(None), rows.c.destination.isnot(None)),
+                 func.concat(rows.c.origin, " → ", rows.c.destination)),
+                else_=""
+            ),
+            func.coalesce(rows.c.distance_km, 0),
+            func.coalesce(rows.c.price_per_km, 0),
+            func.coalesce(rows.c.min_price, 0),
+            func.coalesce(func.greatest(rows.c.distance_km * rows.c.price_per_km,
+                                        func.coalesce(rows.c.min_price, 0)), 0),
+        )
+        .order_by(rows.c.shipment_date.desc(), rows.c.id.desc())
+    )
+
+
+def _shipments_source(**filters) -> ServiceSource:
+    """Перевозки вместе с архивом (shipment_archive): выгрузки за прошлые периоды полные"""
+    return ServiceSource(iter_shipments_for_export, include_archived=True, **filters)
+
+
+class ShipmentSummary(ExportSummary):
+    count_label = "Количество перевозок"
+
+    def __init__(self, filter_label: str):
+        super().__init__(filter_label)
+        self.total_cost = 0
+        self.total_weight = 0
+        self.total_distance = 0
+        self.status_counts: Dict[str, int] = {}
+
+    def add(self, record: Dict):
+        super().add(record)
+        route_info = record.get("route_info") or {}
+        self.total_cost += record.get("total_cost") or 0
+        self.total_weight += record.get("cargo_weight") or 0
+        self.total_distance += route_info.get("distance_km") or 0
+
+        status = record.get("status", "pending")
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def extra_lines(self) -> List[List[Any]]:
+        lines = [
+            [f"Ожидает: {self.status_counts.get('pending', 0)}",
+             f"В пути: {self.status_counts.get('in_transit', 0)}",
+             f"Доставлено: {self.status_counts.get('delivered', 0)}",
+             f"Отменено: {self.status_counts.get('cancelled', 0)}"],
+            [f"Общий вес: {self.total_weight:.1f} кг",
+             f"Общая дистанция: {self.total_distance:.0f} км",
+             f"Общая стоимость: {self.total_cost:.2f} руб"],
+        ]
+
+        averages = []
+        if self.total_weight > 0:
+            averages.append(f"Средняя стоимость за кг: {self.total_cost / self.total_weight:.2f} руб/кг")
+        if self.total_distance > 0:
+            averages.append(f"Средняя стоимость за км: {self.total_cost / self.total_distance:.2f} руб/км")
+        if averages:
+            lines.append(averages)
+        return lines
+
+
+SHIPMENT_EXPORT = ExportSpec(
+    name="перевозки",
+    sheet_title="Перевозки",
+    title_text="ОТЧЕТ ПО ПЕРЕВОЗКАМ",
+    columns=[
+        Column("ID", "id"),
+        Column("Дата", lambda s: _format_datetime(s.get("shipment_date"))),
+        Column("Вес (кг)", "cargo_weight", '#,##0.0" кг"'),
+        Column("Статус", lambda s: SHIPMENT_STATUS_NAMES.get(s.get("status"), "⏳ Ожидает")),
+        Column("Автомобиль", _shipment_car),
+        Column("Водитель", _shipment_driver),
+        Column("Маршрут", _shipment_route),
+        Column("Расстояние (км)", lambda s: (s.get("route_info") or {}).get("distance_km") or 0,
+               '#,##0" км"'),
+        Column("Тариф (руб/км)", lambda s: (s.get("tariff_info") or {}).get("price_per_km", 0),
+               '#,##0.00" руб"'),
+        Column("Мин. цена", lambda s: (s.get("tariff_info") or {}).get("min_price", 0),
+               '#,##0" руб"'),
+        Column("Стоимость (руб)", "total_cost", '#,##0.00" руб"'),
+    ],
+    filters={
+        # Архив (завершенные перевозки старше года) входит во все варианты, кроме текущих
+        "all": ExportFilter("Все перевозки", lambda: _shipments_source(), lambda: _shipments_copy_query()),
+        "current": ExportFilter("Текущие перевозки (ожидает/в пути)", lambda: ServiceSource(
+            iter_shipments_for_export, status=["pending", "in_transit"]
+        ), lambda: _shipments_copy_query(include_archived=False, status=["pending", "in_transit"])),
+        "completed": ExportFilter("Завершенные перевозки", lambda: _shipments_source(
+            status=["delivered"]
+        ), lambda: _shipments_copy_query(status=["delivered"])),
+        "cancelled": ExportFilter("Отмененные перевозки", lambda: _shipments_source(
+            status=["cancelled"]
+        ), lambda: _shipments_copy_query(status=["cancelled"])),
+        "by_status": ExportFilter(
+            lambda status="pending": f"Перевозки по статусу: {SHIPMENT_STATUS_NAMES.get(status, status)}",
+            lambda status="pending": _shipments_source(status=[status]),
+            lambda status="pending": _shipments_copy_query(status=[status])
+        ),
+        # date_to - последний день периода включительно
+        "period": ExportFilter(
+            lambda date_from, date_to: f"Перевозки с {date_from} по {date_to}",
+            lambda date_from, date_to: _shipments_source(
+                date_from=_as_date(date_from), date_before=_day_after(date_to)
+            ),
+            lambda date_from, date_to: _shipments_copy_query(
+                date_from=_as_date(date_from), date_before=_day_after(date_to)
+            )
+        ),
+    },
+    row_fill=_shipment_fill,
+    fills=[FILL_DELIVERED, FILL_CANCELLED],
+    summary=ShipmentSummary
+)
+
+
+# ========== ВОДИТЕЛИ ==========
+
+def _driver_car(driver: Dict, key: str, default: str = "") -> str:
+    return (driver.get("car_info") or {}).get(key) or default
+
+
+def _heavy_car_drivers_copy_query(min_capacity: float = 10):
+    """
+    Отчет HEAVY_CARS_DRIVERS_SQL для COPY: тот же SQL отчета как подзапрос,
+    снаружи только форматируется дата приема (как в HEAVY_CAR_DRIVER_EXPORT).
+    """
+    report = (
+        text(HEAVY_CARS_DRIVERS_SQL)
+        .bindparams(min_capacity=min_capacity)
+        .columns(*[column(name) for name in (
+            "full_name", "license_number", "license_category", "experience_years", "hire_date",
+            "brand", "license_plate", "load_capacity", "body_type", "fuel_consumption"
+        )])
+        .subquery("report")
+    )
+    return select(
+        report.c.full_name,
+        report.c.license_number,
+        report.c.license_category,
+        report.c.experience_years,
+        func.to_char(report.c.hire_date, "DD.MM.YYYY"),
+        report.c.brand,
+        report.c.license_plate,
+        report.c.load_capacity,
+        report.c.body_type,
+        report.c.fuel_consumption,
+    ).order_by(report.c.load_capacity.desc())
+
+
+def _format_date(value: Any) -> str:
+    if not value:
+        return ""
+    if hasattr(value, "strftime"):
+        return value.strftime("%d.%m.%Y")
+    return str(value)
+
+
+DRIVER_EXPORT = ExportSpec(
+    name="Все_водители",
+    sheet_title="Водители",
+    columns=[
+        Column("ID", "id"),
+        Column("ФИО", "full_name"),
+        Column("Номер прав", "license_number"),
+        Column("Категория", "license_category"),
+        Column("Стаж (лет)", "experience_years", value_type=int),
+        Column("Дата приема", "hire_date"),
+        Column("ID автомобиля", "car_id"),
+        Column("Автомобиль", lambda d: _driver_car(d, "full_info", "Не назначен")),
+        Column("Марка автомобиля", lambda d: _driver_car(d, "brand")),
+        Column("Госномер", lambda d: _driver_car(d, "license_plate")),
+    ],
+    filters={
+        "all": ExportFilter("Все водители", lambda: ServiceSource(get_all_drivers_with_cars)),
+    }
+)
+
+EXPERIENCED_DRIVER_EXPORT = ExportSpec(
+    name="Водители_со_стажем_более_10_лет",
+    sheet_title="Опытные водители",
+    columns=[
+        Column("ID", "id"),
+        Column("ФИО", "full_name"),
+        Column("Номер прав", "license_number"),
+        Column("Категория", "license_category"),
+        Column("Общий стаж (лет)", "experience_years", value_type=int),
+        Column("Дата приема", "hire_date"),
+        Column("ID автомобиля", "car_id"),
+        Column("Автомобиль", lambda d: _driver_car(d, "full_info", "Не назначен")),
+        Column("Статус", lambda d: "Опытный водитель"),
+    ],
+    filters={
+        "all": ExportFilter("Водители со стажем > 10 лет", lambda: ServiceSource(
+            get_all_drivers_with_cars, predicate=lambda d: d.get("experience_years", 0) > 10
+        )),
+    }
+)
+
+DRIVER_WITHOUT_CAR_EXPORT = ExportSpec(
+    name="Водители_без_автомобиля",
+    sheet_title="Водители без авто",
+    columns=[
+        Column("ID", "id"),
+        Column("ФИО", "full_name"),
+        Column("Номер прав", "license_number"),
+        Column("Категория", "license_category"),
+        Column("Стаж (лет)", "experience_years", value_type=int),
+        Column("Дата приема", "hire_date"),
+        Column("Статус", lambda d: "Требуется автомобиль"),
+        Column("Приоритет", lambda d: "Высокий" if d.get("experience_years", 0) > 5 else "Средний"),
+        Column("Рекомендация", lambda d: "Назначить автомобиль"),
+    ],
+    filters={
+        "all": ExportFilter("Водители без автомобиля", lambda: ServiceSource(
+            get_all_drivers_with_cars, predicate=lambda d: not d.get("car_id")
+        )),
+    }
+)
+
+HEAVY_CAR_DRIVER_EXPORT = ExportSpec(
+    name="Водители_с_тяжелыми_машинами",
+    sheet_title="Водители с машинами >10т",
+    columns=[
+        Column("ФИО", "full_name"),
+        Column("Номер прав", "license_number"),
+        Column("Категория прав", "license_category"),
+        Column("Стаж (лет)", "experience_years", value_type=int),
+        Column("Дата приема", lambda d: _format_date(d.get("hire_date"))),
+        Column("Марка автомобиля", "brand"),
+        Column("Госномер", "license_plate"),
+        Column("Грузоподъемность (т)", "load_capacity", "0.0"),
+        Column("Тип кузова", "body_type"),
+        Column("Расход топлива (л/100км)", "fuel_consumption", "0.0"),
+    ],
+    filters={
+        "all": ExportFilter(
+            lambda min_capacity=10: f"Водители с машинами грузоподъемностью более {min_capacity} т",
+            lambda min_capacity=10: SqlSource(HEAVY_CARS_DRIVERS_SQL, {"min_capacity": min_capacity}),
+            _heavy_car_drivers_copy_query
+        ),
+    }
+)
+
+
+# Все выгрузки по имени (для диалогов и командной строки)
+EXPORTS: Dict[str, ExportSpec] = {
+    "cars": CAR_EXPORT,
+    "routes": ROUTE_EXPORT,
+    "tariffs": TARIFF_EXPORT,
+    "shipments": SHIPMENT_EXPORT,
+    "drivers": DRIVER_EXPORT,
+    "experienced_drivers": EXPERIENCED_DRIVER_EXPORT,
+    "drivers_without_car": DRIVER_WITHOUT_CAR_EXPORT,
+    "heavy_car_drivers": HEAVY_CAR_DRIVER_EXPORT,
+}
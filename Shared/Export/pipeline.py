@@ -0,0 +1,123 @@
+# Shared/Export/pipeline.py
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from Shared.Export.copy import copy_query_to_file
+from Shared.Export.sinks import CsvSink, ExportSink, make_sink
+from Shared.Export.spec import ExportSpec
+
+
+# Форматы для диалогов сохранения: (подпись, формат)
+EXPORT_FORMATS: List[Tuple[str, str]] = [
+    ("Excel (*.xlsx)", "xlsx"),
+    ("CSV (*.csv)", "csv"),
+    ("Parquet (*.parquet)", "parquet"),
+]
+
+
+def run_export(session: Optional[Session], spec: ExportSpec, sink: ExportSink,
+               filter_type: str = "all", source=None, **params) -> int:
+    """
+    Выгрузить данные: источник -> столбцы спецификации -> приемник.
+
+    Args:
+        session: SQLAlchemy сессия
+        spec: Описание выгрузки
+        sink: Приемник (XLSX, CSV, Parquet)
+        filter_type: Вариант выгрузки из spec.filters
+        source: Свой источник вместо источника варианта выгрузки
+        **params: Параметры варианта (например, cargo_type, status)
+
+    Returns:
+        Количество выгруженных строк. Если строк нет, файл не создается.
+    """
+    export_filter = spec.get_filter(filter_type)
+    if source is None:
+        source = export_filter.make_source(**params)
+
+    summary = spec.summary(export_filter.describe(**params))
+
+    sink.open(spec)
+    try:
+        for record in source.rows(session):
+            fill = spec.row_fill(record) if spec.row_fill else None
+            sink.write(spec.row(record), fill)
+            summary.add(record)
+    except Exception:
+        sink.discard()
+        raise
+
+    if summary.count == 0:
+        sink.close_empty()
+        return 0
+
+    sink.close(summary.footer())
+    return summary.count
+
+
+def run_copy_export(session: Session, spec: ExportSpec, file_path: str,
+                    filter_type: str = "all", **params) -> int:
+    """
+    Выгрузить в CSV через COPY на стороне БД.
+
+    Столбцы запроса варианта подписываются заголовками спецификации.
+    Если у варианта нет copy_query, выгрузка идет обычным путем через CsvSink.
+    """
+    export_filter = spec.get_filter(filter_type)
+    if export_filter.copy_query is None:
+        return run_export(session, spec, CsvSink(file_path), filter_type, **params)
+
+    query = export_filter.copy_query(**params)
+    query = query.with_only_columns(
+        *[column.label(header) for column, header in zip(query.selected_columns, spec.headers)],
+        maintain_column_froms=True
+    )
+
+    count = copy_query_to_file(session, query, file_path)
+    if count == 0 and os.path.exists(file_path):
+        os.remove(file_path)
+    return count
+
+
+def count_rows(session: Session, spec: ExportSpec, filter_type: str = "all", **params) -> Optional[int]:
+    """
+    Посчитать строки варианта выгрузки в БД (по copy_query), не читая сами строки.
+
+    Returns:
+        Количество строк или None, если у варианта нет copy_query
+    """
+    export_filter = spec.get_filter(filter_type)
+    if export_filter.copy_query is None:
+        return None
+
+    query = export_filter.copy_query(**params).order_by(None)
+    return session.execute(select(func.count()).select_from(query.subquery())).scalar()
+
+
+def export_to_file(session: Session, spec: ExportSpec, export_format: str, file_path: str,
+                   filter_type: str = "all", **params) -> int:
+    """
+    Выгрузить в файл выбранного формата.
+
+    xlsx и parquet строятся из записей источника, csv - через COPY.
+
+    Returns:
+        Количество выгруженных строк (0 - файл не создан)
+    """
+    if export_format == CsvSink.extension:
+        return run_copy_export(session, spec, file_path, filter_type, **params)
+    return run_export(session, spec, make_sink(export_format, file_path), filter_type, **params)
+
+
+def default_export_path(filename: str, extension: str = "xlsx") -> str:
+    """Путь в папке загрузок пользователя: {filename}_{timestamp}.{extension}"""
+    downloads_path = Path.home() / "Downloads"
+    downloads_path.mkdir(exist_ok=True)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return str(downloads_path / f"{filename}_{timestamp}.{extension}")
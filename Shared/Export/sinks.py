@@ -0,0 +1,183 @@
+# Shared/Export/sinks.py
+import csv
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from Shared.Export.spec import ExportSpec
+from Shared.excel_stream import StreamingExcelWriter
+
+
+class ExportSink:
+    """Приемник выгрузки: open -> write... -> close (или discard, если писать нечего)"""
+
+    extension = ""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def open(self, spec: ExportSpec):
+        raise NotImplementedError
+
+    def write(self, values: Sequence[Any], fill: Optional[str] = None):
+        raise NotImplementedError
+
+    def close(self, footer: Optional[List[List[Any]]] = None):
+        raise NotImplementedError
+
+    def discard(self):
+        """Прервать выгрузку, не оставляя файл"""
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
+
+    def close_empty(self):
+        """Завершить выгрузку, в которой не оказалось строк (по умолчанию файл не создается)"""
+        self.discard()
+
+
+class XlsxSink(ExportSink):
+    """Excel через потоковый writer (стили, ширина столбцов, подвал со статистикой)"""
+
+    extension = "xlsx"
+
+    def __init__(self, file_path: str,
+                 style_combos: Optional[Sequence[Tuple[Optional[str], Optional[str]]]] = None,
+                 keep_empty: bool = False):
+        """
+        style_combos - заранее закрепленные стили (см. StreamingExcelWriter.fix_styles),
+        keep_empty - сохранять лист с одними заголовками, если строк нет.
+        """
+        super().__init__(file_path)
+        self.style_combos = style_combos
+        self.keep_empty = keep_empty
+
+    def open(self, spec: ExportSpec):
+        self.writer = StreamingExcelWriter(self.file_path)
+        self.sheet = self.writer.create_sheet(
+            spec.sheet_title, spec.headers, spec.number_formats, spec.title_text
+        )
+        if self.style_combos is not None:
+            self.writer.fix_styles(self.style_combos)
+
+    def write(self, values: Sequence[Any], fill: Optional[str] = None):
+        self.sheet.append(values, fill=fill)
+
+    def close(self, footer: Optional[List[List[Any]]] = None):
+        self.sheet.close(footer)
+        self.writer.save()
+
+    def discard(self):
+        # Книга сохраняется только в close(), на диске ничего нет
+        pass
+
+    def close_empty(self):
+        if self.keep_empty:
+            self.close()
+
+
+class CsvSink(ExportSink):
+    """
+    CSV только с данными (без подвала).
+
+    По умолчанию разделитель ";" и BOM - такой файл Excel открывает с кириллицей без мастера импорта.
+    """
+
+    extension = "csv"
+
+    def __init__(self, file_path: str, delimiter: str = ";", encoding: str = "utf-8-sig"):
+        super().__init__(file_path)
+        self.delimiter = delimiter
+        self.encoding = encoding
+
+    def open(self, spec: ExportSpec):
+        self.file = open(self.file_path, "w", newline="", encoding=self.encoding)
+        self.csv_writer = csv.writer(self.file, delimiter=self.delimiter)
+        self.csv_writer.writerow(spec.headers)
+
+    def write(self, values: Sequence[Any], fill: Optional[str] = None):
+        self.csv_writer.writerow(values)
+
+    def close(self, footer: Optional[List[List[Any]]] = None):
+        self.file.close()
+
+    def discard(self):
+        self.file.close()
+        super().discard()
+
+
+class ParquetSink(ExportSink):
+    """
+    Parquet только с данными (без подвала).
+
+    Схема - из типов столбцов спецификации (Column.value_type). Значения
+    копятся по столбцам и сбрасываются группой строк каждые row_group_size
+    строк, поэтому в памяти не больше одной группы.
+    """
+
+    extension = "parquet"
+
+    def __init__(self, file_path: str, compression: str = "snappy", row_group_size: int = 50_000):
+        super().__init__(file_path)
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.writer = None
+
+    def open(self, spec: ExportSpec):
+        # pyarrow нужен до чтения источника: без него выгрузка падает сразу
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Для экспорта в Parquet установите пакет pyarrow")
+
+        arrow_types = {str: pa.string(), int: pa.int64(), float: pa.float64()}
+        self.pa = pa
+        self.schema = pa.schema([
+            (header, arrow_types[value_type])
+            for header, value_type in zip(spec.headers, spec.value_types)
+        ])
+        self.text_columns = [value_type is str for value_type in spec.value_types]
+        self.columns: List[List[Any]] = [[] for _ in spec.headers]
+        self.writer = pq.ParquetWriter(self.file_path, self.schema, compression=self.compression)
+
+    def write(self, values: Sequence[Any], fill: Optional[str] = None):
+        for column, is_text, value in zip(self.columns, self.text_columns, values):
+            if is_text and value is not None and not isinstance(value, str):
+                value = str(value)
+            column.append(value)
+        if len(self.columns[0]) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self.columns[0]:
+            return
+        self.writer.write_table(self.pa.Table.from_arrays([
+            self.pa.array(column, type=field.type)
+            for column, field in zip(self.columns, self.schema)
+        ], schema=self.schema))
+        self.columns = [[] for _ in self.columns]
+
+    def close(self, footer: Optional[List[List[Any]]] = None):
+        self._flush()
+        self.writer.close()
+        self.writer = None
+
+    def discard(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        super().discard()
+
+
+SINKS: Dict[str, Type[ExportSink]] = {
+    XlsxSink.extension: XlsxSink,
+    CsvSink.extension: CsvSink,
+    ParquetSink.extension: ParquetSink,
+}
+
+
+def make_sink(export_format: str, file_path: str) -> ExportSink:
+    """Создать приемник по формату: xlsx, csv, parquet"""
+    sink_class = SINKS.get(export_format)
+    if sink_class is None:
+        raise ValueError(f"Неизвестный формат экспорта: {export_format}")
+    return sink_class(file_path)
@@ -0,0 +1,51 @@
+# Shared/Export/sources.py
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+class ServiceSource:
+    """
+    Источник из сервисной функции вида func(session, ...) -> список или генератор словарей.
+
+    predicate - дополнительный фильтр на стороне Python.
+    """
+
+    def __init__(self, func: Callable[..., Iterable[Dict]], *args,
+                 predicate: Optional[Callable[[Dict], bool]] = None, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.predicate = predicate
+
+    def rows(self, session: Session) -> Iterator[Dict]:
+        for record in self.func(session, *self.args, **self.kwargs):
+            if self.predicate is None or self.predicate(record):
+                yield record
+
+
+class SqlSource:
+    """Источник из SQL запроса, строки читаются серверным курсором пачками"""
+
+    def __init__(self, sql: str, params: Optional[Dict[str, Any]] = None, batch_size: int = 1000):
+        self.sql = sql
+        self.params = params or {}
+        self.batch_size = batch_size
+
+    def rows(self, session: Session) -> Iterator[Dict]:
+        result = session.execute(
+            text(self.sql), self.params,
+            execution_options={"yield_per": self.batch_size}
+        )
+        yield from result.mappings()
+
+
+class IterableSource:
+    """Источник из уже подготовленных записей (список, генератор)"""
+
+    def __init__(self, records: Iterable[Dict]):
+        self.records = records
+
+    def rows(self, session: Optional[Session] = None) -> Iterator[Dict]:
+        yield from self.records
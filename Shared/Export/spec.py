@@ -0,0 +1,131 @@
+# Shared/Export/spec.py
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+
+class Column:
+    """
+    Описание столбца выгрузки.
+
+    value - ключ записи источника или функция record -> значение.
+    value_type - тип значений для форматов со схемой (Parquet): str, int или
+    float; по умолчанию float у столбцов с number_format, иначе str.
+    """
+
+    def __init__(self, header: str, value: Union[str, Callable[[Dict], Any]],
+                 number_format: Optional[str] = None, value_type: Optional[type] = None):
+        self.header = header
+        self.number_format = number_format
+        self.value_type = value_type or (float if number_format else str)
+
+        if isinstance(value, str):
+            self.getter = lambda record: record.get(value)
+        else:
+            self.getter = value
+
+    def extract(self, record: Dict) -> Any:
+        """Получить значение ячейки из записи"""
+        value = self.getter(record)
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return value
+
+
+class ExportSummary:
+    """
+    Подвал выгрузки: фильтр, количество строк, дата экспорта.
+
+    Наследники накапливают свою статистику в add() и дописывают строки в extra_lines().
+    """
+
+    count_label = "Количество записей"
+
+    def __init__(self, filter_label: str):
+        self.filter_label = filter_label
+        self.count = 0
+
+    def add(self, record: Dict):
+        self.count += 1
+
+    def extra_lines(self) -> List[List[Any]]:
+        return []
+
+    def footer(self) -> List[List[Any]]:
+        lines = [[f"Фильтр: {self.filter_label}", f"{self.count_label}: {self.count}"]]
+        lines += self.extra_lines()
+        lines.append([f"Экспортировано: {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}"])
+        return lines
+
+
+class ExportFilter:
+    """
+    Вариант выгрузки (то, что пользователь выбирает в диалоге).
+
+    label - строка (может содержать {параметры}) или функция **params -> str,
+    make_source - функция **params -> источник данных,
+    copy_query - функция **params -> SQLAlchemy select с теми же столбцами,
+    что и у спецификации (для выгрузки в CSV через COPY на стороне БД).
+    """
+
+    def __init__(self, label: Union[str, Callable[..., str]], make_source: Callable[..., Any],
+                 copy_query: Optional[Callable[..., Any]] = None):
+        self.label = label
+        self.make_source = make_source
+        self.copy_query = copy_query
+
+    def describe(self, **params) -> str:
+        if callable(self.label):
+            return self.label(**params)
+        return self.label.format(**params)
+
+
+class ExportSpec:
+    """Декларативное описание выгрузки сущности"""
+
+    def __init__(self, name: str, sheet_title: str, columns: Sequence[Column],
+                 filters: Dict[str, ExportFilter],
+                 title_text: Optional[str] = None,
+                 row_fill: Optional[Callable[[Dict], Optional[str]]] = None,
+                 fills: Sequence[str] = (),
+                 summary: Type[ExportSummary] = ExportSummary):
+        """fills - все цвета, которые может вернуть row_fill"""
+        self.name = name
+        self.sheet_title = sheet_title
+        self.columns = list(columns)
+        self.filters = filters
+        self.title_text = title_text
+        self.row_fill = row_fill
+        self.fills = list(fills)
+        self.summary = summary
+
+    @property
+    def headers(self) -> List[str]:
+        return [column.header for column in self.columns]
+
+    @property
+    def number_formats(self) -> List[Optional[str]]:
+        return [column.number_format for column in self.columns]
+
+    @property
+    def value_types(self) -> List[type]:
+        return [column.value_type for column in self.columns]
+
+    @property
+    def style_combos(self) -> List[Tuple[Optional[str], Optional[str]]]:
+        """Все комбинации (формат, заливка), которые встретятся в ячейках данных"""
+        combos = []
+        for fill in [None] + self.fills:
+            for number_format in self.number_formats:
+                if (number_format, fill) not in combos:
+                    combos.append((number_format, fill))
+        return combos
+
+    def get_filter(self, filter_type: str) -> ExportFilter:
+        """Получить вариант выгрузки (неизвестный - как первый, обычно "all")"""
+        if filter_type in self.filters:
+            return self.filters[filter_type]
+        return next(iter(self.filters.values()))
+
+    def row(self, record: Dict) -> List[Any]:
+        return [column.extract(record) for column in self.columns]
@@ -0,0 +1,140 @@
+# Shared/Export/workbook.py
+"""
+Сводная книга Excel: несколько выгрузок на отдельных листах одного файла.
+
+Листы строятся параллельно в отдельных процессах (у каждого свое
+подключение к БД): процесс пишет свою часть как книгу из одного листа.
+Главный процесс создает пустую книгу с нужными листами и заменяет XML
+каждого листа на XML из соответствующей части.
+
+Перенос XML корректен, потому что:
+- строки openpyxl пишет прямо в ячейки (inlineStr), общей таблицы строк нет;
+- стили всех книг закрепляются одинаковым списком (формат, заливка) через
+  StreamingExcelWriter.fix_styles, поэтому индексы s="..." в ячейках совпадают.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from Shared.DataBaseSession import SyncDatabaseSessions
+from Shared.Export.entities import EXPORTS
+from Shared.Export.pipeline import run_export
+from Shared.Export.sinks import XlsxSink
+from Shared.excel_stream import StreamingExcelWriter
+
+
+# Лист книги: (сущность из EXPORTS, вариант выгрузки, параметры варианта)
+SheetRequest = Tuple[str, str, Dict[str, Any]]
+
+# Отчет на конец месяца
+MONTH_END_SHEETS: List[SheetRequest] = [
+    ("cars", "all", {}),
+    ("drivers", "all", {}),
+    ("routes", "all", {}),
+    ("tariffs", "active", {}),
+    ("shipments", "all", {}),
+]
+
+_SHEET_PART = "xl/worksheets/sheet{}.xml"
+
+
+def workbook_style_combos(sheets: Sequence[SheetRequest]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """Общий список стилей (формат, заливка) для всех листов книги"""
+    combos = []
+    for entity, _, _ in sheets:
+        for combo in EXPORTS[entity].style_combos:
+            if combo not in combos:
+                combos.append(combo)
+    return combos
+
+
+def _render_sheet(entity: str, filter_type: str, params: Dict[str, Any],
+                  combos: List[Tuple[Optional[str], Optional[str]]], file_path: str) -> int:
+    """Построить один лист в отдельной книге (выполняется в дочернем процессе)"""
+    database = SyncDatabaseSessions()
+    session = database.get_session()
+    try:
+        sink = XlsxSink(file_path, style_combos=combos, keep_empty=True)
+        return run_export(session, EXPORTS[entity], sink, filter_type, **params)
+    finally:
+        session.close()
+        database.engine.dispose()
+
+
+def _write_skeleton(file_path: str, sheets: Sequence[SheetRequest],
+                    combos: List[Tuple[Optional[str], Optional[str]]]):
+    """Книга с пустыми листами и теми же стилями, что у частей"""
+    writer = StreamingExcelWriter(file_path)
+    for index, (entity, _, _) in enumerate(sheets):
+        spec = EXPORTS[entity]
+        sheet = writer.create_sheet(spec.sheet_title, spec.headers, spec.number_formats, spec.title_text)
+        if index == 0:
+            writer.fix_styles(combos)
+        sheet.close()
+    writer.save()
+
+
+def _assemble(file_path: str, skeleton_path: str, part_paths: List[str]):
+    """Собрать итоговый файл: части книги-заготовки + XML листов из частей"""
+    replaced = {_SHEET_PART.format(index): path for index, path in enumerate(part_paths, 1)}
+
+    with zipfile.ZipFile(skeleton_path) as skeleton, \
+            zipfile.ZipFile(file_path, "w", zipfile.ZIP_DEFLATED) as result:
+        for item in skeleton.infolist():
+            part_path = replaced.get(item.filename)
+            if part_path is None:
+                result.writestr(item, skeleton.read(item.filename))
+                continue
+
+            with zipfile.ZipFile(part_path) as part, \
+                    part.open(_SHEET_PART.format(1)) as src, \
+                    result.open(item.filename, "w", force_zip64=True) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def build_workbook(file_path: str, sheets: Sequence[SheetRequest] = MONTH_END_SHEETS,
+                   max_workers: Optional[int] = None) -> Dict[str, int]:
+    """
+    Построить сводную книгу, по листу на каждую выгрузку.
+
+    Args:
+        file_path: Путь к итоговому файлу
+        sheets: Листы (сущность, вариант выгрузки, параметры)
+        max_workers: Число процессов (по умолчанию - по листу на процесс, не больше числа ядер)
+
+    Returns:
+        {название листа: количество строк}
+    """
+    if not sheets:
+        raise ValueError("Не выбрано ни одного листа")
+
+    combos = workbook_style_combos(sheets)
+    if max_workers is None:
+        max_workers = min(len(sheets), os.cpu_count() or 1)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        part_paths = [os.path.join(tmp_dir, f"part_{index}.xlsx") for index in range(len(sheets))]
+
+        # spawn: дочерние процессы не наследуют ни Qt, ни открытые соединения пула
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+            futures = [
+                executor.submit(_render_sheet, entity, filter_type, params, combos, part_path)
+                for (entity, filter_type, params), part_path in zip(sheets, part_paths)
+            ]
+
+            skeleton_path = os.path.join(tmp_dir, "skeleton.xlsx")
+            _write_skeleton(skeleton_path, sheets, combos)
+
+            counts = [future.result() for future in futures]
+
+        _assemble(file_path, skeleton_path, part_paths)
+
+    return {
+        EXPORTS[entity].sheet_title: count
+        for (entity, _, _), count in zip(sheets, counts)
+    }
@@ -1,11 +1,14 @@
 # Utils/excel_export.py
-import pandas as pd
+import itertools
 import os
-from datetime import datetime
-from pathlib import Path
-from typing import List, Dict, Any
+from typing import Dict, Iterable
 import logging
 
+from Shared.Export.pipeline import run_export, default_export_path
+from Shared.Export.sinks import XlsxSink
+from Shared.Export.sources import IterableSource
+from Shared.Export.spec import Column, ExportFilter, ExportSpec
+
 logger = logging.getLogger(__name__)
 
 
@@ -13,12 +16,12 @@ class ExcelExporter:
     """Утилита для экспорта данных в Excel"""
 
     @staticmethod
-    def export_to_excel(data: List[Dict], filename: str, sheet_name: str = "Данные") -> str:
+    def export_to_excel(data: Iterable[Dict], filename: str, sheet_name: str = "Данные") -> str:
         """
         Экспорт данных в Excel файл
 
         Args:
-            data: Список словарей с данными
+            data: Список (или генератор) словарей с данными
             filename: Имя файла (без расширения)
             sheet_name: Название листа
 
@@ -26,35 +29,27 @@ class ExcelExporter:
             Путь к сохраненному файлу
         """
         try:
-            # Создаем DataFrame
-            df = pd.DataFrame(data)
+            rows = iter(data)
+            first = next(rows, None)
 
-            if df.empty:
+            if first is None:
                 raise ValueError("Нет данных для экспорта")
 
-            # Создаем имя файла с timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename_with_ts = f"{filename}_{timestamp}.xlsx"
+            # Столбцы берем из ключей первой строки
+            spec = ExportSpec(
+                name=filename,
+                sheet_title=sheet_name,
+                columns=[Column(str(key), key) for key in first.keys()],
+                filters={"all": ExportFilter(sheet_name, lambda: None)}
+            )
 
             # Путь для сохранения (папка загрузок пользователя)
-            downloads_path = Path.home() / "Downloads"
-            downloads_path.mkdir(exist_ok=True)
-
-            file_path = downloads_path / filename_with_ts
-
-            # Сохраняем в Excel
-            with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-
-                # Автонастройка ширины столбцов
-                worksheet = writer.sheets[sheet_name]
-                for column in df:
-                    column_width = max(df[column].astype(str).map(len).max(), len(column)) + 2
-                    col_idx = df.columns.get_loc(column)
-                    worksheet.column_dimensions[chr(65 + col_idx)].width = min(column_width, 50)
+            file_path = default_export_path(filename, XlsxSink.extension)
+            run_export(None, spec, XlsxSink(file_path),
+                       source=IterableSource(itertools.chain([first], rows)))
 
             logger.info(f"Файл успешно сохранен: {file_path}")
-            return str(file_path)
+            return file_path
 
         except Exception as e:
             logger.error(f"Ошибка при экспорте в Excel: {e}")
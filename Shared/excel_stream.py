@@ -0,0 +1,220 @@
+# Shared/excel_stream.py
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+
+# Цвета подсветки строк
+FILL_HEADER = "2E86C1"
+FILL_DELIVERED = "D5F5E3"
+FILL_CANCELLED = "FADBD8"
+
+# Максимум строк на листе Excel
+EXCEL_MAX_ROWS = 1048576
+
+_THIN = Side(style="thin")
+_THIN_BORDER = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
+
+
+class StreamingExcelWriter:
+    """
+    Потоковая запись Excel через openpyxl в режиме write_only.
+
+    Строки не хранятся в памяти целиком: они сразу сериализуются в XML листа.
+    Стили регистрируются один раз на книгу как именованные (NamedStyle),
+    а ячейки ссылаются на них по имени.
+
+    В режиме write_only ширину столбцов нужно задать до записи первой строки,
+    поэтому первые width_sample_rows строк буферизуются, по ним (и заголовкам)
+    считается ширина, после чего буфер сбрасывается и дальше строки пишутся
+    напрямую. Память ограничена размером этого окна.
+    """
+
+    def __init__(self, file_path: str, width_sample_rows: int = 500, max_width: int = 50):
+        self.file_path = file_path
+        self.width_sample_rows = width_sample_rows
+        self.max_width = max_width
+
+        self.wb = Workbook(write_only=True)
+        self._styles: Dict[tuple, str] = {}
+        self._styles_fixed = False
+        self._register_base_styles()
+
+    # ========== СТИЛИ ==========
+
+    def _register_base_styles(self):
+        """Зарегистрировать общие стили книги"""
+        title = NamedStyle(name="export_title")
+        title.font = Font(bold=True, size=16, color="2C3E50")
+        title.alignment = Alignment(horizontal="left", vertical="center")
+        self.wb.add_named_style(title)
+
+        header = NamedStyle(name="export_header")
+        header.font = Font(bold=True, size=12, color="FFFFFF")
+        header.fill = PatternFill(start_color=FILL_HEADER, end_color=FILL_HEADER, fill_type="solid")
+        header.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+        header.border = _THIN_BORDER
+        self.wb.add_named_style(header)
+
+        footer = NamedStyle(name="export_footer")
+        footer.font = Font(bold=True)
+        self.wb.add_named_style(footer)
+
+    def data_style(self, number_format: Optional[str] = None, fill: Optional[str] = None) -> str:
+        """
+        Получить имя стиля для ячейки данных.
+
+        Стиль создается один раз на каждую комбинацию (формат, заливка)
+        и дальше переиспользуется всеми ячейками книги.
+        """
+        key = (number_format, fill)
+        name = self._styles.get(key)
+        if name:
+            return name
+
+        if self._styles_fixed:
+            raise ValueError(f"Стиль не зарегистрирован заранее: формат {number_format}, заливка {fill}")
+
+        name = f"export_cell_{len(self._styles)}"
+        style = NamedStyle(name=name)
+        style.border = _THIN_BORDER
+        if number_format:
+            style.number_format = number_format
+        if fill:
+            style.fill = PatternFill(start_color=fill, end_color=fill, fill_type="solid")
+        self.wb.add_named_style(style)
+
+        self._styles[key] = name
+        return name
+
+    def fix_styles(self, combos: Iterable[Tuple[Optional[str], Optional[str]]]):
+        """
+        Зарегистрировать стили данных заранее и закрепить их индексы в книге.
+
+        Индексы стилей ячеек (cellXfs) openpyxl выдает в порядке первого
+        использования. Если две книги сразу после создания первого листа
+        вызывают fix_styles с одинаковым списком (формат, заливка), индексы
+        у них совпадают и XML листа можно переносить из одной книги в другую.
+        Новые комбинации после этого запрещены.
+        """
+        ws = self.wb.worksheets[0]
+        names = ["export_title", "export_header", "export_footer"]
+        names += [self.data_style(number_format, fill) for number_format, fill in combos]
+
+        for name in names:
+            cell = WriteOnlyCell(ws)
+            cell.style = name
+            cell.style_id  # индекс выдается при первом обращении
+
+        self._styles_fixed = True
+
+    # ========== ЛИСТЫ ==========
+
+    def create_sheet(self, title: str, headers: Sequence[str],
+                     number_formats: Optional[Sequence[Optional[str]]] = None,
+                     title_text: Optional[str] = None) -> "StreamingSheet":
+        """Создать лист с заголовками столбцов"""
+        ws = self.wb.create_sheet(title=title)
+        return StreamingSheet(self, ws, list(headers), number_formats, title_text)
+
+    def save(self):
+        """Сохранить книгу (все листы должны быть закрыты)"""
+        self.wb.save(self.file_path)
+
+
+class StreamingSheet:
+    """Лист, в который строки дописываются по одной"""
+
+    def __init__(self, writer: StreamingExcelWriter, ws, headers: List[str],
+                 number_formats: Optional[Sequence[Optional[str]]] = None,
+                 title_text: Optional[str] = None):
+        self.writer = writer
+        self.ws = ws
+        self.headers = headers
+        self.number_formats = list(number_formats or [None] * len(headers))
+        self.title_text = title_text
+
+        self.rows_written = 0
+        self._widths = [len(str(h)) for h in headers]
+        self._buffer: List[List[Any]] = []
+        self._flushed = False
+
+    def _measure(self, values: Sequence[Any]):
+        """Обновить ширину столбцов по значениям строки"""
+        for idx, value in enumerate(values):
+            if value is None:
+                continue
+            length = len(str(value))
+            if idx >= len(self._widths):
+                self._widths.append(length)
+            elif length > self._widths[idx]:
+                self._widths[idx] = length
+
+    def _next_row_number(self) -> int:
+        """Номер строки листа, в которую попадет следующая строка данных"""
+        header_rows = 3 if self.title_text else 1
+        return header_rows + self.rows_written + 1
+
+    def _cell(self, value: Any, style: Optional[str]):
+        cell = WriteOnlyCell(self.ws, value=value)
+        if style:
+            cell.style = style
+        return cell
+
+    def _flush_buffer(self):
+        """Зафиксировать ширину столбцов и записать накопленные строки"""
+        for idx, width in enumerate(self._widths, 1):
+            self.ws.column_dimensions[get_column_letter(idx)].width = min(width + 2, self.writer.max_width)
+
+        if self.title_text:
+            self.ws.append([self._cell(self.title_text, "export_title")])
+            self.ws.append([])
+
+        self.ws.append([self._cell(h, "export_header") for h in self.headers])
+
+        for row in self._buffer:
+            self.ws.append(row)
+
+        self._buffer = []
+        self._flushed = True
+
+    def append(self, values: Sequence[Any], fill: Optional[str] = None):
+        """Добавить строку данных (fill - цвет подсветки строки)"""
+        if self._next_row_number() > EXCEL_MAX_ROWS:
+            raise ValueError(f"Превышено максимальное число строк листа Excel ({EXCEL_MAX_ROWS})")
+
+        row = [
+            self._cell(value, self.writer.data_style(
+                self.number_formats[idx] if idx < len(self.number_formats) else None, fill
+            ))
+            for idx, value in enumerate(values)
+        ]
+        self.rows_written += 1
+
+        if self._flushed:
+            self.ws.append(row)
+            return
+
+        self._measure(values)
+        self._buffer.append(row)
+        if len(self._buffer) >= self.writer.width_sample_rows:
+            self._flush_buffer()
+
+    def extend(self, rows: Iterable[Sequence[Any]]):
+        """Добавить несколько строк"""
+        for values in rows:
+            self.append(values)
+
+    def close(self, footer: Optional[Iterable[Sequence[Any]]] = None):
+        """Закрыть лист, дописав подвал (статистику, фильтр, дату экспорта)"""
+        if not self._flushed:
+            self._flush_buffer()
+
+        if footer:
+            self.ws.append([])
+            for line in footer:
+                self.ws.append([self._cell(value, "export_footer") for value in line])
+
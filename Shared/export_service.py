@@ -1,10 +1,9 @@
 # Services/Car/export_service.py
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
-from datetime import datetime
 from typing import List, Dict
 from sqlalchemy.orm import Session
 
+from Shared.Export.sources import IterableSource
+
 
 def export_cars_to_excel(session: Session, file_path: str, filters: Dict = None) -> bool:
     """
@@ -19,81 +18,19 @@ def export_cars_to_excel(session: Session, file_path: str, filters: Dict = None)
         bool: Успешность операции
     """
     try:
-        from Services.Car.services import get_all_cars
+        from Services.Car.services import get_all_cars_with_drivers
+        from Shared.Export.entities import CAR_EXPORT
+        from Shared.Export.pipeline import run_export
+        from Shared.Export.sinks import XlsxSink
 
         # Получаем все машины
-        cars = get_all_cars(session)
+        cars = get_all_cars_with_drivers(session)
 
         # Применяем фильтры если есть
         if filters:
             cars = apply_car_filters(cars, filters)
 
-        # Создаем книгу Excel
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Машины"
-
-        # Стили для заголовков
-        header_font = Font(bold=True, size=12)
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_alignment = Alignment(horizontal="center", vertical="center")
-
-        # Заголовки
-        headers = ["ID", "Марка", "Государственный номер",
-                   "Грузоподъемность (т)", "Тип кузова",
-                   "Расход топлива (л/100км)", "Статус"]
-
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_idx, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-
-        # Данные
-        for row_idx, car in enumerate(cars, 2):
-            # Определяем статус машины
-            status = "Свободна"
-            if hasattr(car, 'driver') and car.driver:
-                status = f"Занята ({car.driver.full_name})"
-            elif isinstance(car, dict):
-                status = car.get("status", "Свободна")
-
-            ws.append([
-                car.get("id", row_idx - 1),
-                car.get("brand", ""),
-                car.get("license_plate", ""),
-                car.get("load_capacity", 0),
-                car.get("body_type", ""),
-                car.get("fuel_consumption", 0),
-                status
-            ])
-
-        # Автоподбор ширины столбцов
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    cell_length = len(str(cell.value))
-                    if cell_length > max_length:
-                        max_length = cell_length
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-        # Добавляем информацию о фильтрах
-        if filters:
-            ws.cell(row=ws.max_row + 2, column=1, value="Примененные фильтры:")
-            for i, (key, value) in enumerate(filters.items(), 1):
-                ws.cell(row=ws.max_row + 1, column=1, value=f"{key}: {value}")
-
-        # Добавляем дату экспорта
-        ws.cell(row=ws.max_row + 2, column=1,
-                value=f"Экспортировано: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-
-        # Сохраняем файл
-        wb.save(file_path)
+        run_export(session, CAR_EXPORT, XlsxSink(file_path), source=IterableSource(cars))
         return True
 
     except Exception as e:
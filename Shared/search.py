@@ -0,0 +1,58 @@
+# Shared/search.py
+"""
+Поиск по подстроке и по похожести через pg_trgm (миграция e2a6c91f3b84).
+
+Строка находится, если запрос входит в столбец как подстрока (ILIKE)
+или похож на одно из слов столбца (оператор <%, порог
+pg_trgm.word_similarity_threshold, по умолчанию 0.6 - ловит опечатки).
+Оба условия обслуживает частичный GIN-индекс gin_trgm_ops, поэтому
+условие активности записано как "active", а не "active IS TRUE".
+
+Результаты упорядочены по word_similarity: лучшее совпадение - первым.
+"""
+from typing import Dict, List, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+DEFAULT_LIMIT = 50
+
+
+def escape_like(value: str) -> str:
+    """Экранировать %, _ и \\ для LIKE/ILIKE"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def trigram_search(session: Session, table: str, columns: Sequence[str], select: str,
+                   query: str, limit: int = DEFAULT_LIMIT) -> List[Dict]:
+    """
+    Найти живые строки table, у которых один из columns похож на query.
+
+    Args:
+        table, columns, select: имена из кода сервиса, не из пользовательского ввода
+        query: строка поиска
+
+    Returns:
+        Строки select с полем score (0..1), по убыванию score
+    """
+    query = query.strip()
+    if not query:
+        return []
+
+    matches = " OR ".join(f"{c} ILIKE :pattern OR :query <% {c}" for c in columns)
+    scores = ", ".join(f"word_similarity(:query, {c})" for c in columns)
+    score = f"GREATEST({scores})" if len(columns) > 1 else scores
+
+    sql = f"""
+        SELECT {select}, {score} AS score
+        FROM {table}
+        WHERE active AND ({matches})
+        ORDER BY score DESC, {columns[0]}
+        LIMIT :limit
+    """
+    result = session.execute(text(sql), {
+        "query": query,
+        "pattern": f"%{escape_like(query)}%",
+        "limit": limit,
+    })
+    return [dict(row) for row in result.mappings()]
@@ -0,0 +1,87 @@
+# Shared/soft_delete.py
+"""
+Мягкое удаление по флагу active из Shared/Base.py.
+
+Сервисы не удаляют строки, а выставляют active = false: это обычный
+UPDATE неключевого столбца, он не берет блокировки по внешним ключам
+и не упирается в ссылки из перевозок. Все выборки сервисов фильтруют
+по "WHERE active" - так же, как частичные индексы (миграция d4b7f2a9e016).
+Условие active.is_(True) дает "IS true", и частичный индекс не используется.
+
+Физически удаленные строки убирает purge_inactive (по расписанию,
+см. cli.py purge): только пролежавшие дольше PURGE_AFTER_DAYS и только
+те, на которые больше никто не ссылается.
+"""
+import datetime
+from typing import Dict
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Через сколько дней после удаления строку можно удалить физически
+PURGE_AFTER_DAYS = 30
+
+
+def soft_delete(obj) -> None:
+    """Пометить ORM-объект удаленным (коммит - на вызывающем)"""
+    obj.active = False
+    obj.updated_at = datetime.datetime.now()
+    obj.version += 1
+
+
+# Порядок важен: сначала строки, которые ссылаются на другие
+PURGE_STATEMENTS = [
+    ("shipment", """
+        DELETE FROM shipment
+        WHERE NOT active AND updated_at < :cutoff
+    """),
+    ("route_tariff", """
+        DELETE FROM route_tariff
+        WHERE NOT active AND updated_at < :cutoff
+    """),
+    ("driver", """
+        DELETE FROM driver d
+        WHERE NOT d.active AND d.updated_at < :cutoff
+          AND NOT EXISTS (SELECT 1 FROM shipment s WHERE s.driver_id = d.id)
+          AND NOT EXISTS (SELECT 1 FROM shipment_archive a WHERE a.driver_id = d.id)
+    """),
+    ("car", """
+        DELETE FROM car c
+        WHERE NOT c.active AND c.updated_at < :cutoff
+          AND NOT EXISTS (SELECT 1 FROM driver d WHERE d.car_id = c.id)
+          AND NOT EXISTS (SELECT 1 FROM shipment s WHERE s.car_id = c.id)
+          AND NOT EXISTS (SELECT 1 FROM shipment_archive a WHERE a.car_id = c.id)
+    """),
+    ("tariff", """
+        DELETE FROM tariff t
+        WHERE NOT t.active AND t.updated_at < :cutoff
+          AND NOT EXISTS (SELECT 1 FROM route_tariff rt WHERE rt.tariff_id = t.id)
+          AND NOT EXISTS (SELECT 1 FROM shipment s WHERE s.tariff_id = t.id)
+          AND NOT EXISTS (SELECT 1 FROM shipment_archive a WHERE a.tariff_id = t.id)
+    """),
+    ("route", """
+        DELETE FROM route r
+        WHERE NOT r.active AND r.updated_at < :cutoff
+          AND NOT EXISTS (SELECT 1 FROM route_tariff rt WHERE rt.route_id = r.id)
+          AND NOT EXISTS (SELECT 1 FROM shipment s WHERE s.route_id = r.id)
+          AND NOT EXISTS (SELECT 1 FROM shipment_archive a WHERE a.route_id = r.id)
+    """),
+]
+
+
+def purge_inactive(session: Session, older_than_days: int = PURGE_AFTER_DAYS) -> Dict[str, int]:
+    """
+    Физически удалить строки, помеченные удаленными больше older_than_days дней назад.
+
+    Строки, на которые еще ссылаются перевозки (в том числе архивные),
+    водители или связи маршрут-тариф, остаются до следующего запуска.
+
+    Returns:
+        {таблица: удалено строк}
+    """
+    cutoff = datetime.datetime.now() - datetime.timedelta(days=older_than_days)
+    purged = {}
+    for table, sql in PURGE_STATEMENTS:
+        purged[table] = session.execute(text(sql), {"cutoff": cutoff}).rowcount
+    session.commit()
+    return purged
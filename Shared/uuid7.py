@@ -0,0 +1,56 @@
+# Shared/uuid7.py
+"""
+Упорядоченные по времени идентификаторы UUIDv7 (RFC 9562).
+
+uuid4 случаен, поэтому каждая вставка попадает в произвольную страницу
+B-дерева первичного ключа и внешних ключей: страницы делятся пополам,
+рабочий набор индекса - весь индекс. У UUIDv7 старшие 48 бит - время
+в миллисекундах, новые ключи идут в правый край индекса, как у serial.
+
+Раскладка: unix_ts_ms (48) | ver=7 (4) | счетчик (12) | var=0b10 (2) | случайные (62).
+В пределах одной миллисекунды 12-битный счетчик сохраняет порядок
+идентификаторов, выданных этим процессом.
+"""
+import os
+import threading
+import time
+import uuid
+
+_COUNTER_BITS = 12
+_COUNTER_MAX = (1 << _COUNTER_BITS) - 1
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7_from(timestamp_ms: int, counter: int, random_bits: int) -> uuid.UUID:
+    """Собрать UUIDv7 из метки времени (мс), 12-битного счетчика и 62 случайных бит"""
+    value = (timestamp_ms & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76
+    value |= (counter & _COUNTER_MAX) << 64
+    value |= 0b10 << 62
+    value |= random_bits & ((1 << 62) - 1)
+    return uuid.UUID(int=value)
+
+
+def uuid7() -> uuid.UUID:
+    """Новый UUIDv7; идентификаторы одного процесса строго возрастают"""
+    global _last_ms, _counter
+
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            _counter = int.from_bytes(os.urandom(1), "big")  # запас под рост в той же мс
+        else:
+            # Та же миллисекунда (или часы ушли назад): растим счетчик,
+            # при переполнении занимаем следующую миллисекунду
+            _counter += 1
+            if _counter > _COUNTER_MAX:
+                _last_ms += 1
+                _counter = 0
+        timestamp_ms, counter = _last_ms, _counter
+
+    return uuid7_from(timestamp_ms, counter, int.from_bytes(os.urandom(8), "big"))
+
@@ -0,0 +1,77 @@
+# Shared/versioning.py
+"""
+Оптимистичные блокировки по столбцу version из Shared/Base.py.
+
+Каждая правка строки через сервисы увеличивает version на 1. Клиент
+запоминает версию, которую видел пользователь, и передает ее в update_*
+(expected_version): UPDATE ... WHERE id = :id AND version = :expected
+проходит, только если строку за это время никто не менял. Иначе сразу
+StaleVersionError - без ожидания блокировок строк; пользователь
+перечитывает данные и повторяет правку.
+
+Без expected_version правка применяется как раньше (побеждает последняя),
+но версия все равно растет, и остальные клиенты свой конфликт увидят.
+"""
+import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text, update
+from sqlalchemy.orm import Session
+
+
+class StaleVersionError(ValueError):
+    """Строку изменили после того, как клиент ее прочитал"""
+
+    def __init__(self, table: str, entity_id, expected_version: int, current_version: int):
+        super().__init__(
+            f"Запись уже изменена другим пользователем (версия {current_version}, "
+            f"у вас {expected_version}). Обновите данные и повторите правку."
+        )
+        self.table = table
+        self.entity_id = entity_id
+        self.expected_version = expected_version
+        self.current_version = current_version
+
+
+def check_stale(session: Session, table: str, entity_id, expected_version: Optional[int]) -> None:
+    """
+    После UPDATE, не затронувшего ни одной строки: если строка жива,
+    значит, не совпала версия - StaleVersionError. Если строки нет, ничего
+    не делает (вызывающий вернет False, как раньше).
+    """
+    if expected_version is None:
+        return
+    current = session.execute(
+        text(f"SELECT version FROM {table} WHERE id = :id AND active"), {"id": entity_id}
+    ).scalar()
+    if current is not None:
+        raise StaleVersionError(table, entity_id, expected_version, current)
+
+
+def versioned_update(session: Session, model, entity_id, values: Dict[str, Any],
+                     expected_version: Optional[int] = None) -> Optional[int]:
+    """
+    Изменить строку модели одним UPDATE с проверкой версии (коммит - на вызывающем).
+
+    Returns:
+        Новая версия или None, если строки нет (удалена)
+
+    Raises:
+        StaleVersionError: строку изменили после чтения expected_version
+    """
+    conditions = [model.id == entity_id, model.active]
+    if expected_version is not None:
+        conditions.append(model.version == expected_version)
+
+    new_version = session.execute(
+        update(model)
+        .where(*conditions)
+        .values(**values, version=model.version + 1, updated_at=datetime.datetime.now())
+        .returning(model.version)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+
+    if new_version is None:
+        # UPDATE ничего не изменил - откатывать нечего; транзакция остается за вызывающим
+        check_stale(session, model.__tablename__, entity_id, expected_version)
+    return new_version
@@ -0,0 +1,634 @@
+# api.py
+"""
+HTTP API поверх Services/* (Qt не импортируется, только стандартная библиотека).
+
+Один процесс обслуживает всех клиентов через общий пул соединений
+(--pool-size, --max-overflow), вместо своего набора соединений у каждого
+настольного клиента. Ответы - JSON:
+- справочники (машины, водители, маршруты, тарифы) кешируются в памяти на
+  REFERENCE_TTL секунд; любая запись через API сбрасывает кеш сразу,
+  изменения из других клиентов видны не позже чем через REFERENCE_TTL;
+- у каждого GET есть ETag, повторный запрос с If-None-Match получает 304
+  без тела;
+- ответы больше GZIP_MIN_BYTES сжимаются, если клиент прислал
+  Accept-Encoding: gzip;
+- POST/PATCH принимают только поля записи (CAR_FIELDS и т.д.), лишние
+  ключи - 400; статус перевозки меняется через /shipments/transition.
+
+Примеры:
+    python api.py --port 8080
+    curl -H 'Accept-Encoding: gzip' --compressed http://127.0.0.1:8080/cars
+    curl 'http://127.0.0.1:8080/shipments?status=pending&date_from=2024-06-01'
+    curl 'http://127.0.0.1:8080/shipments?include_archived=1&limit=100&offset=200'
+    curl -X POST -d '{"brand": "MAN", "license_plate": "А001АА77", ...}' http://127.0.0.1:8080/cars
+    curl -X POST -d '{"new_status": "in_transit", "ids": ["..."]}' http://127.0.0.1:8080/shipments/transition
+    curl -X POST -d '{"assignments": {"<водитель>": "<машина>", "<водитель>": null}}' \
+        http://127.0.0.1:8080/drivers/reassign
+"""
+import argparse
+import datetime
+import decimal
+import gzip
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from Shared.DataBaseSession import SyncDatabase
+from Shared.versioning import StaleVersionError
+from Services.Car import services as car_services
+from Services.Dashboard.services import get_dashboard_kpis
+from Services.Driver import services as driver_services
+from Services.Rate import services as rate_services
+from Services.Rate.resolver import get_route_tariffs
+from Services.Revenue.services import get_revenue
+from Services.Route import services as route_services
+from Services.Route.planner import plan_route
+from Services.Transportation import service as shipment_services
+from Services.Utilization.services import get_utilization
+
+# Сколько секунд справочники отдаются из кеша
+REFERENCE_TTL = 30
+# Ответы меньше этого размера не сжимаются: выигрыш меньше заголовков
+GZIP_MIN_BYTES = 1024
+# Страница GET /shipments: по умолчанию и наибольшая
+SHIPMENTS_PAGE_SIZE = 500
+SHIPMENTS_MAX_PAGE_SIZE = 5000
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_OVERFLOW = 10
+
+# Фильтры перевозок из строки запроса и их типы (как в build_shipment_conditions)
+SHIPMENT_FILTERS = {
+    "status": str,
+    "date_from": str,
+    "date_to": str,
+    "car_id": uuid.UUID,
+    "driver_id": uuid.UUID,
+    "route_id": uuid.UUID,
+    "tariff_id": uuid.UUID,
+    "weight_from": float,
+    "weight_to": float,
+}
+
+
+class ApiError(Exception):
+    """Ошибка запроса с HTTP-статусом"""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if hasattr(value, "_asdict"):
+        return value._asdict()
+    if hasattr(value, "keys"):
+        return dict(value)
+    raise TypeError(f"Не сериализуется в JSON: {type(value).__name__}")
+
+
+def to_json(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+def make_etag(body: bytes) -> str:
+    # Слабый ETag: одинаков для сжатого и несжатого ответа
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+class ResponseCache:
+    """Готовые ответы справочников: путь с параметрами -> (тело, ETag, время)"""
+
+    def __init__(self, ttl: float = REFERENCE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[bytes, str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[2] < self.ttl:
+            return entry[0], entry[1]
+        return None
+
+    def put(self, key: str, body: bytes, etag: str):
+        with self._lock:
+            self._entries[key] = (body, etag, time.monotonic())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+# ========== ПАРАМЕТРЫ ЗАПРОСА ==========
+
+def _param(query: Dict[str, List[str]], name: str, cast: Callable = str, default: Any = None,
+           required: bool = False) -> Any:
+    values = query.get(name)
+    if not values or values[-1] == "":
+        if required:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Не задан параметр {name}")
+        return default
+    try:
+        return cast(values[-1])
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Неверное значение параметра {name}: {values[-1]}")
+
+
+def _date(value: str) -> datetime.date:
+    return datetime.date.fromisoformat(value)
+
+
+def _datetime(value: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(value)
+
+
+# ========== ОБРАБОТЧИКИ ==========
+# Каждый обработчик: (session, query, body, *группы пути) -> данные для JSON
+
+def list_shipments(session: Session, query, body):
+    """Страница перевозок (limit, offset), новые сначала; меньше limit строк - последняя страница"""
+    limit = _param(query, "limit", int, SHIPMENTS_PAGE_SIZE)
+    offset = _param(query, "offset", int, 0)
+    if not 1 <= limit <= SHIPMENTS_MAX_PAGE_SIZE:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"limit должен быть от 1 до {SHIPMENTS_MAX_PAGE_SIZE}")
+    if offset < 0:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "offset не может быть отрицательным")
+
+    filters = {}
+    for name, cast in SHIPMENT_FILTERS.items():
+        value = _param(query, name, cast)
+        if value is not None:
+            filters[name] = value
+    include_archived = _param(query, "include_archived", str, "") in ("1", "true")
+    return shipment_services.get_shipments_with_filters(session, include_archived, limit, offset, **filters)
+
+
+def _object(body: Any, what: str = "Тело запроса") -> Dict:
+    if not isinstance(body, dict):
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{what}: ожидается JSON-объект")
+    return body
+
+
+# Поля, которые клиент задает в POST/PATCH: имя -> обязательно при создании.
+# Служебные поля (id, active, version, created_at/updated_at), статус и
+# стоимость перевозки, аренда диспетчера (claimed_*) меняют только сервисы:
+# статус - через POST /shipments/transition
+CAR_FIELDS = {
+    "brand": True, "license_plate": True, "load_capacity": True, "body_type": True, "fuel_consumption": True,
+}
+DRIVER_FIELDS = {
+    "full_name": True, "license_number": True, "license_category": True, "experience_years": True,
+    "hire_date": True, "car_id": False,
+}
+TARIFF_FIELDS = {
+    "price_per_km": True, "cargo_type": True, "min_price": True, "date_start": True,
+    "date_end": False, "description": False,
+}
+# tariff_id не обязателен: create_shipments подберет тариф маршрута
+SHIPMENT_FIELDS = {
+    "shipment_date": True, "cargo_weight": True, "car_id": True, "driver_id": True,
+    "route_id": True, "tariff_id": False,
+}
+ROUTE_FIELDS = {
+    "origin": True, "destination": True, "distance_km": True, "avg_time_hours": True, "road_type": True,
+}
+
+
+def _uuid(value: Any, name: str) -> uuid.UUID:
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Неверный id в поле {name}: {value}")
+
+
+def _optional_uuid(value: Any, name: str) -> Optional[uuid.UUID]:
+    return None if value is None else _uuid(value, name)
+
+
+def _fields(body: Any, allowed: Dict[str, bool], create: bool = False, extra: Tuple[str, ...] = (),
+            what: str = "Тело запроса") -> Dict:
+    """
+    Поля записи из тела запроса: только из allowed (и служебных extra),
+    при создании - все обязательные. Ссылки *_id приводятся к UUID.
+    """
+    body = _object(body, what)
+    unknown = set(body) - set(allowed) - set(extra)
+    if unknown:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{what}: недопустимые поля: {', '.join(sorted(unknown))}")
+    if create:
+        missing = [key for key, required in allowed.items() if required and body.get(key) is None]
+        if missing:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"{what}: не заданы поля: {', '.join(missing)}")
+    elif not set(body) - set(extra):
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{what}: нет полей для изменения")
+
+    fields = dict(body)
+    for key in fields:
+        if key.endswith("_id") and key in allowed:
+            fields[key] = _optional_uuid(fields[key], key)
+    return fields
+
+
+def create_shipments(session: Session, query, body):
+    # Одна перевозка или список: в обоих случаях один INSERT
+    rows = body if isinstance(body, list) else [body]
+    return {"created": shipment_services.create_shipments(session, [
+        _fields(row, SHIPMENT_FIELDS, create=True, what=f"Перевозка {number}")
+        for number, row in enumerate(rows, start=1)
+    ])}
+
+
+def _version(value: Any, name: str = "expected_version") -> Optional[int]:
+    if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} должен быть целым числом")
+    return value
+
+
+def transition_shipments(session: Session, query, body):
+    """{"new_status": ..., "ids": [...], фильтры как у GET /shipments (status - текущий статус)}"""
+    body = dict(_object(body))
+    new_status = body.pop("new_status", None)
+    if not new_status:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Не задан новый статус (new_status)")
+    ids = body.pop("ids", None)
+    if ids is not None:
+        if not isinstance(ids, list):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "ids должен быть списком")
+        ids = [_uuid(value, "ids") for value in ids]
+    unknown = set(body) - set(SHIPMENT_FILTERS)
+    if unknown:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Неизвестные фильтры: {', '.join(sorted(unknown))}")
+    for key in ("car_id", "driver_id", "route_id", "tariff_id"):
+        if key in body:
+            body[key] = _uuid(body[key], key)
+    return {"ids": shipment_services.transition_shipments(session, new_status, ids, **body)}
+
+
+def _route_fields(body: Any, extra: Tuple[str, ...] = ()) -> List:
+    fields = _fields(body, ROUTE_FIELDS, create=True, extra=extra)
+    return [fields[key] for key in ROUTE_FIELDS]
+
+
+def create_route(session: Session, query, body):
+    return {"id": route_services.create_route(session, *_route_fields(body))}
+
+
+def update_route(session: Session, query, body, route_id):
+    """Маршрут меняется целиком (PUT): все поля, expected_version - по желанию"""
+    return _updated(route_services.update_route(
+        session, _uuid(route_id, "route_id"), *_route_fields(body, extra=("expected_version",)),
+        expected_version=_version(body.get("expected_version"))
+    ))
+
+
+def delete_route(session: Session, query, body, route_id):
+    deleted, message = route_services.delete_route(session, _uuid(route_id, "route_id"))
+    if not deleted:
+        raise ApiError(HTTPStatus.CONFLICT, message)
+    return {"ok": True}
+
+
+def link_route_tariff(session: Session, query, body, route_id):
+    tariff_id = _uuid(_object(body).get("tariff_id"), "tariff_id")
+    route_services.link_route_tariff(session, _uuid(route_id, "route_id"), tariff_id)
+    return {"ok": True}
+
+
+def assign_driver_car(session: Session, query, body, driver_id):
+    """{"car_id": машина или null - открепить, "expected_version": ...}"""
+    body = _object(body)
+    if "car_id" not in body:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Не задано поле car_id (null - открепить)")
+    driver_id = _uuid(driver_id, "driver_id")
+    expected_version = _version(body.get("expected_version"))
+    return {"reassigned": driver_services.reassign_fleet(
+        session, {driver_id: _optional_uuid(body["car_id"], "car_id")},
+        {driver_id: expected_version} if expected_version is not None else None
+    )}
+
+
+def swap_driver_cars(session: Session, query, body):
+    """{"driver_ids": [первый, второй]}"""
+    driver_ids = _object(body).get("driver_ids")
+    if not isinstance(driver_ids, list) or len(driver_ids) != 2:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "driver_ids должен быть списком из двух водителей")
+    return _updated(driver_services.swap_driver_car(
+        session, _uuid(driver_ids[0], "driver_ids"), _uuid(driver_ids[1], "driver_ids")
+    ))
+
+
+def reassign_fleet(session: Session, query, body):
+    """{"assignments": {водитель: машина или null}, "expected_versions": {водитель: версия}}"""
+    body = _object(body)
+    assignments = _object(body.get("assignments"), "assignments")
+    expected_versions = _object(body.get("expected_versions") or {}, "expected_versions")
+    return {"reassigned": driver_services.reassign_fleet(
+        session,
+        {_uuid(driver_id, "assignments"): _optional_uuid(car_id, "assignments")
+         for driver_id, car_id in assignments.items()},
+        {_uuid(driver_id, "expected_versions"): _version(version, "expected_versions")
+         for driver_id, version in expected_versions.items()},
+    )}
+
+
+def _created(entity) -> Dict:
+    return {"id": entity.id}
+
+
+def _updated(updated: bool) -> Dict:
+    if not updated:
+        raise ApiError(HTTPStatus.NOT_FOUND, "Запись не найдена")
+    return {"ok": True}
+
+
+def _delete(delete: Callable) -> Callable:
+    """delete_* сервисов возвращают False, если записи нет, или бросают ValueError при связях"""
+    return lambda session, query, body, entity_id: _updated(delete(session, uuid.UUID(entity_id)))
+
+
+def _create(create: Callable, allowed: Dict[str, bool]) -> Callable:
+    return lambda session, query, body: _created(create(session, **_fields(body, allowed, create=True)))
+
+
+def _update(update: Callable, allowed: Dict[str, bool]) -> Callable:
+    """PATCH: любые из allowed, expected_version - по желанию (Shared/versioning.py)"""
+    def handler(session: Session, query, body, entity_id):
+        fields = _fields(body, allowed, extra=("expected_version",))
+        expected_version = _version(fields.pop("expected_version", None))
+        return _updated(update(session, uuid.UUID(entity_id), expected_version=expected_version, **fields))
+    return handler
+
+
+def revenue_report(session: Session, query, body):
+    return get_revenue(
+        session,
+        _param(query, "by", str, "route"),
+        _param(query, "period", str, "month"),
+        _param(query, "from", _date),
+        _param(query, "to", _date),
+        _param(query, "id", uuid.UUID),
+    )
+
+
+def utilization_report(session: Session, query, body):
+    date_from = _param(query, "from", _datetime, required=True)
+    date_to = _param(query, "to", _datetime, required=True)
+    if date_to <= date_from:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Конец периода должен быть позже начала")
+    return get_utilization(session, date_from, date_to, _param(query, "by", str, "car"))
+
+
+def route_plan(session: Session, query, body):
+    plan = plan_route(
+        session,
+        _param(query, "origin", str, required=True),
+        _param(query, "destination", str, required=True),
+        _param(query, "metric", str, "distance"),
+    )
+    if plan is None:
+        raise ApiError(HTTPStatus.NOT_FOUND, "Пути между городами нет")
+    return plan
+
+
+class Endpoint:
+    """Адрес API: метод, шаблон пути, обработчик; cached - справочник (кеш ответов)"""
+
+    def __init__(self, method: str, pattern: str, handler: Callable, cached: bool = False):
+        self.method = method
+        self.pattern = re.compile(f"^{pattern}$")
+        self.handler = handler
+        self.cached = cached
+
+
+ID = "([0-9a-fA-F-]{36})"
+
+ROUTES = [
+    # Справочники
+    Endpoint("GET", "/cars", lambda s, q, b: car_services.get_all_cars_for_assignment(s), cached=True),
+    Endpoint("GET", "/cars/free", lambda s, q, b: car_services.get_free_cars(s), cached=True),
+    Endpoint("GET", "/cars/search", lambda s, q, b: car_services.search_cars(s, _param(q, "q", required=True)),
+          cached=True),
+    Endpoint("GET", "/drivers", lambda s, q, b: driver_services.get_all_drivers_with_cars(s), cached=True),
+    Endpoint("GET", "/drivers/search",
+          lambda s, q, b: driver_services.search_drivers(s, _param(q, "q", required=True)), cached=True),
+    Endpoint("GET", "/routes", lambda s, q, b: route_services.get_all_routes(s), cached=True),
+    Endpoint("GET", "/routes/search",
+          lambda s, q, b: route_services.search_routes(s, _param(q, "q", required=True)), cached=True),
+    Endpoint("GET", f"/routes/{ID}/tariffs",
+          lambda s, q, b, route_id: get_route_tariffs(s, uuid.UUID(route_id), _param(q, "date", _datetime)),
+          cached=True),
+    Endpoint("GET", "/tariffs", lambda s, q, b: rate_services.get_all_tariffs(s), cached=True),
+    Endpoint("GET", "/tariffs/active",
+          lambda s, q, b: rate_services.get_active_tariffs(s, _param(q, "date", _datetime)), cached=True),
+    Endpoint("GET", "/cargo-types", lambda s, q, b: rate_services.get_cargo_types(s), cached=True),
+
+    # Перевозки и отчеты: данные меняются постоянно, только ETag
+    Endpoint("GET", "/shipments", list_shipments),
+    Endpoint("GET", "/dashboard", lambda s, q, b: get_dashboard_kpis(s)),
+    Endpoint("GET", "/revenue", revenue_report),
+    Endpoint("GET", "/utilization", utilization_report),
+    Endpoint("GET", "/plan", route_plan),
+
+    # Запись
+    Endpoint("POST", "/cars", _create(car_services.create_car, CAR_FIELDS)),
+    Endpoint("PATCH", f"/cars/{ID}", _update(car_services.update_car, CAR_FIELDS)),
+    Endpoint("DELETE", f"/cars/{ID}", _delete(car_services.delete_car)),
+    Endpoint("POST", "/drivers", _create(driver_services.create_driver, DRIVER_FIELDS)),
+    Endpoint("PATCH", f"/drivers/{ID}", _update(driver_services.update_driver, DRIVER_FIELDS)),
+    Endpoint("DELETE", f"/drivers/{ID}", _delete(driver_services.delete_driver)),
+    Endpoint("PUT", f"/drivers/{ID}/car", assign_driver_car),
+    Endpoint("POST", "/drivers/swap", swap_driver_cars),
+    Endpoint("POST", "/drivers/reassign", reassign_fleet),
+    Endpoint("POST", "/routes", create_route),
+    Endpoint("PUT", f"/routes/{ID}", update_route),
+    Endpoint("DELETE", f"/routes/{ID}", delete_route),
+    Endpoint("POST", f"/routes/{ID}/tariffs", link_route_tariff),
+    Endpoint("POST", "/tariffs", _create(rate_services.create_tariff, TARIFF_FIELDS)),
+    Endpoint("PATCH", f"/tariffs/{ID}", _update(rate_services.update_tariff, TARIFF_FIELDS)),
+    Endpoint("DELETE", f"/tariffs/{ID}", _delete(rate_services.delete_tariff)),
+    Endpoint("POST", "/shipments", create_shipments),
+    Endpoint("POST", "/shipments/transition", transition_shipments),
+    Endpoint("PATCH", f"/shipments/{ID}", _update(shipment_services.update_shipment, SHIPMENT_FIELDS)),
+    Endpoint("DELETE", f"/shipments/{ID}", _delete(shipment_services.delete_shipment)),
+]
+
+
+# ========== СЕРВЕР ==========
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "DbAppApi/1.0"
+    protocol_version = "HTTP/1.1"   # keep-alive: нагрузочный тест не открывает соединение на каждый запрос
+    # Заголовки и тело уходят отдельными записями: без TCP_NODELAY
+    # тело ждет подтверждения заголовков (задержка ~40 мс на ответ)
+    disable_nagle_algorithm = True
+    session_factory: sessionmaker = SyncDatabase.factory
+    quiet = False
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def _match(self, method: str, path: str):
+        allowed = False
+        for route in ROUTES:
+            match = route.pattern.match(path)
+            if match:
+                if route.method == method:
+                    return route, match.groups()
+                allowed = True
+        if allowed:
+            raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, f"Метод {method} не поддерживается для {path}")
+        raise ApiError(HTTPStatus.NOT_FOUND, f"Нет такого адреса: {path}")
+
+    def _read_body(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Тело запроса должно быть JSON")
+
+    def _dispatch(self, method: str):
+        url = urlsplit(self.path)
+        cache_key = self.path
+        try:
+            route, groups = self._match(method, url.path.rstrip("/") or "/")
+            body = self._read_body() if method != "GET" else None
+
+            cached = response_cache.get(cache_key) if route.cached else None
+            if cached:
+                payload, etag = cached
+            else:
+                payload = self._call(route, parse_qs(url.query), body, groups)
+                etag = make_etag(payload) if method == "GET" else None
+                if route.cached:
+                    response_cache.put(cache_key, payload, etag)
+                elif method != "GET":
+                    # Запись могла изменить любой справочник (машина у водителя, тариф маршрута)
+                    response_cache.clear()
+        except ApiError as e:
+            self._send(e.status, to_json({"error": str(e)}))
+            return
+
+        if etag and etag in (self.headers.get("If-None-Match") or ""):
+            self._send(HTTPStatus.NOT_MODIFIED, b"", etag)
+            return
+        self._send(HTTPStatus.CREATED if method == "POST" else HTTPStatus.OK, payload, etag)
+
+    def _call(self, route: Endpoint, query, body, groups) -> bytes:
+        session = self.session_factory()
+        try:
+            return to_json(route.handler(session, query, body, *groups))
+        except ApiError:
+            raise
+        except IntegrityError as e:
+            session.rollback()
+            raise ApiError(HTTPStatus.CONFLICT, str(e.orig).strip())
+        except StaleVersionError as e:
+            # PATCH с "expected_version" в теле: строку уже изменили
+            raise ApiError(HTTPStatus.CONFLICT, str(e))
+        except (ValueError, TypeError) as e:
+            session.rollback()
+            raise ApiError(HTTPStatus.BAD_REQUEST, str(e))
+        except Exception as e:
+            session.rollback()
+            self.log_error("%s %s: %r", self.command, self.path, e)
+            raise ApiError(HTTPStatus.INTERNAL_SERVER_ERROR, "Внутренняя ошибка сервера")
+        finally:
+            session.close()
+
+    def _send(self, status: HTTPStatus, payload: bytes, etag: Optional[str] = None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")   # клиент кеширует, но каждый раз сверяет ETag
+            self.send_header("Vary", "Accept-Encoding")
+
+        if status == HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if len(payload) >= GZIP_MIN_BYTES and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            payload = gzip.compress(payload, compresslevel=5)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def create_server(host: str, port: int, pool_size: int = DEFAULT_POOL_SIZE,
+                  max_overflow: int = DEFAULT_MAX_OVERFLOW, quiet: bool = False) -> ThreadingHTTPServer:
+    """Сервер со своим пулом соединений (потоки запросов берут сессии из него)"""
+    engine = create_engine(SyncDatabase.URL, pool_size=pool_size, max_overflow=max_overflow,
+                           pool_pre_ping=True)
+    handler = type("PooledApiHandler", (ApiHandler,), {
+        "session_factory": sessionmaker(bind=engine, autoflush=False, autocommit=False),
+        "quiet": quiet,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="HTTP API базы перевозок")
+    parser.add_argument("--host", default="127.0.0.1", help="0.0.0.0 - принимать запросы с других машин")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE, help="Постоянных соединений с БД")
+    parser.add_argument("--max-overflow", type=int, default=DEFAULT_MAX_OVERFLOW,
+                        help="Дополнительных соединений при пиковой нагрузке")
+    parser.add_argument("--quiet", action="store_true", help="Не писать журнал запросов")
+    args = parser.parse_args(argv)
+
+    server = create_server(args.host, args.port, args.pool_size, args.max_overflow, args.quiet)
+    print(f"API: http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,374 @@
+# cli.py
+"""
+Операции без графического интерфейса (Qt не импортируется).
+
+Примеры:
+    python cli.py export shipments --filter completed --format csv -o перевозки.csv
+    python cli.py export tariffs --filter by_cargo --param cargo_type=Общий --format parquet
+    python cli.py workbook -o отчет.xlsx --period 2024-05-01 2024-05-31
+    python cli.py partitions --months-ahead 6 --detach-before 2023-01-01
+    python cli.py archive --older-than 12
+    python cli.py purge --older-than-days 30
+    python cli.py import shipments перевозки.csv --batch 5000
+    python cli.py recalculate
+    python cli.py rollups
+    python cli.py revenue --by car --period quarter --from 2024-01-01
+    python cli.py utilization --from 2024-01-01 --to 2025-01-01 --by driver --top 20
+    python cli.py benchmark services --reset --scales 1
+"""
+import argparse
+import csv
+import datetime
+import importlib
+import sys
+import uuid
+from typing import Any, Dict, Iterator, List, Optional
+
+from Shared.DataBaseSession import SyncDatabase
+from Shared.Export.entities import EXPORTS
+from Shared.Export.pipeline import EXPORT_FORMATS, default_export_path, export_to_file
+from Shared.Export.workbook import MONTH_END_SHEETS, build_workbook
+from Shared.soft_delete import PURGE_AFTER_DAYS, purge_inactive
+from Services.Revenue.services import PERIODS, REVENUE_ROLLUPS, get_revenue, rebuild_revenue_rollups
+from Services.Transportation.service import (
+    ARCHIVE_AFTER_MONTHS, SHIPMENT_PARTITION_MONTHS_AHEAD,
+    archive_shipments, create_shipments, detach_shipment_partitions, ensure_shipment_partitions,
+    recalculate_shipment_costs
+)
+from Services.Utilization.services import get_utilization
+
+# Замеры из Benchmarks/: имя команды -> модуль с main(argv).
+# Импортируются только при запуске (gui_benchmark тянет Qt).
+BENCHMARKS = {
+    "services": "Benchmarks.services_benchmark",
+    "export": "Benchmarks.export_benchmark",
+    "gui": "Benchmarks.gui_benchmark",
+    "uuid": "Benchmarks.uuid_benchmark",
+    "utilization": "Benchmarks.utilization_benchmark",
+    "dispatch": "Benchmarks.dispatch_benchmark",
+    "gate": "Benchmarks.regression_gate",
+    "datagen": "Benchmarks.datagen",
+}
+
+# Столбцы CSV для импорта перевозок и их типы; tariff_id и status необязательны
+SHIPMENT_IMPORT_COLUMNS = {
+    "shipment_date": datetime.datetime.fromisoformat,
+    "cargo_weight": float,
+    "car_id": uuid.UUID,
+    "driver_id": uuid.UUID,
+    "route_id": uuid.UUID,
+    "tariff_id": uuid.UUID,
+    "status": str,
+}
+SHIPMENT_IMPORT_REQUIRED = ("shipment_date", "cargo_weight", "car_id", "driver_id", "route_id")
+
+
+def _parse_value(value: str) -> Any:
+    """Числа из командной строки приводим к int/float, остальное оставляем строкой"""
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def parse_params(items: List[str]) -> Dict[str, Any]:
+    """Разобрать параметры вида key=value"""
+    params = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep or not key:
+            raise ValueError(f"Параметр должен быть вида key=value: {item}")
+        params[key] = _parse_value(value)
+    return params
+
+
+# ========== КОМАНДЫ ==========
+
+def cmd_export(args) -> int:
+    """Выгрузка сущности в xlsx, csv или parquet"""
+    spec = EXPORTS[args.entity]
+    if args.filter not in spec.filters:
+        print(f"Неизвестный фильтр '{args.filter}'. Доступны: {', '.join(spec.filters)}", file=sys.stderr)
+        return 2
+
+    try:
+        params = parse_params(args.param)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    output = args.output or default_export_path(spec.name, args.format)
+
+    session = SyncDatabase.get_session()
+    try:
+        count = export_to_file(session, spec, args.format, output, args.filter, **params)
+    finally:
+        session.close()
+
+    if not count:
+        print("Нет данных по выбранному фильтру, файл не создан")
+        return 1
+
+    print(f"Выгружено строк: {count} -> {output}")
+    return 0
+
+
+def cmd_workbook(args) -> int:
+    """Сводная книга: по листу на сущность, листы строятся параллельно"""
+    sheets = list(MONTH_END_SHEETS)
+    if args.period:
+        date_from, date_to = args.period
+        sheets = [
+            ("shipments", "period", {"date_from": date_from, "date_to": date_to})
+            if entity == "shipments" else (entity, filter_type, params)
+            for entity, filter_type, params in sheets
+        ]
+
+    output = args.output or default_export_path("отчет", "xlsx")
+    counts = build_workbook(output, sheets, max_workers=args.workers)
+
+    for title, count in counts.items():
+        print(f"{title}: {count}")
+    print(f"Книга сохранена -> {output}")
+    return 0
+
+
+def cmd_partitions(args) -> int:
+    """Партиции перевозок: создать будущие месяцы, отключить старые"""
+    today = datetime.date.today()
+    date_to = today + datetime.timedelta(days=31 * args.months_ahead)
+
+    session = SyncDatabase.get_session()
+    try:
+        created = ensure_shipment_partitions(session, today, date_to)
+        print(f"Создано партиций: {created} (до {date_to:%Y-%m})")
+
+        if args.detach_before:
+            detached = detach_shipment_partitions(session, args.detach_before)
+            for name in detached:
+                print(f"Отключена: {name}")
+            print(f"Отключено партиций: {len(detached)}")
+    finally:
+        session.close()
+    return 0
+
+
+def cmd_archive(args) -> int:
+    """Перенос старых завершенных перевозок в архив"""
+    session = SyncDatabase.get_session()
+    try:
+        moved = archive_shipments(session, args.older_than)
+    finally:
+        session.close()
+
+    print(f"Перенесено в архив: {moved}")
+    return 0
+
+
+def cmd_purge(args) -> int:
+    """Физическое удаление давно помеченных удаленными строк"""
+    session = SyncDatabase.get_session()
+    try:
+        purged = purge_inactive(session, args.older_than_days)
+    finally:
+        session.close()
+
+    for table, count in purged.items():
+        print(f"{table}: {count}")
+    return 0
+
+
+def read_shipments_csv(path: str) -> Iterator[Dict[str, Any]]:
+    """Перевозки из CSV с заголовком; пустые ячейки пропускаются"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = [column for column in SHIPMENT_IMPORT_REQUIRED if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"В файле нет столбцов: {', '.join(missing)}")
+
+        for line, record in enumerate(reader, start=2):
+            try:
+                yield {
+                    column: cast(record[column].strip())
+                    for column, cast in SHIPMENT_IMPORT_COLUMNS.items()
+                    if (record.get(column) or "").strip()
+                }
+            except ValueError as e:
+                raise ValueError(f"Строка {line}: {e}") from e
+
+
+def cmd_import(args) -> int:
+    """Загрузка перевозок из CSV пачками"""
+    imported = 0
+    batch = []
+    session = SyncDatabase.get_session()
+    try:
+        for row in read_shipments_csv(args.file):
+            batch.append(row)
+            if len(batch) >= args.batch:
+                imported += create_shipments(session, batch)
+                batch = []
+        imported += create_shipments(session, batch)
+    except ValueError as e:
+        session.rollback()
+        print(e, file=sys.stderr)
+        print(f"Загружено до ошибки: {imported}", file=sys.stderr)
+        return 1
+    finally:
+        session.close()
+
+    print(f"Загружено перевозок: {imported}")
+    return 0
+
+
+def cmd_recalculate(args) -> int:
+    """Пересчет стоимости перевозок, разошедшейся с маршрутом и тарифом"""
+    session = SyncDatabase.get_session()
+    try:
+        updated = recalculate_shipment_costs(session)
+    finally:
+        session.close()
+
+    print(f"Пересчитано перевозок: {updated}")
+    return 0
+
+
+def cmd_rollups(args) -> int:
+    """Полный пересчет дневных сводок выручки"""
+    session = SyncDatabase.get_session()
+    try:
+        rebuild_revenue_rollups(session)
+    finally:
+        session.close()
+
+    print("Сводки выручки пересчитаны")
+    return 0
+
+
+def cmd_revenue(args) -> int:
+    """Отчет по выручке из дневных сводок"""
+    session = SyncDatabase.get_session()
+    try:
+        rows = get_revenue(session, args.by, args.period, args.date_from, args.date_to)
+    finally:
+        session.close()
+
+    print(f"{'Период':<12}{'Название':<40}{'Перевозок':>10}{'Вес, кг':>14}{'Выручка, руб':>16}")
+    for row in rows:
+        print(f"{row['period']:%Y-%m-%d}  {str(row['name'] or row['id'])[:38]:<40}"
+              f"{row['shipments_count']:>10}{row['total_weight']:>14.0f}{row['total_cost']:>16.2f}")
+    return 0
+
+
+def cmd_utilization(args) -> int:
+    """Загрузка машин или водителей за период"""
+    date_from = datetime.datetime.combine(args.date_from, datetime.time())
+    date_to = datetime.datetime.combine(args.date_to, datetime.time())
+    if date_to <= date_from:
+        print("Конец периода должен быть позже начала", file=sys.stderr)
+        return 2
+
+    session = SyncDatabase.get_session()
+    try:
+        rows = get_utilization(session, date_from, date_to, args.by)
+    finally:
+        session.close()
+
+    if args.top:
+        rows = rows[:args.top]
+    print(f"{'id':<38}{'Загрузка':>10}{'Часов в работе':>16}{'Простоев':>10}{'Макс. простой, ч':>18}")
+    for row in rows:
+        print(f"{str(row['id']):<38}{row['utilization']:>10.1%}{row['busy_hours']:>16.1f}"
+              f"{row['idle_gaps']:>10}{row['longest_idle_hours']:>18.1f}")
+    return 0
+
+
+def cmd_benchmark(args) -> int:
+    """Запуск замера из Benchmarks/ с его собственными аргументами"""
+    module = importlib.import_module(BENCHMARKS[args.name])
+    return module.main(args.args)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Операции с базой перевозок без GUI")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export = subparsers.add_parser("export", help="Выгрузка в xlsx, csv (COPY) или parquet")
+    export.add_argument("entity", choices=list(EXPORTS), help="Что выгружать")
+    export.add_argument("--filter", default="all", help="Вариант выгрузки (как в диалоге экспорта)")
+    export.add_argument("--format", default="xlsx", choices=[fmt for _, fmt in EXPORT_FORMATS])
+    export.add_argument("-o", "--output", help="Файл (по умолчанию - папка загрузок)")
+    export.add_argument("--param", action="append", default=[], metavar="KEY=VALUE",
+                        help="Параметр варианта, например status=delivered или cargo_type=Общий")
+    export.set_defaults(func=cmd_export)
+
+    workbook = subparsers.add_parser("workbook", help="Сводная книга Excel (машины, водители, маршруты, тарифы, перевозки)")
+    workbook.add_argument("-o", "--output", help="Файл (по умолчанию - папка загрузок)")
+    workbook.add_argument("--period", nargs=2, metavar=("FROM", "TO"), type=datetime.date.fromisoformat,
+                          help="Перевозки только за период (ГГГГ-ММ-ДД, TO включительно)")
+    workbook.add_argument("--workers", type=int, help="Число процессов (по умолчанию - по листу на процесс)")
+    workbook.set_defaults(func=cmd_workbook)
+
+    partitions = subparsers.add_parser("partitions", help="Месячные партиции перевозок (для запуска по расписанию)")
+    partitions.add_argument("--months-ahead", type=int, default=SHIPMENT_PARTITION_MONTHS_AHEAD,
+                            help="На сколько месяцев вперед создать партиции")
+    partitions.add_argument("--detach-before", type=datetime.date.fromisoformat, metavar="ГГГГ-ММ-ДД",
+                            help="Отключить партиции месяцев раньше этой даты (данные остаются в shipment_detached_*)")
+    partitions.set_defaults(func=cmd_partitions)
+
+    archive = subparsers.add_parser("archive", help="Перенести доставленные и отмененные перевозки в архив")
+    archive.add_argument("--older-than", type=int, default=ARCHIVE_AFTER_MONTHS, metavar="МЕСЯЦЕВ",
+                         help="Переносить перевозки старше стольких месяцев")
+    archive.set_defaults(func=cmd_archive)
+
+    purge = subparsers.add_parser("purge", help="Физически удалить строки, помеченные удаленными (active = false)")
+    purge.add_argument("--older-than-days", type=int, default=PURGE_AFTER_DAYS, metavar="ДНЕЙ",
+                       help="Удалять только помеченные раньше стольких дней назад")
+    purge.set_defaults(func=cmd_purge)
+
+    import_ = subparsers.add_parser("import", help="Загрузить перевозки из CSV")
+    import_.add_argument("entity", choices=["shipments"], help="Что загружать")
+    import_.add_argument("file", help=f"CSV с заголовком: {', '.join(SHIPMENT_IMPORT_COLUMNS)} "
+                                      "(без tariff_id берется самый дешевый тариф маршрута)")
+    import_.add_argument("--batch", type=int, default=5000, help="Перевозок в одной транзакции")
+    import_.set_defaults(func=cmd_import)
+
+    recalculate = subparsers.add_parser("recalculate", help="Пересчитать стоимость перевозок по маршрутам и тарифам")
+    recalculate.set_defaults(func=cmd_recalculate)
+
+    rollups = subparsers.add_parser("rollups", help="Пересчитать дневные сводки выручки с нуля")
+    rollups.set_defaults(func=cmd_rollups)
+
+    revenue = subparsers.add_parser("revenue", help="Выручка по периодам из дневных сводок")
+    revenue.add_argument("--by", default="route", choices=list(REVENUE_ROLLUPS))
+    revenue.add_argument("--period", default="month", choices=list(PERIODS))
+    revenue.add_argument("--from", dest="date_from", type=datetime.date.fromisoformat, metavar="ГГГГ-ММ-ДД")
+    revenue.add_argument("--to", dest="date_to", type=datetime.date.fromisoformat, metavar="ГГГГ-ММ-ДД")
+    revenue.set_defaults(func=cmd_revenue)
+
+    utilization = subparsers.add_parser("utilization", help="Загрузка машин или водителей за период")
+    utilization.add_argument("--from", dest="date_from", type=datetime.date.fromisoformat, required=True,
+                             metavar="ГГГГ-ММ-ДД")
+    utilization.add_argument("--to", dest="date_to", type=datetime.date.fromisoformat, required=True,
+                             metavar="ГГГГ-ММ-ДД", help="Не включая этот день")
+    utilization.add_argument("--by", default="car", choices=["car", "driver"])
+    utilization.add_argument("--top", type=int, help="Показать только первые N по загрузке")
+    utilization.set_defaults(func=cmd_utilization)
+
+    benchmark = subparsers.add_parser("benchmark", help="Запустить замер из Benchmarks/")
+    benchmark.add_argument("name", choices=list(BENCHMARKS))
+    benchmark.add_argument("args", nargs=argparse.REMAINDER, help="Аргументы замера (см. --help замера)")
+    benchmark.set_defaults(func=cmd_benchmark)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,16 @@
 # main.py
+import multiprocessing
 import sys
 from PySide6.QtWidgets import QApplication
 from Gui.route_main_window import MainWindow
 
-app = QApplication(sys.argv)
-window = MainWindow()
-window.show()
-sys.exit(app.exec())
+
+if __name__ == "__main__":
+    # Сводная книга строит листы в дочерних процессах (spawn),
+    # они импортируют этот модуль повторно и не должны запускать окно
+    multiprocessing.freeze_support()
+
+    app = QApplication(sys.argv)
+    window = MainWindow()
+    window.show()
+    sys.exit(app.exec())
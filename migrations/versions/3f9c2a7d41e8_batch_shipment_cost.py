@@ -0,0 +1,216 @@
+"""batch shipment cost
+
+Revision ID: 3f9c2a7d41e8
+Revises: 5b69bc8750a4
+Create Date: 2026-10-19 17:05:12.418233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d41e8'
+down_revision: Union[str, Sequence[str], None] = '5b69bc8750a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Построчный триггер стоимости на вставку заменяем триггером уровня
+    # оператора с таблицей переходов: маршрут и тариф подтягиваются одним
+    # JOIN на весь INSERT/COPY, а не двумя запросами на каждую строку.
+    op.execute("DROP TRIGGER IF EXISTS auto_calculate_shipment_cost ON shipment;")
+    op.execute("DROP FUNCTION IF EXISTS calculate_shipment_cost();")
+
+    # Индексы для пересчета перевозок по маршруту и тарифу
+    op.create_index('ix_shipment_route_id', 'shipment', ['route_id'])
+    op.create_index('ix_shipment_tariff_id', 'shipment', ['tariff_id'])
+
+    # 1. Новые перевозки: стоимость одним UPDATE по вставленным строкам
+    op.execute("""
+    CREATE OR REPLACE FUNCTION calculate_inserted_shipments_cost()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        UPDATE shipment s
+        SET total_cost = GREATEST(r.distance_km * t.price_per_km, t.min_price)
+        FROM new_shipments n
+        JOIN route r ON r.id = n.route_id
+        JOIN tariff t ON t.id = n.tariff_id
+        WHERE s.id = n.id;
+
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+    DROP TRIGGER IF EXISTS shipment_cost_after_insert ON shipment;
+    CREATE TRIGGER shipment_cost_after_insert
+        AFTER INSERT ON shipment
+        REFERENCING NEW TABLE AS new_shipments
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION calculate_inserted_shipments_cost();
+    """)
+
+    # 2. Смена маршрута или тарифа у отдельной перевозки - редкая правка,
+    # построчный триггер со списком столбцов и WHEN не срабатывает ни на
+    # массовую смену статуса, ни на пересчет total_cost из триггеров выше.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION recalculate_shipment_cost()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        SELECT GREATEST(r.distance_km * t.price_per_km, t.min_price)
+        INTO NEW.total_cost
+        FROM route r, tariff t
+        WHERE r.id = NEW.route_id
+          AND t.id = NEW.tariff_id;
+
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+    DROP TRIGGER IF EXISTS shipment_cost_before_update ON shipment;
+    CREATE TRIGGER shipment_cost_before_update
+        BEFORE UPDATE OF route_id, tariff_id ON shipment
+        FOR EACH ROW
+        WHEN (OLD.route_id IS DISTINCT FROM NEW.route_id
+              OR OLD.tariff_id IS DISTINCT FROM NEW.tariff_id)
+        EXECUTE FUNCTION recalculate_shipment_cost();
+    """)
+
+    # 3. Изменение цены тарифа: пересчет только его перевозок
+    op.execute("""
+    CREATE OR REPLACE FUNCTION recalculate_cost_on_tariff_change()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        UPDATE shipment s
+        SET total_cost = GREATEST(r.distance_km * n.price_per_km, n.min_price)
+        FROM new_tariffs n
+        JOIN old_tariffs o ON o.id = n.id,
+             route r
+        WHERE s.tariff_id = n.id
+          AND r.id = s.route_id
+          AND (n.price_per_km, n.min_price) IS DISTINCT FROM (o.price_per_km, o.min_price);
+
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+    DROP TRIGGER IF EXISTS tariff_price_recalculate ON tariff;
+    CREATE TRIGGER tariff_price_recalculate
+        AFTER UPDATE ON tariff
+        REFERENCING OLD TABLE AS old_tariffs NEW TABLE AS new_tariffs
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION recalculate_cost_on_tariff_change();
+    """)
+
+    # 4. Изменение расстояния маршрута: пересчет только его перевозок
+    op.execute("""
+    CREATE OR REPLACE FUNCTION recalculate_cost_on_route_change()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        UPDATE shipment s
+        SET total_cost = GREATEST(n.distance_km * t.price_per_km, t.min_price)
+        FROM new_routes n
+        JOIN old_routes o ON o.id = n.id,
+             tariff t
+        WHERE s.route_id = n.id
+          AND t.id = s.tariff_id
+          AND n.distance_km IS DISTINCT FROM o.distance_km;
+
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+    DROP TRIGGER IF EXISTS route_distance_recalculate ON route;
+    CREATE TRIGGER route_distance_recalculate
+        AFTER UPDATE ON route
+        REFERENCING OLD TABLE AS old_routes NEW TABLE AS new_routes
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION recalculate_cost_on_route_change();
+    """)
+
+    # 5. Проверка грузоподъемности нужна только при смене машины или веса:
+    # массовая смена статуса и пересчет стоимости ее больше не вызывают
+    op.execute("""
+    DROP TRIGGER IF EXISTS validate_shipment_capacity ON shipment;
+    CREATE TRIGGER validate_shipment_capacity
+        BEFORE INSERT OR UPDATE OF car_id, cargo_weight ON shipment
+        FOR EACH ROW
+        EXECUTE FUNCTION check_shipment_capacity();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+    DROP TRIGGER IF EXISTS validate_shipment_capacity ON shipment;
+    CREATE TRIGGER validate_shipment_capacity
+        BEFORE INSERT OR UPDATE ON shipment
+        FOR EACH ROW
+        EXECUTE FUNCTION check_shipment_capacity();
+    """)
+
+    op.execute("DROP TRIGGER IF EXISTS route_distance_recalculate ON route;")
+    op.execute("DROP FUNCTION IF EXISTS recalculate_cost_on_route_change();")
+
+    op.execute("DROP TRIGGER IF EXISTS tariff_price_recalculate ON tariff;")
+    op.execute("DROP FUNCTION IF EXISTS recalculate_cost_on_tariff_change();")
+
+    op.execute("DROP TRIGGER IF EXISTS shipment_cost_before_update ON shipment;")
+    op.execute("DROP FUNCTION IF EXISTS recalculate_shipment_cost();")
+
+    op.execute("DROP TRIGGER IF EXISTS shipment_cost_after_insert ON shipment;")
+    op.execute("DROP FUNCTION IF EXISTS calculate_inserted_shipments_cost();")
+
+    op.drop_index('ix_shipment_tariff_id', table_name='shipment')
+    op.drop_index('ix_shipment_route_id', table_name='shipment')
+
+    # Возвращаем построчный триггер из 7c31029a1d82
+    op.execute("""
+    CREATE OR REPLACE FUNCTION calculate_shipment_cost()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        route_distance FLOAT;
+        tariff_price_per_km FLOAT;
+        tariff_min_price FLOAT;
+        calculated_cost FLOAT;
+    BEGIN
+        SELECT distance_km INTO route_distance
+        FROM route
+        WHERE id = NEW.route_id;
+
+        SELECT price_per_km, min_price INTO tariff_price_per_km, tariff_min_price
+        FROM tariff
+        WHERE id = NEW.tariff_id;
+
+        IF route_distance IS NOT NULL AND tariff_price_per_km IS NOT NULL THEN
+            calculated_cost := route_distance * tariff_price_per_km;
+
+            IF tariff_min_price IS NOT NULL AND calculated_cost < tariff_min_price THEN
+                calculated_cost := tariff_min_price;
+            END IF;
+
+            NEW.total_cost := calculated_cost;
+        END IF;
+
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+    DROP TRIGGER IF EXISTS auto_calculate_shipment_cost ON shipment;
+    CREATE TRIGGER auto_calculate_shipment_cost
+        BEFORE INSERT OR UPDATE OF route_id, tariff_id, cargo_weight ON shipment
+        FOR EACH ROW
+        EXECUTE FUNCTION calculate_shipment_cost();
+    """)
@@ -0,0 +1,301 @@
+"""partition shipment
+
+Revision ID: 9a41c7e2d5b0
+Revises: 3f9c2a7d41e8
+Create Date: 2026-10-19 19:42:37.105872
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a41c7e2d5b0'
+down_revision: Union[str, Sequence[str], None] = '3f9c2a7d41e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Сколько месяцев вперед создавать партиции при миграции
+MONTHS_AHEAD = 12
+
+
+def _create_shipment_constraints(primary_key: Sequence[str]):
+    """Первичный ключ, внешние ключи и индексы таблицы shipment"""
+    op.create_primary_key('shipment_pkey', 'shipment', list(primary_key))
+    op.create_foreign_key('shipment_car_id_fkey', 'shipment', 'car', ['car_id'], ['id'])
+    op.create_foreign_key('shipment_driver_id_fkey', 'shipment', 'driver', ['driver_id'], ['id'])
+    op.create_foreign_key('shipment_route_id_fkey', 'shipment', 'route', ['route_id'], ['id'])
+    op.create_foreign_key('shipment_tariff_id_fkey', 'shipment', 'tariff', ['tariff_id'], ['id'])
+    op.create_index('ix_shipment_route_id', 'shipment', ['route_id'])
+    op.create_index('ix_shipment_tariff_id', 'shipment', ['tariff_id'])
+
+
+def _create_shipment_triggers():
+    """Триггеры shipment из 3f9c2a7d41e8 (функции остаются в базе)"""
+    op.execute("""
+    CREATE TRIGGER validate_shipment_capacity
+        BEFORE INSERT OR UPDATE OF car_id, cargo_weight ON shipment
+        FOR EACH ROW
+        EXECUTE FUNCTION check_shipment_capacity();
+    """)
+
+    op.execute("""
+    CREATE TRIGGER shipment_cost_after_insert
+        AFTER INSERT ON shipment
+        REFERENCING NEW TABLE AS new_shipments
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION calculate_inserted_shipments_cost();
+    """)
+
+    op.execute("""
+    CREATE TRIGGER shipment_cost_before_update
+        BEFORE UPDATE OF route_id, tariff_id ON shipment
+        FOR EACH ROW
+        WHEN (OLD.route_id IS DISTINCT FROM NEW.route_id
+              OR OLD.tariff_id IS DISTINCT FROM NEW.tariff_id)
+        EXECUTE FUNCTION recalculate_shipment_cost();
+    """)
+
+
+def upgrade() -> None:
+    # Таблицу нельзя сделать секционированной на месте: переименовываем старую,
+    # создаем новую с той же структурой и переносим данные.
+    # Имя старой таблицы больше не 'shipment', поэтому prevent_important_drops
+    # не мешает удалить ее в конце.
+    op.execute("ALTER TABLE shipment RENAME TO shipment_unpartitioned;")
+    op.execute("ALTER TABLE shipment_unpartitioned RENAME CONSTRAINT shipment_pkey TO shipment_unpartitioned_pkey;")
+    op.drop_index('ix_shipment_route_id', table_name='shipment_unpartitioned')
+    op.drop_index('ix_shipment_tariff_id', table_name='shipment_unpartitioned')
+
+    op.execute("""
+    CREATE TABLE shipment (LIKE shipment_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+    PARTITION BY RANGE (shipment_date);
+    """)
+
+    # Ключ секционирования обязан входить в первичный ключ
+    _create_shipment_constraints(['id', 'shipment_date'])
+    op.create_index('ix_shipment_shipment_date', 'shipment', ['shipment_date'])
+
+    # Партиция по умолчанию: вставка с датой вне созданных месяцев не падает
+    op.execute("CREATE TABLE shipment_default PARTITION OF shipment DEFAULT;")
+
+    # 1. Партиция одного месяца: shipment_ГГГГ_ММ.
+    # Строки этого месяца, успевшие попасть в shipment_default, переносятся
+    # в новую таблицу до подключения - иначе ATTACH не пройдет проверку.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION create_shipment_partition(p_month DATE)
+    RETURNS TEXT AS $$
+    DECLARE
+        month_start DATE := date_trunc('month', p_month)::DATE;
+        month_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::DATE;
+        partition_name TEXT := 'shipment_' || to_char(p_month, 'YYYY_MM');
+    BEGIN
+        IF to_regclass(partition_name) IS NOT NULL THEN
+            RETURN NULL;
+        END IF;
+
+        EXECUTE format(
+            'CREATE TABLE %I (LIKE shipment INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+            partition_name
+        );
+
+        EXECUTE format(
+            'WITH moved AS (
+                DELETE FROM shipment_default
+                WHERE shipment_date >= %L AND shipment_date < %L
+                RETURNING *
+            )
+            INSERT INTO %I SELECT * FROM moved',
+            month_start, month_end, partition_name
+        );
+
+        EXECUTE format(
+            'ALTER TABLE shipment ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+            partition_name, month_start, month_end
+        );
+
+        RETURN partition_name;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+    # 2. Партиции на все месяцы периода, возвращает число созданных
+    op.execute("""
+    CREATE OR REPLACE FUNCTION ensure_shipment_partitions(p_from DATE, p_to DATE)
+    RETURNS INTEGER AS $$
+    DECLARE
+        month_start DATE := date_trunc('month', p_from)::DATE;
+        created INTEGER := 0;
+    BEGIN
+        WHILE month_start <= p_to LOOP
+            IF create_shipment_partition(month_start) IS NOT NULL THEN
+                created := created + 1;
+            END IF;
+            month_start := (month_start + INTERVAL '1 month')::DATE;
+        END LOOP;
+
+        RETURN created;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+    # 3. Отключение старых партиций: DETACH меняет только каталог, данные
+    # остаются в отдельной таблице shipment_detached_ГГГГ_ММ (ее можно
+    # выгрузить или удалить). Отключаются месяцы, целиком лежащие раньше p_before.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION detach_shipment_partitions(p_before DATE)
+    RETURNS SETOF TEXT AS $$
+    DECLARE
+        partition_name TEXT;
+    BEGIN
+        FOR partition_name IN
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'shipment'::regclass
+              AND c.relname ~ '^shipment_[0-9]{4}_[0-9]{2}$'
+              AND to_date(substr(c.relname, 10), 'YYYY_MM') + INTERVAL '1 month' <= p_before
+            ORDER BY c.relname
+        LOOP
+            EXECUTE format('ALTER TABLE shipment DETACH PARTITION %I', partition_name);
+            EXECUTE format(
+                'ALTER TABLE %I RENAME TO %I',
+                partition_name, 'shipment_detached_' || substr(partition_name, 10)
+            );
+            RETURN NEXT 'shipment_detached_' || substr(partition_name, 10);
+        END LOOP;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+    # 4. Защита от удаления распространяется на подключенные партиции:
+    # DROP TABLE shipment_ГГГГ_ММ молча удалил бы месяц перевозок.
+    # Отключенные партиции переименованы в shipment_detached_* и не защищены.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION prevent_table_drop()
+    RETURNS event_trigger
+    LANGUAGE plpgsql
+    AS $$
+    DECLARE
+        obj record;
+    BEGIN
+        FOR obj IN SELECT * FROM pg_event_trigger_dropped_objects()
+        LOOP
+            -- Запрещаем удаление таблицы shipment
+            IF obj.object_type = 'table' AND obj.object_name = 'shipment' THEN
+                RAISE EXCEPTION 'Удаление таблицы shipment запрещено!';
+            END IF;
+
+            -- Запрещаем удаление партиций shipment (сначала detach_shipment_partitions)
+            IF obj.object_type = 'table'
+               AND (obj.object_name = 'shipment_default'
+                    OR obj.object_name ~ '^shipment_[0-9]{4}_[0-9]{2}$') THEN
+                RAISE EXCEPTION 'Удаление партиции % запрещено, сначала отключите ее', obj.object_name;
+            END IF;
+
+            -- Запрещаем удаление других важных таблиц
+            IF obj.object_type = 'table' AND obj.object_name IN ('driver', 'car', 'route', 'tariff') THEN
+                RAISE EXCEPTION 'Удаление таблицы % запрещено!', obj.object_name;
+            END IF;
+        END LOOP;
+    END;
+    $$;
+    """)
+
+    # Партиции от первой перевозки до MONTHS_AHEAD месяцев вперед
+    op.execute(f"""
+    SELECT ensure_shipment_partitions(
+        COALESCE((SELECT min(shipment_date) FROM shipment_unpartitioned), now())::DATE,
+        (now() + INTERVAL '{MONTHS_AHEAD} months')::DATE
+    );
+    """)
+
+    # Стоимость уже посчитана, поэтому данные переносим до создания триггеров
+    op.execute("INSERT INTO shipment SELECT * FROM shipment_unpartitioned;")
+    op.execute("DROP TABLE shipment_unpartitioned;")
+
+    # Пересчет стоимости новых строк: соединение и по дате, чтобы каждая
+    # строка искалась только в своей партиции
+    op.execute("""
+    CREATE OR REPLACE FUNCTION calculate_inserted_shipments_cost()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        UPDATE shipment s
+        SET total_cost = GREATEST(r.distance_km * t.price_per_km, t.min_price)
+        FROM new_shipments n
+        JOIN route r ON r.id = n.route_id
+        JOIN tariff t ON t.id = n.tariff_id
+        WHERE s.id = n.id
+          AND s.shipment_date = n.shipment_date;
+
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+    _create_shipment_triggers()
+    op.execute("ANALYZE shipment;")
+
+
+def downgrade() -> None:
+    # Возвращаем прежнюю защиту, иначе партиции не удалить вместе с таблицей
+    op.execute("""
+    CREATE OR REPLACE FUNCTION prevent_table_drop()
+    RETURNS event_trigger
+    LANGUAGE plpgsql
+    AS $$
+    DECLARE
+        obj record;
+    BEGIN
+        FOR obj IN SELECT * FROM pg_event_trigger_dropped_objects()
+        LOOP
+            -- Запрещаем удаление таблицы shipment
+            IF obj.object_type = 'table' AND obj.object_name = 'shipment' THEN
+                RAISE EXCEPTION 'Удаление таблицы shipment запрещено!';
+            END IF;
+
+            -- Запрещаем удаление других важных таблиц
+            IF obj.object_type = 'table' AND obj.object_name IN ('driver', 'car', 'route', 'tariff') THEN
+                RAISE EXCEPTION 'Удаление таблицы % запрещено!', obj.object_name;
+            END IF;
+        END LOOP;
+    END;
+    $$;
+    """)
+
+    op.execute("ALTER TABLE shipment RENAME TO shipment_partitioned;")
+    op.execute("ALTER TABLE shipment_partitioned RENAME CONSTRAINT shipment_pkey TO shipment_partitioned_pkey;")
+    op.drop_index('ix_shipment_shipment_date', table_name='shipment_partitioned')
+    op.drop_index('ix_shipment_route_id', table_name='shipment_partitioned')
+    op.drop_index('ix_shipment_tariff_id', table_name='shipment_partitioned')
+
+    op.execute("CREATE TABLE shipment (LIKE shipment_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS);")
+    op.execute("INSERT INTO shipment SELECT * FROM shipment_partitioned;")
+    # Вместе с таблицей удаляются и все подключенные партиции
+    op.execute("DROP TABLE shipment_partitioned;")
+
+    op.execute("DROP FUNCTION IF EXISTS detach_shipment_partitions(DATE);")
+    op.execute("DROP FUNCTION IF EXISTS ensure_shipment_partitions(DATE, DATE);")
+    op.execute("DROP FUNCTION IF EXISTS create_shipment_partition(DATE);")
+
+    op.execute("""
+    CREATE OR REPLACE FUNCTION calculate_inserted_shipments_cost()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        UPDATE shipment s
+        SET total_cost = GREATEST(r.distance_km * t.price_per_km, t.min_price)
+        FROM new_shipments n
+        JOIN route r ON r.id = n.route_id
+        JOIN tariff t ON t.id = n.tariff_id
+        WHERE s.id = n.id;
+
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+
+    _create_shipment_constraints(['id'])
+    _create_shipment_triggers()
@@ -0,0 +1,35 @@
+"""row versions
+
+Revision ID: a3d9e4f6b152
+Revises: f7c3d85a2e19
+Create Date: 2026-10-20 02:17:45.904213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d9e4f6b152'
+down_revision: Union[str, Sequence[str], None] = 'f7c3d85a2e19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Все таблицы моделей Shared/Base.py. shipment_archive - тоже: перенос
+# в архив копирует строки по списку столбцов shipment
+VERSIONED_TABLES = ['car', 'driver', 'route', 'tariff', 'route_tariff', 'shipment', 'shipment_archive']
+
+
+def upgrade() -> None:
+    # Столбец с постоянным значением по умолчанию добавляется без перезаписи
+    # таблицы; у секционированной shipment он появляется во всех партициях
+    for table in VERSIONED_TABLES:
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    for table in reversed(VERSIONED_TABLES):
+        op.drop_column(table, 'version')
@@ -0,0 +1,31 @@
+"""dispatch leases
+
+Revision ID: c1f5a8e2d947
+Revises: a3d9e4f6b152
+Create Date: 2026-10-20 03:48:30.118592
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1f5a8e2d947'
+down_revision: Union[str, Sequence[str], None] = 'a3d9e4f6b152'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Аренда перевозки диспетчером (Services/Dispatch): кто взял и до какого
+    # времени. Только в shipment - в архив ожидающие перевозки не попадают.
+    # Очередь выбирает по ix_shipment_active_status_date (status, shipment_date).
+    op.add_column('shipment', sa.Column('claimed_by', sa.String(length=100), nullable=True))
+    op.add_column('shipment', sa.Column('claimed_until', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('shipment', 'claimed_until')
+    op.drop_column('shipment', 'claimed_by')
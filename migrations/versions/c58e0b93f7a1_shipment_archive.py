@@ -0,0 +1,53 @@
+"""shipment archive
+
+Revision ID: c58e0b93f7a1
+Revises: 9a41c7e2d5b0
+Create Date: 2026-10-19 21:16:04.552917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c58e0b93f7a1'
+down_revision: Union[str, Sequence[str], None] = '9a41c7e2d5b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Архив завершенных перевозок: те же столбцы, что у shipment, плюс время
+    # переноса. Таблица обычная (без партиций и триггеров) - в нее только
+    # дописывают, а читают редко.
+    op.execute("""
+    CREATE TABLE shipment_archive (LIKE shipment INCLUDING DEFAULTS INCLUDING CONSTRAINTS);
+    """)
+    op.add_column('shipment_archive', sa.Column(
+        'archived_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False
+    ))
+
+    op.create_primary_key('shipment_archive_pkey', 'shipment_archive', ['id'])
+    op.create_foreign_key('shipment_archive_car_id_fkey', 'shipment_archive', 'car', ['car_id'], ['id'])
+    op.create_foreign_key('shipment_archive_driver_id_fkey', 'shipment_archive', 'driver', ['driver_id'], ['id'])
+    op.create_foreign_key('shipment_archive_route_id_fkey', 'shipment_archive', 'route', ['route_id'], ['id'])
+    op.create_foreign_key('shipment_archive_tariff_id_fkey', 'shipment_archive', 'tariff', ['tariff_id'], ['id'])
+    op.create_index('ix_shipment_archive_shipment_date', 'shipment_archive', ['shipment_date'])
+
+
+def downgrade() -> None:
+    # Перевозки из архива возвращаем в рабочую таблицу, чтобы не потерять.
+    # Стоимость уже посчитана, триггер вставки пересчитает ее так же.
+    op.execute("""
+    INSERT INTO shipment (
+        id, shipment_date, cargo_weight, status, car_id, driver_id,
+        route_id, tariff_id, total_cost, created_at, updated_at, active
+    )
+    SELECT
+        id, shipment_date, cargo_weight, status, car_id, driver_id,
+        route_id, tariff_id, total_cost, created_at, updated_at, active
+    FROM shipment_archive;
+    """)
+    op.drop_table('shipment_archive')
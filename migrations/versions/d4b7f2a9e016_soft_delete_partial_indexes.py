@@ -0,0 +1,57 @@
+"""soft delete partial indexes
+
+Revision ID: d4b7f2a9e016
+Revises: c58e0b93f7a1
+Create Date: 2026-10-19 22:48:51.730264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b7f2a9e016'
+down_revision: Union[str, Sequence[str], None] = 'c58e0b93f7a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Частичные индексы только по живым строкам (active = true).
+# Условие в запросах должно быть "WHERE active" или "active = true":
+# "active IS TRUE" планировщик с предикатом индекса не сопоставляет.
+PARTIAL_INDEXES = [
+    ('ix_shipment_active_status_date', 'shipment', ['status', 'shipment_date']),
+    ('ix_shipment_active_driver_id', 'shipment', ['driver_id']),
+    ('ix_shipment_active_car_id', 'shipment', ['car_id']),
+    ('ix_tariff_active_date_start', 'tariff', ['date_start']),
+    ('ix_route_tariff_active_route_id', 'route_tariff', ['route_id']),
+]
+
+
+def upgrade() -> None:
+    # Госномер и номер прав уникальны только среди живых записей:
+    # удаленную машину или водителя можно завести заново
+    op.drop_constraint('car_license_plate_key', 'car', type_='unique')
+    op.create_index('ux_car_license_plate_active', 'car', ['license_plate'], unique=True,
+                    postgresql_where=sa.text('active'))
+
+    op.drop_constraint('driver_license_number_key', 'driver', type_='unique')
+    op.create_index('ux_driver_license_number_active', 'driver', ['license_number'], unique=True,
+                    postgresql_where=sa.text('active'))
+
+    for name, table, columns in PARTIAL_INDEXES:
+        op.create_index(name, table, columns, postgresql_where=sa.text('active'))
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(PARTIAL_INDEXES):
+        op.drop_index(name, table_name=table)
+
+    # Уникальность по всем строкам вернется, только если среди удаленных нет повторов
+    op.drop_index('ux_driver_license_number_active', table_name='driver')
+    op.create_unique_constraint('driver_license_number_key', 'driver', ['license_number'])
+
+    op.drop_index('ux_car_license_plate_active', table_name='car')
+    op.create_unique_constraint('car_license_plate_key', 'car', ['license_plate'])
@@ -0,0 +1,37 @@
+"""deferrable driver car unique
+
+Revision ID: d8a2f5c3e619
+Revises: c1f5a8e2d947
+Create Date: 2026-10-20 05:12:38.204517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a2f5c3e619'
+down_revision: Union[str, Sequence[str], None] = 'c1f5a8e2d947'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONSTRAINT_NAME = 'driver_car_id_key'
+
+
+def upgrade() -> None:
+    # Немедленная уникальность проверяется построчно, поэтому обмен машинами
+    # (A <- машина B, B <- машина A) падает даже одним UPDATE. Отложенная
+    # проверяется при COMMIT, когда перестановка уже целиком применена.
+    # Для UNIQUE ALTER CONSTRAINT не меняет DEFERRABLE - пересоздаем.
+    op.drop_constraint(CONSTRAINT_NAME, 'driver', type_='unique')
+    op.create_unique_constraint(
+        CONSTRAINT_NAME, 'driver', ['car_id'],
+        deferrable=True, initially='DEFERRED'
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(CONSTRAINT_NAME, 'driver', type_='unique')
+    op.create_unique_constraint(CONSTRAINT_NAME, 'driver', ['car_id'])
@@ -0,0 +1,47 @@
+"""trigram search
+
+Revision ID: e2a6c91f3b84
+Revises: d4b7f2a9e016
+Create Date: 2026-10-19 23:37:12.905118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a6c91f3b84'
+down_revision: Union[str, Sequence[str], None] = 'd4b7f2a9e016'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Триграммные GIN-индексы для поиска по подстроке (ILIKE '%...%')
+# и по похожести (оператор %). Как и в d4b7f2a9e016, только живые строки:
+# поиск в Shared/search.py всегда фильтрует "WHERE active".
+TRIGRAM_INDEXES = [
+    ('ix_route_origin_trgm', 'route', 'origin'),
+    ('ix_route_destination_trgm', 'route', 'destination'),
+    ('ix_driver_full_name_trgm', 'driver', 'full_name'),
+    ('ix_car_license_plate_trgm', 'car', 'license_plate'),
+    ('ix_car_brand_trgm', 'car', 'brand'),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(name, table, [column],
+                        postgresql_using='gin',
+                        postgresql_ops={column: 'gin_trgm_ops'},
+                        postgresql_where=sa.text('active'))
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table_name=table)
+
+    op.execute("DROP EXTENSION IF EXISTS pg_trgm;")
@@ -0,0 +1,71 @@
+"""lock shipment partition creation
+
+Revision ID: e4b9c2d7a318
+Revises: d8a2f5c3e619
+Create Date: 2026-10-20 06:02:47.513920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b9c2d7a318'
+down_revision: Union[str, Sequence[str], None] = 'd8a2f5c3e619'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Функция из миграции 9a41c7e2d5b0; {lock} - сериализация создания партиций
+CREATE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_shipment_partition(p_month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    month_start DATE := date_trunc('month', p_month)::DATE;
+    month_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::DATE;
+    partition_name TEXT := 'shipment_' || to_char(p_month, 'YYYY_MM');
+BEGIN
+    {lock}
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE shipment INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        partition_name
+    );
+
+    EXECUTE format(
+        'WITH moved AS (
+            DELETE FROM shipment_default
+            WHERE shipment_date >= %L AND shipment_date < %L
+            RETURNING *
+        )
+        INSERT INTO %I SELECT * FROM moved',
+        month_start, month_end, partition_name
+    );
+
+    EXECUTE format(
+        'ALTER TABLE shipment ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, month_start, month_end
+    );
+
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Без блокировки два запуска (cron и cli.py partitions, два сервера) оба
+# видят, что партиции нет, и второй падает на CREATE TABLE с "relation
+# already exists". Транзакционная advisory-блокировка держится до конца
+# транзакции: второй дождется COMMIT первого и увидит готовую таблицу.
+PARTITION_LOCK = "PERFORM pg_advisory_xact_lock(hashtext('create_shipment_partition'));"
+
+
+def upgrade() -> None:
+    op.execute(CREATE_PARTITION_FUNCTION.format(lock=PARTITION_LOCK))
+
+
+def downgrade() -> None:
+    op.execute(CREATE_PARTITION_FUNCTION.format(lock=""))
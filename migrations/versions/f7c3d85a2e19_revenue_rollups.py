@@ -0,0 +1,154 @@
+"""revenue rollups
+
+Revision ID: f7c3d85a2e19
+Revises: e2a6c91f3b84
+Create Date: 2026-10-20 00:41:27.318562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c3d85a2e19'
+down_revision: Union[str, Sequence[str], None] = 'e2a6c91f3b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Выручка по дням в разрезе маршрута, машины и водителя: (таблица, столбец ключа)
+ROLLUPS = [
+    ('revenue_daily_route', 'route_id'),
+    ('revenue_daily_car', 'car_id'),
+    ('revenue_daily_driver', 'driver_id'),
+]
+
+# В выручку идут живые неотмененные перевозки - и рабочие, и архивные
+REVENUE_CONDITION = "active AND status <> 'cancelled'"
+
+# Триггеры уровня оператора: (событие, строки "+1", строки "-1")
+EVENTS = [
+    ('insert', 'new_rows', None),
+    ('update', 'new_rows', 'old_rows'),
+    ('delete', None, 'old_rows'),
+]
+
+
+def _delta_sql(plus: Union[str, None], minus: Union[str, None]) -> str:
+    """
+    Один оператор: изменение выручки по строкам переходных таблиц
+    (новые строки со знаком +, старые со знаком -) прибавляется ко всем
+    трем сводкам. Суммы в numeric, чтобы +x и -x гасились точно.
+    """
+    parts = []
+    for rows, sign in ((plus, 1), (minus, -1)):
+        if rows:
+            parts.append(f"""
+                SELECT shipment_date::date AS day, route_id, car_id, driver_id,
+                       {sign} AS shipments_count,
+                       {sign} * cargo_weight::numeric AS total_weight,
+                       {sign} * COALESCE(total_cost, 0)::numeric AS total_cost
+                FROM {rows}
+                WHERE {REVENUE_CONDITION}""")
+
+    upserts = []
+    for table, key in ROLLUPS:
+        upserts.append(f"""
+            INSERT INTO {table} (day, {key}, shipments_count, total_weight, total_cost)
+            SELECT day, {key}, SUM(shipments_count), SUM(total_weight), SUM(total_cost)
+            FROM delta
+            GROUP BY day, {key}
+            HAVING SUM(shipments_count) <> 0 OR SUM(total_weight) <> 0 OR SUM(total_cost) <> 0
+            ON CONFLICT (day, {key}) DO UPDATE
+            SET shipments_count = {table}.shipments_count + EXCLUDED.shipments_count,
+                total_weight = {table}.total_weight + EXCLUDED.total_weight,
+                total_cost = {table}.total_cost + EXCLUDED.total_cost""")
+
+    # Последняя сводка - основной оператор, первые две - в CTE
+    ctes = [f"delta AS ({' UNION ALL '.join(parts)})"]
+    ctes += [f"upsert_{table} AS ({sql})" for (table, _), sql in zip(ROLLUPS[:-1], upserts[:-1])]
+    return f"WITH {', '.join(ctes)} {upserts[-1]};"
+
+
+def upgrade() -> None:
+    for table, key in ROLLUPS:
+        op.create_table(
+            table,
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column(key, sa.Uuid(), nullable=False),
+            sa.Column('shipments_count', sa.Integer(), nullable=False),
+            sa.Column('total_weight', sa.Numeric(), nullable=False),
+            sa.Column('total_cost', sa.Numeric(), nullable=False),
+            sa.PrimaryKeyConstraint('day', key),
+        )
+        # Отчеты по одной машине/водителю/маршруту за период
+        op.create_index(f'ix_{table}_{key}_day', table, [key, 'day'])
+
+    # Сводки ведут триггеры уровня оператора на shipment и shipment_archive.
+    # Вставка с расчетом стоимости (034) дает два шага: INSERT добавляет
+    # количество и вес, UPDATE total_cost из триггера стоимости - сумму.
+    # Перенос в архив - минус в shipment и плюс в shipment_archive.
+    for event, plus, minus in EVENTS:
+        op.execute(f"""
+        CREATE OR REPLACE FUNCTION revenue_rollup_after_{event}()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            {_delta_sql(plus, minus)}
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+        """)
+
+        referencing = " ".join(
+            f"{kind} TABLE AS {rows}"
+            for kind, rows in (('OLD', minus), ('NEW', plus)) if rows
+        )
+        for source in ('shipment', 'shipment_archive'):
+            op.execute(f"""
+            DROP TRIGGER IF EXISTS {source}_revenue_after_{event} ON {source};
+            CREATE TRIGGER {source}_revenue_after_{event}
+                AFTER {event.upper()} ON {source}
+                REFERENCING {referencing}
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION revenue_rollup_after_{event}();
+            """)
+
+    # Полный пересчет: начальное заполнение и восстановление после
+    # изменений в обход триггеров (TRUNCATE)
+    rebuild = []
+    for table, key in ROLLUPS:
+        rebuild.append(f"""
+            INSERT INTO {table} (day, {key}, shipments_count, total_weight, total_cost)
+            SELECT shipment_date::date, {key}, COUNT(*),
+                   SUM(cargo_weight::numeric), SUM(COALESCE(total_cost, 0)::numeric)
+            FROM (
+                SELECT shipment_date, {key}, cargo_weight, total_cost FROM shipment WHERE {REVENUE_CONDITION}
+                UNION ALL
+                SELECT shipment_date, {key}, cargo_weight, total_cost FROM shipment_archive WHERE {REVENUE_CONDITION}
+            ) s
+            GROUP BY 1, 2;""")
+
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION rebuild_revenue_rollups()
+    RETURNS void AS $$
+    BEGIN
+        TRUNCATE {', '.join(table for table, _ in ROLLUPS)};
+        {''.join(rebuild)}
+    END;
+    $$ LANGUAGE plpgsql;
+    """)
+    op.execute("SELECT rebuild_revenue_rollups();")
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION IF EXISTS rebuild_revenue_rollups();")
+
+    for event, _, _ in reversed(EVENTS):
+        for source in ('shipment_archive', 'shipment'):
+            op.execute(f"DROP TRIGGER IF EXISTS {source}_revenue_after_{event} ON {source};")
+        op.execute(f"DROP FUNCTION IF EXISTS revenue_rollup_after_{event}();")
+
+    for table, _ in reversed(ROLLUPS):
+        op.drop_table(table)